@@ -33,7 +33,7 @@
 
 import os, sys, logging, traceback, codecs, datetime, copy, time, ast, math, re, random, shutil, json, csv, multiprocessing, subprocess
 import soton_corenlppy, openiepy, lexicopy, nltk.stem
-import test_attrib_ie_regex
+import test_attrib_ie_regex, nlp_cache_lib, nlp_scheduler_lib, lexicon_snapshot_lib, lexicon_matcher_lib, wordnet_closure_lib
 
 
 '''
@@ -52,7 +52,1855 @@ def read_noun_type_ranked_list( filename = None, dict_openie_config = {} ) :
 		if ( len(strLine) > 0 ) and (strLine[0] != '#') :
 			listRankedNounType.append( strLine.strip() )
 	
-	return listRankedNounType
+	# compile a rank index, used for lexicon import filtering and schema disambiguation
+	return lexicon_matcher_lib.compile_schema_rank_index( schema_ranked_list = listRankedNounType )
+
+def get_pos_pattern_settings( pos_pattern_type = 'attributional' ) :
+	"""
+	return the POS pattern settings for a POS pattern type, using the patterns defined in test_attrib_ie_regex
+
+	:param str pos_pattern_type: propositional | attributional
+
+	:return: POS pattern settings
+	:rtype: dict
+	"""
+
+	if pos_pattern_type == 'propositional' :
+		dict_POS_pattern_settings = {
+				'exec_order' : test_attrib_ie_regex.listPropExecutionOrder,
+				'pos_patterns' : test_attrib_ie_regex.dictPropPatterns,
+				'phrase_patterns' : test_attrib_ie_regex.dictPropVarPhrasePatterns,
+				'seed_tuples' : test_attrib_ie_regex.listSeedTuplesProp,
+				'prevent_sequence' : test_attrib_ie_regex.listPropPreventSequentialMatchesTriples,
+				'seed_var_mapping' : test_attrib_ie_regex.dictPropSeedToTemplateMapping,
+				'seed_subsumption' : True,
+				'seed_generation_strategy' : 'contiguous_tuple_with_seq_groups',
+				'template_generalization_strategy' : test_attrib_ie_regex.dictGeneralizeStrategyProp,
+				'filter_extract_strat' : 'min_semantic_drift_per_target',
+				'filter_prop_strat' : 'min_length',
+				'prop_stoplist_prefix' : test_attrib_ie_regex.dictPropStoplistPrefixProp,
+				'prop_stoplist_suffix' : test_attrib_ie_regex.dictPropStoplistSuffixProp,
+				'proposition_pattern' : test_attrib_ie_regex.listPropositionPatternPropSet,
+				'displaced_context' : test_attrib_ie_regex.dictDisplacedContextProp,
+				'max_semantic_drift' : test_attrib_ie_regex.nMaxSemanticDriftProp,
+				'max_end_to_end_semantic_dist' : test_attrib_ie_regex.nMaxEndToEndSemanticDriftProp,
+				'semantic_drift_cost' : test_attrib_ie_regex.dictSemanticDriftProp,
+				'include_context_in_prop' : True,
+				'longest_dep_path' : 128,
+				'longest_inter_target_walk' : 5,
+				'min_var_connection' : 2,
+				'avoid_dep' : test_attrib_ie_regex.setAvoidDepInWalkProp,
+				'sent_token_seps' : [ '.', '\n', '\r', '\f', u'\u2026' ],
+			}
+
+	elif pos_pattern_type == 'attributional' :
+		dict_POS_pattern_settings = {
+				'exec_order' : test_attrib_ie_regex.listAttrExecutionOrder,
+				'pos_patterns' : test_attrib_ie_regex.dictAttrPatterns,
+				'phrase_patterns' : test_attrib_ie_regex.dictAttrVarPhrasePatterns,
+				'seed_tuples' : test_attrib_ie_regex.listSeedTuplesAttr,
+				'prevent_sequence' : test_attrib_ie_regex.listAttrPreventSequentialMatchesTriples,
+				'seed_var_mapping' : test_attrib_ie_regex.dictAttrSeedToTemplateMapping,
+				'seed_subsumption' : False,
+				'seed_generation_strategy' : 'contiguous_tuple_with_seq_groups',
+				'template_generalization_strategy' : test_attrib_ie_regex.dictGeneralizeStrategyAttr,
+				'filter_extract_strat' : 'min_semantic_drift_per_target',
+				#'filter_prop_strat' : 'min_length',
+				'filter_prop_strat' : 'prop_subsumption',
+				'prop_stoplist_prefix' : test_attrib_ie_regex.dictPropStoplistPrefixAttr,
+				'prop_stoplist_suffix' : test_attrib_ie_regex.dictPropStoplistSuffixAttr,
+				'proposition_pattern' : test_attrib_ie_regex.listPropositionPatternAttrSet,
+				'displaced_context' : test_attrib_ie_regex.dictDisplacedContextAttr,
+				'max_semantic_drift' : test_attrib_ie_regex.nMaxSemanticDriftAttr,
+				'max_end_to_end_semantic_dist' : test_attrib_ie_regex.nMaxEndToEndSemanticDriftAttr,
+				'semantic_drift_cost' : test_attrib_ie_regex.dictSemanticDriftAttr,
+				'include_context_in_prop' : False,
+				'longest_dep_path' : 128,
+				'longest_inter_target_walk' : 5,
+				'min_var_connection' : 0,
+				'avoid_dep' : test_attrib_ie_regex.setAvoidDepInWalkAttr,
+				'sent_token_seps' : [ ';', ':', '.', '\n', '\r', '\f', u'\u2026' ],
+			}
+
+	else :
+		raise Exception( 'unknown pos_pattern_type = ' + repr(pos_pattern_type) )
+
+	# check there is a seed pattern per proposition pattern
+	if len( dict_POS_pattern_settings['seed_tuples'] ) != len( dict_POS_pattern_settings['proposition_pattern'] ) :
+		raise Exception( 'there should be a 1 to 1 mapping between listSeedTuplesX and listPropositionPatternX' )
+
+	return dict_POS_pattern_settings
+
+def read_attrib_ie_config( filename_config = None, logger = None ) :
+	"""
+	read an attrib_ie config file (e.g. ch_attrib_ie.ini) and setup the openie config object used by all attrib_ie functions
+
+	:param str filename_config: attrib_ie config file
+	:param logging.Logger logger: logger to use
+
+	:return: ( dict_attrib_ie_settings, dict_openie_config )
+	:rtype: tuple
+	"""
+
+	if not isinstance( filename_config, str ) :
+		raise Exception( 'invalid filename_config' )
+	if not os.path.isfile( filename_config ) :
+		raise Exception( '<config file> ' + filename_config + ' does not exist' )
+
+	# load config
+	dictConfig = soton_corenlppy.config_helper.read_config( filename_config )
+
+	dictSettings = {
+		'output_pos' : ast.literal_eval( dictConfig['output_pos'] ),
+		'output_seed' : ast.literal_eval( dictConfig['output_seed'] ),
+		'output_plain_extracts' : ast.literal_eval( dictConfig['output_plain_extracts'] ),
+		'output_encoded_extracts' : ast.literal_eval( dictConfig['output_encoded_extracts'] ),
+		'output_annotated_prop' : ast.literal_eval( dictConfig['output_annotated_prop'] ),
+		'random_subset_training' : int( dictConfig['random_subset_training'] ),
+		'target_extraction_templates' : int( dictConfig['target_extraction_templates'] ),
+		'process_count' : int( dictConfig['process_count'] ),
+		'max_sent_limit' : int( dictConfig['max_sent_limit'] ),
+		'list_lexicon_files' : dictConfig['list_lexicon_files'],
+		'strategy_seed_tuples' : dictConfig['strategy_seed_tuples'],
+		'relevance_feedback_phases' : int( dictConfig['relevance_feedback_phases'] ),
+		'relevance_feedback_percentage_per_phase' : int( dictConfig['relevance_feedback_percentage_per_phase'] ),
+		'nlp_cache_file' : dictConfig['nlp_cache_file'],
+		'nlp_cache_max_entries' : int( dictConfig['nlp_cache_max_entries'] ),
+		'dedup_sents' : ast.literal_eval( dictConfig['dedup_sents'] ),
+		'lexicon_snapshot_file' : dictConfig['lexicon_snapshot_file'],
+		'resident_stanford' : ast.literal_eval( dictConfig['resident_stanford'] ),
+		}
+
+	if not dictSettings['strategy_seed_tuples'] in ['premissive','selective','strict','no_filter'] :
+		raise Exception('invalid pruning strategy')
+
+	# setup structure with the right settings for the POS pattern type
+	dictSettings['pos_pattern_settings'] = get_pos_pattern_settings( pos_pattern_type = dictConfig['pos_pattern_type'] )
+
+	# Disable stemming and rely on Wordnet morphy() instead as its more reliable
+	#dictSettings['stemmer'] = nltk.stem.RegexpStemmer('s$', min=4)
+	dictSettings['stemmer'] = None
+
+	# setup parser config
+	# make sure whitespace does NOT include /\ as we want to use these for patterns later
+	# note: don't bother with ' in whitespace as this is handled separately (and removed if not grammatical)
+	# \u201a & \u201b == unicode single quote
+	# \u201c & \u201d == unicode double quote
+	# \u2018 & \u2019 == unicode apostrophe
+	# \u2026 == ... unicode chart used by twitter to mark truncated tweet text at end of tweet
+	# a null stemmer is provided as we will handle pluruals etc in the regex vocab explicitly (to avoid losing s at end of named entities)
+	# for CH data the text is good, so do not treat hythernated tokens as punctuation so we get tokens like 'four-faceted' preserved
+	# allow hashtags (stanford parser will POS labelled them NN)
+	# set apostrophe_handling to preserve, so we keep "s'" which gets labelled by Stanford POS tagger as 'POS'
+	# dont use any sent tokenizer (t_sent) OR sent token seps, since input data from datasets is manually extracted into sents anyway (and it might get confused with abbreviations like Corp. or monkey.com)
+
+	dictAttribIEConfig = openiepy.openie_lib.get_openie_config(
+		lang_codes = dictConfig['language_codes'],
+		logger = logger,
+		stanford_tagger_dir = dictConfig['stanford_tagger_dir'],
+		stanford_parser_dir = dictConfig['stanford_parser_dir'],
+		dep_model_path = dictConfig['model_path'],
+		dep_model_jar = dictConfig['model_jar'],
+		dep_options = dictConfig['model_options'],
+		whitespace = u'\'"\u201a\u201b\u201c\u201d\u2018\u2019',
+		punctuation = """,;\/:+~&*=!?""",
+		allow_hashtags = True,
+		# sent_token_seps = [ '\n', '\r', '\f', u'\u2026', ';' ],
+		#sent_token_seps = [ '\n', '\r', '\f', u'\u2026' ],
+		sent_token_seps = dictSettings['pos_pattern_settings']['sent_token_seps'],
+		t_sent = None,
+		apostrophe_handling = 'preserve'
+		)
+
+	# add in regex and POS labels for domain-specific label types (e.g. catalogue index containing contain periods, which by default are treated erroneously as sent delimiters)
+	# so the common_parse_lib tokenization and POS tagger function picks them up and uses them
+	# note: remove NAMESPACE as the alpha_numeric pattern will pick this up (as some CH identifiers are very similar to namespace 123.A67)
+	dictAttribIEConfig['token_preservation_regex'] = [ ('regex_url','URI') ]
+	for strLabelType in test_attrib_ie_regex.listTagPatternOrder :
+		# compile pattern
+		rePattern = test_attrib_ie_regex.dictTagPatterns[strLabelType][0]
+		strPOSLabel = test_attrib_ie_regex.dictTagPatterns[strLabelType][1]
+
+		# insert new regex POS pattern
+		dictAttribIEConfig[strLabelType] = rePattern
+		dictAttribIEConfig['token_preservation_regex'].append( ( strLabelType, strPOSLabel ) )
+
+	return ( dictSettings, dictAttribIEConfig )
+
+def get_lexicon_source_files( list_lexicon_files = [] ) :
+	"""
+	return the files a lexicon is built from
+
+	:param list list_lexicon_files: list of lexicon file entries from config (see ch_attrib_ie.ini list_lexicon_files)
+
+	:return: list of filenames
+	:rtype: list
+	"""
+
+	if not isinstance( list_lexicon_files, list ) :
+		raise Exception( 'invalid list_lexicon_files' )
+
+	listSourceFiles = []
+	for entry in list_lexicon_files :
+		for strKey in [ 'file', 'lemma', 'hyper', 'related' ] :
+			if strKey in entry :
+				listSourceFiles.append( entry[strKey] )
+	return listSourceFiles
+
+def load_lexicon( list_lexicon_files = [], stemmer = None, snapshot_file = '', dict_openie_config = None ) :
+	"""
+	load the lexicon files listed in the attrib_ie config (see attrib_ie.build_lexicon()).
+	if snapshot_file is not '' the lexicon is loaded from a memory mapped snapshot, which is (re)built if it is missing or any lexicon file has changed.
+
+	:param list list_lexicon_files: list of lexicon file entries from config (see ch_attrib_ie.ini list_lexicon_files)
+	:param nltk.stem.api.StemmerI stemmer: NLTK stemmer, default is None
+	:param str snapshot_file: lexicon snapshot file ('' for no snapshot)
+	:param dict dict_openie_config: config object returned from attrib_ie.read_attrib_ie_config()
+
+	:return: ( dict_lexicon_uri, dict_lexicon_phrase )
+	:rtype: tuple
+	"""
+
+	if not isinstance( list_lexicon_files, list ) :
+		raise Exception( 'invalid list_lexicon_files' )
+	if not isinstance( snapshot_file, (str,unicode) ) :
+		raise Exception( 'invalid snapshot_file' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	if snapshot_file == '' :
+		return build_lexicon( list_lexicon_files = list_lexicon_files, stemmer = stemmer, dict_openie_config = dict_openie_config )
+
+	( dictLexiconURI, dictLexiconPhrase ) = lexicon_snapshot_lib.load_lexicon_snapshot(
+		filename = snapshot_file,
+		list_source_files = get_lexicon_source_files( list_lexicon_files = list_lexicon_files ),
+		list_settings = [ list_lexicon_files, repr(stemmer), wordnet_closure_lib.get_wordnet_version() ],
+		build_function = lambda : build_lexicon( list_lexicon_files = list_lexicon_files, stemmer = stemmer, dict_openie_config = dict_openie_config ),
+		dict_openie_config = dict_openie_config )
+
+	dict_openie_config['logger'].info( 'LEXICON snapshot' )
+	dict_openie_config['logger'].info( 'num uri = ' + repr(len(dictLexiconURI)) )
+	dict_openie_config['logger'].info( 'num phrases = ' + repr(len(dictLexiconPhrase)) )
+
+	return ( dictLexiconURI, dictLexiconPhrase )
+
+def build_lexicon( list_lexicon_files = [], stemmer = None, dict_openie_config = None ) :
+	"""
+	load, merge and wordnet filter the lexicon files listed in the attrib_ie config.
+	the lexicon is used to filter seed tuples when generating open extraction templates.
+
+	:param list list_lexicon_files: list of lexicon file entries from config (see ch_attrib_ie.ini list_lexicon_files)
+	:param nltk.stem.api.StemmerI stemmer: NLTK stemmer, default is None
+	:param dict dict_openie_config: config object returned from attrib_ie.read_attrib_ie_config()
+
+	:return: ( dict_lexicon_uri, dict_lexicon_phrase )
+	:rtype: tuple
+	"""
+
+	if not isinstance( list_lexicon_files, list ) :
+		raise Exception( 'invalid list_lexicon_files' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	logger = dict_openie_config['logger']
+
+	#
+	# Lexicon import
+	#   manual noun list with domain specific noun type mappings (e.g. part, shape)
+	#   lexicon files specify nouns for filtering purposes later
+	#
+	logger.info( '\n\nLEXICON\n' )
+
+	listLexicon = []
+	listNounTypeRanked = lexicon_matcher_lib.compile_schema_rank_index( schema_ranked_list = [] )
+	for entry in list_lexicon_files :
+
+		# load ranked noun type mappings (will be used as a filter for lexicon import and to disambiguate between multiple schema options)
+		if entry['type'] == 'ranked_list' :
+			listNounTypeRanked = read_noun_type_ranked_list(
+				filename = entry['file'],
+				dict_openie_config = dict_openie_config
+				)
+			logger.info( 'noun type ranked list = ' + repr(len(listNounTypeRanked)) )
+
+		# load NELL noun phrases
+		elif entry['type'] == 'nell' :
+			( dictLoadedLexURI, dictLoadedLexPhrase ) = lexicopy.lexicon_lib.import_NELL_lexicon(
+				filename_nell = entry['file'],
+				stemmer = stemmer,
+				lower_case = False,
+				apply_wordnet_morphy = True,
+				allowed_schema_list = listNounTypeRanked,
+				dict_lexicon_config = dict_openie_config )
+
+			listLexicon.append( ( dictLoadedLexURI, dictLoadedLexPhrase ) )
+			logger.info( 'loaded num uri = ' + repr(len(dictLoadedLexURI)) )
+			logger.info( 'loaded num phrases = ' + repr(len(dictLoadedLexPhrase)) )
+
+		# load plain noun phrases
+		elif entry['type'] == 'plain' :
+			( dictLoadedLexURI, dictLoadedLexPhrase ) = lexicopy.lexicon_lib.import_plain_lexicon(
+				filename_lemma = entry['file'],
+				list_column_names = ['schema','phrase_list','hypernym'],
+				phrase_delimiter = '|',
+				stemmer = stemmer,
+				lower_case = False,
+				apply_wordnet_morphy = True,
+				allowed_schema_list = listNounTypeRanked,
+				dict_lexicon_config = dict_openie_config )
+
+			listLexicon.append( ( dictLoadedLexURI, dictLoadedLexPhrase ) )
+			logger.info( 'loaded num uri = ' + repr(len(dictLoadedLexURI)) )
+			logger.info( 'loaded num phrases = ' + repr(len(dictLoadedLexPhrase)) )
+
+		# load SKOS lexicon
+		elif entry['type'] == 'skos_json' :
+			( dictLoadedLexURI, dictLoadedLexPhrase ) = lexicopy.lexicon_lib.import_skos_lexicon(
+				filename_lemma = entry['lemma'],
+				filename_hypernym = entry['hyper'],
+				filename_related = entry['related'],
+				serialized_format = 'json',
+				lower_case = False,
+				stemmer = stemmer,
+				apply_wordnet_morphy = True,
+				allowed_schema_list = listNounTypeRanked,
+				dict_lexicon_config = dict_openie_config )
+
+			listLexicon.append( ( dictLoadedLexURI, dictLoadedLexPhrase ) )
+			logger.info( 'loaded num uri = ' + repr(len(dictLoadedLexURI)) )
+			logger.info( 'loaded num phrases = ' + repr(len(dictLoadedLexPhrase)) )
+
+	# merge lexicon into a single one
+	tupleMerged = lexicopy.lexicon_lib.merge_lexicon(
+		list_lexicon = listLexicon,
+		dict_lexicon_config = dict_openie_config
+		)
+	if tupleMerged != None :
+		( dictLexiconURI, dictLexiconPhrase ) = tupleMerged
+	else :
+		dictLexiconURI = {}
+		dictLexiconPhrase = {}
+
+	logger.info( 'merged num uri = ' + repr(len(dictLexiconURI)) )
+	logger.info( 'merged num phrases = ' + repr(len(dictLexiconPhrase)) )
+
+	# min wordnet count is 0, so ANY mention in WordNet will be removed from the CH lexicon.
+	# this avoids 'lotus' for example, with count 0, being treated as a material (as it is in CH lexicon).
+	# this means lexicon will ONLY contain the specialist domain vocab and no any common words.
+	lexicopy.lexicon_lib.filter_lexicon_wordnet(
+		dict_phrase = dictLexiconPhrase,
+		count_freq_min = 0,
+		dict_lexicon_config = dict_openie_config
+		)
+
+	logger.info( 'LEXICON filtered using wordnet' )
+	logger.info( 'num uri = ' + repr(len(dictLexiconURI)) )
+	logger.info( 'num phrases = ' + repr(len(dictLexiconPhrase)) )
+
+	return ( dictLexiconURI, dictLexiconPhrase )
+
+def read_sentence_file( dataset_dir = None, max_sent = -1, dict_openie_config = None ) :
+	"""
+	read a dataset sentences.txt file. each line has the format <sentid> \\t <sent> \\t <entityid>.
+
+	:param str dataset_dir: dataset dir containing a sentences.txt file
+	:param int max_sent: limit for number of sents read (-1 for no limit)
+	:param dict dict_openie_config: config object returned from attrib_ie.read_attrib_ie_config()
+
+	:return: dict of sent text indexed by sent index = { sent_index : sent_text }
+	:rtype: dict
+	"""
+
+	if not isinstance( dataset_dir, (str,unicode) ) :
+		raise Exception( 'invalid dataset_dir' )
+	if not isinstance( max_sent, int ) :
+		raise Exception( 'invalid max_sent' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	# read in sentence list
+	dictText = {}
+
+	# check input file exists
+	strInputFile = dataset_dir + os.sep + 'sentences.txt'
+	if os.path.exists( strInputFile ) == False :
+		raise Exception( 'input file does not exist : ' + strInputFile )
+
+	# read input data
+	readHandle = codecs.open( strInputFile, 'r', 'utf-8', errors = 'replace' )
+	listLines = readHandle.readlines()
+	readHandle.close()
+
+	# debug
+	#listLines = listLines[2890:2895]
+	#listLines = listLines[:50]
+
+	nLine = 0
+	for strLine in listLines :
+		listComponents = strLine.rstrip('\n\r').split( '\t' )
+		# clauseIE has format <sentid> <sent>
+		# attribIE has format <sentid> <sent> <entityid>
+		# oie-benchmark has format <sent>
+		# we ignore entity ID but its there for future use should cross-sent co-resolution or discourse level analysis be needed
+		if len(listComponents) > 3 :
+			raise Exception( 'sentence file parse error : ' + repr(strLine) )
+
+		if len(listComponents) > 1 :
+			nTextIndex = 1
+			nSentIndex = int( listComponents[0] )
+		else :
+			nTextIndex = 0
+			nSentIndex = nLine
+
+		# unescape out '&AMP ;' and '&AMP;' so its just &
+		listComponents[nTextIndex] = listComponents[nTextIndex].replace( '&AMP ;', '&' )
+		listComponents[nTextIndex] = listComponents[nTextIndex].replace( '&AMP;', '&' )
+
+		# replace variants of " used in dataset so its easier to POS and dep parse
+		listComponents[nTextIndex] = listComponents[nTextIndex].replace( "``", '"' )
+		listComponents[nTextIndex] = listComponents[nTextIndex].replace( "''", '"' )
+
+		# replace -- with a comma
+		listComponents[nTextIndex] = listComponents[nTextIndex].replace( "--", ',' )
+
+		# remember sent text
+		dictText[ nSentIndex ] = listComponents[nTextIndex]
+		nLine = nLine + 1
+
+		# check sent limit
+		if (max_sent != -1) and (nLine >= max_sent) :
+			break
+
+	dict_openie_config['logger'].info( 'Number of sent in corpus = ' + str(len(dictText)) )
+
+	return dictText
+
+def normalize_sent_tokens( list_tokens = None ) :
+	"""
+	apply the sentence text rewrites of attrib_ie.read_sentence_file() to a list of sent tokens
+
+	:param list list_tokens: list of sent tokens
+
+	:return: list of normalized sent tokens
+	:rtype: list
+	"""
+
+	listResult = []
+	for strToken in list_tokens :
+		# unescape out '&AMP ;' (split over two tokens) and '&AMP;' so its just &
+		if (strToken == ';') and (len(listResult) > 0) and (listResult[-1].endswith( '&AMP' )) :
+			listResult[-1] = listResult[-1][ : -len('&AMP') ] + '&'
+			continue
+		strToken = strToken.replace( '&AMP;', '&' )
+
+		# replace variants of " used in dataset so its easier to POS and dep parse
+		strToken = strToken.replace( "``", '"' )
+		strToken = strToken.replace( "''", '"' )
+
+		# replace -- with a comma
+		strToken = strToken.replace( "--", ',' )
+
+		listResult.append( strToken )
+
+	return listResult
+
+def read_sentence_token_file( dataset_dir = None, max_sent = -1, dict_openie_config = None ) :
+	"""
+	read a dataset sentences.jsonl file of pre-tokenized sents. each line is a JSON object { "sent_id" : int, "tokens" : [ token, ... ], "uri" : entity_id }.
+	tokens are used as they are (after attrib_ie.normalize_sent_tokens()), so sents are not tokenized a second time by attrib_ie.parse_corpus().
+
+	:param str dataset_dir: dataset dir containing a sentences.jsonl file
+	:param int max_sent: limit for number of sents read (-1 for no limit)
+	:param dict dict_openie_config: config object returned from attrib_ie.read_attrib_ie_config()
+
+	:return: ( dict of sent text, dict of sent tokens ) both indexed by sent index. sent text is the space delimited tokens.
+	:rtype: tuple
+	"""
+
+	if not isinstance( dataset_dir, (str,unicode) ) :
+		raise Exception( 'invalid dataset_dir' )
+	if not isinstance( max_sent, int ) :
+		raise Exception( 'invalid max_sent' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	dictText = {}
+	dictTokens = {}
+
+	# check input file exists
+	strInputFile = dataset_dir + os.sep + 'sentences.jsonl'
+	if os.path.exists( strInputFile ) == False :
+		raise Exception( 'input file does not exist : ' + strInputFile )
+
+	readHandle = codecs.open( strInputFile, 'r', 'utf-8', errors = 'replace' )
+	for strLine in readHandle :
+		if len( strLine.strip() ) == 0 :
+			continue
+
+		dictSent = json.loads( strLine )
+		if (not 'sent_id' in dictSent) or (not 'tokens' in dictSent) :
+			raise Exception( 'sentence token file parse error : ' + repr(strLine) )
+
+		nSentIndex = int( dictSent['sent_id'] )
+		listTokens = normalize_sent_tokens( list_tokens = dictSent['tokens'] )
+		dictTokens[ nSentIndex ] = listTokens
+		dictText[ nSentIndex ] = u' '.join( listTokens )
+
+		# check sent limit
+		if (max_sent != -1) and (len(dictText) >= max_sent) :
+			break
+	readHandle.close()
+
+	dict_openie_config['logger'].info( 'Number of sent in corpus = ' + str(len(dictText)) + ' (pre-tokenized)' )
+
+	return ( dictText, dictTokens )
+
+def read_dataset_sents( dataset_dir = None, max_sent = -1, dict_openie_config = None ) :
+	"""
+	read the sents of a dataset, using pre-tokenized sents from sentences.jsonl if the dataset has one and sentences.txt otherwise.
+
+	:param str dataset_dir: dataset dir containing a sentences.jsonl or sentences.txt file
+	:param int max_sent: limit for number of sents read (-1 for no limit)
+	:param dict dict_openie_config: config object returned from attrib_ie.read_attrib_ie_config()
+
+	:return: ( dict of sent text, dict of sent tokens or None if sents are not pre-tokenized ) both indexed by sent index
+	:rtype: tuple
+	"""
+
+	if os.path.exists( dataset_dir + os.sep + 'sentences.jsonl' ) == True :
+		return read_sentence_token_file( dataset_dir = dataset_dir, max_sent = max_sent, dict_openie_config = dict_openie_config )
+
+	dictText = read_sentence_file( dataset_dir = dataset_dir, max_sent = max_sent, dict_openie_config = dict_openie_config )
+	return ( dictText, None )
+
+def read_ground_truth( filename = None, dataset_dir = None ) :
+	"""
+	read a ground truth file of labelled extractions
+
+	:param str filename: ground truth file
+	:param str dataset_dir: dataset dir the ground truth belongs to (clauseIE datasets are forced to triples)
+
+	:return: list of ground truth tuples = [ ( sent_index, [ phrase, ... ], score ), ... ] with numbers left as strings
+	:rtype: list
+	"""
+
+	listGroundTruth = []
+
+	# read the ground truth data
+	readHandle = codecs.open( filename, 'r', 'utf-8', errors = 'replace' )
+	listLines = readHandle.readlines()
+	readHandle.close()
+
+	for strLine in listLines :
+		listComponents = strLine.rstrip('\n\r').split( '\t' )
+		if len(listComponents) == 1 :
+			# ignore sentences
+			continue
+		elif len(listComponents) > 1 :
+			# sent_index, [arg, rel, arg, context], 0|1
+			# sent_index, [subj, attr_base, attr_prep, obj], 0|1
+			# sent_index, [subj, attr], 0|1
+			# sent_index, [subj], 0|1
+			nSizeOfExtraction = len(listComponents) - 2
+			if nSizeOfExtraction < 1 :
+				raise Exception( 'invalid extraction in ground truth : ' + repr(listComponents) )
+
+			# for clauseIE only force it to triples
+			if dataset_dir in ['nyt-clauseIE','reverb-clauseIE','wikipedia-clauseIE'] :
+				if nSizeOfExtraction > 3 :
+					nSizeOfExtraction = 3
+
+			# remove single quote from both end (not multiple in case string has quotes in it) and make a proposition list
+			listProp = []
+			for nIndexEntry in range(1,nSizeOfExtraction+1) :
+				listProp.append( listComponents[nIndexEntry][1:-1] )
+
+			# add to list (leave numbers as strings)
+			listGroundTruth.append( ( listComponents[0], listProp, listComponents[-1] ) )
+
+	return listGroundTruth
+
+def randomize_ground_truth( dataset_dir = None, dict_openie_config = None ) :
+	"""
+	create a randomly ordered version of the ground truth (so we have a random sample for later relevance feedback work that is consitent across multiple feedback iterations).
+	nothing is done if the dataset has no ground truth file.
+
+	:param str dataset_dir: dataset dir containing an (optional) extractions-all-labelled.txt file
+	:param dict dict_openie_config: config object returned from attrib_ie.read_attrib_ie_config()
+	"""
+
+	# load the ground truth data and create a random sample (if we have a ground truth at all)
+	strGroundTruth = dataset_dir + os.sep + 'extractions-all-labelled.txt'
+	if os.path.exists( strGroundTruth ) == False :
+		return
+
+	listGroundTruth = read_ground_truth( filename = strGroundTruth, dataset_dir = dataset_dir )
+
+	# randomize the order of ground truth annotations, so feedback sample is a random sample
+	# dont shuffle as we want a consistent ground truth list per feedback run (manually shuffle file if this is important)
+	random.shuffle( listGroundTruth )
+
+	# serialize random sample of ground truth to file
+	strGroundTruthRandom = dataset_dir + os.sep + 'extractions-all-labelled-randomized.txt'
+	writeHandle = codecs.open( strGroundTruthRandom, 'w', 'utf-8', errors = 'replace' )
+	for ( nSentIndex, listProp, nScore ) in listGroundTruth :
+		writeHandle.write( str(nSentIndex) + '\t' )
+		for strPhrase in listProp :
+			writeHandle.write( strPhrase + '\t' )
+		writeHandle.write( str(nScore) + '\n' )
+	writeHandle.close()
+
+def parse_corpus( dict_text = None, dataset_dir = None, dict_attrib_ie_settings = None, worker_pool = None, dict_tokens = None, dict_openie_config = None ) :
+	"""
+	POS tag, create sent trees, annotate POS patterns and dependency parse a corpus of sents.
+	the parsed corpus is all that generate_templates() and execute_templates() need, so it can be parsed once and shared by both.
+	if dedup_sents is True only the first occurrence of each sent (after whitespace normalization) is parsed, and later occurrences are listed in 'duplicates' so generate_propositions() can fan out propositions to them and generate_templates() can count them in template frequencies.
+
+	:param dict dict_text: dict of sent text from attrib_ie.read_sentence_file()
+	:param str dataset_dir: dataset dir to write POS output to (if output_pos is True)
+	:param dict dict_attrib_ie_settings: settings returned from attrib_ie.read_attrib_ie_config()
+	:param dict worker_pool: worker pool handle returned from nlp_scheduler_lib.start_worker_pool(). None will start worker processes for each batch call.
+	:param dict dict_tokens: dict of pre-tokenized sents from attrib_ie.read_sentence_token_file() (None to tokenize dict_text)
+	:param dict dict_openie_config: config object returned from attrib_ie.read_attrib_ie_config()
+
+	:return: parsed corpus = { 'text' : {}, 'tagged_sents' : {}, 'sent_trees' : {}, 'sent_trees_pos_patterns' : {}, 'dep_graphs' : {}, 'duplicates' : {} } with each dict indexed by sent index. text has all sents, other dicts have unique sents only, and duplicates = { sent index : sent index of first occurrence }
+	:rtype: dict
+	"""
+
+	if not isinstance( dict_text, dict ) :
+		raise Exception( 'invalid dict_text' )
+	if not isinstance( dict_attrib_ie_settings, dict ) :
+		raise Exception( 'invalid dict_attrib_ie_settings' )
+	if not isinstance( dict_tokens, (dict,type(None)) ) :
+		raise Exception( 'invalid dict_tokens' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	logger = dict_openie_config['logger']
+	dict_POS_pattern_settings = dict_attrib_ie_settings['pos_pattern_settings']
+	nProcessMax = dict_attrib_ie_settings['process_count']
+
+	#
+	# POS tagging
+	#   stanford POS tagger +
+	#   Namespace and URI POS patterns +
+	#   CH POS tag patterns for CH-style citations and catalogue identifiers
+	#   note: POS patterns are declared in config object - see test_attrib_ie_regex.dictTagPatterns()
+	#
+
+	# sent deduplication (e.g. CH boilerplate like 'inscription on exterior')
+	# note: case is not normalized as the POS tagger is case sensitive
+	dictUniqueText = {}
+	dictDuplicates = {}
+	if dict_attrib_ie_settings['dedup_sents'] == True :
+		dictFirstOccurrence = {}
+		for nIndexDoc in sorted( dict_text.keys() ) :
+			strNormalized = u' '.join( dict_text[nIndexDoc].split() )
+			if strNormalized in dictFirstOccurrence :
+				dictDuplicates[nIndexDoc] = dictFirstOccurrence[strNormalized]
+			else :
+				dictFirstOccurrence[strNormalized] = nIndexDoc
+				dictUniqueText[nIndexDoc] = dict_text[nIndexDoc]
+
+		if len(dict_text) > 0 :
+			logger.info( 'sent dedup : ' + str(len(dict_text)) + ' sents, ' + str(len(dictUniqueText)) + ' unique, dedup ratio = ' + '%.3f' % ( 1.0 * len(dictDuplicates) / len(dict_text) ) )
+	else :
+		dictUniqueText = dict_text
+
+	dictSents = {}
+	nSentTotal = 0
+	for nIndexDoc in sorted( dictUniqueText.keys() ) :
+		if dict_tokens != None :
+			# pre-tokenized sents are used as they are
+			listTokens = dict_tokens[nIndexDoc]
+		else :
+			strUTF8Text = dictUniqueText[nIndexDoc]
+
+			# note: phrases matching dict_common_config['token_preservation_regex'] regex will be preserved as single tokens
+			listTokens = soton_corenlppy.common_parse_lib.unigram_tokenize_text( text = strUTF8Text, dict_common_config = dict_openie_config )
+		dictSents[ nIndexDoc ] = [ listTokens ]
+		nSentTotal = nSentTotal + 1
+
+	# POS tag document set (only sents not already in the POS cache are sent to the tagger)
+	dictPOSCache = None
+	if len( dict_attrib_ie_settings['nlp_cache_file'] ) > 0 :
+		dictPOSCache = nlp_cache_lib.open_cache(
+			filename = dict_attrib_ie_settings['nlp_cache_file'],
+			table = 'pos',
+			max_entries = dict_attrib_ie_settings['nlp_cache_max_entries'],
+			dict_openie_config = dict_openie_config )
+
+	dictTaggedSents = nlp_cache_lib.pos_tag_tokenset_batch_cached(
+						document_token_set = dictSents,
+						lang = 'en',
+						dict_cache = dictPOSCache,
+						max_processes = nProcessMax,
+						timeout = 300,
+						worker_pool = worker_pool,
+						resident = dict_attrib_ie_settings['resident_stanford'],
+						dict_common_config = dict_openie_config )
+
+	if dictPOSCache != None :
+		nlp_cache_lib.close_cache( dict_cache = dictPOSCache, dict_openie_config = dict_openie_config )
+
+	if (dict_attrib_ie_settings['output_pos'] == True) and (dataset_dir != None) :
+		# serialize output (POS)
+		strPOSFile = dataset_dir + os.sep + 'pos_labelled_sents.txt'
+		logger.info( 'POS tagged sent file: ' + strPOSFile )
+		writeHandle = codecs.open( strPOSFile, 'w', 'utf-8', errors = 'replace' )
+		for nIndexDoc in sorted( dictTaggedSents.keys() ) :
+			writeHandle.write( 'SENT\n' )
+			writeHandle.write( str(nIndexDoc) + '\n' )
+			writeHandle.write( 'TEXT\n' )
+			writeHandle.write( dict_text[nIndexDoc] + '\n' )
+			writeHandle.write( 'TAGGED SENT\n' )
+			for listSent in dictTaggedSents[nIndexDoc] :
+				writeHandle.write( soton_corenlppy.common_parse_lib.serialize_tagged_list( list_pos = listSent, dict_common_config = dict_openie_config ) + '\n' )
+		writeHandle.close()
+
+	#
+	# apply POS patterns to generate seed tuples
+	# - propositional seeds -> arg/rel/prep
+	# - attributional seeds -> s/a/p/o, s/a/o, s/a/p/<end>, s/a/<end>, <start>/a/<end>, <start>/a/p/<end>
+	#
+
+	# create a set of sent trees
+	logger.info( '\n\nSENT TREES\n' )
+	dictSentTrees = {}
+	dictSentTreesPOSPatterns = {}
+
+	for nIndexDoc in dictTaggedSents :
+		dictSentTrees[nIndexDoc] = []
+		for listSentTagged in dictTaggedSents[nIndexDoc] :
+			listSentTrees = soton_corenlppy.common_parse_lib.create_sent_trees( list_pos = listSentTagged, dict_common_config = dict_openie_config )
+			dictSentTrees[nIndexDoc].extend( listSentTrees )
+
+	# annotate sents with the POS patterns (arg, rel, prep, numeric)
+	for nIndexDoc in dictSentTrees :
+		listSentTreeAnnotated = openiepy.comp_sem_lib.annotate_using_pos_patterns(
+			list_sent_trees = dictSentTrees[nIndexDoc],
+			list_phrase_sequence_patterns_exec_order = dict_POS_pattern_settings['exec_order'],
+			dict_phrase_sequence_patterns = dict_POS_pattern_settings['pos_patterns'],
+			dict_openie_config = dict_openie_config )
+		dictSentTreesPOSPatterns[nIndexDoc] = listSentTreeAnnotated
+
+	#
+	# Dependency graphs
+	#
+
+	# get dependency parser
+	logger.info( '\n\nDEP PARSE\n' )
+	dep_parser = openiepy.comp_sem_lib.get_dependency_parser( dict_openie_config = dict_openie_config )
+
+	# dependancy parse tagged sents (only sents not already in the dep graph cache are sent to the parser)
+	dictDepCache = None
+	if len( dict_attrib_ie_settings['nlp_cache_file'] ) > 0 :
+		dictDepCache = nlp_cache_lib.open_cache(
+			filename = dict_attrib_ie_settings['nlp_cache_file'],
+			table = 'dep',
+			max_entries = dict_attrib_ie_settings['nlp_cache_max_entries'],
+			dict_openie_config = dict_openie_config )
+
+	dictDepGraphs = nlp_cache_lib.parse_sent_trees_batch_cached(
+		dict_doc_sent_trees = dictSentTrees,
+		dep_parser = dep_parser,
+		dict_custom_pos_mappings = test_attrib_ie_regex.dictTagDependancyParseMapping,
+		dict_cache = dictDepCache,
+		max_processes = nProcessMax,
+		worker_pool = worker_pool,
+		resident = dict_attrib_ie_settings['resident_stanford'],
+		dict_openie_config = dict_openie_config )
+
+	if dictDepCache != None :
+		nlp_cache_lib.close_cache( dict_cache = dictDepCache, dict_openie_config = dict_openie_config )
+
+	logger.info( 'dep graphs = ' + str(len(dictDepGraphs)) )
+
+	return {
+		'text' : dict_text,
+		'tagged_sents' : dictTaggedSents,
+		'sent_trees' : dictSentTrees,
+		'sent_trees_pos_patterns' : dictSentTreesPOSPatterns,
+		'dep_graphs' : dictDepGraphs,
+		'duplicates' : dictDuplicates,
+		}
+
+def generate_templates( dict_corpus = None, dataset_dir = None, template_file = None, lexicon_uri = {}, lexicon_phrase = {}, dict_attrib_ie_settings = None, worker_pool = None, dict_openie_config = None ) :
+	"""
+	generate seed tuples, open extraction templates and save templates to file (one template file per proposition pattern).
+	note: we generate seeds, templates and extractions *per pattern* to avoid longer patterns (subj, attr, prep, obj} being filtered in preference to shorter ones {subj, attr, obj} later
+
+	:param dict dict_corpus: parsed corpus from attrib_ie.parse_corpus()
+	:param str dataset_dir: dataset dir to write template files to
+	:param str template_file: template filename prefix (files written are <dataset_dir>/<template_file>_<pattern_index>.txt)
+	:param dict lexicon_uri: lexicon uri index from attrib_ie.load_lexicon()
+	:param dict lexicon_phrase: lexicon phrase index from attrib_ie.load_lexicon()
+	:param dict dict_attrib_ie_settings: settings returned from attrib_ie.read_attrib_ie_config()
+	:param dict worker_pool: worker pool handle returned from nlp_scheduler_lib.start_worker_pool(). None will start worker processes for each batch call.
+	:param dict dict_openie_config: config object returned from attrib_ie.read_attrib_ie_config()
+
+	:return: dict of normalized templates indexed by pattern index = { pattern_index : [ template, ... ] }
+	:rtype: dict
+	"""
+
+	if not isinstance( dict_corpus, dict ) :
+		raise Exception( 'invalid dict_corpus' )
+	if not isinstance( dataset_dir, (str,unicode) ) :
+		raise Exception( 'invalid dataset_dir' )
+	if not isinstance( template_file, (str,unicode) ) :
+		raise Exception( 'invalid template_file' )
+	if not isinstance( lexicon_uri, (dict,lexicon_snapshot_lib.LexiconSnapshotIndex) ) :
+		raise Exception( 'invalid lexicon_uri' )
+	if not isinstance( lexicon_phrase, (dict,lexicon_snapshot_lib.LexiconSnapshotIndex) ) :
+		raise Exception( 'invalid lexicon_phrase' )
+	if not isinstance( dict_attrib_ie_settings, dict ) :
+		raise Exception( 'invalid dict_attrib_ie_settings' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	logger = dict_openie_config['logger']
+	dict_POS_pattern_settings = dict_attrib_ie_settings['pos_pattern_settings']
+	strStrategyPruneSeedTuples = dict_attrib_ie_settings['strategy_seed_tuples']
+	stemmer = dict_attrib_ie_settings['stemmer']
+	dictSentTreesPOSPatterns = dict_corpus['sent_trees_pos_patterns']
+	dictDepGraphs = dict_corpus['dep_graphs']
+	dictDuplicates = dict_corpus.get( 'duplicates', {} )
+
+	# extract seed_tuples from annotated sents
+	logger.info( '\n\nSEED TUPLES\n' )
+	dictSeedTuplesPerPattern = {}
+	dictVarCandidatesPerPattern = {}
+
+	if len(lexicon_phrase) > 0 :
+		tupleLexiconFilter = ( lexicon_uri, lexicon_phrase )
+	else :
+		tupleLexiconFilter = None
+
+	# generate seeds for each set of patterns (so we can generate separate templates for each pattern)
+	for nIndexPattern in range(len(dict_POS_pattern_settings['seed_tuples'])) :
+
+		tupleSeedPattern = dict_POS_pattern_settings['seed_tuples'][nIndexPattern]
+		listSeqSeedPattern = [ tupleSeedPattern ]
+
+		listSeedTuplesTotal = []
+		dictVarCandidatesTotal = {}
+
+		for nIndexDoc in dict_corpus['sent_trees'] :
+
+			( listSeedTuples, dictVarCandidates ) = openiepy.comp_sem_lib.generate_seed_tuples(
+				list_sent_trees = dictSentTreesPOSPatterns[nIndexDoc],
+				generation_strategy = dict_POS_pattern_settings['seed_generation_strategy'],
+				lexicon_filter = tupleLexiconFilter,
+				set_annotations = set( dict_POS_pattern_settings['exec_order'] ),
+				dict_annotation_phrase_patterns = dict_POS_pattern_settings['phrase_patterns'],
+				list_sequences = listSeqSeedPattern,
+				prevent_sequential_instances = dict_POS_pattern_settings['prevent_sequence'],
+				dict_openie_config = dict_openie_config )
+
+			# merge sent results into total
+			listSeedTuplesTotal.extend( listSeedTuples )
+
+			for strVarType in dictVarCandidates :
+				if not strVarType in dictVarCandidatesTotal :
+					dictVarCandidatesTotal[strVarType] = []
+				for tupleVarPhrase in dictVarCandidates[strVarType] :
+					if not tupleVarPhrase in dictVarCandidatesTotal[strVarType] :
+						dictVarCandidatesTotal[strVarType].append( tupleVarPhrase )
+
+		# make a set to remove any duplicates
+		setSeedTuplesTotal = set( listSeedTuplesTotal )
+
+		# filter seed_tuple arguments using lexicon (to ensure they are high quality matches that appear)
+		# allow any relation type as the majority are not present in lexicon anyway (e.g. has)
+		# strategy A (permissive): make sure at least 1 arg or rel is in the lexicon
+		# strategy B (selective): make sure at least 2 arg or rel is in the lexicon
+		# strategy C (strict): make sure at least all arg or rel is in the lexicon
+		if len(lexicon_uri) > 0 :
+			dictMatcher = lexicon_matcher_lib.get_phrase_matcher(
+				lex_phrase_index = lexicon_phrase,
+				lex_uri_index = lexicon_uri,
+				dict_openie_config = dict_openie_config )
+
+			listSeedTuplesTotal = list( setSeedTuplesTotal )
+			nIndex = 0
+			while nIndex < len(listSeedTuplesTotal) :
+				nVarsOK = 0
+				nVarsChecked = 0
+
+				for nIndexVar in range(len(listSeedTuplesTotal[nIndex])) :
+					tupleSeed = listSeedTuplesTotal[nIndex][nIndexVar]
+					strVarType = tupleSeed[0]
+					listPhrase = list( tupleSeed[1:] )
+
+					# only filter noun phrase types (i.e. arg, subject, object)
+					if strVarType in ['ARGUMENT','SUBJECT','OBJECT'] :
+
+						nVarsChecked = nVarsChecked + 1
+
+						# stem if needed
+						if stemmer != None :
+							for nIndex2 in range(len(listPhrase)) :
+								listPhrase[nIndex2] = stemmer.stem( listPhrase[nIndex2].lower() )
+
+						# get all possible lexicon matches
+						listLexiconMatch = lexicon_matcher_lib.phrase_lookup(
+							matcher = dictMatcher,
+							phrase_tokens = listPhrase,
+							head_token = None,
+							max_gram = 5,
+							stemmer = stemmer,
+							apply_wordnet_morphy = True,
+							hyphen_variant = True,
+							dict_openie_config = dict_openie_config )
+
+						# any match is OK
+						if len(listLexiconMatch) > 0 :
+							nVarsOK = nVarsOK + 1
+
+				# prune seed tuples to ensure only good ones remain prior to generating open templates
+				bFailed = False
+				if strStrategyPruneSeedTuples == 'premissive' :
+					# strategy A (permissive): make sure at least 1 arg or rel is in the lexicon
+					if nVarsOK == 0 :
+						bFailed = True
+				elif strStrategyPruneSeedTuples == 'selective' :
+					# strategy B (selective): make sure at least 2 vars match in set, unless only one then allow 1
+					if nVarsOK < 2 :
+						bFailed = True
+					if (nVarsChecked == 1) and (nVarsOK != 1) :
+						bFailed = True
+				elif strStrategyPruneSeedTuples == 'strict' :
+					# strategy C (strict): make sure at least all arg or rel is in the lexicon
+					if nVarsOK != nVarsChecked :
+						bFailed = True
+				elif strStrategyPruneSeedTuples == 'no_filter' :
+					# do nothing
+					pass
+
+				# delete seed tuples that fail lexicon lookup
+				if bFailed == True :
+					del listSeedTuplesTotal[nIndex]
+				else :
+					nIndex = nIndex + 1
+			setSeedTuplesTotal = set( listSeedTuplesTotal )
+
+		dictSeedTuplesPerPattern[nIndexPattern] = setSeedTuplesTotal
+		dictVarCandidatesPerPattern[nIndexPattern] = dictVarCandidatesTotal
+
+		# write seeds to file
+		if dict_attrib_ie_settings['output_seed'] == True :
+			strSeedFile = dataset_dir + os.sep + str(nIndexPattern) + '_' + 'seed_tuples.txt'
+			writeHandle = codecs.open( strSeedFile, 'w', 'utf-8', errors = 'replace' )
+			writeHandle.write( 'SEED TUPLES\n' )
+			for tupleSeed in setSeedTuplesTotal :
+				writeHandle.write( repr(tupleSeed) + '\n' )
+
+			writeHandle.write( '\nVAR CANDIDATES\n' )
+			for strVarType in dictVarCandidatesTotal :
+				writeHandle.write( repr( strVarType ) + '\n' )
+				for tuplePhrase in dictVarCandidatesTotal[strVarType] :
+					writeHandle.write( '\t' + repr( tuplePhrase ) + '\n' )
+
+			writeHandle.close()
+
+	#
+	# Learn open extraction templates
+	#   use a random set of corpus sentences for training (e.g. 500 or 1000)
+	#   use all seed tuples
+	#   dep graph walk uses a set of universal dependencies
+	#     allowing BOTH {arg,rel,arg} and {arg,prep,arg}
+	#     capture negation and genuine/false patterns
+	#     allow long graph walks (up to 15 steps) to get the long tail context
+	#   aggresively normalize patterns (merge them into more general patterns)
+	#     keep topN (e.g. 1000) based on frequency of occurance
+	#   note: use a process farm to max CPU as this is a slow process
+	#
+
+	# create extraction templates based on a random subset of the whole data as its taking 1.5 minutes per artifact description on average
+	# e.g. 500 artifacts takes 0.5 day of processing with a 15 deep graph walk
+	# duplicate sents (see parse_corpus()) are in the subset like any other sent, sharing the graphs of their first occurrence. normalization ranks templates by frequency so every occurrence must count, but each unique sent is only generated once.
+	dictSubsetGraphs = dict( dictDepGraphs )
+	for nIndexDoc in dictDuplicates :
+		if dictDuplicates[nIndexDoc] in dictDepGraphs :
+			dictSubsetGraphs[nIndexDoc] = dictDepGraphs[ dictDuplicates[nIndexDoc] ]
+
+	listDocURI = dictSubsetGraphs.keys()
+	random.shuffle( listDocURI )
+	if dict_attrib_ie_settings['random_subset_training'] < len(listDocURI) :
+		listDocURI = listDocURI[:dict_attrib_ie_settings['random_subset_training']]
+
+	dictRandomSubsetGraphs = {}
+	for strDocURI in listDocURI :
+		dictRandomSubsetGraphs[strDocURI] = dictSubsetGraphs[strDocURI]
+
+	# generate templates for each set of patterns (so we can generate separate templates for each pattern)
+	dictTemplatesPerPattern = {}
+	for nIndexPattern in range(len(dict_POS_pattern_settings['seed_tuples'])) :
+		logger.info( 'pattern : ' + str(nIndexPattern) )
+		setSeedTuplesTotal = dictSeedTuplesPerPattern[nIndexPattern]
+		dictVarCandidatesTotal = dictVarCandidatesPerPattern[nIndexPattern]
+
+		# extract from corpus all sents where a seed_tuple exists somewhere in sent structure, but without any constraint on lexical position -> training_sents
+		listOpenExtractionPatternsTotal = nlp_scheduler_lib.generate_open_extraction_templates_batch(
+			seed_tuples = setSeedTuplesTotal,
+			var_candidates = dictVarCandidatesTotal,
+			dict_document_sent_graphs = dictRandomSubsetGraphs,
+			dict_seed_to_template_mappings = dict_POS_pattern_settings['seed_var_mapping'],
+			dict_context_dep_types = test_attrib_ie_regex.dictContextualDepTypes,
+			max_processes = dict_attrib_ie_settings['process_count'],
+			longest_dep_path = dict_POS_pattern_settings['longest_dep_path'],
+			longest_inter_target_walk = dict_POS_pattern_settings['longest_inter_target_walk'],
+			max_seed_variants = 128,
+			allow_seed_subsumption = dict_POS_pattern_settings['seed_subsumption'],
+			avoid_dep_set = dict_POS_pattern_settings['avoid_dep'],
+			worker_pool = worker_pool,
+			dict_openie_config = dict_openie_config )
+
+		logger.info( 'patterns before normalization = ' + str(len(listOpenExtractionPatternsTotal)) )
+
+		# aggresively normalize patterns. keep topN based on freq of occurance.
+		listOpenExtractionPatternsTotal = openiepy.comp_sem_lib.normalize_open_extraction_templates(
+			list_patterns = listOpenExtractionPatternsTotal,
+			topN = dict_attrib_ie_settings['target_extraction_templates'],
+			dict_generalize_strategy = dict_POS_pattern_settings['template_generalization_strategy'],
+			dict_openie_config = dict_openie_config )
+		logger.info( 'patterns after normalization = ' + str(len(listOpenExtractionPatternsTotal)) )
+
+		# write open pattern templates to disk
+		strTemplateFileNew = dataset_dir + os.sep + template_file + '_' + str(nIndexPattern) + '.txt'
+		logger.info( 'writing open extraction templates to file ' + strTemplateFileNew )
+		writeHandle = codecs.open( strTemplateFileNew, 'w', 'utf-8', errors = 'replace' )
+		for strPattern in listOpenExtractionPatternsTotal :
+			writeHandle.write( strPattern + '\n' )
+		writeHandle.close()
+
+		dictTemplatesPerPattern[nIndexPattern] = listOpenExtractionPatternsTotal
+
+	return dictTemplatesPerPattern
+
+def read_templates( dataset_dir = None, template_file = None, dict_attrib_ie_settings = None, dict_openie_config = None ) :
+	"""
+	load templates from file and parse them (one template file per proposition pattern). parsed templates can be loaded once and passed to execute_templates() for each corpus they are run on.
+
+	:param str dataset_dir: dataset dir to read template files from
+	:param str template_file: template filename prefix (files read are <dataset_dir>/<template_file>_<pattern_index>.txt)
+	:param dict dict_attrib_ie_settings: settings returned from attrib_ie.read_attrib_ie_config()
+	:param dict dict_openie_config: config object returned from attrib_ie.read_attrib_ie_config()
+
+	:return: templates = { pattern_index : ( list_templates, list_parsed_templates ) }
+	:rtype: dict
+	"""
+
+	if not isinstance( dataset_dir, (str,unicode) ) :
+		raise Exception( 'invalid dataset_dir' )
+	if not isinstance( template_file, (str,unicode) ) :
+		raise Exception( 'invalid template_file' )
+	if not isinstance( dict_attrib_ie_settings, dict ) :
+		raise Exception( 'invalid dict_attrib_ie_settings' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	logger = dict_openie_config['logger']
+	dict_POS_pattern_settings = dict_attrib_ie_settings['pos_pattern_settings']
+
+	dictTemplates = {}
+	for nIndexPattern in range(len(dict_POS_pattern_settings['proposition_pattern'])) :
+
+		# read templates from file
+		strFileToOpen = dataset_dir + os.sep + template_file + '_' + str(nIndexPattern) + '.txt'
+		if not os.path.isfile(strFileToOpen) :
+			raise Exception( '<template file> ' + strFileToOpen + ' does not exist' )
+		logger.info( 'reading open extraction templates to file ' + strFileToOpen )
+		readHandle = codecs.open( strFileToOpen, 'r', 'utf-8', errors = 'replace' )
+		listLines = readHandle.readlines()
+		readHandle.close()
+
+		listOpenExtractionPatternsTotal = []
+		for strLine in listLines :
+			strPattern = strLine.rstrip('\n\r')
+			listOpenExtractionPatternsTotal.append( strPattern )
+
+		# parse open pattern templates
+		listParsedExtractionPatterns = []
+		for strPattern in listOpenExtractionPatternsTotal :
+			listParsedExtractionPatterns.append(
+				openiepy.comp_sem_lib.parse_extraction_pattern(
+					str_pattern = strPattern,
+					dict_openie_config = dict_openie_config )
+				)
+
+		dictTemplates[nIndexPattern] = ( listOpenExtractionPatternsTotal, listParsedExtractionPatterns )
+
+	return dictTemplates
+
+def execute_templates( dict_corpus = None, dataset_dir = None, template_file = None, templates = None, dict_attrib_ie_settings = None, worker_pool = None, dict_openie_config = None ) :
+	"""
+	load templates from file and execute them on the parsed corpus to generate extractions (one template file per proposition pattern).
+	extractions are filtered to avoid variable subsumption.
+
+	:param dict dict_corpus: parsed corpus from attrib_ie.parse_corpus()
+	:param str dataset_dir: dataset dir to read template files from
+	:param str template_file: template filename prefix (files read are <dataset_dir>/<template_file>_<pattern_index>.txt)
+	:param dict templates: templates previously loaded by attrib_ie.read_templates() (None to load templates from file)
+	:param dict dict_attrib_ie_settings: settings returned from attrib_ie.read_attrib_ie_config()
+	:param dict worker_pool: worker pool handle returned from nlp_scheduler_lib.start_worker_pool(). None will start worker processes for each batch call.
+	:param dict dict_openie_config: config object returned from attrib_ie.read_attrib_ie_config()
+
+	:return: extractions = { 'templates' : {}, 'parsed_templates' : {}, 'unfiltered' : {}, 'filtered' : {}, 'conf' : {} } with each dict indexed by pattern index
+	:rtype: dict
+	"""
+
+	if not isinstance( dict_corpus, dict ) :
+		raise Exception( 'invalid dict_corpus' )
+	if not isinstance( dict_attrib_ie_settings, dict ) :
+		raise Exception( 'invalid dict_attrib_ie_settings' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	if templates == None :
+		templates = read_templates(
+			dataset_dir = dataset_dir,
+			template_file = template_file,
+			dict_attrib_ie_settings = dict_attrib_ie_settings,
+			dict_openie_config = dict_openie_config )
+	elif not isinstance( templates, dict ) :
+		raise Exception( 'invalid templates' )
+
+	logger = dict_openie_config['logger']
+	dict_POS_pattern_settings = dict_attrib_ie_settings['pos_pattern_settings']
+	dictDepGraphs = dict_corpus['dep_graphs']
+
+	logger.info( '\n\nEXTRACT VARS\n' )
+
+	dictExtractions = {
+		'templates' : {},
+		'parsed_templates' : {},
+		'unfiltered' : {},
+		'filtered' : {},
+		'conf' : {},
+		}
+
+	# execute templates for each set of patterns (so we can generate separate extractions for each pattern)
+	for nIndexPattern in range(len(dict_POS_pattern_settings['proposition_pattern'])) :
+		logger.info( 'pattern : ' + str(nIndexPattern) )
+
+		strTargetVarType = dict_POS_pattern_settings['proposition_pattern'][nIndexPattern][2]
+
+		( listOpenExtractionPatternsTotal, listParsedExtractionPatterns ) = templates[nIndexPattern]
+
+		#
+		# Execute open extraction templates
+		#    report arg, rel, arg
+		#    report dep connections between arg/rel variables so we can later use subj/obj etc to make good semantic mappings
+		#
+
+		# execute open pattern templates on the test corpus
+		dictExtractedVarsUnfiltered = nlp_scheduler_lib.match_extraction_patterns_batch(
+			dict_document_sent_graphs = dictDepGraphs,
+			list_extraction_patterns = listParsedExtractionPatterns,
+			dict_collapse_dep_types = test_attrib_ie_regex.dictCollapseDepTypes,
+			max_processes = dict_attrib_ie_settings['process_count'],
+			worker_pool = worker_pool,
+			dict_openie_config = dict_openie_config )
+
+		logger.info( 'documents = ' + str(len(dictExtractedVarsUnfiltered)) )
+
+		# filter extractions to avoid variable subsumption
+		dictExtractedVars = {}
+		dictExtractedVarsConf = {}
+		for nIndexDoc in dictDepGraphs :
+			if not nIndexDoc in dictExtractedVars :
+				dictExtractedVars[nIndexDoc] = []
+				dictExtractedVarsConf[nIndexDoc] = []
+
+			for nSentIndex in range(len(dictExtractedVarsUnfiltered[nIndexDoc])) :
+				listMatches = dictExtractedVarsUnfiltered[nIndexDoc][nSentIndex]
+
+				( listMatchesFiltered, listConf ) = openiepy.comp_sem_lib.filter_extractions(
+					dep_graph = dictDepGraphs[nIndexDoc][nSentIndex],
+					list_extractions = listMatches,
+					filter_strategy = dict_POS_pattern_settings['filter_extract_strat'],
+					use_context = False,
+					max_context = 100,
+					min_var_connection = dict_POS_pattern_settings['min_var_connection'],
+					max_semantic_drift = dict_POS_pattern_settings['max_semantic_drift'],
+					target_var_type = strTargetVarType,
+					dict_sem_drift = dict_POS_pattern_settings['semantic_drift_cost'],
+					dict_openie_config = dict_openie_config )
+
+				dictExtractedVars[nIndexDoc].append( listMatchesFiltered )
+				dictExtractedVarsConf[nIndexDoc].append( listConf )
+
+		dictExtractions['templates'][nIndexPattern] = listOpenExtractionPatternsTotal
+		dictExtractions['parsed_templates'][nIndexPattern] = listParsedExtractionPatterns
+		dictExtractions['unfiltered'][nIndexPattern] = dictExtractedVarsUnfiltered
+		dictExtractions['filtered'][nIndexPattern] = dictExtractedVars
+		dictExtractions['conf'][nIndexPattern] = dictExtractedVarsConf
+
+		logger.info( 'documents (filtered)' )
+
+	return dictExtractions
+
+def write_extracted_vars( dict_corpus = None, dict_extractions = None, dataset_dir = None, extract_file = None, dict_attrib_ie_settings = None, dict_openie_config = None ) :
+	"""
+	save extraction variables to disk (plain and/or encoded, depending on output_plain_extracts and output_encoded_extracts settings)
+
+	:param dict dict_corpus: parsed corpus from attrib_ie.parse_corpus()
+	:param dict dict_extractions: extractions from attrib_ie.execute_templates()
+	:param str dataset_dir: dataset dir to write files to
+	:param str extract_file: extract filename (files written are <dataset_dir>/var-<extract_file>_<pattern_index>.txt and <dataset_dir>/encoded-var-<extract_file>_<pattern_index>.txt)
+	:param dict dict_attrib_ie_settings: settings returned from attrib_ie.read_attrib_ie_config()
+	:param dict dict_openie_config: config object returned from attrib_ie.read_attrib_ie_config()
+	"""
+
+	logger = dict_openie_config['logger']
+	dict_POS_pattern_settings = dict_attrib_ie_settings['pos_pattern_settings']
+	dictText = dict_corpus['text']
+	dictTaggedSents = dict_corpus['tagged_sents']
+	dictSentTreesPOSPatterns = dict_corpus['sent_trees_pos_patterns']
+	dictDepGraphs = dict_corpus['dep_graphs']
+
+	logger.info( '\n\nSAVE VARS\n' )
+
+	# save extractions for each set of patterns
+	for nIndexPattern in range(len(dict_POS_pattern_settings['proposition_pattern'])) :
+		logger.info( 'pattern : ' + str(nIndexPattern) )
+
+		listOpenExtractionPatternsTotal = dict_extractions['templates'][nIndexPattern]
+		dictExtractedVarsUnfiltered = dict_extractions['unfiltered'][nIndexPattern]
+		dictExtractedVars = dict_extractions['filtered'][nIndexPattern]
+
+		if dict_attrib_ie_settings['output_plain_extracts'] == True :
+
+			# serialize output (extracted vars)
+			strVarFile = dataset_dir + os.sep + 'var-' + extract_file + '_' + str(nIndexPattern) + '.txt'
+			logger.info( 'Extracted variables file: ' + strVarFile )
+			writeHandle = codecs.open( strVarFile, 'w', 'utf-8', errors = 'replace' )
+
+			writeHandle.write( '\nNORMALIZED PATTERNS\n' )
+			for strPattern in listOpenExtractionPatternsTotal :
+				writeHandle.write( repr( strPattern ) + '\n' )
+
+			writeHandle.write( '\nALL EXTRACTS (unfiltered)\n' )
+			for nIndexDoc in sorted( dictDepGraphs.keys() ) :
+				for nSentIndex in range(len(dictExtractedVarsUnfiltered[nIndexDoc])) :
+
+					treeSent = dictSentTreesPOSPatterns[nIndexDoc][nSentIndex]
+					writeHandle.write( u' '.join( treeSent.leaves() ) + '\n' )
+
+					for nMatchIndex in range(len(dictExtractedVarsUnfiltered[nIndexDoc][nSentIndex])) :
+						strPrettyText = openiepy.comp_sem_lib.pretty_print_extraction(
+							list_extracted_vars = dictExtractedVarsUnfiltered[nIndexDoc][nSentIndex][nMatchIndex],
+							dep_graph = dictDepGraphs[nIndexDoc][nSentIndex],
+							set_var_types = set( test_attrib_ie_regex.setGraphDepTypes ),
+							style = 'highlighted_vars',
+							dict_openie_config = dict_openie_config )
+
+						writeHandle.write( '\t' + strPrettyText + '\n' )
+
+			writeHandle.write( '\nALL EXTRACTS (filtered)\n' )
+			for nIndexDoc in sorted( dictDepGraphs.keys() ) :
+				for nSentIndex in range(len(dictExtractedVars[nIndexDoc])) :
+
+					treeSent = dictSentTreesPOSPatterns[nIndexDoc][nSentIndex]
+					writeHandle.write( u' '.join( treeSent.leaves() ) + '\n' )
+
+					for nMatchIndex in range(len(dictExtractedVars[nIndexDoc][nSentIndex])) :
+						strPrettyText = openiepy.comp_sem_lib.pretty_print_extraction(
+							list_extracted_vars = dictExtractedVars[nIndexDoc][nSentIndex][nMatchIndex],
+							dep_graph = dictDepGraphs[nIndexDoc][nSentIndex],
+							set_var_types = set( test_attrib_ie_regex.setGraphDepTypes ),
+							style = 'highlighted_vars',
+							dict_openie_config = dict_openie_config )
+
+						writeHandle.write( '\t' + strPrettyText + '\n' )
+
+			# extracted in human form
+			writeHandle.write( '\nALL EXTRACTS (filtered, human formatted variables)\n' )
+			for nIndexDoc in sorted( dictDepGraphs.keys() ) :
+				writeHandle.write( dictText[nIndexDoc] + '\n' )
+
+				for nSentIndex in range(len(dictExtractedVars[nIndexDoc])) :
+					for nMatchIndex in range(len(dictExtractedVars[nIndexDoc][nSentIndex])) :
+
+						writeHandle.write( '\textract ' + str(nMatchIndex) + '\n' )
+
+						# get extraction vars
+						# listExtractedVars = [ ( var_type, var_name, graph_address, collapsed_graph_addresses[], { dep : [ var_name, ... ] }, pattern_index ), ... ]
+						listExtractedVars = dictExtractedVars[nIndexDoc][nSentIndex][nMatchIndex]
+
+						# encode extraction
+						strEncoded = openiepy.comp_sem_lib.encode_extraction(
+							list_extracted_vars = listExtractedVars,
+							dep_graph = dictDepGraphs[nIndexDoc][nSentIndex],
+							set_var_types = set( test_attrib_ie_regex.setGraphDepTypes ),
+							dict_openie_config = dict_openie_config )
+
+						# parse extraction into the form needed by map_encoded_extraction_to_lexicon()
+						# listExtractedVarsParsed = [ ( var_name, var_head, var_phrase, { dep_path : [ var,var... ], ... }, addr, pattern_index, var_phrase_human ), ... ]
+						listExtractedVarsParsed = openiepy.comp_sem_lib.parse_encoded_extraction(
+							encoded_str = strEncoded,
+							dict_openie_config = dict_openie_config )
+
+						# output extracted variables in human format
+						for ( strVarName, strVarHead, strVarPhrase, dictConnections, nAddr, nPatternIndex, strVarHuman ) in listExtractedVarsParsed :
+							writeHandle.write( '\t\t{' + strVarName + '} == ' + strVarHuman + '\n' )
+
+			writeHandle.write( '\nPER URI RESULTS\n' )
+			writeHandle.write( '---------------\n' )
+
+			for nIndexDoc in sorted( dictDepGraphs.keys() ) :
+
+				writeHandle.write( '\nURI\n' )
+				writeHandle.write( str(nIndexDoc) + '\n' )
+
+				writeHandle.write( '\nTEXT\n' )
+				writeHandle.write( dictText[nIndexDoc] + '\n' )
+
+				writeHandle.write( '\SENTS and EXTRACTS\n' )
+				for nSentIndex in range(len(dictExtractedVars[nIndexDoc])) :
+					treeSent = dictSentTreesPOSPatterns[nIndexDoc][nSentIndex]
+					writeHandle.write( soton_corenlppy.common_parse_lib.serialize_tagged_tree( treeSent, dict_common_config = dict_openie_config ) + '\n' )
+					writeHandle.write( unicode( treeSent ) + '\n' )
+
+					for nMatchIndex in range(len(dictExtractedVars[nIndexDoc][nSentIndex])) :
+
+						strPrettyText = openiepy.comp_sem_lib.pretty_print_extraction(
+							list_extracted_vars = dictExtractedVars[nIndexDoc][nSentIndex][nMatchIndex],
+							dep_graph = dictDepGraphs[nIndexDoc][nSentIndex],
+							set_var_types = set( test_attrib_ie_regex.setGraphDepTypes ),
+							style = 'highlighted_vars',
+							dict_openie_config = dict_openie_config )
+
+						writeHandle.write( '>> ' + strPrettyText + '\n' )
+
+						listVars = openiepy.comp_sem_lib.get_extraction_vars(
+							list_extracted_vars = dictExtractedVars[nIndexDoc][nSentIndex][nMatchIndex],
+							dict_openie_config = dict_openie_config )
+						for ( strVar, strType ) in listVars :
+							tuplePrettyVar = openiepy.comp_sem_lib.pretty_print_extraction_var(
+								list_extracted_vars = dictExtractedVars[nIndexDoc][nSentIndex][nMatchIndex],
+								dep_graph = dictDepGraphs[nIndexDoc][nSentIndex],
+								var_name = strVar,
+								dict_openie_config = dict_openie_config )
+							if tuplePrettyVar[0] != None :
+								writeHandle.write( '\t' + strVar + ' = ' + tuplePrettyVar[0] + ' [' + repr(tuplePrettyVar[1]) + ']' )
+							if tuplePrettyVar[2] == True :
+								writeHandle.write( ' negated' )
+							writeHandle.write( '\n' )
+
+				writeHandle.write( '\nTAG\n' )
+				for listSent in dictTaggedSents[nIndexDoc] :
+					writeHandle.write( soton_corenlppy.common_parse_lib.serialize_tagged_list( list_pos = listSent, dict_common_config = dict_openie_config ) + '\n' )
+
+				writeHandle.write( '\nGRAPH\n' )
+				for depObj in dictDepGraphs[nIndexDoc] :
+					writeHandle.write( depObj.to_dot() + '\n' )
+
+			writeHandle.close()
+
+		if dict_attrib_ie_settings['output_encoded_extracts'] == True :
+
+			# serialize output (extracted vars)
+			strVarFile = dataset_dir + os.sep + 'encoded-var-' + extract_file + '_' + str(nIndexPattern) + '.txt'
+			logger.info( 'Extracted variables file: ' + strVarFile )
+			writeHandle = codecs.open( strVarFile, 'w', 'utf-8', errors = 'replace' )
+
+			for nIndexDoc in sorted( dictDepGraphs.keys() ) :
+				for nSentIndex in range(len(dictExtractedVars[nIndexDoc])) :
+					for nMatchIndex in range(len(dictExtractedVars[nIndexDoc][nSentIndex])) :
+
+						# get extraction vars
+						# listExtractedVars = [ ( var_type, var_name, graph_address, collapsed_graph_addresses[], (negated, genuine), { dep : [ var_name, ... ] } ), ... ]
+						listExtractedVars = dictExtractedVars[nIndexDoc][nSentIndex][nMatchIndex]
+
+						# encode extraction
+						strEncoded = openiepy.comp_sem_lib.encode_extraction(
+							list_extracted_vars = listExtractedVars,
+							dep_graph = dictDepGraphs[nIndexDoc][nSentIndex],
+							set_var_types = set( test_attrib_ie_regex.setGraphDepTypes ),
+							dict_openie_config = dict_openie_config )
+
+						writeHandle.write( str(nIndexDoc) + '\t' + strEncoded + '\n' )
+
+			writeHandle.close()
+
+def generate_propositions( dict_corpus = None, dict_extractions = None, dict_attrib_ie_settings = None, dict_openie_config = None ) :
+	"""
+	generate propositions {arg, rel, arg} from extractions in a format suitable for evaluation
+
+	:param dict dict_corpus: parsed corpus from attrib_ie.parse_corpus()
+	:param dict dict_extractions: extractions from attrib_ie.execute_templates()
+	:param dict dict_attrib_ie_settings: settings returned from attrib_ie.read_attrib_ie_config()
+	:param dict dict_openie_config: config object returned from attrib_ie.read_attrib_ie_config()
+
+	:return: ( dict_doc_set_of_propositions_per_pattern, list_doc_set_of_propositions_aggregated ). proposition sets are lists of tuples = ( str_index_doc, list_phrases_prop, pattern_index, conf, list_prop_pattern, list_head_text )
+	:rtype: tuple
+	"""
+
+	logger = dict_openie_config['logger']
+	dict_POS_pattern_settings = dict_attrib_ie_settings['pos_pattern_settings']
+	dictDepGraphs = dict_corpus['dep_graphs']
+
+	logger.info( '\n\nGENERATE PROPOSITIONS\n' )
+
+	dictDocumentPropositionSetsPerPattern = {}
+	for nIndexPattern in range(len(dict_POS_pattern_settings['proposition_pattern'])) :
+		dictDocumentPropositionSetsPerPattern[nIndexPattern] = []
+
+	listDocumentPropositionSetsAggregated = []
+
+	# loop on each document
+	for nIndexDoc in sorted( dictDepGraphs.keys() ) :
+		for nSentIndex in range(len(dictDepGraphs[nIndexDoc])) :
+
+			listPropSetAggregate = []
+			listPropSetConfAggregate = []
+
+			# generate propositions for this document from extraction data for each set of patterns
+			for nIndexPattern in range(len(dict_POS_pattern_settings['proposition_pattern'])) :
+
+				dictExtractedVars = dict_extractions['filtered'][nIndexPattern]
+				dictExtractedVarsConf = dict_extractions['conf'][nIndexPattern]
+
+				listPropPattern = dict_POS_pattern_settings['proposition_pattern'][nIndexPattern][0]
+				nTargetIndex = dict_POS_pattern_settings['proposition_pattern'][nIndexPattern][1]
+
+				# loop on each extraction for this sent
+				listPropSet = []
+				listPropSetConf = []
+				for nMatchIndex in range(len(dictExtractedVars[nIndexDoc][nSentIndex])) :
+
+					# get extraction vars
+					# listExtractedVars = [ ( var_type, var_name, graph_address, collapsed_graph_addresses[], { dep : [ var_name, ... ] }, pattern_index ), ... ]
+					listExtractedVars = dictExtractedVars[nIndexDoc][nSentIndex][nMatchIndex]
+					nConf = dictExtractedVarsConf[nIndexDoc][nSentIndex][nMatchIndex]
+
+					listResult = openiepy.comp_sem_lib.generate_proposition_set_from_extraction(
+						list_extracted_vars = listExtractedVars,
+						dep_graph = dictDepGraphs[nIndexDoc][nSentIndex],
+						proposition_pattern = listPropPattern,
+						dict_displaced_context = dict_POS_pattern_settings['displaced_context'],
+						dict_sem_drift = dict_POS_pattern_settings['semantic_drift_cost'],
+						max_semantic_dist = dict_POS_pattern_settings['max_end_to_end_semantic_dist'],
+						include_context = dict_POS_pattern_settings['include_context_in_prop'],
+						dict_openie_config = dict_openie_config )
+
+					# add to prop set (avoiding any duplicates)
+					if listResult != None :
+						for tupleResult in listResult :
+							if not tupleResult in listPropSet :
+								listPropSet.append( tupleResult )
+								listPropSetConf.append( nConf )
+
+				# filter prop set for this sent (for this prop pattern target)
+				if dict_POS_pattern_settings['filter_prop_strat'] in ['min_length','max_length'] :
+					openiepy.comp_sem_lib.filter_proposition_set(
+						list_proposition_set = listPropSet,
+						list_proposition_set_conf = listPropSetConf,
+						target_index = nTargetIndex,
+						filter_strategy = dict_POS_pattern_settings['filter_prop_strat'],
+						dict_index_stoplist_prefix = dict_POS_pattern_settings['prop_stoplist_prefix'],
+						dict_index_stoplist_suffix = dict_POS_pattern_settings['prop_stoplist_suffix'],
+						dict_openie_config = dict_openie_config )
+
+				# serialize propositional structures (per pattern)
+				for nIndexProp in range(len(listPropSet)) :
+					tupleResult = listPropSet[nIndexProp]
+					nConf = listPropSetConf[nIndexProp]
+					( listPhraseText, listHeadText, listPhrasesProposition, listHeadProposition, nPatternIndex, listPattern ) = tupleResult
+					dictDocumentPropositionSetsPerPattern[nIndexPattern].append( ( str(nIndexDoc), listPhraseText, nPatternIndex, nConf, listPattern, listHeadText ) )
+
+				# also aggregate all patterns together
+				listPropSetAggregate.extend( listPropSet )
+				listPropSetConfAggregate.extend( listPropSetConf )
+
+			# filter aggregate prop set (prop subsumption)
+			if dict_POS_pattern_settings['filter_prop_strat'] == 'prop_subsumption' :
+				openiepy.comp_sem_lib.filter_proposition_set(
+					list_proposition_set = listPropSetAggregate,
+					list_proposition_set_conf = listPropSetConfAggregate,
+					target_index = None,
+					filter_strategy = dict_POS_pattern_settings['filter_prop_strat'],
+					dict_index_stoplist_prefix = dict_POS_pattern_settings['prop_stoplist_prefix'],
+					dict_index_stoplist_suffix = dict_POS_pattern_settings['prop_stoplist_suffix'],
+					dict_openie_config = dict_openie_config )
+
+			# serialize propositional structures (aggregated)
+			for nIndexProp in range(len(listPropSetAggregate)) :
+				tupleResult = listPropSetAggregate[nIndexProp]
+				nConf = listPropSetConfAggregate[nIndexProp]
+				( listPhraseText, listHeadText, listPhrasesProposition, listHeadProposition, nPatternIndex, listPattern ) = tupleResult
+				listDocumentPropositionSetsAggregated.append( ( str(nIndexDoc), listPhraseText, nPatternIndex, nConf, listPattern, listHeadText ) )
+
+	# fan out propositions of unique sents to all duplicate occurrences of them (see attrib_ie.parse_corpus())
+	dictDuplicates = dict_corpus.get( 'duplicates', {} )
+	if len(dictDuplicates) > 0 :
+		dictOccurrences = {}
+		for nIndexDoc in sorted( dictDuplicates.keys() ) :
+			strIndexFirst = str( dictDuplicates[nIndexDoc] )
+			if not strIndexFirst in dictOccurrences :
+				dictOccurrences[strIndexFirst] = []
+			dictOccurrences[strIndexFirst].append( str(nIndexDoc) )
+
+		listPropSets = dictDocumentPropositionSetsPerPattern.values() + [ listDocumentPropositionSetsAggregated ]
+		for listPropSet in listPropSets :
+			listFanOut = []
+			for tupleProp in listPropSet :
+				if tupleProp[0] in dictOccurrences :
+					for strIndexDoc in dictOccurrences[ tupleProp[0] ] :
+						listFanOut.append( ( strIndexDoc, ) + tupleProp[1:] )
+			listPropSet.extend( listFanOut )
+
+			# keep sent index order (stable sort so prop order within each sent is unchanged)
+			listPropSet.sort( key=lambda entry: int( entry[0] ) )
+
+		logger.info( 'propositions fanned out to ' + str(len(dictDuplicates)) + ' duplicate sents' )
+
+	return ( dictDocumentPropositionSetsPerPattern, listDocumentPropositionSetsAggregated )
+
+def write_proposition_file( filename = None, dict_text = None, list_doc_set_of_propositions = None, annotated = False, dict_openie_config = None ) :
+	"""
+	save extracted propositions to file (plain text report).
+	note: score is always 1 as we have no meaningful way to score propositions at this stage
+		<sent-text>
+		<sent-index> tab <arg> tab <rel> tab <arg> tab <score>
+		...
+	annotated files also have the head terms and the proposition pattern
+		<sent-index> tab <arg> tab <rel> tab <arg> tab <head> tab <head> tab <head> tab <score> tab {<prop_type>,<prop_type>,...}
+
+	:param str filename: file to write
+	:param dict dict_text: dict of sent text from attrib_ie.read_sentence_file()
+	:param list list_doc_set_of_propositions: proposition set from attrib_ie.generate_propositions()
+	:param bool annotated: if True write head terms and proposition pattern
+	:param dict dict_openie_config: config object returned from attrib_ie.read_attrib_ie_config()
+	"""
+
+	dict_openie_config['logger'].info( 'result file: ' + filename )
+	writeHandle = codecs.open( filename, 'w', 'utf-8', errors = 'replace' )
+
+	for nIndexDoc in sorted( dict_text.keys() ) :
+		writeHandle.write( dict_text[nIndexDoc] + '\n' )
+
+		# loop on all propositions that refer to this document
+		listPropsGenerated = []
+		for (strIndexDoc, listPhraseText, nPatternIndex, nConf, listPropPattern, listHeadText ) in list_doc_set_of_propositions :
+			if strIndexDoc == str(nIndexDoc) :
+
+				# only write a prop once if we have seen it before from another pattern
+				if not listPhraseText in listPropsGenerated :
+					listPropsGenerated.append( listPhraseText )
+
+					# serialize result
+					writeHandle.write( strIndexDoc + '\t' )
+
+					for nIndexPhrase in range(len(listPhraseText)) :
+						writeHandle.write( '"' + listPhraseText[nIndexPhrase] + '"' )
+						writeHandle.write( '\t' )
+
+					if annotated == False :
+						writeHandle.write( str(nConf) + '\n' )
+						continue
+
+					for nIndexHead in range(len(listHeadText)) :
+						writeHandle.write( '"' + listHeadText[nIndexHead] + '"' )
+						writeHandle.write( '\t' )
+
+					writeHandle.write( str(nConf) + '\t' )
+
+					writeHandle.write( '{' )
+					for nPropIndex in range(len(listPropPattern)) :
+						strPropType = listPropPattern[nPropIndex]
+						writeHandle.write( strPropType )
+						if nPropIndex < len(listPropPattern)-1 :
+							writeHandle.write( ',' )
+					writeHandle.write( '}' )
+
+					writeHandle.write( '\n' )
+
+	writeHandle.close()
+
+def write_propositions( dict_corpus = None, dict_propositions_per_pattern = None, list_propositions_aggregated = None, dataset_dir = None, extract_file = None, dict_attrib_ie_settings = None, dict_openie_config = None ) :
+	"""
+	save extracted propositions to file, per pattern and aggregated over all patterns (+ annotated versions if output_annotated_prop is True)
+
+	:param dict dict_corpus: parsed corpus from attrib_ie.parse_corpus()
+	:param dict dict_propositions_per_pattern: per pattern proposition sets from attrib_ie.generate_propositions()
+	:param list list_propositions_aggregated: aggregated proposition set from attrib_ie.generate_propositions()
+	:param str dataset_dir: dataset dir to write files to
+	:param str extract_file: extract filename (files written are <dataset_dir>/<extract_file>_<pattern_index>.txt and <dataset_dir>/<extract_file>)
+	:param dict dict_attrib_ie_settings: settings returned from attrib_ie.read_attrib_ie_config()
+	:param dict dict_openie_config: config object returned from attrib_ie.read_attrib_ie_config()
+	"""
+
+	logger = dict_openie_config['logger']
+	dict_POS_pattern_settings = dict_attrib_ie_settings['pos_pattern_settings']
+	bOutputAnnotatedProp = dict_attrib_ie_settings['output_annotated_prop']
+
+	# only docs with dep graphs (or duplicates of docs with dep graphs) are reported
+	dictText = {}
+	for nIndexDoc in dict_corpus['dep_graphs'] :
+		dictText[nIndexDoc] = dict_corpus['text'][nIndexDoc]
+	for nIndexDoc in dict_corpus.get( 'duplicates', {} ) :
+		if dict_corpus['duplicates'][nIndexDoc] in dict_corpus['dep_graphs'] :
+			dictText[nIndexDoc] = dict_corpus['text'][nIndexDoc]
+
+	logger.info( '\n\nSAVE PROPOSITIONS\n' )
+
+	# save propositions for each set of patterns
+	for nIndexPattern in range(len(dict_POS_pattern_settings['proposition_pattern'])) :
+		logger.info( 'pattern : ' + str(nIndexPattern) )
+
+		write_proposition_file(
+			filename = dataset_dir + os.sep + extract_file + '_' + str(nIndexPattern) + '.txt',
+			dict_text = dictText,
+			list_doc_set_of_propositions = dict_propositions_per_pattern[nIndexPattern],
+			annotated = False,
+			dict_openie_config = dict_openie_config )
+
+		if bOutputAnnotatedProp == True :
+			write_proposition_file(
+				filename = dataset_dir + os.sep + 'annotated-' + extract_file + '_' + str(nIndexPattern) + '.txt',
+				dict_text = dictText,
+				list_doc_set_of_propositions = dict_propositions_per_pattern[nIndexPattern],
+				annotated = True,
+				dict_openie_config = dict_openie_config )
+
+	# save propositions for aggregated patterns
+	write_proposition_file(
+		filename = dataset_dir + os.sep + extract_file,
+		dict_text = dictText,
+		list_doc_set_of_propositions = list_propositions_aggregated,
+		annotated = False,
+		dict_openie_config = dict_openie_config )
+
+	if bOutputAnnotatedProp == True :
+		write_proposition_file(
+			filename = dataset_dir + os.sep + 'annotated-' + extract_file,
+			dict_text = dictText,
+			list_doc_set_of_propositions = list_propositions_aggregated,
+			annotated = True,
+			dict_openie_config = dict_openie_config )
+
+def filter_templates( dict_extractions = None, dict_propositions_per_pattern = None, list_ground_truth = None, feedback_start_index = -1, feedback_end_index = -1, dataset_dir = None, filtered_template_file = None, dict_attrib_ie_settings = None, dict_openie_config = None ) :
+	"""
+	filter templates using ground truth relevance feedback and save filtered templates to file
+
+	:param dict dict_extractions: extractions from attrib_ie.execute_templates()
+	:param dict dict_propositions_per_pattern: per pattern proposition sets from attrib_ie.generate_propositions()
+	:param list list_ground_truth: ground truth from attrib_ie.read_ground_truth()
+	:param int feedback_start_index: start index of ground truth to use for feedback (-1 for start of list)
+	:param int feedback_end_index: end index of ground truth to use for feedback (-1 for end of list)
+	:param str dataset_dir: dataset dir to write files to
+	:param str filtered_template_file: filtered template filename prefix (files written are <dataset_dir>/<filtered_template_file>_<pattern_index>.txt)
+	:param dict dict_attrib_ie_settings: settings returned from attrib_ie.read_attrib_ie_config()
+	:param dict dict_openie_config: config object returned from attrib_ie.read_attrib_ie_config()
+	"""
+
+	logger = dict_openie_config['logger']
+	dict_POS_pattern_settings = dict_attrib_ie_settings['pos_pattern_settings']
+
+	logger.info( '\n\nAPPLY RELEVANCE FEEDBACK\n' )
+
+	if list_ground_truth == None :
+		raise Exception( 'cannot process feedback loop without a ground truth file for feedback (None)' )
+
+	if feedback_start_index == -1 :
+		feedback_start_index = 0
+	if feedback_end_index == -1 :
+		feedback_end_index = len(list_ground_truth)
+
+	logger.info( 'feedback used ' + repr( (feedback_start_index,feedback_end_index) ) )
+
+	# apply ground truth relevance filter to filter each patterns's set of templates
+	for nIndexPattern in range(len(dict_POS_pattern_settings['proposition_pattern'])) :
+		logger.info( 'pattern : ' + str(nIndexPattern) )
+
+		listDocumentPropositionSets = dict_propositions_per_pattern[nIndexPattern]
+		listParsedExtractionPatterns = dict_extractions['parsed_templates'][nIndexPattern]
+
+		# remove from listParsedExtractionPatterns any templates that generated an incorrect extraction
+		openiepy.comp_sem_lib.filter_open_extraction_templates_using_relevance_feedback(
+			list_parsed_patterns = listParsedExtractionPatterns,
+			list_doc_set_of_propositions = listDocumentPropositionSets,
+			list_relevance_feedback = list_ground_truth[feedback_start_index:feedback_end_index],
+			dict_openie_config = dict_openie_config )
+
+		# write open pattern templates to disk
+		strNewTemplateFile = dataset_dir + os.sep + filtered_template_file + '_' + str(nIndexPattern) + '.txt'
+		logger.info( 'writing open extraction templates to file ' + strNewTemplateFile )
+		writeHandle = codecs.open( strNewTemplateFile, 'w', 'utf-8', errors = 'replace' )
+		for listPattern in listParsedExtractionPatterns :
+			writeHandle.write( openiepy.comp_sem_lib.serialize_extraction_pattern( list_pattern = listPattern, dict_openie_config = dict_openie_config ) + '\n' )
+		writeHandle.close()
+
+def prepare_dataset( filename_config = None, dataset_dir = None, logger = None ) :
+	"""
+	read attrib_ie config, lexicon and a dataset's sentences.txt file, then POS tag and dependency parse the corpus. the prepared dataset can be shared by generate_dataset_templates() and extract_dataset_propositions() so the corpus is only parsed once.
+	a worker pool (preloaded with the config) is started and reused by every batch stage run on the prepared dataset. call close_dataset() to stop it.
+
+	:param str filename_config: attrib_ie config file (e.g. ch_attrib_ie.ini)
+	:param str dataset_dir: dataset dir containing a sentences.txt file
+	:param logging.Logger logger: logger to use
+
+	:return: prepared dataset = { 'dataset_dir' : str, 'settings' : dict, 'config' : dict, 'lexicon_uri' : dict, 'lexicon_phrase' : dict, 'corpus' : dict, 'worker_pool' : dict }
+	:rtype: dict
+	"""
+
+	( dictSettings, dictAttribIEConfig ) = read_attrib_ie_config( filename_config = filename_config, logger = logger )
+
+	# start the worker pool once the config is loaded, so forked workers inherit it
+	# note: workers do not use the lexicon, so the pool is started before it is loaded. workers forked after loading would inherit the lexicon dicts, and garbage collection in each worker would turn their shared pages into private copies
+	dictWorkerPool = nlp_scheduler_lib.start_worker_pool(
+		max_processes = dictSettings['process_count'],
+		dict_openie_config = dictAttribIEConfig )
+
+	try :
+		( dictLexiconURI, dictLexiconPhrase ) = load_lexicon(
+			list_lexicon_files = dictSettings['list_lexicon_files'],
+			stemmer = dictSettings['stemmer'],
+			snapshot_file = dictSettings['lexicon_snapshot_file'],
+			dict_openie_config = dictAttribIEConfig )
+
+		logger.info( '\n\nCORPUS : ' + dataset_dir + '\n' )
+
+		( dictText, dictTokens ) = read_dataset_sents(
+			dataset_dir = dataset_dir,
+			max_sent = dictSettings['max_sent_limit'],
+			dict_openie_config = dictAttribIEConfig )
+
+		dictCorpus = parse_corpus(
+			dict_text = dictText,
+			dataset_dir = dataset_dir,
+			dict_attrib_ie_settings = dictSettings,
+			worker_pool = dictWorkerPool,
+			dict_tokens = dictTokens,
+			dict_openie_config = dictAttribIEConfig )
+	except :
+		nlp_scheduler_lib.stop_worker_pool( worker_pool = dictWorkerPool, terminate = True )
+		raise
+
+	return {
+		'dataset_dir' : dataset_dir,
+		'settings' : dictSettings,
+		'config' : dictAttribIEConfig,
+		'lexicon_uri' : dictLexiconURI,
+		'lexicon_phrase' : dictLexiconPhrase,
+		'corpus' : dictCorpus,
+		'worker_pool' : dictWorkerPool,
+		}
+
+def close_dataset( dict_dataset = None ) :
+	"""
+	stop the worker pool of a prepared dataset
+
+	:param dict dict_dataset: prepared dataset from attrib_ie.prepare_dataset()
+	"""
+
+	nlp_scheduler_lib.stop_worker_pool( worker_pool = dict_dataset['worker_pool'] )
+
+def generate_dataset_templates( dict_dataset = None, template_file = None ) :
+	"""
+	run attrib_ie generate on a prepared dataset
+
+	:param dict dict_dataset: prepared dataset from attrib_ie.prepare_dataset()
+	:param str template_file: template filename prefix
+	"""
+
+	dictAttribIEConfig = dict_dataset['config']
+	dictAttribIEConfig['logger'].info( '\n#\n# Attrib IE - Generate Templates\n#' )
+
+	randomize_ground_truth( dataset_dir = dict_dataset['dataset_dir'], dict_openie_config = dictAttribIEConfig )
+
+	generate_templates(
+		dict_corpus = dict_dataset['corpus'],
+		dataset_dir = dict_dataset['dataset_dir'],
+		template_file = template_file,
+		lexicon_uri = dict_dataset['lexicon_uri'],
+		lexicon_phrase = dict_dataset['lexicon_phrase'],
+		dict_attrib_ie_settings = dict_dataset['settings'],
+		worker_pool = dict_dataset['worker_pool'],
+		dict_openie_config = dictAttribIEConfig )
+
+def extract_dataset_propositions( dict_dataset = None, template_file = None, extract_file = None, template_dir = None ) :
+	"""
+	run attrib_ie extract on a prepared dataset, using the templates previously written by generate_dataset_templates()
+
+	:param dict dict_dataset: prepared dataset from attrib_ie.prepare_dataset()
+	:param str template_file: template filename prefix
+	:param str extract_file: extract filename
+	:param str template_dir: dir to read template files from (None to use the dataset dir). allows templates learnt on one dataset to be used on another.
+
+	:return: aggregated proposition set from attrib_ie.generate_propositions()
+	:rtype: list
+	"""
+
+	dictSettings = dict_dataset['settings']
+	dictAttribIEConfig = dict_dataset['config']
+	dictCorpus = dict_dataset['corpus']
+	strDatasetDir = dict_dataset['dataset_dir']
+
+	dictAttribIEConfig['logger'].info( '\n#\n# Attrib IE - Extract Propositions\n#' )
+
+	if template_dir == None :
+		template_dir = strDatasetDir
+
+	dictExtractions = execute_templates(
+		dict_corpus = dictCorpus,
+		dataset_dir = template_dir,
+		template_file = template_file,
+		dict_attrib_ie_settings = dictSettings,
+		worker_pool = dict_dataset['worker_pool'],
+		dict_openie_config = dictAttribIEConfig )
+
+	write_extracted_vars(
+		dict_corpus = dictCorpus,
+		dict_extractions = dictExtractions,
+		dataset_dir = strDatasetDir,
+		extract_file = extract_file,
+		dict_attrib_ie_settings = dictSettings,
+		dict_openie_config = dictAttribIEConfig )
+
+	( dictPropsPerPattern, listPropsAggregated ) = generate_propositions(
+		dict_corpus = dictCorpus,
+		dict_extractions = dictExtractions,
+		dict_attrib_ie_settings = dictSettings,
+		dict_openie_config = dictAttribIEConfig )
+
+	write_propositions(
+		dict_corpus = dictCorpus,
+		dict_propositions_per_pattern = dictPropsPerPattern,
+		list_propositions_aggregated = listPropsAggregated,
+		dataset_dir = strDatasetDir,
+		extract_file = extract_file,
+		dict_attrib_ie_settings = dictSettings,
+		dict_openie_config = dictAttribIEConfig )
+
+	return listPropsAggregated
+
+def generate_and_extract( filename_config = None, dataset_dir = None, template_file = None, extract_file = None, logger = None ) :
+	"""
+	run attrib_ie generate then extract on a dataset in-process. the corpus is POS tagged and dependency parsed once and shared by both stages.
+
+	:param str filename_config: attrib_ie config file (e.g. ch_attrib_ie.ini)
+	:param str dataset_dir: dataset dir containing a sentences.txt file
+	:param str template_file: template filename prefix
+	:param str extract_file: extract filename
+	:param logging.Logger logger: logger to use
+
+	:return: aggregated proposition set from attrib_ie.generate_propositions()
+	:rtype: list
+	"""
+
+	dictDataset = prepare_dataset( filename_config = filename_config, dataset_dir = dataset_dir, logger = logger )
+
+	try :
+		generate_dataset_templates( dict_dataset = dictDataset, template_file = template_file )
+
+		return extract_dataset_propositions( dict_dataset = dictDataset, template_file = template_file, extract_file = extract_file )
+	finally :
+		close_dataset( dict_dataset = dictDataset )
+
 
 
 ################################
@@ -88,10 +1936,6 @@ if __name__ == '__main__' :
 	logging.basicConfig( level=logging.INFO, format=LOG_FORMAT )
 	logger.info('logging started')
 
-	# initialize
-	readHandle = None
-	writeHandle = None
-
 	try :
 		# init
 		strConfigFile = sys.argv[1]
@@ -133,732 +1977,62 @@ if __name__ == '__main__' :
 			listEvalDatasets.append( sys.argv[nDataset] )
 
 		logger.info('Dataset dir list (input): ' + repr(listEvalDatasets) )
+		if len(listEvalDatasets) == 0 :
+			raise Exception( 'no <dataset> dirs' )
 
 		# load config
-		dictConfig = soton_corenlppy.config_helper.read_config( strConfigFile )
-
-		bOutputPOS = ast.literal_eval( dictConfig['output_pos'] )
-		bOutputSeed = ast.literal_eval( dictConfig['output_seed'] )
-		bOutputPlainExtract = ast.literal_eval( dictConfig['output_plain_extracts'] )
-		bOutputEncodedExtract = ast.literal_eval( dictConfig['output_encoded_extracts'] )
-		bOutputAnnotatedProp = ast.literal_eval( dictConfig['output_annotated_prop'] )
-
-		nRandomSubsetTraining = int( dictConfig['random_subset_training'] )
-		nTargetExtractionTemplates = int( dictConfig['target_extraction_templates'] )
-		nProcessMax = int( dictConfig['process_count'] )
-
-		nSentMax = int( dictConfig['max_sent_limit'] )
-
-		listLangs = dictConfig['language_codes']
-		strStanfordTaggerDir = dictConfig['stanford_tagger_dir']
-		strStanfordParserDir = dictConfig['stanford_parser_dir']
-
-		strModelPath = dictConfig['model_path']
-		strModelJar = dictConfig['model_jar']
-		strModelOptions = dictConfig['model_options']
-
-		listLexiconFiles = dictConfig['list_lexicon_files']
-		strPOSPatternType = dictConfig['pos_pattern_type']
-		strStrategyPruneSeedTuples = dictConfig['strategy_seed_tuples']
-
-		nFeedbackPhasesMax = int( dictConfig['relevance_feedback_phases'] )
-		nFeedbackPercentagePerPhase = int( dictConfig['relevance_feedback_percentage_per_phase'] )
-
-		if not strStrategyPruneSeedTuples in ['premissive','selective','strict','no_filter'] :
-			raise Exception('invalid pruning strategy')
-
-		# setup structure with the right settings for the POS pattern type
-		if strPOSPatternType == 'propositional' :
-			dict_POS_pattern_settings = {
-					'exec_order' : test_attrib_ie_regex.listPropExecutionOrder,
-					'pos_patterns' : test_attrib_ie_regex.dictPropPatterns,
-					'phrase_patterns' : test_attrib_ie_regex.dictPropVarPhrasePatterns,
-					'seed_tuples' : test_attrib_ie_regex.listSeedTuplesProp,
-					'prevent_sequence' : test_attrib_ie_regex.listPropPreventSequentialMatchesTriples,
-					'seed_var_mapping' : test_attrib_ie_regex.dictPropSeedToTemplateMapping,
-					'seed_subsumption' : True, 
-					'template_generalization_strategy' : test_attrib_ie_regex.dictGeneralizeStrategyProp,
-					'filter_extract_strat' : 'min_semantic_drift_per_target',
-					'filter_prop_strat' : 'min_length',
-					'prop_stoplist_prefix' : test_attrib_ie_regex.dictPropStoplistPrefixProp,
-					'prop_stoplist_suffix' : test_attrib_ie_regex.dictPropStoplistSuffixProp,
-					'proposition_pattern' : test_attrib_ie_regex.listPropositionPatternPropSet,
-					'displaced_context' : test_attrib_ie_regex.dictDisplacedContextProp,
-					'max_semantic_drift' : test_attrib_ie_regex.nMaxSemanticDriftProp,
-					'max_end_to_end_semantic_dist' : test_attrib_ie_regex.nMaxEndToEndSemanticDriftProp,
-					'semantic_drift_cost' : test_attrib_ie_regex.dictSemanticDriftProp,
-					'include_context_in_prop' : True,
-					'longest_dep_path' : 128,
-					'longest_inter_target_walk' : 5,
-					'min_var_connection' : 2,
-					'avoid_dep' : test_attrib_ie_regex.setAvoidDepInWalkProp,
-					'sent_token_seps' : [ '.', '\n', '\r', '\f', u'\u2026' ],
-				}
-			strStrategySeedGeneration = 'contiguous_tuple_with_seq_groups'
-
-		elif strPOSPatternType == 'attributional' :
-			dict_POS_pattern_settings = {
-					'exec_order' : test_attrib_ie_regex.listAttrExecutionOrder,
-					'pos_patterns' : test_attrib_ie_regex.dictAttrPatterns,
-					'phrase_patterns' : test_attrib_ie_regex.dictAttrVarPhrasePatterns,
-					'seed_tuples' : test_attrib_ie_regex.listSeedTuplesAttr,
-					'prevent_sequence' : test_attrib_ie_regex.listAttrPreventSequentialMatchesTriples,
-					'seed_var_mapping' : test_attrib_ie_regex.dictAttrSeedToTemplateMapping,
-					'seed_subsumption' : False, 
-					'template_generalization_strategy' : test_attrib_ie_regex.dictGeneralizeStrategyAttr,
-					'filter_extract_strat' : 'min_semantic_drift_per_target',
-					#'filter_prop_strat' : 'min_length',
-					'filter_prop_strat' : 'prop_subsumption',
-					'prop_stoplist_prefix' : test_attrib_ie_regex.dictPropStoplistPrefixAttr,
-					'prop_stoplist_suffix' : test_attrib_ie_regex.dictPropStoplistSuffixAttr,
-					'proposition_pattern' : test_attrib_ie_regex.listPropositionPatternAttrSet,
-					'displaced_context' : test_attrib_ie_regex.dictDisplacedContextAttr,
-					'max_semantic_drift' : test_attrib_ie_regex.nMaxSemanticDriftAttr,
-					'max_end_to_end_semantic_dist' : test_attrib_ie_regex.nMaxEndToEndSemanticDriftAttr,
-					'semantic_drift_cost' : test_attrib_ie_regex.dictSemanticDriftAttr,
-					'include_context_in_prop' : False,
-					'longest_dep_path' : 128,
-					'longest_inter_target_walk' : 5,
-					'min_var_connection' : 0,
-					'avoid_dep' : test_attrib_ie_regex.setAvoidDepInWalkAttr,
-					'sent_token_seps' : [ ';', ':', '.', '\n', '\r', '\f', u'\u2026' ],
-				}
-			strStrategySeedGeneration = 'contiguous_tuple_with_seq_groups'
-
-		else :
-			raise Exception( 'unknown pos_pattern_type = ' + repr(strPOSPatternType) )
-
-		# check there is a seed pattern per proposition pattern
-		if len( dict_POS_pattern_settings['seed_tuples'] ) != len( dict_POS_pattern_settings['proposition_pattern'] ) :
-			raise Exception( 'there should be a 1 to 1 mapping between listSeedTuplesX and listPropositionPatternX' )
-
-
-
-		# setup parser config
-		# make sure whitespace does NOT include /\ as we want to use these for patterns later
-		# note: don't bother with ' in whitespace as this is handled separately (and removed if not grammatical)
-		# \u201a & \u201b == unicode single quote
-		# \u201c & \u201d == unicode double quote
-		# \u2018 & \u2019 == unicode apostrophe
-		# \u2026 == ... unicode chart used by twitter to mark truncated tweet text at end of tweet
-		# a null stemmer is provided as we will handle pluruals etc in the regex vocab explicitly (to avoid losing s at end of named entities)
-		# for CH data the text is good, so do not treat hythernated tokens as punctuation so we get tokens like 'four-faceted' preserved
-		# allow hashtags (stanford parser will POS labelled them NN)
-		# set apostrophe_handling to preserve, so we keep "s'" which gets labelled by Stanford POS tagger as 'POS'
-		# dont use any sent tokenizer (t_sent) OR sent token seps, since input data from datasets is manually extracted into sents anyway (and it might get confused with abbreviations like Corp. or monkey.com)
-
-		dictAttribIEConfig = openiepy.openie_lib.get_openie_config(
-			lang_codes = listLangs,
-			logger = logger,
-			stanford_tagger_dir = strStanfordTaggerDir,
-			stanford_parser_dir = strStanfordParserDir,
-			dep_model_path = strModelPath,
-			dep_model_jar = strModelJar,
-			dep_options = strModelOptions,
-			whitespace = u'\'"\u201a\u201b\u201c\u201d\u2018\u2019',
-			punctuation = """,;\/:+~&*=!?""",
-			allow_hashtags = True,
-			# sent_token_seps = [ '\n', '\r', '\f', u'\u2026', ';' ],
-			#sent_token_seps = [ '\n', '\r', '\f', u'\u2026' ],
-			sent_token_seps = dict_POS_pattern_settings['sent_token_seps'],
-			t_sent = None,
-			apostrophe_handling = 'preserve'
-			)
-
-		# add in regex and POS labels for domain-specific label types (e.g. catalogue index containing contain periods, which by default are treated erroneously as sent delimiters)
-		# so the common_parse_lib tokenization and POS tagger function picks them up and uses them
-		# note: remove NAMESPACE as the alpha_numeric pattern will pick this up (as some CH identifiers are very similar to namespace 123.A67)
-		dictAttribIEConfig['token_preservation_regex'] = [ ('regex_url','URI') ]
-		for strLabelType in test_attrib_ie_regex.listTagPatternOrder :
-			# compile pattern
-			rePattern = test_attrib_ie_regex.dictTagPatterns[strLabelType][0]
-			strPOSLabel = test_attrib_ie_regex.dictTagPatterns[strLabelType][1]
-
-			# insert new regex POS pattern
-			dictAttribIEConfig[strLabelType] = rePattern
-			dictAttribIEConfig['token_preservation_regex'].append( ( strLabelType, strPOSLabel ) )
-
-		# Disable stemming and rely on Wordnet morphy() instead as its more reliable
-		#stemmer = nltk.stem.RegexpStemmer('s$', min=4)
-		stemmer = None
-
-		#
-		# Lexicon import
-		#   manual noun list with domain specific noun type mappings (e.g. part, shape)
-		#   lexicon files specify nouns for filtering purposes later
-		#
-		logger.info( '\n\nLEXICON\n' )
-
-		listLexicon = []
-		listNounTypeRanked = []
-		for entry in listLexiconFiles :
-
-			# load ranked noun type mappings (will be used as a filter for lexicon import and to disambiguate between multiple schema options)
-			if entry['type'] == 'ranked_list' :
-				listNounTypeRanked = read_noun_type_ranked_list(
-					filename = entry['file'],
-					dict_openie_config = dictAttribIEConfig
-					)
-				logger.info( 'noun type ranked list = ' + repr(len(listNounTypeRanked)) )
-
-			# load NELL noun phrases
-			elif entry['type'] == 'nell' :
-				( dictLoadedLexURI, dictLoadedLexPhrase ) = lexicopy.lexicon_lib.import_NELL_lexicon(
-					filename_nell = entry['file'],
-					stemmer = stemmer,
-					lower_case = False,
-					apply_wordnet_morphy = True,
-					allowed_schema_list = listNounTypeRanked,
-					dict_lexicon_config = dictAttribIEConfig )
-
-				listLexicon.append( ( dictLoadedLexURI, dictLoadedLexPhrase ) )
-				logger.info( 'loaded num uri = ' + repr(len(dictLoadedLexURI)) )
-				logger.info( 'loaded num phrases = ' + repr(len(dictLoadedLexPhrase)) )
-
-			# load plain noun phrases
-			elif entry['type'] == 'plain' :
-				( dictLoadedLexURI, dictLoadedLexPhrase ) = lexicopy.lexicon_lib.import_plain_lexicon(
-					filename_lemma = entry['file'],
-					list_column_names = ['schema','phrase_list','hypernym'],
-					phrase_delimiter = '|',
-					stemmer = stemmer,
-					lower_case = False,
-					apply_wordnet_morphy = True,
-					allowed_schema_list = listNounTypeRanked,
-					dict_lexicon_config = dictAttribIEConfig )
-
-				listLexicon.append( ( dictLoadedLexURI, dictLoadedLexPhrase ) )
-				logger.info( 'loaded num uri = ' + repr(len(dictLoadedLexURI)) )
-				logger.info( 'loaded num phrases = ' + repr(len(dictLoadedLexPhrase)) )
-
-			# load SKOS lexicon
-			elif entry['type'] == 'skos_json' :
-				( dictLoadedLexURI, dictLoadedLexPhrase ) = lexicopy.lexicon_lib.import_skos_lexicon(
-					filename_lemma = entry['lemma'],
-					filename_hypernym = entry['hyper'],
-					filename_related = entry['related'],
-					serialized_format = 'json',
-					lower_case = False,
-					stemmer = stemmer,
-					apply_wordnet_morphy = True,
-					allowed_schema_list = listNounTypeRanked,
-					dict_lexicon_config = dictAttribIEConfig )
-
-				listLexicon.append( ( dictLoadedLexURI, dictLoadedLexPhrase ) )
-				logger.info( 'loaded num uri = ' + repr(len(dictLoadedLexURI)) )
-				logger.info( 'loaded num phrases = ' + repr(len(dictLoadedLexPhrase)) )
-
-		# merge lexicon into a single one
-		tupleMerged = lexicopy.lexicon_lib.merge_lexicon(
-			list_lexicon = listLexicon,
-			dict_lexicon_config = dictAttribIEConfig
-			)
-		if tupleMerged != None :
-			( dictLexiconURI, dictLexiconPhrase ) = tupleMerged
-		else :
-			dictLexiconURI = {}
-			dictLexiconPhrase = {}
+		( dictSettings, dictAttribIEConfig ) = read_attrib_ie_config( filename_config = strConfigFile, logger = logger )
 
-		logger.info( 'merged num uri = ' + repr(len(dictLexiconURI)) )
-		logger.info( 'merged num phrases = ' + repr(len(dictLexiconPhrase)) )
+		# one worker pool (preloaded with config) is reused by every batch stage for all datasets
+		# note: started before the lexicon is loaded, so workers do not inherit the lexicon dicts (see prepare_dataset())
+		dictWorkerPool = nlp_scheduler_lib.start_worker_pool(
+			max_processes = dictSettings['process_count'],
+			dict_openie_config = dictAttribIEConfig )
 
-		# min wordnet count is 0, so ANY mention in WordNet will be removed from the CH lexicon.
-		# this avoids 'lotus' for example, with count 0, being treated as a material (as it is in CH lexicon).
-		# this means lexicon will ONLY contain the specialist domain vocab and no any common words.
-		lexicopy.lexicon_lib.filter_lexicon_wordnet(
-			dict_phrase = dictLexiconPhrase,
-			count_freq_min = 0,
-			dict_lexicon_config = dictAttribIEConfig
-			)
-
-		logger.info( 'LEXICON filtered using wordnet' )
-		logger.info( 'num uri = ' + repr(len(dictLexiconURI)) )
-		logger.info( 'num phrases = ' + repr(len(dictLexiconPhrase)) )
+		# load lexicon
+		( dictLexiconURI, dictLexiconPhrase ) = load_lexicon(
+			list_lexicon_files = dictSettings['list_lexicon_files'],
+			stemmer = dictSettings['stemmer'],
+			snapshot_file = dictSettings['lexicon_snapshot_file'],
+			dict_openie_config = dictAttribIEConfig )
 
 		for strDataset in listEvalDatasets :
 
 			logger.info( '\n\nCORPUS : ' + strDataset + '\n' )
 
-			# read in sentence list
-			dictText = {}
-
-			# check input file exists
-			strInputFile = strDataset + os.sep + 'sentences.txt'
-			if os.path.exists( strInputFile ) == False :
-				raise Exception( 'input file does not exist : ' + strInputFile )
-
-			# read input data
-			readHandle = codecs.open( strInputFile, 'r', 'utf-8', errors = 'replace' )
-			listLines = readHandle.readlines()
-			readHandle.close()
-
-			# debug
-			#listLines = listLines[2890:2895]
-			#listLines = listLines[:50]
-
-			nLine = 0
-			for strLine in listLines :
-				listComponents = strLine.rstrip('\n\r').split( '\t' )
-				# clauseIE has format <sentid> <sent>
-				# attribIE has format <sentid> <sent> <entityid>
-				# oie-benchmark has format <sent>
-				# we ignore entity ID but its there for future use should cross-sent co-resolution or discourse level analysis be needed
-				if len(listComponents) > 3 :
-					raise Exception( 'sentence file parse error : ' + repr(strLine) )
-
-				if len(listComponents) > 1 :
-
-					# unescape out '&AMP ;' and '&AMP;' so its just &
-					listComponents[1] = listComponents[1].replace( '&AMP ;', '&' )
-					listComponents[1] = listComponents[1].replace( '&AMP;', '&' )
-
-					# replace variants of " used in dataset so its easier to POS and dep parse
-					listComponents[1] = listComponents[1].replace( "``", '"' )
-					listComponents[1] = listComponents[1].replace( "''", '"' )
-
-					# replace -- with a comma
-					listComponents[1] = listComponents[1].replace( "--", ',' )
-
-					# remember sent text
-					dictText[ int( listComponents[0] ) ] = listComponents[1]
-					nLine = nLine + 1
-
-				else :
-
-					# unescape out '&AMP ;' and '&AMP;' so its just &
-					listComponents[0] = listComponents[0].replace( '&AMP ;', '&' )
-					listComponents[0] = listComponents[0].replace( '&AMP;', '&' )
-
-					# replace variants of " used in dataset so its easier to POS and dep parse
-					listComponents[0] = listComponents[0].replace( "``", '"' )
-					listComponents[0] = listComponents[0].replace( "''", '"' )
-
-					# replace -- with a comma
-					listComponents[0] = listComponents[0].replace( "--", ',' )
-
-					# remember sent text
-					dictText[ nLine ] = listComponents[0]
-					nLine = nLine + 1
-
-				# check sent limit
-				if (nSentMax != -1) and (nLine >= nSentMax) :
-					break
-
-			logger.info( 'Number of sent in corpus = ' + str(len(dictText)) )
-
-			#
-			# GENERATE : create a randomly ordered version of the ground truth (so we have a random sample for later relevance feedback work that is consitent across multiple feedback iterations)
-			#
+			# read in sentence list (pre-tokenized if the dataset has a sentences.jsonl file)
+			( dictText, dictTokens ) = read_dataset_sents(
+				dataset_dir = strDataset,
+				max_sent = dictSettings['max_sent_limit'],
+				dict_openie_config = dictAttribIEConfig )
 
+			# GENERATE : create a randomly ordered version of the ground truth
 			if strMode == 'generate' :
-
-				# load the ground truth data and create a random sample (if we have a ground truth at all)
-				strGroundTruth = strDataset + os.sep + 'extractions-all-labelled.txt'
-				if os.path.exists( strGroundTruth ) == True :
-
-					listGroundTruth = []
-
-					# read the ground truth data
-					readHandle = codecs.open( strGroundTruth, 'r', 'utf-8', errors = 'replace' )
-					listLines = readHandle.readlines()
-					readHandle.close()
-
-					for strLine in listLines :
-						listComponents = strLine.rstrip('\n\r').split( '\t' )
-						if len(listComponents) == 1 :
-							# ignore sentences
-							continue
-						elif len(listComponents) > 1 :
-							# sent_index, [arg, rel, arg, context], 0|1
-							# sent_index, [subj, attr_base, attr_prep, obj], 0|1
-							# sent_index, [subj, attr], 0|1
-							# sent_index, [subj], 0|1
-							nSizeOfExtraction = len(listComponents) - 2
-							if nSizeOfExtraction < 1 :
-								raise Exception( 'invalid extraction in ground truth : ' + repr(listComponents) )
-
-							# for clauseIE only force it to triples
-							if strDataset in ['nyt-clauseIE','reverb-clauseIE','wikipedia-clauseIE'] :
-								if nSizeOfExtraction > 3 :
-									nSizeOfExtraction = 3
-
-							# remove single quote from both end (not multiple in case string has quotes in it) and make a proposition list
-							listProp = []
-							for nIndexEntry in range(1,nSizeOfExtraction+1) :
-								listProp.append( listComponents[nIndexEntry][1:-1] )
-
-							# add to list (leave numbers as strings)
-							listGroundTruth.append( ( listComponents[0], listProp, listComponents[-1] ) )
-				
-					# randomize the order of ground truth annotations, so feedback sample is a random sample
-					# dont shuffle as we want a consistent ground truth list per feedback run (manually shuffle file if this is important)
-					random.shuffle( listGroundTruth )
-
-					# serialize random sample of ground truth to file
-					strGroundTruthRandom = strDataset + os.sep + 'extractions-all-labelled-randomized.txt'
-					writeHandle = codecs.open( strGroundTruthRandom, 'w', 'utf-8', errors = 'replace' )
-					for ( nSentIndex, listProp, nScore ) in listGroundTruth :
-						writeHandle.write( str(nSentIndex) + '\t' )
-						for strPhrase in listProp :
-							writeHandle.write( strPhrase + '\t' )
-						writeHandle.write( str(nScore) + '\n' )
-					writeHandle.close()
-
-
-			#
-			# POS tagging
-			#   stanford POS tagger +
-			#   Namespace and URI POS patterns + 
-			#   CH POS tag patterns for CH-style citations and catalogue identifiers
-			#   note: POS patterns are declared in config object - see test_attrib_ie_regex.dictTagPatterns()
-			#
-
-			dictSents = {}
-			nSentTotal = 0
-			for nIndexDoc in sorted( dictText.keys() ) :
-				strUTF8Text = dictText[nIndexDoc]
-
-				# note: phrases matching dict_common_config['token_preservation_regex'] regex will be preserved as single tokens
-				listTokens = soton_corenlppy.common_parse_lib.unigram_tokenize_text( text = strUTF8Text, dict_common_config = dictAttribIEConfig )
-				dictSents[ nIndexDoc ] = [ listTokens ]
-				nSentTotal = nSentTotal + 1
-
-			# POS tag document set
-			dictTaggedSents = soton_corenlppy.common_parse_lib.pos_tag_tokenset_batch( 
-								document_token_set = dictSents,
-								lang = 'en',
-								dict_common_config = dictAttribIEConfig,
-								max_processes = nProcessMax,
-								timeout = 300 )
-
-			if bOutputPOS == True :
-				# serialize output (POS)
-				strPOSFile = strDataset + os.sep + 'pos_labelled_sents.txt'
-				logger.info( 'POS tagged sent file: ' + strPOSFile )
-				writeHandle = codecs.open( strPOSFile, 'w', 'utf-8', errors = 'replace' )
-				for nIndexDoc in sorted( dictTaggedSents.keys() ) :
-					writeHandle.write( 'SENT\n' )
-					writeHandle.write( str(nIndexDoc) + '\n' )
-					writeHandle.write( 'TEXT\n' )
-					writeHandle.write( dictText[nIndexDoc] + '\n' )
-					writeHandle.write( 'TAGGED SENT\n' )
-					for listSent in dictTaggedSents[nIndexDoc] :
-						writeHandle.write( soton_corenlppy.common_parse_lib.serialize_tagged_list( list_pos = listSent, dict_common_config = dictAttribIEConfig ) + '\n' )
-				writeHandle.close()
-
-			#
-			# apply POS patterns to generate seed tuples
-			# - propositional seeds -> arg/rel/prep
-			# - attributional seeds -> s/a/p/o, s/a/o, s/a/p/<end>, s/a/<end>, <start>/a/<end>, <start>/a/p/<end>
-			#
-
-			# create a set of sent trees
-			logger.info( '\n\nSENT TREES\n' )
-			dictSentTrees = {}
-			dictSentTreesPOSPatterns = {}
-
-			for nIndexDoc in dictTaggedSents :
-				dictSentTrees[nIndexDoc] = []
-				for listSentTagged in dictTaggedSents[nIndexDoc] :
-					listSentTrees = soton_corenlppy.common_parse_lib.create_sent_trees( list_pos = listSentTagged, dict_common_config = dictAttribIEConfig )
-
-					#listSentTrees = listSentTrees[7:8]
-
-					# logger.info( '\n\nSENT == ' + repr(listSentTrees) )
-
-					'''
-					# use CH domain specific POS-patterns to label sequences of POS tags in sent trees
-					listSentMatchesTotal = [[]] * len(listSentTrees)
-					for dictPatterns in [
-						test_attrib_ie_regex.dictCHIdentifierPatterns,
-						test_attrib_ie_regex.dictCHAttributePatterns ] :
-
-						listSentMatches = soton_corenlppy.common_parse_lib.match_linguistic_patterns(
-							list_sent_trees = listSentTrees,
-							pattern_dict = dictPatterns,
-							dict_common_config = dictAttribIEConfig )
-
-						for nIndexSent in range(len(listSentMatchesTotal)) :
-
-							if len( listSentMatches[nIndexSent] ) > 0 :
-								#logger.info( 'MATCHES = ' + repr( listSentMatches ) )
-
-								# note: copy list as we will extend it otherwise we change the original list
-								listExisting = copy.deepcopy( listSentMatchesTotal[nIndexSent] )
-								listNew = listSentMatches[nIndexSent]
-								listExisting.extend( listNew )
-
-								listSentMatchesTotal[nIndexSent] = listExisting
-
-					# annotate sent trees with matches for entities, attributes and relationships (this will create n-gram phrases for matched CH concepts)
-					listSentTrees = soton_corenlppy.common_parse_lib.annotate_sent_with_pattern_matches(
-						list_sent_trees = listSentTrees,
-						list_sent_matches = listSentMatchesTotal,
-						dict_common_config = dictAttribIEConfig )
-					'''
-
-					dictSentTrees[nIndexDoc].extend( listSentTrees )
-
-			# annotate sents with the POS patterns (arg, rel, prep, numeric)
-			for nIndexDoc in dictSentTrees :
-				listSentTreeAnnotated = openiepy.comp_sem_lib.annotate_using_pos_patterns(
-					list_sent_trees = dictSentTrees[nIndexDoc],
-					list_phrase_sequence_patterns_exec_order = dict_POS_pattern_settings['exec_order'],
-					dict_phrase_sequence_patterns = dict_POS_pattern_settings['pos_patterns'],
-					dict_openie_config = dictAttribIEConfig )
-				dictSentTreesPOSPatterns[nIndexDoc] = listSentTreeAnnotated
-
-			#
-			# Dependency graphs
-			#
-
-			# get dependency parser
-			logger.info( '\n\nDEP PARSE\n' )
-			dep_parser = openiepy.comp_sem_lib.get_dependency_parser( dict_openie_config = dictAttribIEConfig )
-
-			# dependancy parse tagged sents
-			dictDepGraphs = openiepy.comp_sem_lib.parse_sent_trees_batch(
-				dict_doc_sent_trees = dictSentTrees,
-				dep_parser = dep_parser,
-				dict_custom_pos_mappings = test_attrib_ie_regex.dictTagDependancyParseMapping,
-				max_processes = nProcessMax,
+				randomize_ground_truth( dataset_dir = strDataset, dict_openie_config = dictAttribIEConfig )
+
+			# POS tag, sent trees and dependency graphs
+			dictCorpus = parse_corpus(
+				dict_text = dictText,
+				dataset_dir = strDataset,
+				dict_attrib_ie_settings = dictSettings,
+				worker_pool = dictWorkerPool,
+				dict_tokens = dictTokens,
 				dict_openie_config = dictAttribIEConfig )
 
-			logger.info( 'dep graphs = ' + str(len(dictDepGraphs)) )
-
 			#
 			# GENERATE : seed tuples, open extraction templates, save templates to file
-			# note: we generate seeds, templates and extractions *per pattern* to avoid longer patterns (subj, attr, prep, obj} being filtered in preference to shorter ones {subj, attr, obj} later
 			#
 
 			if strMode == 'generate' :
-
-				# extract seed_tuples from annotated sents
-				logger.info( '\n\nSEED TUPLES\n' )
-				dictSeedTuplesPerPattern = {}
-				dictVarCandidatesPerPattern = {}
-
-				# generate seeds for each set of patterns (so we can generate separate templates for each pattern)
-				for nIndexPattern in range(len(dict_POS_pattern_settings['seed_tuples'])) :
-					#logger.info( 'pattern : ' + str(nIndexPattern) )
-
-					tupleSeedPattern = dict_POS_pattern_settings['seed_tuples'][nIndexPattern]
-					listSeqSeedPattern = [ tupleSeedPattern ]
-
-					listSeedTuplesTotal = []
-					dictVarCandidatesTotal = {}
-
-					for nIndexDoc in dictSentTrees :
-
-						#logger.info('S0 = ' + repr(nIndexDoc) )
-
-						'''
-						listSentExtractions = openiepy.comp_sem_lib.extract_annotations_from_sents(
-							list_sent_trees = dictSentTreesPOSPatterns[nIndexDoc],
-							set_annotations = set( dict_POS_pattern_settings['exec_order'] ),
-							dict_openie_config = dictAttribIEConfig )
-
-						listSeedTuples = openiepy.comp_sem_lib.get_seed_tuples_from_extractions(
-							list_sent_extractions = listSentExtractions,
-							list_sequences = dict_POS_pattern_settings['seed_tuples'],
-							prevent_sequential_instances = dict_POS_pattern_settings['prevent_sequence'],
-							dict_openie_config = dictAttribIEConfig )
-						'''
-
-						if len(dictLexiconPhrase) > 0 :
-							tupleLexiconFilter = ( dictLexiconURI, dictLexiconPhrase )
-						else :
-							tupleLexiconFilter = None
-
-						( listSeedTuples, dictVarCandidates ) = openiepy.comp_sem_lib.generate_seed_tuples(
-							list_sent_trees = dictSentTreesPOSPatterns[nIndexDoc],
-							generation_strategy = strStrategySeedGeneration,
-							lexicon_filter = tupleLexiconFilter,
-							set_annotations = set( dict_POS_pattern_settings['exec_order'] ),
-							dict_annotation_phrase_patterns = dict_POS_pattern_settings['phrase_patterns'],
-							list_sequences = listSeqSeedPattern,
-							prevent_sequential_instances = dict_POS_pattern_settings['prevent_sequence'],
-							dict_openie_config = dictAttribIEConfig )
-
-						# merge sent results into total
-						listSeedTuplesTotal.extend( listSeedTuples )
-
-						for strVarType in dictVarCandidates :
-							if not strVarType in dictVarCandidatesTotal :
-								dictVarCandidatesTotal[strVarType] = []
-							for tupleVarPhrase in dictVarCandidates[strVarType] :
-								if not tupleVarPhrase in dictVarCandidatesTotal[strVarType] :
-									dictVarCandidatesTotal[strVarType].append( tupleVarPhrase )
-
-					# make a set to remove any duplicates
-					setSeedTuplesTotal = set( listSeedTuplesTotal )
-
-					# filter seed_tuple arguments using lexicon (to ensure they are high quality matches that appear)
-					# allow any relation type as the majority are not present in lexicon anyway (e.g. has)
-					# strategy A (permissive): make sure at least 1 arg or rel is in the lexicon
-					# strategy B (selective): make sure at least 2 arg or rel is in the lexicon
-					# strategy C (strict): make sure at least all arg or rel is in the lexicon
-					if len(dictLexiconURI) > 0 :
-						listSeedTuplesTotal = list( setSeedTuplesTotal )
-						nIndex = 0
-						while nIndex < len(listSeedTuplesTotal) :
-							nVarsOK = 0
-							nVarsChecked = 0
-
-							for nIndexVar in range(len(listSeedTuplesTotal[nIndex])) :
-								tupleSeed = listSeedTuplesTotal[nIndex][nIndexVar]
-								strVarType = tupleSeed[0]
-								listPhrase = list( tupleSeed[1:] )
-
-								# only filter noun phrase types (i.e. arg, subject, object)
-								if strVarType in ['ARGUMENT','SUBJECT','OBJECT'] :
-
-									nVarsChecked = nVarsChecked + 1
-
-									# stem if needed
-									if stemmer != None :
-										for nIndex2 in range(len(listPhrase)) :
-											listPhrase[nIndex2] = stemmer.stem( listPhrase[nIndex2].lower() )
-
-									# get all possible lexicon matches
-									listLexiconMatch = lexicopy.lexicon_lib.phrase_lookup(
-										phrase_tokens = listPhrase,
-										head_token = None,
-										lex_phrase_index = dictLexiconPhrase,
-										lex_uri_index = dictLexiconURI,
-										max_gram = 5,
-										stemmer = stemmer,
-										apply_wordnet_morphy = True,
-										hyphen_variant = True,
-										dict_lexicon_config = dictAttribIEConfig )
-
-									# any match is OK
-									if len(listLexiconMatch) > 0 :
-										nVarsOK = nVarsOK + 1
-							
-							# prune seed tuples to ensure only good ones remain prior to generating open templates
-							bFailed = False
-							if strStrategyPruneSeedTuples == 'premissive' :
-								# strategy A (permissive): make sure at least 1 arg or rel is in the lexicon
-								if nVarsOK == 0 :
-									bFailed = True
-							elif strStrategyPruneSeedTuples == 'selective' :
-								# strategy B (selective): make sure at least 2 vars match in set, unless only one then allow 1
-								if nVarsOK < 2 :
-									bFailed = True
-								if (nVarsChecked == 1) and (nVarsOK != 1) :
-									bFailed = True
-							elif strStrategyPruneSeedTuples == 'strict' :
-								# strategy C (strict): make sure at least all arg or rel is in the lexicon
-								if nVarsOK != nVarsChecked :
-									bFailed = True
-							elif strStrategyPruneSeedTuples == 'no_filter' :
-								# do nothing
-								pass
-
-							# delete seed tuples that fail lexicon lookup
-							if bFailed == True :
-								del listSeedTuplesTotal[nIndex]
-							else :
-								nIndex = nIndex + 1
-						setSeedTuplesTotal = set( listSeedTuplesTotal )
-
-					dictSeedTuplesPerPattern[nIndexPattern] = setSeedTuplesTotal
-					dictVarCandidatesPerPattern[nIndexPattern] = dictVarCandidatesTotal
-
-					# write seeds to file
-					if bOutputSeed == True :
-						strSeedFile = strDataset + os.sep + str(nIndexPattern) + '_' + 'seed_tuples.txt'
-						writeHandle = codecs.open( strSeedFile, 'w', 'utf-8', errors = 'replace' )
-						writeHandle.write( 'SEED TUPLES\n' )
-						for tupleSeed in setSeedTuplesTotal :
-							writeHandle.write( repr(tupleSeed) + '\n' )
-
-						writeHandle.write( '\nVAR CANDIDATES\n' )
-						for strVarType in dictVarCandidatesTotal :
-							writeHandle.write( repr( strVarType ) + '\n' )
-							for tuplePhrase in dictVarCandidatesTotal[strVarType] :
-								writeHandle.write( '\t' + repr( tuplePhrase ) + '\n' )
-
-						writeHandle.close()
-
-				#
-				# Learn open extraction templates
-				#   use a random set of corpus sentences for training (e.g. 500 or 1000)
-				#   use all seed tuples
-				#   dep graph walk uses a set of universal dependencies
-				#     allowing BOTH {arg,rel,arg} and {arg,prep,arg}
-				#     capture negation and genuine/false patterns
-				#     allow long graph walks (up to 15 steps) to get the long tail context
-				#   aggresively normalize patterns (merge them into more general patterns)
-				#     keep topN (e.g. 1000) based on frequency of occurance
-				#   note: use a process farm to max CPU as this is a slow process
-				#
-
-				# create extraction templates based on a random subset of the whole data as its taking 1.5 minutes per artifact description on average
-				# e.g. 500 artifacts takes 0.5 day of processing with a 15 deep graph walk
-				listDocURI = dictDepGraphs.keys()
-				random.shuffle( listDocURI )
-				if nRandomSubsetTraining < len(listDocURI) :
-					listDocURI = listDocURI[:nRandomSubsetTraining]
-
-				dictRandomSubsetGraphs = {}
-				for strDocURI in listDocURI :
-					dictRandomSubsetGraphs[strDocURI] = dictDepGraphs[strDocURI]
-
-				# generate templates for each set of patterns (so we can generate separate templates for each pattern)
-				for nIndexPattern in range(len(dict_POS_pattern_settings['seed_tuples'])) :
-					logger.info( 'pattern : ' + str(nIndexPattern) )
-					setSeedTuplesTotal = dictSeedTuplesPerPattern[nIndexPattern]
-					dictVarCandidatesTotal = dictVarCandidatesPerPattern[nIndexPattern]
-
-					# extract from corpus all sents where a seed_tuple exists somewhere in sent structure, but without any constraint on lexical position -> training_sents
-					listOpenExtractionPatternsTotal= openiepy.comp_sem_lib.generate_open_extraction_templates_batch(
-						seed_tuples = setSeedTuplesTotal,
-						var_candidates = dictVarCandidatesTotal,
-						dict_document_sent_graphs = dictRandomSubsetGraphs,
-						dict_seed_to_template_mappings = dict_POS_pattern_settings['seed_var_mapping'],
-						dict_context_dep_types = test_attrib_ie_regex.dictContextualDepTypes,
-						max_processes = nProcessMax,
-						longest_dep_path = dict_POS_pattern_settings['longest_dep_path'],
-						longest_inter_target_walk = dict_POS_pattern_settings['longest_inter_target_walk'],
-						max_seed_variants = 128,
-						allow_seed_subsumption = dict_POS_pattern_settings['seed_subsumption'],
-						avoid_dep_set = dict_POS_pattern_settings['avoid_dep'],
-						dict_openie_config = dictAttribIEConfig )
-
-					listOpenExtractionPatternsBeforeNormalization = copy.deepcopy( listOpenExtractionPatternsTotal )
-					logger.info( 'patterns before normalization = ' + str(len(listOpenExtractionPatternsBeforeNormalization)) )
-
-					# debug
-					'''
-					logger.info( 'SPECIFIC PATTERNS' )
-					for strPattern in listOpenExtractionPatternsTotal :
-						logger.info( repr(strPattern) )
-					'''
-
-					# aggresively normalize patterns. keep topN based on freq of occurance.
-					listOpenExtractionPatternsTotal = openiepy.comp_sem_lib.normalize_open_extraction_templates(
-						list_patterns = listOpenExtractionPatternsTotal,
-						topN = nTargetExtractionTemplates,
-						dict_generalize_strategy = dict_POS_pattern_settings['template_generalization_strategy'],
-						dict_openie_config = dictAttribIEConfig )
-					logger.info( 'patterns after normalization = ' + str(len(listOpenExtractionPatternsTotal)) )
-
-					# debug
-					'''
-					logger.info( 'NORMALIZED PATTERNS' )
-					for strPattern in listOpenExtractionPatternsTotal :
-						logger.info( repr(strPattern) )
-					'''
-
-					# write open pattern templates to disk
-					strTemplateFileNew = strDataset + os.sep + strTemplateFile + '_' + str(nIndexPattern) + '.txt'
-					logger.info( 'writing open extraction templates to file ' + strTemplateFileNew )
-					writeHandle = codecs.open( strTemplateFileNew, 'w', 'utf-8', errors = 'replace' )
-					for strPattern in listOpenExtractionPatternsTotal :
-						writeHandle.write( strPattern + '\n' )
-					writeHandle.close()
+				generate_templates(
+					dict_corpus = dictCorpus,
+					dataset_dir = strDataset,
+					template_file = strTemplateFile,
+					lexicon_uri = dictLexiconURI,
+					lexicon_phrase = dictLexiconPhrase,
+					dict_attrib_ie_settings = dictSettings,
+					worker_pool = dictWorkerPool,
+					dict_openie_config = dictAttribIEConfig )
 
 			#
 			# FILTER : load ground truth
@@ -870,658 +2044,77 @@ if __name__ == '__main__' :
 
 				logger.info( '\n\nLOAD GROUND TRUTH\n' )
 
-				# load the ground truth data for use in relevance feedback (optional)
-				listGroundTruth = None
+				# load the ground truth data for use in relevance feedback
 				strGroundTruth = strDataset + os.sep + 'extractions-all-labelled-randomized.txt'
-				if os.path.exists( strGroundTruth ) == True :
-
-					listGroundTruth = []
-
-					# read the ground truth data
-					readHandle = codecs.open( strGroundTruth, 'r', 'utf-8', errors = 'replace' )
-					listLines = readHandle.readlines()
-					readHandle.close()
-
-					for strLine in listLines :
-						listComponents = strLine.rstrip('\n\r').split( '\t' )
-						if len(listComponents) == 1 :
-							# ignore sentences
-							continue
-						elif len(listComponents) > 1 :
-							# sent_index, [arg, rel, arg, context], 0|1
-							# sent_index, [subj, attr_base, attr_prep, obj], 0|1
-							# sent_index, [subj, attr], 0|1
-							# sent_index, [subj], 0|1
-							nSizeOfExtraction = len(listComponents) - 2
-							if nSizeOfExtraction < 1 :
-								raise Exception( 'invalid extraction in ground truth : ' + repr(listComponents) )
-
-							# for clauseIE only force it to triples
-							if strDataset in ['nyt-clauseIE','reverb-clauseIE','wikipedia-clauseIE'] :
-								if nSizeOfExtraction > 3 :
-									nSizeOfExtraction = 3
-
-							# remove single quote from both end (not multiple in case string has quotes in it) and make a proposition list
-							listProp = []
-							for nIndexEntry in range(1,nSizeOfExtraction+1) :
-								listProp.append( listComponents[nIndexEntry][1:-1] )
-
-							# add to list (leave numbers as strings)
-							listGroundTruth.append( ( listComponents[0], listProp, listComponents[-1] ) )
-				
-					# randomize the order of ground truth annotations, so feedback sample is a random sample
-					# dont shuffle as we want a consistent ground truth list per feedback run (manually shuffle file if this is important)
-					#random.shuffle( listGroundTruth )
-				else :
+				if os.path.exists( strGroundTruth ) == False :
 					raise Exception( 'missing ground truth file : ' + strGroundTruth )
 
-			#
-			# EXTRACT & FILTER : load templates from file, execute templates to generate extractions
-			#
-
-			if (strMode == 'extract') or (strMode == 'filter') :
-
-				logger.info( '\n\nEXTRACT VARS\n' )
-
-				dictExtractedVarsUnfilteredPerPattern = {}
-				dictExtractedVarsPerPattern = {}
-				dictExtractedVarsConfPerPattern = {}
-				dictParsedExtractionPatternsPerPattern = {}
-
-				# execute templates for each set of patterns (so we can generate separate extractions for each pattern)
-				for nIndexPattern in range(len(dict_POS_pattern_settings['proposition_pattern'])) :
-					logger.info( 'pattern : ' + str(nIndexPattern) )
-
-					listPropPattern = dict_POS_pattern_settings['proposition_pattern'][nIndexPattern][0]
-					nTargetIndex = dict_POS_pattern_settings['proposition_pattern'][nIndexPattern][1]
-					strTargetVarType = dict_POS_pattern_settings['proposition_pattern'][nIndexPattern][2]
-
-					# read templates from file
-					strFileToOpen = strDataset + os.sep + strTemplateFile + '_' + str(nIndexPattern) + '.txt'
-					if not os.path.isfile(strFileToOpen) :
-						raise Exception( '<template file> ' + strFileToOpen + ' does not exist' )
-					logger.info( 'reading open extraction templates to file ' + strFileToOpen )
-					readHandle = codecs.open( strFileToOpen, 'r', 'utf-8', errors = 'replace' )
-					listLines = readHandle.readlines()
-					readHandle.close()
-
-					listOpenExtractionPatternsTotal = []
-					for strLine in listLines :
-						strPattern = strLine.rstrip('\n\r')
-						listOpenExtractionPatternsTotal.append( strPattern )
-
-					# parse open pattern templates 
-					listParsedExtractionPatterns = []
-					for strPattern in listOpenExtractionPatternsTotal :
-						listParsedExtractionPatterns.append(
-							openiepy.comp_sem_lib.parse_extraction_pattern(
-								str_pattern = strPattern,
-								dict_openie_config = dictAttribIEConfig )
-							)
-
-					#
-					# Execute open extraction templates
-					#    report arg, rel, arg
-					#    report dep connections between arg/rel variables so we can later use subj/obj etc to make good semantic mappings
-					#
-
-					# execute open pattern templates on the test corpus
-					dictExtractedVarsUnfiltered = openiepy.comp_sem_lib.match_extraction_patterns_batch(
-						dict_document_sent_graphs = dictDepGraphs,
-						list_extraction_patterns = listParsedExtractionPatterns,
-						dict_collapse_dep_types = test_attrib_ie_regex.dictCollapseDepTypes,
-						max_processes = nProcessMax,
-						dict_openie_config = dictAttribIEConfig )
-
-					logger.info( 'documents = ' + str(len(dictExtractedVarsUnfiltered)) )
-
-					# filter extractions to avoid variable subsumption
-					dictExtractedVars = {}
-					dictExtractedVarsConf = {}
-					for nIndexDoc in dictDepGraphs :
-						if not nIndexDoc in dictExtractedVars :
-							dictExtractedVars[nIndexDoc] = []
-							dictExtractedVarsConf[nIndexDoc] = []
-
-						#logger.info( '****** T0 = ' + repr(nIndexDoc) )
-						#logger.info( repr( dictText[nIndexDoc] ) )
-						#logger.info( '' )
-						#logger.info( '' )
-
-						for nSentIndex in range(len(dictExtractedVarsUnfiltered[nIndexDoc])) :
-							listMatches = dictExtractedVarsUnfiltered[nIndexDoc][nSentIndex]
-
-							( listMatchesFiltered, listConf ) = openiepy.comp_sem_lib.filter_extractions(
-								dep_graph = dictDepGraphs[nIndexDoc][nSentIndex],
-								list_extractions = listMatches,
-								filter_strategy = dict_POS_pattern_settings['filter_extract_strat'],
-								use_context = False,
-								max_context = 100,
-								min_var_connection = dict_POS_pattern_settings['min_var_connection'],
-								max_semantic_drift = dict_POS_pattern_settings['max_semantic_drift'],
-								target_var_type = strTargetVarType,
-								dict_sem_drift = dict_POS_pattern_settings['semantic_drift_cost'],
-								dict_openie_config = dictAttribIEConfig )
-
-							dictExtractedVars[nIndexDoc].append( listMatchesFiltered )
-							dictExtractedVarsConf[nIndexDoc].append( listConf )
-
-						#if nIndexDoc == 6 :
-						#	sys.exit()
-
-					dictExtractedVarsUnfilteredPerPattern[nIndexPattern] = dictExtractedVarsUnfiltered
-					dictExtractedVarsPerPattern[nIndexPattern] = dictExtractedVars
-					dictExtractedVarsConfPerPattern[nIndexPattern] = dictExtractedVarsConf
-					dictParsedExtractionPatternsPerPattern[nIndexPattern] = listParsedExtractionPatterns
-
-					logger.info( 'documents (filtered)' )
+				listGroundTruth = read_ground_truth( filename = strGroundTruth, dataset_dir = strDataset )
 
 			#
-			# EXTRACT : save extraction variables to disk
+			# EXTRACT & FILTER : load templates from file, execute templates to generate extractions and propositions
 			#
 
-			if strMode == 'extract' :
-
-				logger.info( '\n\nSAVE VARS\n' )
-
-				# save extractions for each set of patterns
-				for nIndexPattern in range(len(dict_POS_pattern_settings['proposition_pattern'])) :
-					logger.info( 'pattern : ' + str(nIndexPattern) )
-
-					dictExtractedVarsUnfiltered = dictExtractedVarsUnfilteredPerPattern[nIndexPattern]
-					dictExtractedVars = dictExtractedVarsPerPattern[nIndexPattern]
-					dictExtractedVarsConf = dictExtractedVarsConfPerPattern[nIndexPattern]
-
-					if bOutputPlainExtract == True :
-
-						# serialize output (extracted vars)
-						strVarFile = strDataset + os.sep + 'var-' + strExtractFile + '_' + str(nIndexPattern) + '.txt'
-						logger.info( 'Extracted variables file: ' + strVarFile )
-						writeHandle = codecs.open( strVarFile, 'w', 'utf-8', errors = 'replace' )
-
-						#writeHandle.write( '\nPre-NORMALIZED PATTERNS\n' )
-						#for strPattern in listOpenExtractionPatternsBeforeNormalization :
-						#	writeHandle.write( repr( strPattern ) + '\n' )
-
-						writeHandle.write( '\nNORMALIZED PATTERNS\n' )
-						for strPattern in listOpenExtractionPatternsTotal :
-							writeHandle.write( repr( strPattern ) + '\n' )
-
-						writeHandle.write( '\nALL EXTRACTS (unfiltered)\n' )
-						for nIndexDoc in sorted( dictDepGraphs.keys() ) :
-							for nSentIndex in range(len(dictExtractedVarsUnfiltered[nIndexDoc])) :
-
-								treeSent = dictSentTreesPOSPatterns[nIndexDoc][nSentIndex]
-								writeHandle.write( u' '.join( treeSent.leaves() ) + '\n' )
-
-								for nMatchIndex in range(len(dictExtractedVarsUnfiltered[nIndexDoc][nSentIndex])) :
-									strPrettyText = openiepy.comp_sem_lib.pretty_print_extraction(
-										list_extracted_vars = dictExtractedVarsUnfiltered[nIndexDoc][nSentIndex][nMatchIndex],
-										dep_graph = dictDepGraphs[nIndexDoc][nSentIndex],
-										set_var_types = set( test_attrib_ie_regex.setGraphDepTypes ),
-										style = 'highlighted_vars',
-										dict_openie_config = dictAttribIEConfig )
-
-									writeHandle.write( '\t' + strPrettyText + '\n' )
-
-						writeHandle.write( '\nALL EXTRACTS (filtered)\n' )
-						for nIndexDoc in sorted( dictDepGraphs.keys() ) :
-							for nSentIndex in range(len(dictExtractedVars[nIndexDoc])) :
-
-								treeSent = dictSentTreesPOSPatterns[nIndexDoc][nSentIndex]
-								writeHandle.write( u' '.join( treeSent.leaves() ) + '\n' )
-
-								for nMatchIndex in range(len(dictExtractedVars[nIndexDoc][nSentIndex])) :
-									strPrettyText = openiepy.comp_sem_lib.pretty_print_extraction(
-										list_extracted_vars = dictExtractedVars[nIndexDoc][nSentIndex][nMatchIndex],
-										dep_graph = dictDepGraphs[nIndexDoc][nSentIndex],
-										set_var_types = set( test_attrib_ie_regex.setGraphDepTypes ),
-										style = 'highlighted_vars',
-										dict_openie_config = dictAttribIEConfig )
-
-									writeHandle.write( '\t' + strPrettyText + '\n' )
-
-						# extracted in human form
-						writeHandle.write( '\nALL EXTRACTS (filtered, human formatted variables)\n' )
-						for nIndexDoc in sorted( dictDepGraphs.keys() ) :
-							writeHandle.write( dictText[nIndexDoc] + '\n' )
-
-							for nSentIndex in range(len(dictExtractedVars[nIndexDoc])) :
-								for nMatchIndex in range(len(dictExtractedVars[nIndexDoc][nSentIndex])) :
-
-									writeHandle.write( '\textract ' + str(nMatchIndex) + '\n' )
-
-									# get extraction vars
-									# listExtractedVars = [ ( var_type, var_name, graph_address, collapsed_graph_addresses[], { dep : [ var_name, ... ] }, pattern_index ), ... ]
-									listExtractedVars = dictExtractedVars[nIndexDoc][nSentIndex][nMatchIndex]
-
-									# encode extraction
-									strEncoded = openiepy.comp_sem_lib.encode_extraction(
-										list_extracted_vars = listExtractedVars,
-										dep_graph = dictDepGraphs[nIndexDoc][nSentIndex],
-										set_var_types = set( test_attrib_ie_regex.setGraphDepTypes ),
-										dict_openie_config = dictAttribIEConfig )
-
-									# parse extraction into the form needed by map_encoded_extraction_to_lexicon()
-									# listExtractedVarsParsed = [ ( var_name, var_head, var_phrase, { dep_path : [ var,var... ], ... }, addr, pattern_index, var_phrase_human ), ... ]
-									listExtractedVarsParsed = openiepy.comp_sem_lib.parse_encoded_extraction(
-										encoded_str = strEncoded,
-										dict_openie_config = dictAttribIEConfig )
-
-									# output extracted variables in human format
-									for ( strVarName, strVarHead, strVarPhrase, dictConnections, nAddr, nPatternIndex, strVarHuman ) in listExtractedVarsParsed :
-										writeHandle.write( '\t\t{' + strVarName + '} == ' + strVarHuman + '\n' )
-
-						writeHandle.write( '\nPER URI RESULTS\n' )
-						writeHandle.write( '---------------\n' )
-
-						for nIndexDoc in sorted( dictDepGraphs.keys() ) :
-							listTaggedSents = dictTaggedSents[nIndexDoc]
-							listSentGraphs = dictDepGraphs[nIndexDoc]
-							listSentVars = dictExtractedVars[nIndexDoc]
-
-							writeHandle.write( '\nURI\n' )
-							writeHandle.write( str(nIndexDoc) + '\n' )
-
-							writeHandle.write( '\nTEXT\n' )
-							writeHandle.write( dictText[nIndexDoc] + '\n' )
-
-							writeHandle.write( '\SENTS and EXTRACTS\n' )
-							for nSentIndex in range(len(dictExtractedVars[nIndexDoc])) :
-								treeSent = dictSentTreesPOSPatterns[nIndexDoc][nSentIndex]
-								writeHandle.write( soton_corenlppy.common_parse_lib.serialize_tagged_tree( treeSent, dict_common_config = dictAttribIEConfig ) + '\n' )
-								writeHandle.write( unicode( treeSent ) + '\n' )
-
-								for nMatchIndex in range(len(dictExtractedVars[nIndexDoc][nSentIndex])) :
-
-									strPrettyText = openiepy.comp_sem_lib.pretty_print_extraction(
-										list_extracted_vars = dictExtractedVars[nIndexDoc][nSentIndex][nMatchIndex],
-										dep_graph = dictDepGraphs[nIndexDoc][nSentIndex],
-										set_var_types = set( test_attrib_ie_regex.setGraphDepTypes ),
-										style = 'highlighted_vars',
-										dict_openie_config = dictAttribIEConfig )
-
-									writeHandle.write( '>> ' + strPrettyText + '\n' )
-
-									listVars = openiepy.comp_sem_lib.get_extraction_vars(
-										list_extracted_vars = dictExtractedVars[nIndexDoc][nSentIndex][nMatchIndex],
-										dict_openie_config = dictAttribIEConfig )
-									for ( strVar, strType ) in listVars :
-										tuplePrettyVar = openiepy.comp_sem_lib.pretty_print_extraction_var(
-											list_extracted_vars = dictExtractedVars[nIndexDoc][nSentIndex][nMatchIndex],
-											dep_graph = dictDepGraphs[nIndexDoc][nSentIndex],
-											var_name = strVar,
-											dict_openie_config = dictAttribIEConfig )
-										if tuplePrettyVar[0] != None :
-											writeHandle.write( '\t' + strVar + ' = ' + tuplePrettyVar[0] + ' [' + repr(tuplePrettyVar[1]) + ']' )
-										if tuplePrettyVar[2] == True :
-											writeHandle.write( ' negated' )
-										writeHandle.write( '\n' )
-
-							writeHandle.write( '\nTAG\n' )
-							for listSent in dictTaggedSents[nIndexDoc] :
-								writeHandle.write( soton_corenlppy.common_parse_lib.serialize_tagged_list( list_pos = listSent, dict_common_config = dictAttribIEConfig ) + '\n' )
-
-							writeHandle.write( '\nGRAPH\n' )
-							for depObj in dictDepGraphs[nIndexDoc] :
-								writeHandle.write( depObj.to_dot() + '\n' )
-
-						writeHandle.close()
-
-					if bOutputEncodedExtract == True :
-
-						# serialize output (extracted vars)
-						strVarFile = strDataset + os.sep + 'encoded-var-' + strExtractFile + '_' + str(nIndexPattern) + '.txt'
-						logger.info( 'Extracted variables file: ' + strVarFile )
-						writeHandle = codecs.open( strVarFile, 'w', 'utf-8', errors = 'replace' )
-
-						for nIndexDoc in sorted( dictDepGraphs.keys() ) :
-							listTaggedSents = dictTaggedSents[nIndexDoc]
-							listSentGraphs = dictDepGraphs[nIndexDoc]
-							listSentVars = dictExtractedVars[nIndexDoc]
-
-							for nSentIndex in range(len(dictExtractedVars[nIndexDoc])) :
-								treeSent = dictSentTreesPOSPatterns[nIndexDoc][nSentIndex]
-
-								for nMatchIndex in range(len(dictExtractedVars[nIndexDoc][nSentIndex])) :
-
-									# get extraction vars
-									# listExtractedVars = [ ( var_type, var_name, graph_address, collapsed_graph_addresses[], (negated, genuine), { dep : [ var_name, ... ] } ), ... ]
-									listExtractedVars = dictExtractedVars[nIndexDoc][nSentIndex][nMatchIndex]
-
-									# encode extraction
-									strEncoded = openiepy.comp_sem_lib.encode_extraction(
-										list_extracted_vars = listExtractedVars,
-										dep_graph = dictDepGraphs[nIndexDoc][nSentIndex],
-										set_var_types = set( test_attrib_ie_regex.setGraphDepTypes ),
-										dict_openie_config = dictAttribIEConfig )
-
-									writeHandle.write( str(nIndexDoc) + '\t' + strEncoded + '\n' )
-
-						writeHandle.close()
+			if (strMode == 'extract') or (strMode == 'filter') :
 
-			#
-			# EXTRACT & FILTER : generate save extracted propositions
-			#
+				dictExtractions = execute_templates(
+					dict_corpus = dictCorpus,
+					dataset_dir = strDataset,
+					template_file = strTemplateFile,
+					dict_attrib_ie_settings = dictSettings,
+					worker_pool = dictWorkerPool,
+					dict_openie_config = dictAttribIEConfig )
 
-			if (strMode == 'extract') or (strMode == 'filter') :
+				if strMode == 'extract' :
+					write_extracted_vars(
+						dict_corpus = dictCorpus,
+						dict_extractions = dictExtractions,
+						dataset_dir = strDataset,
+						extract_file = strExtractFile,
+						dict_attrib_ie_settings = dictSettings,
+						dict_openie_config = dictAttribIEConfig )
 
-				#
-				# generate output {arg, rel, arg} in format suitable for evaluation
-				#
-
-				logger.info( '\n\nGENERATE PROPOSITIONS\n' )
-
-				dictDocumentPropositionSetsPerPattern = {}
-				for nIndexPattern in range(len(dict_POS_pattern_settings['proposition_pattern'])) :
-					dictDocumentPropositionSetsPerPattern[nIndexPattern] = []
-
-				listDocumentPropositionSetsAggregated = []
-
-				# loop on each document
-				listDocumentPropositionSets = []
-				for nIndexDoc in sorted( dictDepGraphs.keys() ) :
-					for nSentIndex in range(len(dictExtractedVars[nIndexDoc])) :
-
-						listPropSetAggregate = []
-						listPropSetConfAggregate = []
-
-						# generate propositions for this document from extraction data for each set of patterns
-						for nIndexPattern in range(len(dict_POS_pattern_settings['proposition_pattern'])) :
-							#logger.info( 'pattern : ' + str(nIndexPattern) )
-
-							dictExtractedVarsUnfiltered = dictExtractedVarsUnfilteredPerPattern[nIndexPattern]
-							dictExtractedVars = dictExtractedVarsPerPattern[nIndexPattern]
-							dictExtractedVarsConf = dictExtractedVarsConfPerPattern[nIndexPattern]
-
-							listPropPattern = dict_POS_pattern_settings['proposition_pattern'][nIndexPattern][0]
-							nTargetIndex = dict_POS_pattern_settings['proposition_pattern'][nIndexPattern][1]
-
-							#logger.info('*** pattern = ' + repr(listPropPattern) )
-							#logger.info('' )
-							#logger.info('' )
-							#logger.info('' )
-
-							# loop on each extraction for this sent
-							listPropSet = []
-							listPropSetConf = []
-							for nMatchIndex in range(len(dictExtractedVars[nIndexDoc][nSentIndex])) :
-
-								#logger.info( '  match ' + str(nMatchIndex) )
-
-								# get extraction vars
-								# listExtractedVars = [ ( var_type, var_name, graph_address, collapsed_graph_addresses[], { dep : [ var_name, ... ] }, pattern_index ), ... ]
-								listExtractedVars = dictExtractedVars[nIndexDoc][nSentIndex][nMatchIndex]
-								nConf = dictExtractedVarsConf[nIndexDoc][nSentIndex][nMatchIndex]
-
-								listResult = openiepy.comp_sem_lib.generate_proposition_set_from_extraction(
-									list_extracted_vars = listExtractedVars,
-									dep_graph = dictDepGraphs[nIndexDoc][nSentIndex],
-									proposition_pattern = listPropPattern,
-									dict_displaced_context = dict_POS_pattern_settings['displaced_context'],
-									dict_sem_drift = dict_POS_pattern_settings['semantic_drift_cost'],
-									max_semantic_dist = dict_POS_pattern_settings['max_end_to_end_semantic_dist'],
-									include_context = dict_POS_pattern_settings['include_context_in_prop'],
-									dict_openie_config = dictAttribIEConfig )
-
-								# add to prop set (avoiding any duplicates)
-								if listResult != None :
-									for tupleResult in listResult :
-										if not tupleResult in listPropSet :
-											listPropSet.append( tupleResult )
-											listPropSetConf.append( nConf )
-
-							# filter prop set for this sent (for this prop pattern target)
-							if dict_POS_pattern_settings['filter_prop_strat'] in ['min_length','max_length'] :
-								openiepy.comp_sem_lib.filter_proposition_set(
-									list_proposition_set = listPropSet,
-									list_proposition_set_conf = listPropSetConf,
-									target_index = nTargetIndex,
-									filter_strategy = dict_POS_pattern_settings['filter_prop_strat'],
-									dict_index_stoplist_prefix = dict_POS_pattern_settings['prop_stoplist_prefix'],
-									dict_index_stoplist_suffix = dict_POS_pattern_settings['prop_stoplist_suffix'],
-									dict_openie_config = dictAttribIEConfig )
-
-							# serialize propositional structures (per pattern)
-							for nIndexProp in range(len(listPropSet)) :
-								tupleResult = listPropSet[nIndexProp]
-								nConf = listPropSetConf[nIndexProp]
-								( listPhraseText, listHeadText, listPhrasesProposition, listHeadProposition, nPatternIndex, listPattern ) = tupleResult
-								dictDocumentPropositionSetsPerPattern[nIndexPattern].append( ( str(nIndexDoc), listPhraseText, nPatternIndex, nConf, listPattern, listHeadText ) )
-
-							# also aggregate all patterns together
-							listPropSetAggregate.extend( listPropSet )
-							listPropSetConfAggregate.extend( listPropSetConf )
-
-						# filter aggregate prop set (prop subsumption)
-						if dict_POS_pattern_settings['filter_prop_strat'] == 'prop_subsumption' :
-							openiepy.comp_sem_lib.filter_proposition_set(
-								list_proposition_set = listPropSetAggregate,
-								list_proposition_set_conf = listPropSetConfAggregate,
-								target_index = None,
-								filter_strategy = dict_POS_pattern_settings['filter_prop_strat'],
-								dict_index_stoplist_prefix = dict_POS_pattern_settings['prop_stoplist_prefix'],
-								dict_index_stoplist_suffix = dict_POS_pattern_settings['prop_stoplist_suffix'],
-								dict_openie_config = dictAttribIEConfig )
-
-						# serialize propositional structures (aggregated)
-						for nIndexProp in range(len(listPropSetAggregate)) :
-							tupleResult = listPropSetAggregate[nIndexProp]
-							nConf = listPropSetConfAggregate[nIndexProp]
-							( listPhraseText, listHeadText, listPhrasesProposition, listHeadProposition, nPatternIndex, listPattern ) = tupleResult
-							listDocumentPropositionSetsAggregated.append( ( str(nIndexDoc), listPhraseText, nPatternIndex, nConf, listPattern, listHeadText ) )
+				( dictPropsPerPattern, listPropsAggregated ) = generate_propositions(
+					dict_corpus = dictCorpus,
+					dict_extractions = dictExtractions,
+					dict_attrib_ie_settings = dictSettings,
+					dict_openie_config = dictAttribIEConfig )
 
 			#
 			# EXTRACT : save extracted propositions to file
 			#
 
 			if strMode == 'extract' :
-
-				#
-				# save extractions to disk (plain text report and encoded)
-				# note: score is always 1 as we have no meaningful way to score propositions at this stage
-				#   <sent-text>
-				#   <sent-index> tab <arg> tab <rel> tab <arg> tab <score>
-				#   ...
-				#
-
-				logger.info( '\n\nSAVE PROPOSITIONS\n' )
-
-				# save propositions for each set of patterns
-				for nIndexPattern in range(len(dict_POS_pattern_settings['proposition_pattern'])) :
-					logger.info( 'pattern : ' + str(nIndexPattern) )
-
-					listDocumentPropositionSets = dictDocumentPropositionSetsPerPattern[nIndexPattern]
-
-					strResultFile = strDataset + os.sep + strExtractFile + '_' + str(nIndexPattern) + '.txt'
-					logger.info( 'result file: ' + strResultFile )
-					writeHandle = codecs.open( strResultFile, 'w', 'utf-8', errors = 'replace' )
-
-					for nIndexDoc in sorted( dictDepGraphs.keys() ) :
-						writeHandle.write( dictText[nIndexDoc] + '\n' )
-
-						# loop on all propositions that refer to this document
-						listPropsGenerated = []
-						for (strIndexDoc, listPhraseText, nPatternIndex, nConf, listPropPattern, listHeadText ) in listDocumentPropositionSets :
-							if strIndexDoc == str(nIndexDoc) :
-
-								# only write a prop once if we have seen it before from another pattern
-								if not listPhraseText in listPropsGenerated :
-									listPropsGenerated.append( listPhraseText )
-
-									# serialize result
-									writeHandle.write( strIndexDoc + '\t' )
-									for nIndexPhrase in range(len(listPhraseText)) :
-										writeHandle.write( '"' + listPhraseText[nIndexPhrase] + '"' )
-										writeHandle.write( '\t' )
-									writeHandle.write( str(nConf) + '\n' )
-
-					writeHandle.close()
-
-					if bOutputAnnotatedProp == True :
-
-						strResultFile = strDataset + os.sep + 'annotated-' + strExtractFile + '_' + str(nIndexPattern) + '.txt'
-						logger.info( 'result file: ' + strResultFile )
-						writeHandle = codecs.open( strResultFile, 'w', 'utf-8', errors = 'replace' )
-
-						for nIndexDoc in sorted( dictDepGraphs.keys() ) :
-							writeHandle.write( dictText[nIndexDoc] + '\n' )
-
-							# loop on all propositions that refer to this document
-							listPropsGenerated = []
-							for (strIndexDoc, listPhraseText, nPatternIndex, nConf, listPropPattern, listHeadText ) in listDocumentPropositionSets :
-								if strIndexDoc == str(nIndexDoc) :
-
-									# only write a prop once if we have seen it before from another pattern
-									if not listPhraseText in listPropsGenerated :
-										listPropsGenerated.append( listPhraseText )
-
-										# serialize result
-										writeHandle.write( strIndexDoc + '\t' )
-
-										for nIndexPhrase in range(len(listPhraseText)) :
-											writeHandle.write( '"' + listPhraseText[nIndexPhrase] + '"' )
-											writeHandle.write( '\t' )
-
-										for nIndexHead in range(len(listHeadText)) :
-											writeHandle.write( '"' + listHeadText[nIndexHead] + '"' )
-											writeHandle.write( '\t' )
-
-										writeHandle.write( str(nConf) + '\t' )
-
-										writeHandle.write( '{' )
-										for nPropIndex in range(len(listPropPattern)) :
-											strPropType = listPropPattern[nPropIndex]
-											writeHandle.write( strPropType )
-											if nPropIndex < len(listPropPattern)-1 :
-												writeHandle.write( ',' )
-										writeHandle.write( '}' )
-
-										writeHandle.write( '\n' )
-
-						writeHandle.close()
-
-				# save propositions for aggregated patterns
-				strResultFile = strDataset + os.sep + strExtractFile
-				logger.info( 'result file (aggregated): ' + strResultFile )
-				writeHandle = codecs.open( strResultFile, 'w', 'utf-8', errors = 'replace' )
-
-				for nIndexDoc in sorted( dictDepGraphs.keys() ) :
-					writeHandle.write( dictText[nIndexDoc] + '\n' )
-
-					# loop on all propositions that refer to this document
-					listPropsGenerated = []
-					for (strIndexDoc, listPhraseText, nPatternIndex, nConf, listPropPattern, listHeadText ) in listDocumentPropositionSetsAggregated :
-						if strIndexDoc == str(nIndexDoc) :
-
-							# only write a prop once if we have seen it before from another pattern
-							if not listPhraseText in listPropsGenerated :
-								listPropsGenerated.append( listPhraseText )
-
-								# serialize result
-								writeHandle.write( strIndexDoc + '\t' )
-								for nIndexPhrase in range(len(listPhraseText)) :
-									writeHandle.write( '"' + listPhraseText[nIndexPhrase] + '"' )
-									writeHandle.write( '\t' )
-								writeHandle.write( str(nConf) + '\n' )
-
-				writeHandle.close()
-
-				if bOutputAnnotatedProp == True :
-
-					strResultFile = strDataset + os.sep + 'annotated-' + strExtractFile
-					logger.info( 'result file (aggregated): ' + strResultFile )
-					writeHandle = codecs.open( strResultFile, 'w', 'utf-8', errors = 'replace' )
-
-					for nIndexDoc in sorted( dictDepGraphs.keys() ) :
-						writeHandle.write( dictText[nIndexDoc] + '\n' )
-
-						# loop on all propositions that refer to this document
-						listPropsGenerated = []
-						for (strIndexDoc, listPhraseText, nPatternIndex, nConf, listPropPattern, listHeadText ) in listDocumentPropositionSetsAggregated :
-							if strIndexDoc == str(nIndexDoc) :
-
-								# only write a prop once if we have seen it before from another pattern
-								if not listPhraseText in listPropsGenerated :
-									listPropsGenerated.append( listPhraseText )
-
-									# serialize result
-									writeHandle.write( strIndexDoc + '\t' )
-
-									for nIndexPhrase in range(len(listPhraseText)) :
-										writeHandle.write( '"' + listPhraseText[nIndexPhrase] + '"' )
-										writeHandle.write( '\t' )
-
-									for nIndexHead in range(len(listHeadText)) :
-										writeHandle.write( '"' + listHeadText[nIndexHead] + '"' )
-										writeHandle.write( '\t' )
-
-									writeHandle.write( str(nConf) + '\t' )
-
-									writeHandle.write( '{' )
-									for nPropIndex in range(len(listPropPattern)) :
-										strPropType = listPropPattern[nPropIndex]
-										writeHandle.write( strPropType )
-										if nPropIndex < len(listPropPattern)-1 :
-											writeHandle.write( ',' )
-									writeHandle.write( '}' )
-
-									writeHandle.write( '\n' )
-
-					writeHandle.close()
+				write_propositions(
+					dict_corpus = dictCorpus,
+					dict_propositions_per_pattern = dictPropsPerPattern,
+					list_propositions_aggregated = listPropsAggregated,
+					dataset_dir = strDataset,
+					extract_file = strExtractFile,
+					dict_attrib_ie_settings = dictSettings,
+					dict_openie_config = dictAttribIEConfig )
 
 			#
 			# FILTER : filter templates using ground truth, save templates to file
 			#
 
 			if strMode == 'filter' :
+				filter_templates(
+					dict_extractions = dictExtractions,
+					dict_propositions_per_pattern = dictPropsPerPattern,
+					list_ground_truth = listGroundTruth,
+					feedback_start_index = nFeedbackStartIndex,
+					feedback_end_index = nFeedbackEndIndex,
+					dataset_dir = strDataset,
+					filtered_template_file = strFilteredTemplateFile,
+					dict_attrib_ie_settings = dictSettings,
+					dict_openie_config = dictAttribIEConfig )
 
-				logger.info( '\n\nAPPLY RELEVANCE FEEDBACK\n' )
-
-				if listGroundTruth == None :
-					raise Exception( 'cannot process feedback loop without a ground truth file for feedback (None)' )
-
-				if nFeedbackStartIndex == -1 :
-					nFeedbackStartIndex = 0
-				if nFeedbackEndIndex == -1 :
-					nFeedbackEndIndex = len(listGroundTruth)
-
-				logger.info( 'feedback used ' + repr( (nFeedbackStartIndex,nFeedbackEndIndex) ) )
-
-				# apply ground truth relevance filter to filter each patterns's set of templates
-				for nIndexPattern in range(len(dict_POS_pattern_settings['proposition_pattern'])) :
-					logger.info( 'pattern : ' + str(nIndexPattern) )
-
-					listDocumentPropositionSets = dictDocumentPropositionSetsPerPattern[nIndexPattern]
-					listParsedExtractionPatterns = dictParsedExtractionPatternsPerPattern[nIndexPattern]
-
-					# remove from listParsedExtractionPatterns any templates that generated an incorrect extraction
-					openiepy.comp_sem_lib.filter_open_extraction_templates_using_relevance_feedback(
-						list_parsed_patterns = listParsedExtractionPatterns,
-						list_doc_set_of_propositions = listDocumentPropositionSets,
-						list_relevance_feedback = listGroundTruth[nFeedbackStartIndex:nFeedbackEndIndex],
-						dict_openie_config = dictAttribIEConfig )
-
-					# write open pattern templates to disk
-					strNewTemplateFile = strDataset + os.sep + strFilteredTemplateFile + '_' + str(nIndexPattern) + '.txt'
-					logger.info( 'writing open extraction templates to file ' + strNewTemplateFile )
-					writeHandle = codecs.open( strNewTemplateFile, 'w', 'utf-8', errors = 'replace' )
-					for strPattern in listOpenExtractionPatternsTotal :
-						writeHandle.write( strPattern + '\n' )
-					writeHandle.close()
+		nlp_scheduler_lib.stop_worker_pool( worker_pool = dictWorkerPool )
 
 	except :
 		logger.exception( 'eval_attrib_ie main() exception' )
 		sys.stderr.flush()
-		sys.stdout.flush()
-
-		# close file handler
-		if readHandle != None :
-			readHandle.close()
-		if writeHandle != None :
-			writeHandle.close()
-		logger.info( 'closed file handles' )
-
 		sys.stdout.flush()
 		sys.exit(1)
 
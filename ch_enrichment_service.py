@@ -0,0 +1,403 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+/////////////////////////////////////////////////////////////////////////
+//
+// (c) Copyright University of Southampton IT Innovation, 2016
+//
+// Copyright in this software belongs to IT Innovation Centre of
+// Gamma House, Enterprise Road, Southampton SO16 7NS, UK.
+//
+// This software may not be used, sold, licensed, transferred, copied
+// or reproduced in whole or in part in any manner or form or in or
+// on any media by any person other than in accordance with the terms
+// of the Licence Agreement supplied with the software, or otherwise
+// without the prior written consent of the copyright owners.
+//
+// This software is distributed WITHOUT ANY WARRANTY, without even the
+// implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+// PURPOSE, except where stated in the Licence Agreement supplied with
+// the software.
+//
+//    Created By :    Stuart E. Middleton
+//    Created Date :    2018/11/28
+//    Created for Project:    GRAVITATE
+//
+/////////////////////////////////////////////////////////////////////////
+//
+// Dependencies: None
+//
+/////////////////////////////////////////////////////////////////////////
+"""
+
+import os, sys, logging, json, time, BaseHTTPServer
+import soton_corenlppy, nltk.stem, nltk.corpus
+import cultural_heritage_parse_lib, attrib_ie, nlp_scheduler_lib, ch_information_extraction_app, lexicon_matcher_lib
+
+'''
+CH enrichment service
+- long running HTTP service for enriching single artifacts (e.g. a newly edited artifact description during interactive curation)
+- config, WordNet, lexicons, attrib_ie regex patterns, templates and association mining rules are loaded once at startup
+- POST /enrich { "uri" : artifact_uri, "text" : text or [ text, ... ] } returns item sets + CIDOC-CRM turtle for the artifact and per-stage latency
+- GET /stats returns latency stats (per stage) for all requests served so far
+- templates and association mining rules are those already learnt by a batch run of ch_information_extraction_app.py
+- the Stanford POS tagger and parser run as resident processes in the worker process (started at startup), so sents missing from the NLP cache do not start new Stanford JVMs for each request
+'''
+
+# stages timed for each request
+listLatencyStages = [ 'sentence_split', 'parse', 'extract', 'item_sets', 'rdf', 'total' ]
+
+def load_enrichment_service( filename_config = None, filename_attrib_ie_config = 'ch_attrib_ie.ini', dataset_dir = 'CH_dataset', template_file = 'attribie-templates.txt', filename_rules = 'association_mining_rules.txt', logger = None ) :
+	#
+	# load everything needed to enrich an artifact, so it is done once at service startup not per request
+	#
+
+	dictConfig = soton_corenlppy.config_helper.read_config( filename_config )
+
+	dictCHConfig = ch_information_extraction_app.get_ch_config( dict_config = dictConfig, logger = logger )
+
+	# attrib_ie config (includes compiled test_attrib_ie_regex patterns)
+	# note: a single artifact has only a few sents, so use a single worker process for attrib_ie batch functions
+	( dictAttribIESettings, dictAttribIEConfig ) = attrib_ie.read_attrib_ie_config( filename_config = filename_attrib_ie_config, logger = logger )
+	dictAttribIESettings['process_count'] = 1
+	dictAttribIESettings['resident_stanford'] = True
+
+	# a single long-lived worker is reused by every request, rather than spawning workers for each batch call
+	dictWorkerPool = nlp_scheduler_lib.start_worker_pool(
+		max_processes = dictAttribIESettings['process_count'],
+		dict_openie_config = dictAttribIEConfig )
+
+	# start the resident Stanford POS tagger and parser in the worker now (JVM startup and model load take several seconds), rather than on the first request
+	# note: the NLP cache is not used so the warm up sent always reaches the tagger and parser
+	dictWarmUpSettings = dict( dictAttribIESettings )
+	dictWarmUpSettings['nlp_cache_file'] = ''
+	attrib_ie.parse_corpus(
+		dict_text = { 0 : u'A flint blade with a curved edge.' },
+		dataset_dir = None,
+		dict_attrib_ie_settings = dictWarmUpSettings,
+		worker_pool = dictWorkerPool,
+		dict_openie_config = dictAttribIEConfig )
+
+	# parsed templates learnt by the last batch run
+	dictTemplates = attrib_ie.read_templates(
+		dataset_dir = dataset_dir,
+		template_file = template_file,
+		dict_attrib_ie_settings = dictAttribIESettings,
+		dict_openie_config = dictAttribIEConfig )
+
+	# association mining rules learnt by the last batch run
+	listRules = ch_information_extraction_app.import_association_mining_rules(
+		filename_rules = filename_rules,
+		dict_openie_config = dictCHConfig )
+	logger.info( 'association mining rules = ' + str(len(listRules)) )
+
+	listSemanticMappings = ch_information_extraction_app.load_semantic_mapping(
+		filename_mapping = dictConfig['semantic_mapping_ch'],
+		dict_openie_config = dictCHConfig )
+
+	# use a previously exported CH lexicon if there is one, rather than rebuilding it from SKOS files
+	# note: with a lexicon snapshot the batch run settings are kept, so the snapshot built by the batch run is used as it is
+	strLexiconFileExport = dictConfig['export_lexicon_file']
+	strLexiconFileImport = dictConfig['import_lexicon_file']
+	if (dictConfig['lexicon_snapshot_file'] == '') and (strLexiconFileExport != '') and (os.path.isfile( strLexiconFileExport ) == True) :
+		strLexiconFileImport = strLexiconFileExport
+		strLexiconFileExport = ''
+
+	( listNounTypeRanked, dictMergedLexiconURI, dictMergedLexiconPhrase ) = ch_information_extraction_app.load_ch_lexicon(
+		noun_types_ranked = dictConfig['noun_types_ranked'],
+		noun_types_lexicon = dictConfig['noun_types_ch_lexicon'],
+		export_lexicon_file = strLexiconFileExport,
+		import_lexicon_file = strLexiconFileImport,
+		filename_lemma = dictConfig['filename_lemma'],
+		filename_hypernym = dictConfig['filename_hypernym'],
+		filename_related = dictConfig['filename_related'],
+		import_file_format = dictConfig['import_file_format'],
+		stemmer = None,
+		snapshot_file = dictConfig['lexicon_snapshot_file'],
+		dict_openie_config = dictCHConfig )
+
+	# WordNet is lazy loaded by NLTK on first use, so force it to load now (not needed with a WordNet closure table)
+	if dictCHConfig['wordnet_closure'] == None :
+		nltk.corpus.wordnet.synsets( 'artifact' )
+
+	dictLatency = {}
+	for strStage in listLatencyStages :
+		dictLatency[strStage] = { 'count' : 0, 'total_ms' : 0.0, 'max_ms' : 0.0 }
+
+	return {
+		'ch_config' : dictCHConfig,
+		'attrib_ie_settings' : dictAttribIESettings,
+		'attrib_ie_config' : dictAttribIEConfig,
+		'worker_pool' : dictWorkerPool,
+		'templates' : dictTemplates,
+		'rules' : listRules,
+		'semantic_mapping' : listSemanticMappings,
+		'schema_ranked_list' : listNounTypeRanked,
+		'lexicon_uri' : dictMergedLexiconURI,
+		'lexicon_phrase' : dictMergedLexiconPhrase,
+		'schema_cache' : lexicon_matcher_lib.open_lookup_cache( max_entries = int( dictConfig['lexicon_schema_cache_size'] ) ),
+		'wordnet_cache' : ch_information_extraction_app.open_wordnet_cache( dict_config = dictConfig, dict_openie_config = dictCHConfig ),
+		'entity_stemmer' : nltk.stem.RegexpStemmer('s$', 4),
+		'latency' : dictLatency,
+		}
+
+def enrich_artifact( dict_service = None, uri = None, list_text = [] ) :
+	#
+	# run the CH pipeline for a single artifact
+	# return { 'uri' : uri, 'item_sets' : [ [ item, ... ], ... ], 'turtle' : str, 'latency_ms' : { stage : ms } }
+	#
+
+	if not isinstance( dict_service, dict ) :
+		raise Exception( 'invalid dict_service' )
+	if not isinstance( uri, (str,unicode) ) :
+		raise Exception( 'invalid uri' )
+	if not isinstance( list_text, list ) :
+		raise Exception( 'invalid list_text' )
+
+	dictCHConfig = dict_service['ch_config']
+	dictAttribIESettings = dict_service['attrib_ie_settings']
+	dictAttribIEConfig = dict_service['attrib_ie_config']
+
+	# a failed batch call stops the worker pool, so start a new one (its resident Stanford processes are started by the next parse)
+	if dict_service['worker_pool']['running'] == False :
+		dict_service['worker_pool'] = nlp_scheduler_lib.start_worker_pool(
+			max_processes = dictAttribIESettings['process_count'],
+			dict_openie_config = dictAttribIEConfig )
+
+	dictLatency = {}
+	nTimeStart = time.time()
+	nTimeStage = nTimeStart
+
+	# sentence split
+	# note: sents are passed to attrib_ie pre-tokenized (as in a batch run with sentences.jsonl), so they are not tokenized twice
+	dictText = {}
+	dictTokens = {}
+	dictSentToURIIndex = {}
+	for strText in list_text :
+		for listTokens in ch_information_extraction_app.tokenize_artifact_text( text = strText, dict_openie_config = dictCHConfig ) :
+			listTokens = attrib_ie.normalize_sent_tokens( list_tokens = listTokens )
+			dictSentToURIIndex[ len(dictText) ] = uri
+			dictTokens[ len(dictText) ] = listTokens
+			dictText[ len(dictText) ] = ' '.join( listTokens )
+
+	dictLatency['sentence_split'] = 1000.0 * ( time.time() - nTimeStage )
+	nTimeStage = time.time()
+
+	listItemSets = []
+	strTurtle = ''
+	if len(dictText) > 0 :
+
+		# POS tag and dependency parse (sents seen before are read from the NLP cache)
+		dictCorpus = attrib_ie.parse_corpus(
+			dict_text = dictText,
+			dataset_dir = None,
+			dict_attrib_ie_settings = dictAttribIESettings,
+			worker_pool = dict_service['worker_pool'],
+			dict_tokens = dictTokens,
+			dict_openie_config = dictAttribIEConfig )
+
+		dictLatency['parse'] = 1000.0 * ( time.time() - nTimeStage )
+		nTimeStage = time.time()
+
+		# execute preloaded templates
+		dictExtractions = attrib_ie.execute_templates(
+			dict_corpus = dictCorpus,
+			templates = dict_service['templates'],
+			dict_attrib_ie_settings = dictAttribIESettings,
+			worker_pool = dict_service['worker_pool'],
+			dict_openie_config = dictAttribIEConfig )
+
+		( dictPropsPerPattern, listPropsAggregated ) = attrib_ie.generate_propositions(
+			dict_corpus = dictCorpus,
+			dict_extractions = dictExtractions,
+			dict_attrib_ie_settings = dictAttribIESettings,
+			dict_openie_config = dictAttribIEConfig )
+
+		listDocumentPropositionSets = ch_information_extraction_app.convert_attrib_ie_propositions(
+			list_propositions_aggregated = listPropsAggregated,
+			dict_openie_config = dictCHConfig )
+
+		dictLatency['extract'] = 1000.0 * ( time.time() - nTimeStage )
+		nTimeStage = time.time()
+
+		# item sets + inferred semantic types from preloaded association mining rules
+		listItemSets = ch_information_extraction_app.create_item_sets(
+			list_document_proposition_sets = listDocumentPropositionSets,
+			dict_sent_to_uri = dictSentToURIIndex,
+			lex_phrase_index = dict_service['lexicon_phrase'],
+			lex_uri_index = dict_service['lexicon_uri'],
+			schema_ranked_list = dict_service['schema_ranked_list'],
+			list_semantic_mapping = dict_service['semantic_mapping'],
+			stemmer = None,
+			schema_cache = dict_service['schema_cache'],
+			wordnet_cache = dict_service['wordnet_cache'],
+			dict_openie_config = dictCHConfig )
+
+		ch_information_extraction_app.apply_association_mining_rules(
+			list_item_sets = listItemSets,
+			list_rules = dict_service['rules'],
+			max_inferences = 3,
+			dict_openie_config = dictCHConfig )
+
+		dictLatency['item_sets'] = 1000.0 * ( time.time() - nTimeStage )
+		nTimeStage = time.time()
+
+		# RDF
+		if len(listItemSets) > 0 :
+			strTurtle = cultural_heritage_parse_lib.item_set_to_CIDOC_CRM_RDF(
+				item_sets = listItemSets,
+				annotation_namespace = 'http://gravitate.org/id/',
+				graph_namespace = 'http://gravitate.org/id/NLP_algorithm/graph',
+				include_prefix = True,
+				entity_stemmer = dict_service['entity_stemmer'],
+				dict_ch_config = dictCHConfig )
+
+		dictLatency['rdf'] = 1000.0 * ( time.time() - nTimeStage )
+
+	dictLatency['total'] = 1000.0 * ( time.time() - nTimeStart )
+
+	# update service latency stats
+	for strStage in dictLatency :
+		dictStats = dict_service['latency'][strStage]
+		dictStats['count'] = dictStats['count'] + 1
+		dictStats['total_ms'] = dictStats['total_ms'] + dictLatency[strStage]
+		dictStats['max_ms'] = max( dictStats['max_ms'], dictLatency[strStage] )
+
+	dictCHConfig['logger'].info( 'enriched ' + uri + ' : sents = ' + str(len(dictText)) + ', item sets = ' + str(len(listItemSets)) + ', latency ms = ' + repr( dictLatency ) )
+
+	return {
+		'uri' : uri,
+		'item_sets' : listItemSets,
+		'turtle' : strTurtle,
+		'latency_ms' : dictLatency,
+		}
+
+def get_latency_stats( dict_service = None ) :
+	#
+	# return { stage : { 'count' : int, 'mean_ms' : float, 'max_ms' : float } } for all requests served so far
+	#
+
+	dictResult = {}
+	for strStage in listLatencyStages :
+		dictStats = dict_service['latency'][strStage]
+		nMean = 0.0
+		if dictStats['count'] > 0 :
+			nMean = dictStats['total_ms'] / dictStats['count']
+		dictResult[strStage] = { 'count' : dictStats['count'], 'mean_ms' : nMean, 'max_ms' : dictStats['max_ms'] }
+
+	return dictResult
+
+class EnrichmentRequestHandler( BaseHTTPServer.BaseHTTPRequestHandler ) :
+	#
+	# HTTP handler. the loaded service is attached to the server object (server.dict_service).
+	# note: requests are handled one at a time, as the attrib_ie and NLP cache calls are not thread safe
+	#
+
+	def do_GET( self ) :
+		if self.path == '/stats' :
+			self.send_json( 200, get_latency_stats( dict_service = self.server.dict_service ) )
+		else :
+			self.send_json( 404, { 'error' : 'unknown path ' + self.path } )
+
+	def do_POST( self ) :
+		if self.path != '/enrich' :
+			self.send_json( 404, { 'error' : 'unknown path ' + self.path } )
+			return
+
+		try :
+			nLength = int( self.headers.getheader( 'content-length', 0 ) )
+			dictRequest = json.loads( self.rfile.read( nLength ).decode( 'utf-8' ) )
+			if (not isinstance( dictRequest, dict )) or (not 'uri' in dictRequest) or (not 'text' in dictRequest) :
+				raise ValueError( 'request JSON must have uri and text keys' )
+
+			listText = dictRequest['text']
+			if not isinstance( listText, list ) :
+				listText = [ listText ]
+
+		except ValueError as err :
+			self.send_json( 400, { 'error' : str(err) } )
+			return
+
+		try :
+			dictResult = enrich_artifact(
+				dict_service = self.server.dict_service,
+				uri = dictRequest['uri'],
+				list_text = listText )
+		except :
+			self.server.dict_service['ch_config']['logger'].exception( 'enrich failed : ' + repr( dictRequest['uri'] ) )
+			self.send_json( 500, { 'error' : 'enrich failed : ' + repr( sys.exc_info()[1] ) } )
+			return
+
+		self.send_json( 200, dictResult )
+
+	def send_json( self, code, obj ) :
+		strBody = json.dumps( obj, ensure_ascii = True )
+		self.send_response( code )
+		self.send_header( 'Content-Type', 'application/json' )
+		self.send_header( 'Content-Length', str(len(strBody)) )
+		self.end_headers()
+		self.wfile.write( strBody )
+
+	def log_message( self, format, *args ) :
+		self.server.dict_service['ch_config']['logger'].info( 'http ' + self.address_string() + ' ' + ( format % args ) )
+
+
+################################
+# main
+################################
+
+# only execute if this is the main file
+if __name__ == '__main__' :
+
+	#
+	# check args
+	#
+	if len(sys.argv) < 2 :
+		print 'Usage: ch_enrichment_service.py <config file>\n'
+		sys.stdout.flush()
+		sys.exit(1)
+	if not os.path.isfile(sys.argv[1]) :
+		print '<config file> ' + sys.argv[1] + ' does not exist\n'
+		sys.stdout.flush()
+		sys.exit(1)
+
+	# make logger (global to STDOUT)
+	LOG_FORMAT = ('%(levelname) -s %(asctime)s %(message)s')
+	logger = logging.getLogger( __name__ )
+	logging.basicConfig( level=logging.INFO, format=LOG_FORMAT )
+	logger.info('logging started')
+
+	try :
+		# init
+		strConfigFile = sys.argv[1]
+
+		dictConfig = soton_corenlppy.config_helper.read_config( strConfigFile )
+		strHost = dictConfig['service_host']
+		nPort = int( dictConfig['service_port'] )
+
+		logger.info( '\n#\n# Gravitate - Loading CH enrichment service\n#' )
+
+		nTimeStart = time.time()
+		dictService = load_enrichment_service( filename_config = strConfigFile, logger = logger )
+		logger.info( 'service loaded in ' + '%.1f' % ( time.time() - nTimeStart ) + ' seconds' )
+
+		httpd = BaseHTTPServer.HTTPServer( ( strHost, nPort ), EnrichmentRequestHandler )
+		httpd.dict_service = dictService
+
+		logger.info( 'listening on http://' + strHost + ':' + str(nPort) + '/enrich' )
+		httpd.serve_forever()
+
+	except KeyboardInterrupt :
+		logger.info( 'service stopped' )
+
+	except :
+		logger.exception( 'ch_enrichment_service main() exception' )
+		sys.stderr.flush()
+		sys.stdout.flush()
+		sys.exit(1)
+
+	# all done
+	logger.info('finished')
+	sys.stdout.flush()
+	sys.exit(0);
@@ -31,9 +31,9 @@
 /////////////////////////////////////////////////////////////////////////
 """
 
-import os, sys, logging, traceback, codecs, datetime, copy, time, ast, math, re, random, shutil, json, csv, multiprocessing, subprocess
+import os, sys, logging, traceback, codecs, datetime, copy, time, ast, math, re, random, shutil, json, csv, multiprocessing, subprocess, glob, threading, Queue, httplib, urllib, urlparse, hashlib
 import soton_corenlppy, openiepy, lexicopy, nltk.stem
-import cultural_heritage_parse_lib, cultural_heritage_patterns_regex
+import cultural_heritage_parse_lib, cultural_heritage_patterns_regex, attrib_ie, checkpoint_lib, nlp_cache_lib, lexicon_snapshot_lib, lexicon_matcher_lib, wordnet_closure_lib
 
 # TODO move semantic mapping (using association mining) to openie at end of project
 
@@ -44,13 +44,30 @@ CH information extraction app
 - execute filtered open pattern templates to extract useful argument/relation/context information from CH test corpus 
 '''
 
-# regex for item set entries
+# regex for compound item set entries in string form
 # e.g. subj((phrase tokens)(head1)(head2)...)
+# note: compound items are kept as ( var_type, phrase, ( head1, head2, ... ) ) tuples in memory so they are never re-parsed, see compound_item_to_string()
 regexItemSet = re.compile( ur'\A(?P<TYPE>[a-zA-z0-9]+)\(\((?P<PHRASE_LEXICON>[^)]+)\)(?P<HEAD>.*\))\)\Z', re.IGNORECASE | re.UNICODE )
 
 # regex for association mining rules
 regexAMRules = re.compile( ur'\A\"(?P<ITEMS>\{[^}]*\}) \=\> (?P<INFERENCE>\{[^}]*\})\"\Z', re.IGNORECASE | re.UNICODE )
 
+# code each pipeline stage depends on = { stage : [ filename, ... ] }
+# the files are added to the inputs of the stage checkpoint fingerprint, so a code change re-runs the stage (and everything downstream of it if its output changes)
+# note: list every module the stage calls into, including modules imported by other modules (e.g. lexicon_matcher_lib imports wordnet_closure_lib)
+listAttribIEStageCode = [ 'attrib_ie.py', 'test_attrib_ie_regex.py', 'lexicon_matcher_lib.py', 'wordnet_closure_lib.py', 'lexicon_snapshot_lib.py', 'nlp_scheduler_lib.py', 'nlp_cache_lib.py' ]
+listCHStageCode = [ 'ch_information_extraction_app.py', 'cultural_heritage_parse_lib.py', 'cultural_heritage_patterns_regex.py', 'lexicon_matcher_lib.py', 'wordnet_closure_lib.py', 'lexicon_snapshot_lib.py' ]
+dictStageDependencies = {
+	'ingest' : [ 'ch_information_extraction_app.py' ],
+	'sentence_split' : [ 'ch_information_extraction_app.py' ],
+	'attrib_ie_generate' : listAttribIEStageCode,
+	'attrib_ie_extract' : listAttribIEStageCode,
+	'item_sets' : listCHStageCode + [ 'nlp_cache_lib.py' ],
+	'merge' : [ 'ch_information_extraction_app.py' ],
+	'association_mining' : [],
+	'rdf' : listCHStageCode,
+	}
+
 def read_noun_type_ranked_list( filename = None, dict_openie_config = {} ) :
 
 	readHandle = codecs.open( filename, 'r', 'utf-8', errors = 'replace' )
@@ -63,199 +80,187 @@ def read_noun_type_ranked_list( filename = None, dict_openie_config = {} ) :
 		if ( len(strLine) > 0 ) and (strLine[0] != '#') :
 			listRankedNounType.append( strLine.strip() )
 	
-	return listRankedNounType
+	# compile a rank index, used for lexicon import filtering and schema disambiguation
+	return lexicon_matcher_lib.compile_schema_rank_index( schema_ranked_list = listRankedNounType )
+
+def compound_item_to_string( compound_item = None ) :
+	#
+	# serialize a compound item tuple to its string form ( var_type, phrase, ( head1, head2, ... ) ) ==> var_type((phrase)(head1)(head2)...)
+	# artifact_uri items are single value ( 'artifact_uri', uri, () ) ==> artifact_uri(uri)
+	#
+
+	( strVarType, strPhrase, tupleHeads ) = compound_item
+	if strVarType == 'artifact_uri' :
+		return strVarType + '(' + strPhrase + ')'
+
+	strEntry = strVarType + '((' + strPhrase + ')'
+	for strHead in tupleHeads :
+		strEntry = strEntry + '(' + strHead + ')'
+	return strEntry + ')'
 
 def add_item_sets_from_extraction( list_item_sets = None, list_extracted_prop = [], list_prop_pattern = [], list_head_terms = [], dict_openie_config = {} ) :
 	#
 	# take the attrib_ie proposition output and create compound item sets (one item per prop entry)
 	# compound item set = subj((flint blades)(blade)), attr((of)(of)), ...
+	# compound items are ( var_type, escaped phrase, ( escaped lowercase head, ... ) ) tuples, so later steps read their parts directly rather than re-parsing item strings
 	#
 
 	listItemSet = []
+	setItemSet = set([])
 	for nIndexVar in range(len(list_prop_pattern)) :
 
 		strVarType = list_prop_pattern[nIndexVar]
-		strPhrase = list_extracted_prop[nIndexVar]
-
-		strEntry = strVarType + '('
-
-		strEntry = strEntry + '(' + soton_corenlppy.common_parse_lib.escape_token( strPhrase ) +')'
+		strPhrase = soton_corenlppy.common_parse_lib.escape_token( list_extracted_prop[nIndexVar] )
 
 		listHeadTokens = list_head_terms[nIndexVar].split(' ')
-		for strHead in listHeadTokens :
-			strEntry = strEntry + '(' + soton_corenlppy.common_parse_lib.escape_token( strHead.lower() ) +')'
+		for nIndex in range(len(listHeadTokens)) :
+			listHeadTokens[nIndex] = soton_corenlppy.common_parse_lib.escape_token( listHeadTokens[nIndex].lower() )
 
-		strEntry = strEntry + ')'
+		tupleEntry = ( strVarType, strPhrase, tuple( listHeadTokens ) )
 
-		if not strEntry in listItemSet :
-			listItemSet.append( strEntry )
+		if not tupleEntry in setItemSet :
+			setItemSet.add( tupleEntry )
+			listItemSet.append( tupleEntry )
 
 	# add new item set to list of item sets
 	if len(listItemSet) > 0 :
 		list_item_sets.append( listItemSet )
 
+def get_compound_item_heads( compound_item = None ) :
+	#
+	# return the list of lowercase head tokens of a compound item tuple (empty heads removed)
+	#
+
+	listHeadTokens = []
+	for strHead in compound_item[2] :
+		if len(strHead) > 0 :
+			listHeadTokens.append( strHead.lower() )
+	return listHeadTokens
+
 def aggregate_phrases_in_item_set( list_item_sets = [], agg_patterns = [ ('attr',), ('attrbase','attrprep'), ('attrnoobjnosubj',) ], agg_var_name = 'attribute', dict_openie_config = {} ) :
 
 	#
 	# aggregate compound item sets, adding an extra attribute(...) entry to the item set
 	# e.g. attrbase + attrprep -> attribute
 	# e.g. attr -> attribute
-	# compound item set = subj((flint blades)(blade)), attr((of)(of)), ...
+	# compound item set = subj((flint blades)(blade)), attr((of)(of)), ... as ( var_type, phrase, ( head, ... ) ) tuples
 	#
 
 	for nIndexItemSet in range(len(list_item_sets)) :
 
-		# get item set and make a copy for iteration (cannot iterate on a set and change its value)
 		listItemSet = list_item_sets[nIndexItemSet]
+		setItemSet = None
 
 		for tupleAggPattern in agg_patterns :
 			listAggPhrase = []
 			listAggHead = []
+			setAggHead = set([])
 
 			for strTargetVar in tupleAggPattern :
 
-				for strItem in list_item_sets[nIndexItemSet] :
-					if strItem.startswith( strTargetVar + '(' ) :
-
-						#
-						# parse each compound item and break it apart
-						#
-
-						matchObj = regexItemSet.match( strItem )
-						if matchObj != None :
-							if 'TYPE' in matchObj.groupdict() :
-								strVarType = matchObj.groupdict()['TYPE']
-
-							else :
-								raise Exception( 'type missing in item set : ' + repr(strItem) )
+				for tupleItem in listItemSet :
+					if tupleItem[0] == strTargetVar :
 
-							if 'PHRASE_LEXICON' in matchObj.groupdict() :
-								strVarPhrase = matchObj.groupdict()['PHRASE_LEXICON']
-								if strVarPhrase != None :
-									listTokensArg = strVarPhrase.lower().split(' ')
-								else :
-									listTokensArg = []
-							else :
-								raise Exception( 'head missing in item set : ' + repr(strItem) )
+						listAggPhrase.append( tupleItem[1] )
 
-							if 'HEAD' in matchObj.groupdict() :
-								strVarHead = matchObj.groupdict()['HEAD']
-								if strVarHead != None :
-									# get list of head terms from (head1)(head2) ...
-									strVarHead = strVarHead.replace('(',' ')
-									strVarHead = strVarHead.replace(')',' ')
-									listHeadTokensArg = strVarHead.lower().split(' ')
-									while '' in listHeadTokensArg :
-										listHeadTokensArg.remove('')
-								else :
-									listHeadTokensArg = []
-
-							else :
-								raise Exception( 'head missing in item set : ' + repr(strItem) )
-
-						else :
-							raise Exception( 'bad parse of item set : ' + repr(strItem) )
-
-
-						listAggPhrase.append( strVarPhrase )
-
-						for strHead in listHeadTokensArg :
-							if len(strHead) > 0 :
-								if not strHead in listAggHead :
-									listAggHead.append( strHead )
+						for strHead in get_compound_item_heads( tupleItem ) :
+							if not strHead in setAggHead :
+								setAggHead.add( strHead )
+								listAggHead.append( strHead )
 
 			# add aggregated phrase and head to item set
 			if len(listAggPhrase) > 0 :
-				strEntry = agg_var_name + '('
+				tupleEntry = ( agg_var_name, ' '.join( listAggPhrase ), tuple( listAggHead ) )
 
-				strAggregatePhrase = ' '.join( listAggPhrase )
-				strEntry = strEntry + '(' + strAggregatePhrase + ')'
+				# hashed index of the item set, made on the first aggregate (most item sets have none)
+				if setItemSet == None :
+					setItemSet = set( listItemSet )
 
-				for strAggregateHead in listAggHead :
-					strEntry = strEntry + '(' + strAggregateHead + ')'
+				if not tupleEntry in setItemSet :
+					setItemSet.add( tupleEntry )
+					listItemSet.append( tupleEntry )
 
-				strEntry = strEntry + ')'
+def choose_lexicon_schema( matcher = None, phrase_tokens = [], head_token = None, schema_ranked_list = [], allow_non_ranked_schema = False, stemmer = None, dict_openie_config = {} ) :
 
-				if not strEntry in listItemSet :
-					listItemSet.append( strEntry )
+	#
+	# lookup a phrase (around a head token) in the lexicon and choose the most likely schema for it
+	# schema_ranked_list is a lexicon_matcher_lib.SchemaRankIndex
+	# return schema URI or None if there is no lexicon match with a ranked schema
+	#
 
-def expand_compound_items_and_apply_lexicon_schema_mappings( list_item_sets = [], lex_phrase_index = {}, lex_uri_index = {}, schema_ranked_list = {}, allow_non_ranked_schema = False, stemmer = None, dict_openie_config = {} ) :
+	# match lexicon to phrase ngrams
+	# listLexiconMatch = [ ( lexicon_uri, schema_uri, matched_phrase, match_gram_size, confidence_score ), ... ]
+	listLexiconMatch = lexicon_matcher_lib.phrase_lookup(
+		matcher = matcher,
+		phrase_tokens = phrase_tokens,
+		head_token = head_token,
+		max_gram = 5,
+		stemmer = stemmer,
+		apply_wordnet_morphy = True,
+		hyphen_variant = True,
+		dict_openie_config = dict_openie_config )
+
+	# pick the most likely schema of the highest confidence score results, using a ranked list of schema
+	# this list is ranked in order of how likely an occurance of each schema wordsense is for this domain
+	# if the schema does not appear in our domain ranked list then (if allowed) just pick the first one as a 'guess'
+	return lexicon_matcher_lib.choose_ranked_schema(
+		list_lexicon_match = listLexiconMatch,
+		schema_rank_index = schema_ranked_list,
+		allow_non_ranked_schema = allow_non_ranked_schema )
+
+def expand_compound_items_and_apply_lexicon_schema_mappings( list_item_sets = [], lex_phrase_index = {}, lex_uri_index = {}, schema_ranked_list = [], allow_non_ranked_schema = False, stemmer = None, schema_cache = None, dict_openie_config = {} ) :
 
 	#
-	# expand compound item sets into single value items suitable for association mining
+	# expand compound item sets (see add_item_sets_from_extraction()) into single value items suitable for association mining
 	# also do a lexicon lexicon lookup for subj() and obj() types, assigning them a type classifications if they appear in a lexicon
 	# e.g. subj((flint blade)(blade)) ==> subj(flint blade), subj_head(blade), subj_type(...)
 	# single value item set = subj(flint blade), subj_head(blade), subj_type(...)
+	# the same phrases recur across the corpus, so each unique (phrase tokens, head) lookup is resolved once and its schema choice kept in schema_cache
+	# schema_cache is a lexicon_matcher_lib.open_lookup_cache() handle, valid for one lexicon and schema_ranked_list (None for a cache local to this call)
+	# single value items are shared strings, so an item such as subj_head(blade) is held in memory once however many item sets it appears in
 	#
 
-	for nIndexItemSet in range(len(list_item_sets)) :
-
-		# get item set and make a copy for iteration (cannot iterate on a set and change its value)
-		listItemSet = list_item_sets[nIndexItemSet]
-		listItemSetNew = []
+	# compiled lexicon phrase matcher (built once per lexicon)
+	dictMatcher = lexicon_matcher_lib.get_phrase_matcher(
+		lex_phrase_index = lex_phrase_index,
+		lex_uri_index = lex_uri_index,
+		dict_openie_config = dict_openie_config )
 
-		# lookup subject phrase schema type in lexicon
-		for nIndexItem in range(len(listItemSet)) :
-			strItem = listItemSet[nIndexItem]
-
-			if strItem.startswith('artifact_uri(') :
-					strVarType = 'artifact_uri'
-					strVarPhrase = strItem[len(strVarType)+1:-1]
-					listHeadTokensArg = []
+	if schema_cache == None :
+		schema_cache = lexicon_matcher_lib.open_lookup_cache( max_entries = -1 )
 
-			else :
+	# rank index of schema (read_noun_type_ranked_list() returns one already)
+	listSchemaRanked = lexicon_matcher_lib.compile_schema_rank_index( schema_ranked_list = schema_ranked_list )
 
-				#
-				# parse each compound item and break it apart
-				#
+	#
+	# (a) expand compound items, noting where each lexicon lookup goes in the item set
+	# listItemSetSlots = [ item, ..., ( var_type, ( tuple_phrase_tokens, head_token ) ), ... ]
+	#
 
-				matchObj = regexItemSet.match( strItem )
-				if matchObj != None :
-					if 'TYPE' in matchObj.groupdict() :
-						strVarType = matchObj.groupdict()['TYPE']
+	listExpandedItemSets = []
+	setLookupKeys = set([])
+	nLookups = 0
 
-					else :
-						raise Exception( 'type missing in item set : ' + repr(strItem) )
-
-					if 'PHRASE_LEXICON' in matchObj.groupdict() :
-						strVarPhrase = matchObj.groupdict()['PHRASE_LEXICON']
-						if strVarPhrase != None :
-							listTokensArg = strVarPhrase.lower().split(' ')
-						else :
-							listTokensArg = []
-					else :
-						raise Exception( 'head missing in item set : ' + repr(strItem) )
-
-					if 'HEAD' in matchObj.groupdict() :
-						strVarHead = matchObj.groupdict()['HEAD']
-						if strVarHead != None :
-							# get list of head terms from (head1)(head2) ...
-							strVarHead = strVarHead.replace('(',' ')
-							strVarHead = strVarHead.replace(')',' ')
-							listHeadTokensArg = strVarHead.lower().split(' ')
-							while '' in listHeadTokensArg :
-								listHeadTokensArg.remove('')
-						else :
-							listHeadTokensArg = []
+	for nIndexItemSet in range(len(list_item_sets)) :
 
-					else :
-						raise Exception( 'head missing in item set : ' + repr(strItem) )
+		listItemSet = list_item_sets[nIndexItemSet]
+		listItemSetSlots = []
 
-				else :
-					raise Exception( 'bad parse of item set : ' + repr(strItem) )
+		# lookup subject phrase schema type in lexicon
+		for tupleItem in listItemSet :
+			strVarType = tupleItem[0]
+			strVarPhrase = tupleItem[1]
+			listTokensArg = strVarPhrase.lower().split(' ')
+			listHeadTokensArg = get_compound_item_heads( tupleItem )
 
 			#
 			# add components back as individual items
 			#
 
-			strEntry = strVarType + '(' + strVarPhrase + ')'
-			if not strEntry in listItemSetNew :
-				listItemSetNew.append( strEntry )
+			listItemSetSlots.append( strVarType + '(' + strVarPhrase + ')' )
 
 			for strHead in listHeadTokensArg :
-				strEntry = strVarType + '_head(' + strHead + ')'
-				if not strEntry in listItemSetNew :
-					listItemSetNew.append( strEntry )
+				listItemSetSlots.append( strVarType + '_head(' + strHead + ')' )
 
 			#
 			# for subject and object do a lexicon lookup
@@ -264,82 +269,79 @@ def expand_compound_items_and_apply_lexicon_schema_mappings( list_item_sets = []
 			# get subj and obj vars (if any)
 			if strVarType in ['subj','obj'] :
 
-				listLexiconMatch = []
-
 				if stemmer != None :
 					for nIndex in range(len(listTokensArg)) :
 						listTokensArg[nIndex] = stemmer.stem( listTokensArg[nIndex] )
 					for nIndex in range(len(listHeadTokensArg)) :
 						listHeadTokensArg[nIndex] = stemmer.stem( listHeadTokensArg[nIndex] )
 
-				nVarGramSize = len(listTokensArg)
-
-				#if strHeadTokenArg == 'flint' :
-				#	dict_openie_config['logger'].info( 'flint = ' + repr( listTokensArg ) )
-
 				if len(listTokensArg) > 0  :
 
 					# do a lexicon lookup for all head tokens (there might be more than one for a long phrase than spans dep graph branches)
 					for strHeadToken in listHeadTokensArg :
+						tupleKey = ( tuple( listTokensArg ), strHeadToken )
+						listItemSetSlots.append( ( strVarType, tupleKey ) )
+						setLookupKeys.add( tupleKey )
+						nLookups = nLookups + 1
 
-						# match lexicon to phrase ngrams
-						# listLexiconMatch = [ ( lexicon_uri, schema_uri, matched_phrase, match_gram_size, confidence_score ), ... ]
-						listLexiconMatch = lexicopy.lexicon_lib.phrase_lookup(
-							phrase_tokens = listTokensArg,
-							head_token = strHeadToken,
-							lex_phrase_index = lex_phrase_index,
-							lex_uri_index = lex_uri_index,
-							max_gram = 5,
-							stemmer = stemmer,
-							apply_wordnet_morphy = True,
-							hyphen_variant = True,
-							dict_lexicon_config = dict_openie_config )
-
-						#dict_openie_config['logger'].info( 'PHRASE LOOKUP = ' + repr( listTokensArg ) )
-
-						# remove all but the highest confidence score results
-						# get top confidence value
-						nBestScore = None
-						for nIndex in range(len(listLexiconMatch)) :
-							if (nBestScore == None) or (listLexiconMatch[nIndex][4] > nBestScore) :
-								nBestScore = listLexiconMatch[nIndex][4]
-
-						# filter out anything with less than the top confidence score
-						nIndex = 0
-						while nIndex < len(listLexiconMatch) :
-							if listLexiconMatch[nIndex][4] < nBestScore :
-								del listLexiconMatch[nIndex]
-							else :
-								nIndex = nIndex + 1
-
-						if len(listLexiconMatch) == 0 :
-							continue
-
-						# pick the most likely schema from a ranked list of schema
-						# this list is ranked in order of how likely an occurance of each schema wordsense is for this domain
-						strSchemaChoice = None
-						for strSchema in schema_ranked_list :
-							for ( lexicon_uri, schema_uri, matched_phrase, match_gram_size, confidence_score ) in listLexiconMatch :
-								if strSchema == schema_uri :
-									strSchemaChoice = strSchema
-									break
-							if strSchemaChoice != None :
-								break
+		listExpandedItemSets.append( listItemSetSlots )
+
+	#
+	# (b) resolve each unique lookup once, reusing schema choices cached from previous calls
+	#
+
+	listLookupKeys = list( setLookupKeys )
+	dictSchemaChoice = lexicon_matcher_lib.lookup_cache_get(
+		dict_cache = schema_cache,
+		list_keys = listLookupKeys )
+
+	dictResolved = {}
+	for tupleKey in listLookupKeys :
+		if not tupleKey in dictSchemaChoice :
+			dictResolved[tupleKey] = choose_lexicon_schema(
+				matcher = dictMatcher,
+				phrase_tokens = list( tupleKey[0] ),
+				head_token = tupleKey[1],
+				schema_ranked_list = listSchemaRanked,
+				allow_non_ranked_schema = allow_non_ranked_schema,
+				stemmer = stemmer,
+				dict_openie_config = dict_openie_config )
+
+	lexicon_matcher_lib.lookup_cache_store(
+		dict_cache = schema_cache,
+		dict_entries = dictResolved )
+	dictSchemaChoice.update( dictResolved )
+
+	dict_openie_config['logger'].info( 'lexicon schema lookups = ' + str(nLookups) + ', unique = ' + str(len(listLookupKeys)) + ', cache ' + lexicon_matcher_lib.get_lookup_cache_stats( dict_cache = schema_cache ) )
+
+	#
+	# (c) build single value item sets, adding the lexicon type of each lookup
+	#
 
-						# if the schema does not appear in our domain ranked list then just pick the first one as a 'guess'
-						if (strSchemaChoice == None) and (allow_non_ranked_schema == True) :
-							strSchemaChoice = listLexiconMatch[0][1]
+	dictItems = {}
+	for nIndexItemSet in range(len(listExpandedItemSets)) :
 
-						if strSchemaChoice == None :
-							continue
+		listItemSetNew = []
+		setItemSetNew = set([])
+		for entrySlot in listExpandedItemSets[nIndexItemSet] :
+			if isinstance( entrySlot, tuple ) :
+				( strVarType, tupleKey ) = entrySlot
+				strSchemaChoice = dictSchemaChoice[tupleKey]
+				if strSchemaChoice == None :
+					continue
+
+				# add lexicon type to item set
+				strEntry = strVarType + '_type(' + soton_corenlppy.common_parse_lib.escape_token(strSchemaChoice) + ')'
+			else :
+				strEntry = entrySlot
 
-						# add lexicon type to item set
-						strEntry = strVarType + '_type(' + soton_corenlppy.common_parse_lib.escape_token(strSchemaChoice) + ')'
-						if not strEntry in listItemSetNew :
-							listItemSetNew.append( strEntry )
+			if not strEntry in setItemSetNew :
+				setItemSetNew.add( strEntry )
+				listItemSetNew.append( dictItems.setdefault( strEntry, strEntry ) )
 
-		# change original item set to be new one
+		# change original item set to be new one (and free the expanded slots as we go)
 		list_item_sets[nIndexItemSet] = listItemSetNew
+		listExpandedItemSets[nIndexItemSet] = None
 
 
 def load_semantic_mapping( filename_mapping = None, dict_openie_config = {} ) :
@@ -414,13 +416,176 @@ def apply_semantic_mapping_to_item_sets( list_item_sets = None, list_semantic_ma
 	# all done (list_item_sets modified to have schema assignments added as extra items)
 	return
 
-def apply_wordnet_mapping_to_item_sets( list_item_sets = None, allowed_types = set(['attribute_head', 'subj_head', 'obj_head']), count_freq_threshold = 0.5, top_n_lemma = 5, dict_openie_config = {} ) :
+def calc_wordnet_model_key( count_freq_threshold = 0.5, top_n_lemma = 5, wordnet_closure = None ) :
+	#
+	# key for the WordNet version and settings used by expand_wordnet_lemma(). if any of these change a cached expansion is invalid.
+	# wordnet_closure is a wordnet_closure_lib.open_wordnet_closure() handle (None to use NLTK WordNet)
+	#
+
+	if wordnet_closure != None :
+		return [ 'wordnet', wordnet_closure['wordnet_version'], count_freq_threshold, top_n_lemma ]
+
+	return [ 'wordnet', wordnet_closure_lib.get_wordnet_version(), count_freq_threshold, top_n_lemma ]
+
+def expand_wordnet_lemma( lemma = None, pos = None, count_freq_threshold = 0.5, top_n_lemma = 5, dict_openie_config = {} ) :
+	#
+	# lookup a lemma in WordNet and return the base names of its most frequent wordsenses, their hypernyms and verb groups
+	# return [ base_name, ... ] ([] if lemma is not in WordNet)
+	# if dict_openie_config['wordnet_closure'] is set (see get_ch_config()) the precomputed WordNet closure table is used rather than NLTK WordNet, with the same result
+	#
+
+	setWordNet = set([])
+	dictClosure = dict_openie_config.get( 'wordnet_closure' )
+
+	# get all synsets
+	if dictClosure != None :
+		listSynsets = wordnet_closure_lib.get_synset_ids(
+			wordnet_closure = dictClosure,
+			lemma = lemma,
+			pos = pos )
+	else :
+		listSynsets = lexicopy.wordnet_lib.get_synset_names(
+			lemma = lemma,
+			pos=pos,
+			dict_lexicon_config = dict_openie_config )
+
+	# get all lemma and sort them by wordnet frequency count
+	setLemmaWithFreq = set([])
+	for syn in listSynsets :
+		# get lemma
+		if dictClosure != None :
+			wordnet_closure_lib.get_lemma_with_freq(
+				set_lexicon = setLemmaWithFreq,
+				wordnet_closure = dictClosure,
+				synset_id = syn,
+				pos = pos )
+		else :
+			lexicopy.wordnet_lib.get_lemma_with_freq(
+				set_lexicon = setLemmaWithFreq,
+				syn = syn,
+				lang = 'eng',
+				pos=pos,
+				dict_lexicon_config = dict_openie_config )
+
+	# phrase not in wordnet?
+	if len(setLemmaWithFreq) == 0 :
+		return []
+
+	# sort lemma in frequency order
+	listLemmaWithFreq = list( setLemmaWithFreq )
+	listLemmaWithFreq = sorted( listLemmaWithFreq, key=lambda entry: entry[1], reverse=True )
+
+	#if lemma == 'flint' :
+	#	dict_openie_config['logger'].info( 'flint wordnet = ' + repr(setLemmaWithFreq) )
+
+	# apply top N filter to lemma to avoid spamming out wordnet entries later (which will slow up association mining)
+	if top_n_lemma != None :
+		listLemmaWithFreq = listLemmaWithFreq[:top_n_lemma]
+
+	# disambiguate verb wordsense using wordnet corpus occurance frequency (as we have no other context to work with)
+	# select lemma with a freq of N% of the most frequent sense, to capture those wordsenses that are statistically most likly and avoid the more obscure wordsenses
+	nFreqTop = listLemmaWithFreq[0][1]
+	nFreqThreshold = nFreqTop * count_freq_threshold
+	if nFreqThreshold < 1 :
+		nFreqThreshold = 1.0
+
+	#if lemma == 'flint' :
+	#	dict_openie_config['logger'].info( 'flint threshold = ' + repr(nFreqThreshold) )
+
+	for ( strLemmaID, nFreqLemma ) in listLemmaWithFreq :
+		# ignore?
+		if nFreqLemma < nFreqThreshold :
+			continue
+
+		setWordNet.add( strLemmaID )
+
+		# get wordnet syn object for it
+		listParts = strLemmaID.split('.')
+		if len(listParts) < 4 :
+			raise Exception( 'invalid wordnet entry' )
+		strSyn = '.'.join( listParts[0:3] )
+
+		if dictClosure != None :
+			nSynsetID = wordnet_closure_lib.get_synset_id(
+				wordnet_closure = dictClosure,
+				synset_name = strSyn )
+
+			# add hypernyms (verb = troponym, noun = hypernymn)
+			wordnet_closure_lib.inherited_hypernyms(
+				set_lexicon = setWordNet,
+				wordnet_closure = dictClosure,
+				synset_id = nSynsetID,
+				pos = pos,
+				max_depth = 10 )
+
+			# add verb groups
+			wordnet_closure_lib.verb_groups(
+				set_lexicon = setWordNet,
+				wordnet_closure = dictClosure,
+				synset_id = nSynsetID,
+				pos = pos )
+
+		else :
+			syn = lexicopy.wordnet_lib.get_synset(
+				wordnet_synset_name = strSyn,
+				dict_lexicon_config = dict_openie_config )
+
+			# add hypernyms (verb = troponym, noun = hypernymn)
+			lexicopy.wordnet_lib.inherited_hypernyms(
+				set_lexicon = setWordNet,
+				syn = syn,
+				lang = 'eng',
+				pos=pos,
+				max_depth=10,
+				depth=0,
+				dict_lexicon_config = dict_openie_config )
+
+			# add verb groups
+			lexicopy.wordnet_lib.verb_groups(
+				set_lexicon = setWordNet,
+				syn = syn,
+				lang = 'eng',
+				pos=pos,
+				dict_lexicon_config = dict_openie_config )
+
+	#if lemma == 'flint' :
+	#	dict_openie_config['logger'].info( 'flint words = ' + repr(setWordNet) )
+
+	# add synset of all verb, hyponyms and verb groups
+	setBase = set([])
+	for strEntry in setWordNet :
+		listParts = strEntry.split('.')
+		if len(listParts) < 3 :
+			raise Exception( 'invalid wordnet entry' )
+		# setBase.add( '.'.join( listParts[0:3] ) )
+		setBase.add( listParts[0] )
+
+	return list( setBase )
+
+def apply_wordnet_mapping_to_item_sets( list_item_sets = None, allowed_types = set(['attribute_head', 'subj_head', 'obj_head']), count_freq_threshold = 0.5, top_n_lemma = 5, wordnet_cache = None, dict_openie_config = {} ) :
+
+	#
+	# add WordNet expansions (wordsense base names, hypernyms and verb groups) for head items e.g. attribute_head(...) ==> attribute_wn(...)
+	# an expansion only depends on ( lemma, POS, count_freq_threshold, top_n_lemma ), so each unique lemma and POS is expanded once
+	# wordnet_cache is a nlp_cache_lib.open_cache() handle to keep expansions between runs (None for no persistent cache)
+	#
 
 	if list_item_sets == None :
 		return
 
-	# loop on all attr_head(...) entries and add wordnet similar verbs
+	nTimeStage = time.time()
+
+	#
+	# (a) find the lemma and POS of all allowed head items
+	# listItemLookups = [ [ ( wn_type, lemma, pos ), ... ] per item set ]
+	#
+
+	listItemLookups = []
+	setLookups = set([])
+	nLookups = 0
+
 	for listItemSet in list_item_sets :
+		listLookups = []
 		for strItem in listItemSet :
 			bAllowed = False
 			strPOSFilter = None
@@ -446,107 +611,72 @@ def apply_wordnet_mapping_to_item_sets( list_item_sets = None, allowed_types = s
 
 			if bAllowed :
 				strPhraseToLookup = strItem[ len(strPrefix) : -1 ].lower().strip()
-				setWordNet = set([])
-
-				#if strPhraseToLookup == 'flint' :
-				#	dict_openie_config['logger'].info('flint wordnet')
-
-				# get all synsets
-				listSynsets = lexicopy.wordnet_lib.get_synset_names(
-					lemma = strPhraseToLookup,
-					pos=strPOSFilter,
-					dict_lexicon_config = dict_openie_config )
-
-				# get all lemma and sort them by wordnet frequency count
-				setLemmaWithFreq = set([])
-				for syn in listSynsets :
-					# get lemma
-					lexicopy.wordnet_lib.get_lemma_with_freq(
-						set_lexicon = setLemmaWithFreq,
-						syn = syn,
-						lang = 'eng',
-						pos=strPOSFilter,
-						dict_lexicon_config = dict_openie_config )
-
-				# phrase not in wordnet?
-				if len(setLemmaWithFreq) == 0 :
-					continue
+				listLookups.append( ( strWNType, strPhraseToLookup, strPOSFilter ) )
+				setLookups.add( ( strPhraseToLookup, strPOSFilter ) )
+				nLookups = nLookups + 1
+
+		listItemLookups.append( listLookups )
+
+	#
+	# (b) expand each unique lemma and POS once, using cached expansions from previous runs if available
+	#
+
+	dictExpansion = {}
+	dictKeys = {}
+	if wordnet_cache != None :
+		listModelKey = calc_wordnet_model_key( count_freq_threshold = count_freq_threshold, top_n_lemma = top_n_lemma, wordnet_closure = dict_openie_config.get( 'wordnet_closure' ) )
+		for ( strLemma, strPOS ) in setLookups :
+			dictKeys[ ( strLemma, strPOS ) ] = nlp_cache_lib.calc_cache_key( list_components = [ listModelKey, strLemma, strPOS ] )
+
+		dictCached = nlp_cache_lib.cache_lookup( dict_cache = wordnet_cache, list_keys = dictKeys.values() )
+		for tupleLookup in dictKeys :
+			if dictKeys[tupleLookup] in dictCached :
+				dictExpansion[tupleLookup] = dictCached[ dictKeys[tupleLookup] ]
+
+	dictNewEntries = {}
+	nExpanded = 0
+	for ( strLemma, strPOS ) in setLookups :
+		if not ( strLemma, strPOS ) in dictExpansion :
+			nExpanded = nExpanded + 1
+			listBase = expand_wordnet_lemma(
+				lemma = strLemma,
+				pos = strPOS,
+				count_freq_threshold = count_freq_threshold,
+				top_n_lemma = top_n_lemma,
+				dict_openie_config = dict_openie_config )
+			dictExpansion[ ( strLemma, strPOS ) ] = listBase
+			if wordnet_cache != None :
+				dictNewEntries[ dictKeys[ ( strLemma, strPOS ) ] ] = listBase
+
+	if len(dictNewEntries) > 0 :
+		nlp_cache_lib.cache_store( dict_cache = wordnet_cache, dict_entries = dictNewEntries )
+
+	#
+	# (c) add as item set entry (e.g. for association mining to make use of it)
+	# the entries for each ( wn_type, lemma, POS ) are made once and shared by all item sets they are added to
+	#
+
+	dictEntries = {}
+	for nIndexItemSet in range(len(list_item_sets)) :
+		if len( listItemLookups[nIndexItemSet] ) == 0 :
+			continue
+
+		listItemSet = list_item_sets[nIndexItemSet]
+		setItemSet = set( listItemSet )
+		for tupleLookup in listItemLookups[nIndexItemSet] :
+			if not tupleLookup in dictEntries :
+				( strWNType, strLemma, strPOS ) = tupleLookup
+				listEntries = []
+				for strBase in dictExpansion[ ( strLemma, strPOS ) ] :
+					listEntries.append( strWNType + '(' + strBase + ')' )
+				dictEntries[tupleLookup] = listEntries
+
+			for strEntry in dictEntries[tupleLookup] :
+				if not strEntry in setItemSet :
+					setItemSet.add( strEntry )
+					listItemSet.append( strEntry )
 
-				# sort lemma in frequency order
-				listLemmaWithFreq = list( setLemmaWithFreq )
-				listLemmaWithFreq = sorted( listLemmaWithFreq, key=lambda entry: entry[1], reverse=True )
-
-				#if strPhraseToLookup == 'flint' :
-				#	dict_openie_config['logger'].info( 'flint wordnet = ' + repr(setLemmaWithFreq) )
-
-				# apply top N filter to lemma to avoid spamming out wordnet entries later (which will slow up association mining)
-				if top_n_lemma != None :
-					listLemmaWithFreq = listLemmaWithFreq[:top_n_lemma]
-
-				# disambiguate verb wordsense using wordnet corpus occurance frequency (as we have no other context to work with)
-				# select lemma with a freq of N% of the most frequent sense, to capture those wordsenses that are statistically most likly and avoid the more obscure wordsenses
-				nFreqTop = listLemmaWithFreq[0][1]
-				nFreqThreshold = nFreqTop * count_freq_threshold
-				if nFreqThreshold < 1 :
-					nFreqThreshold = 1.0
-
-				#if strPhraseToLookup == 'flint' :
-				#	dict_openie_config['logger'].info( 'flint threshold = ' + repr(nFreqThreshold) )
-
-				for ( strLemmaID, nFreqLemma ) in listLemmaWithFreq :
-					# ignore?
-					if nFreqLemma < nFreqThreshold :
-						continue
-
-					setWordNet.add( strLemmaID )
-
-					# get wordnet syn object for it
-					listParts = strLemmaID.split('.')
-					if len(listParts) < 4 :
-						raise Exception( 'invalid wordnet entry' )
-					strSyn = '.'.join( listParts[0:3] )
-					syn = lexicopy.wordnet_lib.get_synset(
-						wordnet_synset_name = strSyn,
-						dict_lexicon_config = dict_openie_config )
-
-					# add hypernyms (verb = troponym, noun = hypernymn)
-					lexicopy.wordnet_lib.inherited_hypernyms(
-						set_lexicon = setWordNet,
-						syn = syn,
-						lang = 'eng',
-						pos=strPOSFilter,
-						max_depth=10,
-						depth=0,
-						dict_lexicon_config = dict_openie_config )
-
-					# add verb groups
-					lexicopy.wordnet_lib.verb_groups(
-						set_lexicon = setWordNet,
-						syn = syn,
-						lang = 'eng',
-						pos=strPOSFilter,
-						dict_lexicon_config = dict_openie_config )
-
-				#if strPhraseToLookup == 'flint' :
-				#	dict_openie_config['logger'].info( 'flint words = ' + repr(setWordNet) )
-
-				# add synset of all verb, hyponyms and verb groups
-				setBase = set([])
-				for strEntry in setWordNet :
-					listParts = strEntry.split('.')
-					if len(listParts) < 3 :
-						raise Exception( 'invalid wordnet entry' )
-					# setBase.add( '.'.join( listParts[0:3] ) )
-					setBase.add( listParts[0] )
-
-				#if strPhraseToLookup == 'flint' :
-				#	dict_openie_config['logger'].info( 'flint base = ' + repr(setBase) )
-				
-				# add as item set entry (e.g. for association mining to make use of it)
-				for strBase in setBase :
-					strEntry = strWNType + '(' + strBase + ')'
-					if not strEntry in listItemSet :
-						listItemSet.append( strEntry )
+	dict_openie_config['logger'].info( 'wordnet expansion : heads = ' + str(nLookups) + ', unique = ' + str(len(setLookups)) + ', expanded = ' + str(nExpanded) + ', time = ' + '%.3f' % ( time.time() - nTimeStage ) + 's' )
 
 	# all done (list_item_sets modified)
 	return
@@ -746,8 +876,9 @@ def apply_association_mining_rules( list_item_sets = None, list_rules = [], max_
 		if strAssigned != None :
 			nInference = 1
 
-		# make a set for items
+		# make a set for items (to match rules against), and a set of all items including the inferred ones added below (for membership checks)
 		setItems = set( list_item_sets[nIndexItemSet] )
+		setItemsInferred = set( setItems )
 
 		# check left hand side of each rule to see if we can apply it
 		for nIndexRule in range(len(listLHS)) :
@@ -756,10 +887,11 @@ def apply_association_mining_rules( list_item_sets = None, list_rules = [], max_
 				# add infered items sets
 				for strItem in listRHS[nIndexRule] :
 					# check semantic_type(...) does not exist already. if not add it as an inferred_semantic_type(...)
-					if not strItem in list_item_sets[nIndexItemSet] :
+					if not strItem in setItemsInferred :
 
 						strNewItem = 'inferred_' + strItem
-						if not strNewItem in list_item_sets[nIndexItemSet] :
+						if not strNewItem in setItemsInferred :
+							setItemsInferred.add( strNewItem )
 							list_item_sets[nIndexItemSet].append( strNewItem )
 							nInference = nInference + 1
 							if nInference == max_inferences :
@@ -771,649 +903,1855 @@ def apply_association_mining_rules( list_item_sets = None, list_rules = [], max_
 		# next item set
 		nIndexItemSet = nIndexItemSet + 1
 
+def get_ch_config( dict_config = None, logger = None ) :
+	#
+	# make CH parser config from the app config file settings ([common] section)
+	#
 
-################################
-# main
-################################
-
-# only execute if this is the main file
-if __name__ == '__main__' :
-
+	# setup parser config
+	# make sure whitespace does NOT include /\ as we want to use these for patterns later
+	# note: don't bother with ' in whitespace as this is handled separately (and removed if not grammatical)
+	# \u201a & \u201b == unicode single quote
+	# \u201c & \u201d == unicode double quote
+	# \u2018 & \u2019 == unicode apostrophe
+	# \u2026 == ... unicode chart used by twitter to mark truncated tweet text at end of tweet
+	# a null stemmer is provided as we will handle pluruals etc in the regex vocab explicitly (to avoid losing s at end of named entities)
+	# for CH data the text is good, so do not treat hythernated tokens as punctuation so we get tokens like 'four-faceted' preserved
+	# allow hashtags (stanford parser will POS labelled them NN)
+
+	dictCHConfig = cultural_heritage_parse_lib.get_cultural_heritage_config(
+		lang_codes = dict_config['language_codes'],
+		logger = logger,
+		stanford_tagger_dir = dict_config['stanford_tagger_dir'],
+		stanford_parser_dir = dict_config['stanford_parser_dir'],
+		dep_model_path = dict_config['model_path'],
+		dep_model_jar = dict_config['model_jar'],
+		dep_options = dict_config['model_options'],
+		whitespace = u'\'"\u201a\u201b\u201c\u201d\u2018\u2019',
+		punctuation = """,;\/:+~&*=!?""",
+		allow_hashtags = True,
+		sent_token_seps = [ ';', ':', '.', '\n', '\r', '\f', u'\u2026' ],
+		apostrophe_handling = 'preserve'
+		)
+
+	# precomputed WordNet closure table, used for WordNet lookups instead of NLTK WordNet (None if there is no closure table)
+	dictCHConfig['wordnet_closure'] = open_wordnet_closure( dict_config = dict_config, dict_openie_config = dictCHConfig )
+
+	return dictCHConfig
+
+# SPARQL JSON results are { "head" : {...}, "results" : { "bindings" : [ { "artifact" : { "value" : uri }, "text" : { "value" : text } }, ... ] } }
+regexSPARQLBindings = re.compile( r'"bindings"\s*:\s*\[', re.UNICODE )
+
+# JSON tokens needed to find the end of an object: a complete string, a run of non-string non-brace chars or a brace
+regexJSONObjectToken = re.compile( r'"(?:[^"\\]|\\.)*"|[^"{}]+|[{}]', re.UNICODE | re.DOTALL )
+
+def find_json_object_end( text = None, pos = 0 ) :
 	#
-	# check args
+	# scan a JSON object starting at text[pos] (which must be a '{') and return the index after its closing brace, or -1 if the object is not closed before the end of text (i.e. more data is needed).
+	# strings are matched whole so braces inside them are ignored. an unterminated string at the end of text also returns -1.
 	#
-	if len(sys.argv) < 2 :
-		print 'Usage: ch_information_extraction_app.py <config file>\n'
-		sys.stdout.flush()
-		sys.exit(1)
-	if not os.path.isfile(sys.argv[1]) :
-		print '<config file> ' + sys.argv[1] + ' does not exist\n'
-		sys.stdout.flush()
-		sys.exit(1)
 
-	# make logger (global to STDOUT)
-	LOG_FORMAT = ('%(levelname) -s %(asctime)s %(message)s')
-	logger = logging.getLogger( __name__ )
-	logging.basicConfig( level=logging.INFO, format=LOG_FORMAT )
-	logger.info('logging started')
+	nDepth = 0
+	nPos = pos
+	while nPos < len(text) :
+		matchToken = regexJSONObjectToken.match( text, nPos )
+		if matchToken == None :
+			return -1
+		nPos = matchToken.end()
+		if matchToken.group(0) == u'{' :
+			nDepth = nDepth + 1
+		elif matchToken.group(0) == u'}' :
+			nDepth = nDepth - 1
+			if nDepth == 0 :
+				return nPos
+	return -1
+
+def iter_sparql_json_bindings( filename = None, chunk_size = 1048576, max_binding_size = 67108864, dict_openie_config = {} ) :
+	#
+	# incrementally parse a SPARQL JSON results file, yielding ( artifact_uri, text ) for each binding in turn.
+	# the file is read in chunks and each binding object is decoded with JSONDecoder.raw_decode(), so memory is bounded by the chunk size and largest binding, not the file size.
+	# a binding that fails to decode is only treated as needing more data if it runs off the end of the buffer. a corrupt binding raises immediately, and a binding larger than max_binding_size chars raises rather than reading the rest of the file into memory.
+	#
 
-	# initialize
-	readHandle = None
-	writeHandle = None
+	decoderJSON = json.JSONDecoder( encoding = 'utf-8' )
 
+	readHandle = codecs.open( filename, 'r', 'utf-8', errors = 'replace' )
 	try :
-		# init
-		strConfigFile = sys.argv[1]
-
-		# load config
-		dictConfig = soton_corenlppy.config_helper.read_config( strConfigFile )
-
-		strInputFile = dictConfig['input_file']
-		strInputFormat = dictConfig['input_format']
-		strOutputFileItemSet = dictConfig['output_file_item_set']
-		strOutputFileProductions = dictConfig['output_file_productions']
-		nDocMax = int( dictConfig['max_doc_limit'] )
-		setAllowedURI = set( ast.literal_eval( dictConfig['list_allowed_uri'] ) )
-
-		listLangs = dictConfig['language_codes']
-		strStanfordTaggerDir = dictConfig['stanford_tagger_dir']
-		strStanfordParserDir = dictConfig['stanford_parser_dir']
-
-		strModelPath = dictConfig['model_path']
-		strModelJar = dictConfig['model_jar']
-		strModelOptions = dictConfig['model_options']
-
-		strLexiconFileExport = dictConfig['export_lexicon_file']
-		strLexiconFileImport = dictConfig['import_lexicon_file']
-		strSkosLemmaFile = dictConfig['filename_lemma']
-		strSkosHyperFile = dictConfig['filename_hypernym']
-		strSkosRelatedFile = dictConfig['filename_related']
-		strFileFormat = dictConfig['import_file_format']
+		strBuffer = u''
+		nPos = 0
+		bEOF = False
+
+		# find the start of the bindings array
+		while True :
+			matchBindings = regexSPARQLBindings.search( strBuffer )
+			if matchBindings != None :
+				if strBuffer.find( u'"results"', 0, matchBindings.start() ) == -1 :
+					raise Exception( 'input JSON does not have a SPARQL results key' )
+				nPos = matchBindings.end()
+				break
+			if bEOF == True :
+				raise Exception( 'input JSON does not have a SPARQL bindings key' )
+			strChunk = readHandle.read( chunk_size )
+			if len(strChunk) == 0 :
+				bEOF = True
+			strBuffer = strBuffer + strChunk
+
+		# decode one binding at a time, topping up the buffer when a binding spans the end of it
+		while True :
+			while (nPos < len(strBuffer)) and (strBuffer[nPos] in u' \t\r\n,') :
+				nPos = nPos + 1
+
+			if nPos < len(strBuffer) :
+				if strBuffer[nPos] == u']' :
+					break
 
-		strNounTypeRankedFile = dictConfig['noun_types_ranked']
-		strNounTypeLexiconFile = dictConfig['noun_types_ch_lexicon']
-		strSemanticMappingCHFile = dictConfig['semantic_mapping_ch']
+				try :
+					( dictBinding, nPosEnd ) = decoderJSON.raw_decode( strBuffer, nPos )
+				except ValueError :
+					# raise unless the binding is an object that is not yet closed at the end of the buffer (python 2 JSON errors do not reliably give the truncation point)
+					if (bEOF == True) or (strBuffer[nPos] != u'{') or (find_json_object_end( text = strBuffer, pos = nPos ) != -1) :
+						raise Exception( 'input JSON has an invalid binding : ' + repr( strBuffer[nPos:nPos+200] ) + ' : ' + repr( sys.exc_info()[1] ) )
+					if len(strBuffer) - nPos > max_binding_size :
+						raise Exception( 'input JSON has a binding larger than max_binding_size (' + str(max_binding_size) + ' chars)' )
+					dictBinding = None
+
+				if dictBinding != None :
+					nPos = nPosEnd
+					yield ( dictBinding['artifact']['value'], dictBinding['text']['value'] )
+					continue
 
-		# setup parser config
-		# make sure whitespace does NOT include /\ as we want to use these for patterns later
-		# note: don't bother with ' in whitespace as this is handled separately (and removed if not grammatical)
-		# \u201a & \u201b == unicode single quote
-		# \u201c & \u201d == unicode double quote
-		# \u2018 & \u2019 == unicode apostrophe
-		# \u2026 == ... unicode chart used by twitter to mark truncated tweet text at end of tweet
-		# a null stemmer is provided as we will handle pluruals etc in the regex vocab explicitly (to avoid losing s at end of named entities)
-		# for CH data the text is good, so do not treat hythernated tokens as punctuation so we get tokens like 'four-faceted' preserved
-		# allow hashtags (stanford parser will POS labelled them NN)
-
-		dictCHConfig = cultural_heritage_parse_lib.get_cultural_heritage_config(
-			lang_codes = listLangs,
-			logger = logger,
-			stanford_tagger_dir = strStanfordTaggerDir,
-			stanford_parser_dir = strStanfordParserDir,
-			dep_model_path = strModelPath,
-			dep_model_jar = strModelJar,
-			dep_options = strModelOptions,
-			whitespace = u'\'"\u201a\u201b\u201c\u201d\u2018\u2019',
-			punctuation = """,;\/:+~&*=!?""",
-			allow_hashtags = True,
-			sent_token_seps = [ ';', ':', '.', '\n', '\r', '\f', u'\u2026' ],
-			apostrophe_handling = 'preserve'
-			)
-
-		# check dir exists
-		if os.path.exists( strInputFile ) == False :
-			raise Exception( 'input file does not exist : ' + strInputFile )
+			elif bEOF == True :
+				raise Exception( 'input JSON bindings array is not terminated' )
 
-		# Disable stemming and rely on Wordnet morphy() instead as its more reliable
-		stemmer = None
+			strChunk = readHandle.read( chunk_size )
+			if len(strChunk) == 0 :
+				bEOF = True
+			strBuffer = strBuffer[nPos:] + strChunk
+			nPos = 0
 
-		logger.info( '\n#\n# Gravitate - Preparing CH Corpus\n#' )
+	finally :
+		readHandle.close()
 
-		logger.info( 'reading corpus : ' + strInputFile )
+def fetch_sparql_page( connection = None, url_path = None, query = None, limit = 10000, offset = 0, timeout = 300 ) :
+	#
+	# run one page of a SPARQL SELECT query (query + LIMIT/OFFSET) on a keep-alive HTTP connection and return its list of bindings
+	#
 
-		# parse JSON from SPARQL
-		dictText = {}
-		if strInputFormat == 'sparql_json' :
+	strQuery = query.rstrip() + '\nLIMIT ' + str(limit) + '\nOFFSET ' + str(offset)
+	strBody = urllib.urlencode( { 'query' : strQuery.encode( 'utf-8' ) } )
 
-			# read input data
-			readHandle = codecs.open( strInputFile, 'r', 'utf-8', errors = 'replace' )
-			listLines = readHandle.readlines()
-			readHandle.close()
+	connection.request( 'POST', url_path, strBody, {
+		'Content-Type' : 'application/x-www-form-urlencoded',
+		'Accept' : 'application/sparql-results+json, application/json;charset=UTF-8',
+		'Connection' : 'keep-alive',
+		} )
+	response = connection.getresponse()
+	strResponse = response.read()
+	if response.status != 200 :
+		raise Exception( 'SPARQL endpoint returned HTTP ' + str(response.status) + ' ' + response.reason + ' : ' + repr( strResponse[:200] ) )
 
-			strJSON = u'\n'.join( listLines )
-			dictJSON = json.loads( strJSON, encoding = 'utf-8' )
-			if not 'results' in dictJSON :
-				raise Exception( 'input JSON does not have a SPARQL results key' )
-			if not 'bindings' in dictJSON['results'] :
-				raise Exception( 'input JSON does not have a SPARQL bindings key' )
-			
-			# extract sents and URIs into simple lists
-			for dictBinding in dictJSON['results']['bindings'] :
-				strURI = dictBinding['artifact']['value']
-				strText = dictBinding['text']['value']
-				if not strURI in dictText :
-					dictText[ strURI ] = []
-				dictText[ strURI ].append( strText )
+	dictJSON = json.loads( strResponse, encoding = 'utf-8' )
+	if not 'results' in dictJSON :
+		raise Exception( 'SPARQL endpoint JSON does not have a results key' )
+	if not 'bindings' in dictJSON['results'] :
+		raise Exception( 'SPARQL endpoint JSON does not have a bindings key' )
 
-				# apply doc limit
-				if (nDocMax != -1) and (len(dictText) >= nDocMax) :
-					break
+	return dictJSON['results']['bindings']
 
-		# parse JSON from SQL
-		elif strInputFormat == 'sql_csv' :
+def put_unless_stopped( queue_items = None, item = None, event_stop = None ) :
+	#
+	# put item on a bounded queue, waiting for space unless event_stop is set (the consumer may have stopped early and will never read the queue again)
+	# returns True if the item was put, False if event_stop was set first
+	#
 
-			# PostgreSQL export > "image_uri";"text";"source_uri"
-			# note: csv.reader does not work for upper UTF-8 characters so might need to manually parse
-			readHandle = codecs.open( strInputFile, 'rb', 'utf-8', errors = 'replace' )
-			csvReader = csv.reader( readHandle, delimiter=';', quotechar='"')
+	while event_stop.is_set() == False :
+		try :
+			queue_items.put( item, True, 1 )
+			return True
+		except Queue.Full :
+			continue
+	return False
 
-			bHeader = True
-			for listValues in csvReader :
-				if bHeader == False :
-					strText = listValues[1]
-					# crudely remove RT prefix
-					if ':' in strText[:10] :
-						strText = strText[ strText.index(':') : ]
-					strURI = listValues[2]
+def sparql_page_prefetch_worker( endpoint = None, query = None, page_size = 10000, max_retries = 5, queue_pages = None, event_stop = None, dict_openie_config = {} ) :
+	#
+	# thread fetching pages of bindings from a SPARQL endpoint in order, so the next page is fetched while the last one is processed.
+	# pages are put on queue_pages as ( 'page', [ binding, ... ] ), followed by ( 'end', None ) or ( 'error', error_msg )
+	# a failed page is retried with exponential backoff (1s, 2s, 4s ...) on a new connection, up to max_retries times
+	#
 
-					if not strURI in dictText :
-						dictText[ strURI ] = []
-					dictText[ strURI ].append( strText )
+	logger = dict_openie_config['logger']
 
-					# apply doc limit
-					if (nDocMax != -1) and (len(dictText) >= nDocMax) :
-						break
+	tupleURL = urlparse.urlsplit( endpoint )
+	if tupleURL.scheme == 'https' :
+		classConnection = httplib.HTTPSConnection
+	else :
+		classConnection = httplib.HTTPConnection
 
-				bHeader = False
+	strURLPath = tupleURL.path
+	if len(tupleURL.query) > 0 :
+		strURLPath = strURLPath + '?' + tupleURL.query
 
-			readHandle.close()
+	connection = None
+	try :
+		nOffset = 0
+		while event_stop.is_set() == False :
+
+			nRetry = 0
+			while True :
+				try :
+					if connection == None :
+						connection = classConnection( tupleURL.netloc, timeout = 300 )
+					listBindings = fetch_sparql_page( connection = connection, url_path = strURLPath, query = query, limit = page_size, offset = nOffset )
+					break
+				except Exception as err :
+					if connection != None :
+						connection.close()
+						connection = None
+					if nRetry >= max_retries :
+						raise
+					nBackoff = 2 ** nRetry
+					logger.warning( 'SPARQL page at offset ' + str(nOffset) + ' failed (' + repr(err) + '), retry in ' + str(nBackoff) + 's' )
+					time.sleep( nBackoff )
+					nRetry = nRetry + 1
+
+			logger.info( 'SPARQL page at offset ' + str(nOffset) + ' = ' + str(len(listBindings)) + ' bindings' )
+
+			# wait for space on the queue (the consumer may have stopped early)
+			if put_unless_stopped( queue_items = queue_pages, item = ( 'page', listBindings ), event_stop = event_stop ) == False :
+				break
 
-		# parse JSON from JSON (raw posts)
-		elif strInputFormat == 'json' :
+			# a short page is the last page
+			if len(listBindings) < page_size :
+				break
+			nOffset = nOffset + page_size
 
-			# read input data
-			readHandle = codecs.open( strInputFile, 'r', 'utf-8', errors = 'replace' )
-			listLines = readHandle.readlines()
-			readHandle.close()
+		put_unless_stopped( queue_items = queue_pages, item = ( 'end', None ), event_stop = event_stop )
 
-			for strLine in listLines :
-				if len(strLine.strip()) == 0 :
-					continue
-				elif strLine.startswith( '#' ) :
-					continue
-				else :
-					#logger.info( repr(strLine.strip()) )
-					jsonObj = json.loads( strLine.strip(), encoding = 'utf-8' )
+	except :
+		put_unless_stopped( queue_items = queue_pages, item = ( 'error', repr( sys.exc_info()[0] ) + '\n' + repr( sys.exc_info()[1] ) ), event_stop = event_stop )
 
-					strUserScreenName = ''
-					if 'user' in jsonObj :
-						dictUser = jsonObj['user']
-						if 'screen_name' in dictUser :
-							strUserScreenName = dictUser['screen_name']
+	finally :
+		if connection != None :
+			connection.close()
 
-					if len(strUserScreenName) > 0 :
-						strURI = 'https://twitter.com/' + strUserScreenName + '/status/' + jsonObj['id_str']
-					else :
-						raise Exception( 'JSON tweet with no screen name : ' + repr(strLine) )
+def iter_sparql_endpoint_bindings( endpoint = None, query = None, page_size = 10000, max_retries = 5, dict_openie_config = {} ) :
+	#
+	# page through the results of a SPARQL query (using LIMIT/OFFSET over a keep-alive connection), yielding ( artifact_uri, text ) for each binding in turn.
+	# the query must have an ORDER BY clause so pages are stable. up to 2 pages are prefetched by a background thread so fetching overlaps processing.
+	#
 
-					strText = jsonObj[ 'text' ]
+	queuePages = Queue.Queue( 2 )
+	eventStop = threading.Event()
 
-				if not strURI in dictText :
-					dictText[ strURI ] = []
-				dictText[ strURI ].append( strText )
+	threadFetch = threading.Thread(
+		target = sparql_page_prefetch_worker,
+		args = ( endpoint, query, page_size, max_retries, queuePages, eventStop, dict_openie_config )
+		)
+	threadFetch.daemon = True
+	threadFetch.start()
 
-				# apply doc limit
-				if (nDocMax != -1) and (len(dictText) >= nDocMax) :
-					break
+	try :
+		while True :
+			( strType, objPage ) = queuePages.get()
+			if strType == 'end' :
+				break
+			if strType == 'error' :
+				raise Exception( 'SPARQL endpoint fetch failed : ' + objPage )
 
-		else :
-			raise Exception( 'unknown input format : ' + strInputFormat )
+			for dictBinding in objPage :
+				yield ( dictBinding['artifact']['value'], dictBinding['text']['value'] )
 
-		logger.info( 'Number of URIs in corpus = ' + str(len(dictText)) )
+	finally :
+		# stop prefetching if the consumer has finished early (e.g. doc limit reached)
+		eventStop.set()
 
-		# filter URIs
-		if len(setAllowedURI) > 0 :
-			listKeys = dictText.keys()
-			for strURI in listKeys :
-				if not strURI in setAllowedURI :
-					del dictText[strURI]
+def read_corpus( filename = None, input_format = None, max_doc = -1, allowed_uri = set([]), sparql_endpoint = None, sparql_page_size = 10000, sparql_max_retries = 5, shard_index = 0, shard_count = 1, dict_openie_config = {} ) :
+	#
+	# read artifact text from the input file, returning a dict of { uri : [ text, ... ] }
+	# formats supported are sparql_json (JSON from SPARQL query), sparql_endpoint (filename is a SPARQL query file, run with paging on sparql_endpoint), sql_csv (PostgreSQL export) and json (raw tweets)
+	# the allowed_uri filter is applied as each record is read, so max_doc limits the number of allowed URIs read
+	# if shard_count > 1 only artifacts in shard shard_index are read (see get_artifact_shard()), and max_doc is a per shard limit
+	#
 
-		logger.info( 'Number of Allowed URIs in corpus = ' + str(len(dictText)) )
+	# check file exists
+	if os.path.exists( filename ) == False :
+		raise Exception( 'input file does not exist : ' + filename )
 
-		#
-		# prepare dataset dir for corpus sentences so attribie can work on it
-		# sent_id \t text \t entity_id
-		#
-		os.mkdir( 'CH_dataset' )
-		writeHandle = codecs.open( 'CH_dataset' + os.sep + 'sentences.txt', 'w', 'utf-8', errors = 'replace' )
-		nSentIndex = 0
-		dictSentToURIIndex = {}
-		for strURI in dictText :
-			for strText in dictText[strURI] :
-				listLines = strText.strip('\r\n').split('\n')
-				for strLine in listLines :
+	dict_openie_config['logger'].info( 'reading corpus : ' + filename )
 
-					# avoid embedded tabs and newlines, which will cause errors when reading sentence file back in
-					strTextSafe = strLine
-					strTextSafe = strTextSafe.replace('\t',' ')
+	# parse JSON from SPARQL
+	dictText = {}
+	if input_format == 'sparql_json' :
 
-					# tokenize with sent breakdown, as attrib ie expects to be provided with sentences not paragraphs of text.
-					listSents = soton_corenlppy.common_parse_lib.unigram_tokenize_text_with_sent_breakdown(
-						text = strTextSafe,
-						dict_common_config = dictCHConfig )
+		# stream bindings from the input file and extract sents and URIs into simple lists
+		for ( strURI, strText ) in iter_sparql_json_bindings( filename = filename, dict_openie_config = dict_openie_config ) :
+			if (len(allowed_uri) > 0) and (not strURI in allowed_uri) :
+				continue
+			if (shard_count > 1) and (get_artifact_shard( uri = strURI, shard_count = shard_count ) != shard_index) :
+				continue
 
-					for listTokens in listSents :
-						strSent = ' '.join( listTokens )
-						writeHandle.write( str(nSentIndex) + '\t' + strSent + '\t' + strURI + '\n' )
-						dictSentToURIIndex[ nSentIndex ] = strURI
-						nSentIndex = nSentIndex + 1
+			if not strURI in dictText :
+				dictText[ strURI ] = []
+			dictText[ strURI ].append( strText )
 
-		writeHandle.close()
+			# apply doc limit
+			if (max_doc != -1) and (len(dictText) >= max_doc) :
+				break
 
-		#
-		# run attrib ie
-		#
+	# page through JSON results from a SPARQL endpoint
+	elif input_format == 'sparql_endpoint' :
 
-		listCMD = [
-			'python',
-			'attrib_ie.py',
-			'ch_attrib_ie.ini',
-			'generate',
-			'attribie-templates.txt',
-			'CH_dataset',
-			]
-		p = subprocess.Popen( listCMD, cwd='.', shell=False )
-		logger.info( '\n#\n# Attrib IE - Generate Templates\n#' )
-		p.wait()
-		if p.returncode != 0 :
-			raise Exception( 'template generation failed (attrib ie) : ' + repr(p.returncode) )
-
-		listCMD = [
-			'python',
-			'attrib_ie.py',
-			'ch_attrib_ie.ini',
-			'extract',
-			'attribie-templates.txt',
-			'extractions-attribie.txt',
-			'CH_dataset',
-			]
-		p = subprocess.Popen( listCMD, cwd='.', shell=False )
-		logger.info( '\n#\n# Attrib IE - Extract Propositions\n#' )
-		p.wait()
-		if p.returncode != 0 :
-			raise Exception( 'template extract failed (attrib ie) : ' + repr(p.returncode) )
-
-		logger.info( '\n#\n# Gravitate - Semantic Mapping\n#' )
+		readHandle = codecs.open( filename, 'r', 'utf-8', errors = 'replace' )
+		strQuery = readHandle.read()
+		readHandle.close()
 
-		#
-		# Semantic mapping patterns
-		#   manual domain-specific patterns
-		#
-		listSemanticMappings = load_semantic_mapping(
-			filename_mapping = strSemanticMappingCHFile,
-			dict_openie_config = dictCHConfig
-			)
-		logger.info( 'SEMANTIC MAPPING manual' )
-		logger.info( 'num patterns = ' + repr(len(listSemanticMappings)) )
+		for ( strURI, strText ) in iter_sparql_endpoint_bindings( endpoint = sparql_endpoint, query = strQuery, page_size = sparql_page_size, max_retries = sparql_max_retries, dict_openie_config = dict_openie_config ) :
+			if (len(allowed_uri) > 0) and (not strURI in allowed_uri) :
+				continue
+			if (shard_count > 1) and (get_artifact_shard( uri = strURI, shard_count = shard_count ) != shard_index) :
+				continue
 
-		#
-		# Lexicon creation
-		#   manual noun list with domain specific noun type mappings (e.g. part, shape)
-		#   CH lexicon with nouns removed if they appear in WordNet (so we keep only the specialist vocabulary)
-		#
+			if not strURI in dictText :
+				dictText[ strURI ] = []
+			dictText[ strURI ].append( strText )
 
-		# load ranked noun type mappings (will be used as a filter for CH lexicon import and to disambiguate between multiple schema options)
-		listNounTypeRanked = read_noun_type_ranked_list(
-			filename = strNounTypeRankedFile,
-			dict_openie_config = dictCHConfig
-			)
-
-		logger.info( 'LEXICON schema list' )
-		logger.info( 'num uri = ' + repr(len(listNounTypeRanked)) )
-
-		# load noun type lexicon
-		( dictNounTypeLexiconURI, dictNounTypeLexiconPhrase ) = lexicopy.lexicon_lib.import_plain_lexicon(
-			filename_lemma = strNounTypeLexiconFile,
-			list_column_names = ['schema','phrase_list','hypernym'],
-			phrase_delimiter = '|',
-			lower_case = True,
-			stemmer = stemmer,
-			apply_wordnet_morphy = True,
-			allowed_schema_list = None,
-			dict_lexicon_config = dictCHConfig )
-
-		logger.info( 'LEXICON noun type' )
-		logger.info( 'num uri = ' + repr(len(dictNounTypeLexiconURI)) )
-		logger.info( 'num phrases = ' + repr(len(dictNounTypeLexiconPhrase)) )
-
-		if strLexiconFileExport != '' :
-			# create lexicon from JSON results of BM SPARQL queries (of SKOS vocabulary)
-			# use simple stemming to allow plurals to match (e.g. chalices => chalice)
-			( dictCHLexiconURI, dictCHLexiconPhrase ) = lexicopy.lexicon_lib.import_skos_lexicon(
-				filename_lemma = strSkosLemmaFile,
-				filename_hypernym = strSkosHyperFile,
-				filename_related = strSkosRelatedFile,
-				serialized_format = strFileFormat,
-				stemmer = stemmer,
-				apply_wordnet_morphy = True,
-				allowed_schema_list = listNounTypeRanked,
-				dict_lexicon_config = dictCHConfig )
+			# apply doc limit
+			if (max_doc != -1) and (len(dictText) >= max_doc) :
+				break
 
-			lexicopy.lexicon_lib.export_lexicon(
-				filename_lexicon = strLexiconFileExport,
-				dict_uri = dictCHLexiconURI,
-				dict_phrase = dictCHLexiconPhrase,
-				dict_lexicon_config = dictCHConfig )
-			logger.info( 'lexicon exported to ' + strLexiconFileExport )
+	# parse JSON from SQL
+	elif input_format == 'sql_csv' :
 
-		else :
-			if strLexiconFileImport != '' :
+		# PostgreSQL export > "image_uri";"text";"source_uri"
+		# note: csv.reader does not work for upper UTF-8 characters so might need to manually parse
+		readHandle = codecs.open( filename, 'rb', 'utf-8', errors = 'replace' )
+		csvReader = csv.reader( readHandle, delimiter=';', quotechar='"')
 
-				# load previously prepared lexicon from disk
-				( dictCHLexiconURI, dictCHLexiconPhrase ) = lexicopy.lexicon_lib.import_lexicon( filename_lexicon = strLexiconFileImport, dict_lexicon_config = dictCHConfig )
-				logger.info( 'lexicon imported from ' + strLexiconFileImport )
-			else :
-				dictCHLexiconURI = {}
-				dictCHLexiconPhrase = {}
+		bHeader = True
+		for listValues in csvReader :
+			if bHeader == False :
+				strText = listValues[1]
+				# crudely remove RT prefix
+				if ':' in strText[:10] :
+					strText = strText[ strText.index(':') : ]
+				strURI = listValues[2]
 
-		logger.info( 'LEXICON CH' )
-		logger.info( 'num uri = ' + repr(len(dictCHLexiconURI)) )
-		logger.info( 'num phrases = ' + repr(len(dictCHLexiconPhrase)) )
+				if (len(allowed_uri) > 0) and (not strURI in allowed_uri) :
+					continue
+				if (shard_count > 1) and (get_artifact_shard( uri = strURI, shard_count = shard_count ) != shard_index) :
+					continue
 
-		# min wordnet count is 0, so ANY mention in WordNet will be removed from the CH lexicon.
-		# this avoids 'lotus' for example, with cound 0, being treated as a material (as it is in CH lexicon).
-		# this means lexicon will ONLY contain the specialist domain vocab and no any common words.
-		lexicopy.lexicon_lib.filter_lexicon_wordnet(
-			dict_phrase = dictCHLexiconPhrase,
-			count_freq_min = 0,
-			dict_lexicon_config = dictCHConfig
-			)
+				if not strURI in dictText :
+					dictText[ strURI ] = []
+				dictText[ strURI ].append( strText )
 
-		logger.info( 'LEXICON filtered using wordnet' )
-		logger.info( 'num uri = ' + repr(len(dictCHLexiconURI)) )
-		logger.info( 'num phrases = ' + repr(len(dictCHLexiconPhrase)) )
+				# apply doc limit
+				if (max_doc != -1) and (len(dictText) >= max_doc) :
+					break
 
-		# merge it with CH lexicon
-		( dictMergedLexiconURI, dictMergedLexiconPhrase ) = lexicopy.lexicon_lib.merge_lexicon(
-			list_lexicon = [ ( dictNounTypeLexiconURI, dictNounTypeLexiconPhrase ), ( dictCHLexiconURI, dictCHLexiconPhrase ) ],
-			dict_lexicon_config = dictCHConfig
-			)
+			bHeader = False
 
-		logger.info( 'LEXICON merged' )
-		logger.info( 'num uri = ' + repr(len(dictMergedLexiconURI)) )
-		logger.info( 'num phrases = ' + repr(len(dictMergedLexiconPhrase)) )
+		readHandle.close()
 
-		#
-		# read in annotated propositions extracted from attribie
-		#
+	# parse JSON from JSON (raw posts)
+	elif input_format == 'json' :
 
-		strVarFile = 'CH_dataset' + os.sep + 'annotated-extractions-attribie.txt'
-		readHandle = codecs.open( strVarFile, 'r', 'utf-8', errors = 'replace' )
+		# read input data
+		readHandle = codecs.open( filename, 'r', 'utf-8', errors = 'replace' )
 		listLines = readHandle.readlines()
 		readHandle.close()
 
-		listDocumentPropositionSets = []
 		for strLine in listLines :
-			if not '\t' in strLine :
+			if len(strLine.strip()) == 0 :
 				continue
-			
-			# proposition file
-			# ----------------
-			# <some sentence text> \n
-			# sent_index \t "phrase1" \t "phrase2" ... \t "head1" \t "head2" ... \t conf_float \t {subj,attr,obj}\n
-			# sent_index \t "phrase1" \t "phrase2" ... \t "head1" \t "head2" ... \t conf_float \t {subj,attr,obj}\n
-			# ...
+			elif strLine.startswith( '#' ) :
+				continue
+			else :
+				#logger.info( repr(strLine.strip()) )
+				jsonObj = json.loads( strLine.strip(), encoding = 'utf-8' )
 
-			listComponents = strLine.strip().split('\t')
-			if len(listComponents) < 3 :
-				raise Exception( 'bad extraction (parse fail) : ' + strLine )
+				strUserScreenName = ''
+				if 'user' in jsonObj :
+					dictUser = jsonObj['user']
+					if 'screen_name' in dictUser :
+						strUserScreenName = dictUser['screen_name']
 
-			strIndexSent = listComponents[0]
-			nConf = float(listComponents[-2])
-			strPropPattern = listComponents[-1]
+				if len(strUserScreenName) > 0 :
+					strURI = 'https://twitter.com/' + strUserScreenName + '/status/' + jsonObj['id_str']
+				else :
+					raise Exception( 'JSON tweet with no screen name : ' + repr(strLine) )
 
-			# parse prop pattern into a list (remove wrapping ")
-			listPropPattern = strPropPattern[1:-1].split(',')
+				strText = jsonObj[ 'text' ]
 
-			listPhraseText = []
-			for nIndexProp in range(1,len(listPropPattern)+1) :
-				# remove wrapping "'s
-				listPhraseText.append( listComponents[nIndexProp][1:-1] )
+			if (len(allowed_uri) > 0) and (not strURI in allowed_uri) :
+				continue
+			if (shard_count > 1) and (get_artifact_shard( uri = strURI, shard_count = shard_count ) != shard_index) :
+				continue
 
-			listHeadText = []
-			for nIndexHead in range(len(listPropPattern)+1,1+len(listPropPattern)*2) :
-				# remove wrapping "'s
-				listHeadText.append( listComponents[nIndexHead][1:-1] )
+			if not strURI in dictText :
+				dictText[ strURI ] = []
+			dictText[ strURI ].append( strText )
 
-			listDocumentPropositionSets.append( ( strIndexSent, listPhraseText, nConf, listPropPattern, listHeadText ) )
+			# apply doc limit
+			if (max_doc != -1) and (len(dictText) >= max_doc) :
+				break
 
-		#
-		# Semantic mapping to kwowledge base productions (KBP)
-		#   create item sets from {arg,rel}arg} variables
-		#   semantically map nouns (domain specific noun mapping file) -> subj_type, obj_type
-		#   add WordNet subj/obj/rel hypernymns as items -> rel_wn, subj_wn, obj_wn
-		#   semantically map rels (domain specific rel mapping file) -> rel_type
-		#   association mining (apriori) -> inferred_rel_type
-		#     learn rules to infer rel_type based on item sets (confidence 1.0 only)
-		#     apply rules to infer rel types
-		#   apply domain-specific heuristics to take known rel_type's and make CIDOC-CRM RDF productions
-		#
+	else :
+		raise Exception( 'unknown input format : ' + input_format )
 
-		logger.info( 'SEMANTIC MAPPED EXTRACTIONS (using association mining)' )
+	dict_openie_config['logger'].info( 'Number of Allowed URIs in corpus = ' + str(len(dictText)) )
 
-		#
-		# (1) create compound itemset from extraction set
-		#
+	return dictText
 
-		# debug
-		'''
-		for entry in listDocumentPropositionSets :
-			logger.info( 'T0 = ' + repr(entry) )
-		'''
+def write_corpus_file( filename = None, dict_text = {}, dict_openie_config = {} ) :
+	#
+	# write ingested corpus checkpoint (JSON lines, one artifact per line sorted by URI)
+	# { "uri" : uri, "text" : [ text, ... ] }
+	#
 
-		listExtractionItemSets = []
-		for nSentIndex in dictSentToURIIndex :
-			strURI = dictSentToURIIndex[ nSentIndex ]
+	writeHandle = codecs.open( filename, 'w', 'utf-8', errors = 'replace' )
+	for strURI in sorted( dict_text.keys() ) :
+		writeHandle.write( json.dumps( { 'uri' : strURI, 'text' : dict_text[strURI] }, ensure_ascii = False, sort_keys = True ) + '\n' )
+	writeHandle.close()
 
-			for ( strIndexSent, listPhraseText, nConf, listPropPattern, listHeadText ) in listDocumentPropositionSets :
-				if strIndexSent == str(nSentIndex) :
+def read_corpus_file( filename = None, dict_openie_config = {} ) :
 
-					# note last index
-					nLastSet = len(listExtractionItemSets)
+	readHandle = codecs.open( filename, 'r', 'utf-8', errors = 'replace' )
+	listLines = readHandle.readlines()
+	readHandle.close()
 
-					# create item sets for this proposition
-					add_item_sets_from_extraction(
-						list_item_sets = listExtractionItemSets,
-						list_extracted_prop = listPhraseText,
-						list_head_terms = listHeadText,
-						list_prop_pattern = listPropPattern,
-						dict_openie_config = dictCHConfig )
+	dictText = {}
+	for strLine in listLines :
+		if len(strLine.strip()) == 0 :
+			continue
+		dictArtifact = json.loads( strLine )
+		dictText[ dictArtifact['uri'] ] = dictArtifact['text']
 
-					# add artifact URI to all new item sets (useful later when making RDF)
-					for nIndexSet in range( nLastSet, len(listExtractionItemSets) ) :
-						listExtractionItemSets[nIndexSet].append( 'artifact_uri(' + strURI + ')' )
+	return dictText
 
-		# debug
-		'''
-		for entry in listExtractionItemSets :
-			logger.info( 'T1 = ' + repr(entry) )
-		'''
+def tokenize_artifact_text( text = None, dict_openie_config = {} ) :
+	#
+	# split artifact text into a list of tokenized sents [ [ token, ... ], ... ], as attrib ie expects to be provided with sentences not paragraphs of text
+	#
 
-		#
-		# (2) aggregate patterns to extend compound itemset
-		#
+	listResult = []
+	listLines = text.strip('\r\n').split('\n')
+	for strLine in listLines :
 
-		aggregate_phrases_in_item_set( 
-			list_item_sets = listExtractionItemSets,
-			agg_patterns = [ ('attr',), ('attrbase','attrprep'), ('attrnoobjnosubj',) ],
-			agg_var_name = 'attribute',
-			dict_openie_config = dictCHConfig
-			)
+		# avoid embedded tabs and newlines, which will cause errors when reading sentence file back in
+		strTextSafe = strLine
+		strTextSafe = strTextSafe.replace('\t',' ')
 
-		# debug
-		'''
-		for entry in listExtractionItemSets :
-			logger.info( 'T2 = ' + repr(entry) )
-		'''
+		# tokenize with sent breakdown
+		listSents = soton_corenlppy.common_parse_lib.unigram_tokenize_text_with_sent_breakdown(
+			text = strTextSafe,
+			dict_common_config = dict_openie_config )
 
-		#
-		# (3) expand compound item sets into single value item sets, and do a lexicon lookup to add type classifications
-		#
+		listResult.extend( listSents )
 
-		expand_compound_items_and_apply_lexicon_schema_mappings(
-			list_item_sets = listExtractionItemSets,
-			lex_phrase_index = dictMergedLexiconPhrase,
-			lex_uri_index = dictMergedLexiconURI,
-			schema_ranked_list = listNounTypeRanked,
+	return listResult
+
+def split_artifact_text( text = None, dict_openie_config = {} ) :
+	#
+	# split artifact text into a list of sents (space delimited tokens)
+	#
+
+	listResult = []
+	for listTokens in tokenize_artifact_text( text = text, dict_openie_config = dict_openie_config ) :
+		listResult.append( ' '.join( listTokens ) )
+
+	return listResult
+
+# config for sentence split worker processes (set by init_sentence_split_worker)
+dictSentenceSplitConfig = None
+
+def init_sentence_split_worker( dict_openie_config = {} ) :
+	#
+	# initializer for sentence split worker processes. the config (with its compiled regex) is received once per worker, not once per chunk.
+	# multiprocess cannot pickle logger objects so the parent sends a config without logger, and a logger is made within this process
+	#
+
+	global dictSentenceSplitConfig
+
+	logger = logging.getLogger( __name__ )
+	if len(logger.handlers) == 0 :
+		hdlr = logging.StreamHandler( stream = sys.stdout )
+		LOG_FORMAT = ('%(levelname) -s %(asctime)s %(message)s')
+		fmt = logging.Formatter( fmt = LOG_FORMAT )
+		hdlr.setFormatter( fmt )
+		logger.addHandler( hdlr )
+	logger.setLevel( logging.INFO )
+
+	dictSentenceSplitConfig = copy.copy( dict_openie_config )
+	dictSentenceSplitConfig['logger'] = logger
+
+def split_artifact_chunk( list_artifacts = [], dict_openie_config = None ) :
+	#
+	# sentence split worker function. list_artifacts = [ ( uri, [ text, ... ] ), ... ]
+	# return [ ( uri, [ [ token, ... ], ... ] ), ... ] in the same order
+	# if dict_openie_config is None the config set by init_sentence_split_worker() is used
+	#
+
+	if dict_openie_config == None :
+		dict_openie_config = dictSentenceSplitConfig
+
+	listResult = []
+	for ( strURI, listText ) in list_artifacts :
+		listSents = []
+		for strText in listText :
+			listSents.extend( tokenize_artifact_text( text = strText, dict_openie_config = dict_openie_config ) )
+		listResult.append( ( strURI, listSents ) )
+
+	return listResult
+
+def write_sentence_file( filename = None, dict_text = {}, max_processes = 1, token_filename = None, dict_openie_config = {} ) :
+	#
+	# prepare dataset dir for corpus sentences so attribie can work on it
+	# sent_id \t text \t entity_id
+	# if token_filename is not None the same sents are also written pre-tokenized (JSON lines), so attrib ie can use the tokens as they are and not tokenize the text a second time
+	# { "sent_id" : sent_id, "tokens" : [ token, ... ], "uri" : entity_id }
+	# URIs are processed in sorted order so sent_id's are stable between runs (needed for checkpoint fingerprints)
+	# artifacts are split into sents by a pool of worker processes, in chunks of sorted URIs. chunk results are returned in order
+	# and sent_id's are assigned here, so the sentence file is identical to a single process run.
+	#
+
+	listURI = sorted( dict_text.keys() )
+
+	# aim for about 8 chunks per process so the tail of the run is balanced, with a cap on chunk size to limit IPC message size
+	nChunkSize = max( 1, min( 500, len(listURI) / ( 8 * max( 1, max_processes ) ) ) )
+	listChunks = []
+	for nIndex in range( 0, len(listURI), nChunkSize ) :
+		listChunks.append( [ ( strURI, dict_text[strURI] ) for strURI in listURI[ nIndex : nIndex + nChunkSize ] ] )
+
+	poolWorkers = None
+	if (max_processes > 1) and (len(listChunks) > 1) :
+		dictConfigCopy = copy.copy( dict_openie_config )
+		dictConfigCopy['logger'] = None
+
+		poolWorkers = multiprocessing.Pool( processes = min( max_processes, len(listChunks) ), initializer = init_sentence_split_worker, initargs = ( dictConfigCopy, ) )
+		iterResults = poolWorkers.imap( split_artifact_chunk, listChunks )
+	else :
+		iterResults = ( split_artifact_chunk( list_artifacts = listChunk, dict_openie_config = dict_openie_config ) for listChunk in listChunks )
+
+	writeHandle = None
+	writeHandleTokens = None
+	try :
+		writeHandle = codecs.open( filename, 'w', 'utf-8', errors = 'replace' )
+		if token_filename != None :
+			writeHandleTokens = codecs.open( token_filename, 'w', 'utf-8', errors = 'replace' )
+		nSentIndex = 0
+		for listChunkResult in iterResults :
+			for ( strURI, listSents ) in listChunkResult :
+				for listTokens in listSents :
+					writeHandle.write( str(nSentIndex) + '\t' + ' '.join( listTokens ) + '\t' + strURI + '\n' )
+					if writeHandleTokens != None :
+						writeHandleTokens.write( json.dumps( { 'sent_id' : nSentIndex, 'tokens' : listTokens, 'uri' : strURI }, ensure_ascii = False, sort_keys = True ) + '\n' )
+					nSentIndex = nSentIndex + 1
+
+	finally :
+		if writeHandle != None :
+			writeHandle.close()
+		if writeHandleTokens != None :
+			writeHandleTokens.close()
+		if poolWorkers != None :
+			poolWorkers.terminate()
+			poolWorkers.join()
+
+	dict_openie_config['logger'].info( 'Number of sents in corpus = ' + str(nSentIndex) + ' (' + str(len(listChunks)) + ' chunks)' )
+
+def read_sentence_uri_index( filename = None, dict_openie_config = {} ) :
+	#
+	# read sentence file and return a dict of { sent_id : entity_id }
+	#
+
+	readHandle = codecs.open( filename, 'r', 'utf-8', errors = 'replace' )
+	listLines = readHandle.readlines()
+	readHandle.close()
+
+	dictSentToURIIndex = {}
+	for strLine in listLines :
+		listParts = strLine.rstrip('\r\n').split('\t')
+		if len(listParts) != 3 :
+			continue
+		dictSentToURIIndex[ int(listParts[0]) ] = listParts[2]
+
+	return dictSentToURIIndex
+
+def read_proposition_file( filename = None, dict_openie_config = {} ) :
+	#
+	# read in annotated propositions extracted from attribie
+	#
+
+	return list( iter_proposition_file( filename = filename, dict_openie_config = dict_openie_config ) )
+
+def iter_proposition_file( filename = None, dict_openie_config = {} ) :
+	#
+	# stream annotated propositions extracted from attribie, yielding ( sent_index, phrase_list, conf, prop_pattern_list, head_list ) for each proposition in file order
+	# the file is read a line at a time, so the whole file is never held in memory
+	#
+
+	readHandle = codecs.open( filename, 'r', 'utf-8', errors = 'replace' )
+	try :
+		for strLine in readHandle :
+			tupleProp = parse_proposition_line( line = strLine, dict_openie_config = dict_openie_config )
+			if tupleProp != None :
+				yield tupleProp
+	finally :
+		readHandle.close()
+
+def parse_proposition_line( line = None, dict_openie_config = {} ) :
+	#
+	# parse a line of an annotated propositions file
+	# return ( sent_index, phrase_list, conf, prop_pattern_list, head_list ), or None if the line is not a proposition (e.g. sentence text)
+	#
+
+	if not '\t' in line :
+		return None
+	
+	# proposition file
+	# ----------------
+	# <some sentence text> \n
+	# sent_index \t "phrase1" \t "phrase2" ... \t "head1" \t "head2" ... \t conf_float \t {subj,attr,obj}\n
+	# sent_index \t "phrase1" \t "phrase2" ... \t "head1" \t "head2" ... \t conf_float \t {subj,attr,obj}\n
+	# ...
+
+	listComponents = line.strip().split('\t')
+	if len(listComponents) < 3 :
+		raise Exception( 'bad extraction (parse fail) : ' + line )
+
+	strIndexSent = listComponents[0]
+	nConf = float(listComponents[-2])
+	strPropPattern = listComponents[-1]
+
+	# parse prop pattern into a list (remove wrapping ")
+	listPropPattern = strPropPattern[1:-1].split(',')
+
+	listPhraseText = []
+	for nIndexProp in range(1,len(listPropPattern)+1) :
+		# remove wrapping "'s
+		listPhraseText.append( listComponents[nIndexProp][1:-1] )
+
+	listHeadText = []
+	for nIndexHead in range(len(listPropPattern)+1,1+len(listPropPattern)*2) :
+		# remove wrapping "'s
+		listHeadText.append( listComponents[nIndexHead][1:-1] )
+
+	return ( strIndexSent, listPhraseText, nConf, listPropPattern, listHeadText )
+
+def group_propositions_by_sent( list_document_proposition_sets = [], dict_openie_config = {} ) :
+	#
+	# group propositions by sent index in one pass, keeping their order within each sent
+	# list_document_proposition_sets can be a list or an iterator (e.g. from iter_proposition_file())
+	# return { sent_index (str) : [ ( phrase_list, conf, prop_pattern_list, head_list ), ... ] }
+	#
+
+	dictPropsBySent = {}
+	for ( strIndexSent, listPhraseText, nConf, listPropPattern, listHeadText ) in list_document_proposition_sets :
+		if not strIndexSent in dictPropsBySent :
+			dictPropsBySent[strIndexSent] = []
+		dictPropsBySent[strIndexSent].append( ( listPhraseText, nConf, listPropPattern, listHeadText ) )
+
+	return dictPropsBySent
+
+def convert_attrib_ie_propositions( list_propositions_aggregated = [], dict_openie_config = {} ) :
+	#
+	# convert an aggregated proposition set from attrib_ie.generate_propositions() to the tuples read_proposition_file() returns,
+	# so item sets can be made without a round trip via the annotated extractions file.
+	# as with the file, a proposition is only reported once per sent if several patterns extract the same phrases.
+	#
+
+	listDocumentPropositionSets = []
+	dictPropsGenerated = {}
+	for ( strIndexDoc, listPhraseText, nPatternIndex, nConf, listPropPattern, listHeadText ) in list_propositions_aggregated :
+		if not strIndexDoc in dictPropsGenerated :
+			dictPropsGenerated[strIndexDoc] = []
+		if listPhraseText in dictPropsGenerated[strIndexDoc] :
+			continue
+		dictPropsGenerated[strIndexDoc].append( listPhraseText )
+
+		listDocumentPropositionSets.append( ( strIndexDoc, list( listPhraseText ), float( nConf ), list( listPropPattern ), list( listHeadText ) ) )
+
+	return listDocumentPropositionSets
+
+def write_item_set_file( filename = None, list_item_sets = [], dict_openie_config = {} ) :
+	#
+	# write item sets to disk (one tab delimited item set per line)
+	#
+
+	writeHandle = codecs.open( filename, 'w', 'utf-8', errors = 'replace' )
+	for listItemSet in list_item_sets :
+		strLine = '\t'.join( list( listItemSet ) )
+		writeHandle.write( strLine + '\n' )
+	writeHandle.write( '\n' )
+	writeHandle.close()
+
+def read_item_set_file( filename = None, dict_openie_config = {} ) :
+
+	readHandle = codecs.open( filename, 'r', 'utf-8', errors = 'replace' )
+	listLines = readHandle.readlines()
+	readHandle.close()
+
+	listItemSets = []
+	for strLine in listLines :
+		strLine = strLine.rstrip('\r\n')
+		if len(strLine) > 0 :
+			listItemSets.append( strLine.split('\t') )
+
+	return listItemSets
+
+def calc_artifact_hashes( dict_text = {} ) :
+	#
+	# calc a hash of the description texts of each artifact, returning { uri : sha1 hex }
+	#
+
+	dictHashes = {}
+	for strURI in dict_text :
+		strSerialized = json.dumps( dict_text[strURI], ensure_ascii = True )
+		dictHashes[strURI] = hashlib.sha1( strSerialized ).hexdigest()
+
+	return dictHashes
+
+def read_artifact_manifest( filename = None, dict_openie_config = {} ) :
+	#
+	# read the artifact manifest { uri : hash } written by the last run (empty dict if there is no manifest)
+	#
+
+	if os.path.isfile( filename ) == False :
+		return {}
+
+	readHandle = codecs.open( filename, 'r', 'utf-8', errors = 'replace' )
+	dictManifest = json.loads( readHandle.read() )
+	readHandle.close()
+
+	return dictManifest
+
+def write_artifact_manifest( filename = None, dict_manifest = {}, dict_openie_config = {} ) :
+	#
+	# write the artifact manifest { uri : hash } so a later delta run can find new and changed artifacts
+	#
+
+	writeHandle = codecs.open( filename, 'w', 'utf-8', errors = 'replace' )
+	writeHandle.write( json.dumps( dict_manifest, ensure_ascii = False, sort_keys = True, indent = 0 ) + '\n' )
+	writeHandle.close()
+
+def get_item_set_uri( list_item_set = [] ) :
+	#
+	# return the artifact URI of an item set (from its artifact_uri(...) item) or None
+	#
+
+	for strItem in list_item_set :
+		if strItem.startswith( 'artifact_uri(' ) :
+			return strItem[ len('artifact_uri(') : -1 ]
+
+	return None
+
+def merge_item_sets( list_item_sets = [], list_delta_item_sets = [], replaced_uri = set([]) ) :
+	#
+	# replace the item sets of artifacts in replaced_uri with the delta item sets
+	#
+
+	listResult = []
+	for listItemSet in list_item_sets :
+		if not get_item_set_uri( listItemSet ) in replaced_uri :
+			listResult.append( listItemSet )
+	listResult.extend( list_delta_item_sets )
+
+	return listResult
+
+def get_artifact_shard( uri = None, shard_count = 1 ) :
+	#
+	# return the shard (0 .. shard_count-1) of an artifact, using a stable hash of its URI so every node agrees on the split
+	#
+
+	if isinstance( uri, unicode ) :
+		uri = uri.encode( 'utf-8' )
+
+	return int( hashlib.md5( uri ).hexdigest(), 16 ) % shard_count
+
+def get_shard_dataset_dir( dataset_dir = None, shard_index = 0, shard_count = 1 ) :
+	#
+	# return the dataset dir for a shard e.g. CH_dataset_shard0of4
+	#
+
+	return dataset_dir + '_shard' + str(shard_index) + 'of' + str(shard_count)
+
+def merge_shards( dataset_dir = None, shard_count = 1, item_set_file = None, am_item_set_file = None, manifest_file = None, dict_openie_config = {} ) :
+	#
+	# merge the item sets and artifact manifests of all shards (each run with --shard=k/N) into the dataset dir, and write the item sets for association mining.
+	# every shard must have completed its item sets stage.
+	#
+
+	logger = dict_openie_config['logger']
+
+	listExtractionItemSets = []
+	dictManifest = {}
+
+	for nShard in range( shard_count ) :
+		strShardDir = get_shard_dataset_dir( dataset_dir = dataset_dir, shard_index = nShard, shard_count = shard_count )
+		dictShardCheckpoints = checkpoint_lib.read_checkpoints( filename = strShardDir + os.sep + 'checkpoints.json' )
+		if not 'item_sets' in dictShardCheckpoints :
+			raise Exception( 'shard ' + str(nShard) + ' of ' + str(shard_count) + ' has not completed its item sets stage : ' + strShardDir )
+
+		listShardItemSets = read_item_set_file( filename = strShardDir + os.sep + os.path.basename( item_set_file ), dict_openie_config = dict_openie_config )
+		dictShardManifest = read_artifact_manifest( filename = strShardDir + os.sep + os.path.basename( manifest_file ), dict_openie_config = dict_openie_config )
+		logger.info( 'shard ' + str(nShard) + ' : ' + str(len(dictShardManifest)) + ' artifacts, ' + str(len(listShardItemSets)) + ' item sets' )
+
+		listExtractionItemSets.extend( listShardItemSets )
+		dictManifest.update( dictShardManifest )
+
+	logger.info( 'merged item sets = ' + str(len(listExtractionItemSets)) )
+
+	# association mining item sets are filtered after the merge, so duplicates are removed across all shards
+	listAssociationMiningItemSets = filter_item_sets(
+		list_item_sets = listExtractionItemSets,
+		mandatory_items = set([]),
+		allowed_items = set(['semantic_type', 'attribute_head', 'subj_head', 'obj_head', 'attribute_wn', 'subj_wn', 'obj_wn']),
+		remove_duplicates = True,
+		dict_openie_config = dict_openie_config )
+
+	logger.info( 'item set (semantic mapped) : ' + item_set_file )
+	write_item_set_file( filename = item_set_file, list_item_sets = listExtractionItemSets, dict_openie_config = dict_openie_config )
+
+	logger.info( 'item set for am : ' + am_item_set_file )
+	write_item_set_file( filename = am_item_set_file, list_item_sets = listAssociationMiningItemSets, dict_openie_config = dict_openie_config )
+
+	write_artifact_manifest( filename = manifest_file, dict_manifest = dictManifest, dict_openie_config = dict_openie_config )
+
+def build_ch_lexicon( noun_types_lexicon = None, export_lexicon_file = '', import_lexicon_file = '', filename_lemma = None, filename_hypernym = None, filename_related = None, import_file_format = 'json', allowed_schema_list = [], stemmer = None, dict_openie_config = {} ) :
+	#
+	# build the merged CH lexicon, returning ( dict_uri, dict_phrase )
+	#
+
+	# load noun type lexicon
+	( dictNounTypeLexiconURI, dictNounTypeLexiconPhrase ) = lexicopy.lexicon_lib.import_plain_lexicon(
+		filename_lemma = noun_types_lexicon,
+		list_column_names = ['schema','phrase_list','hypernym'],
+		phrase_delimiter = '|',
+		lower_case = True,
+		stemmer = stemmer,
+		apply_wordnet_morphy = True,
+		allowed_schema_list = None,
+		dict_lexicon_config = dict_openie_config )
+
+	dict_openie_config['logger'].info( 'LEXICON noun type' )
+	dict_openie_config['logger'].info( 'num uri = ' + repr(len(dictNounTypeLexiconURI)) )
+	dict_openie_config['logger'].info( 'num phrases = ' + repr(len(dictNounTypeLexiconPhrase)) )
+
+	if export_lexicon_file != '' :
+		# create lexicon from JSON results of BM SPARQL queries (of SKOS vocabulary)
+		# use simple stemming to allow plurals to match (e.g. chalices => chalice)
+		( dictCHLexiconURI, dictCHLexiconPhrase ) = lexicopy.lexicon_lib.import_skos_lexicon(
+			filename_lemma = filename_lemma,
+			filename_hypernym = filename_hypernym,
+			filename_related = filename_related,
+			serialized_format = import_file_format,
 			stemmer = stemmer,
-			dict_openie_config = dictCHConfig
-			)
+			apply_wordnet_morphy = True,
+			allowed_schema_list = allowed_schema_list,
+			dict_lexicon_config = dict_openie_config )
+
+		lexicopy.lexicon_lib.export_lexicon(
+			filename_lexicon = export_lexicon_file,
+			dict_uri = dictCHLexiconURI,
+			dict_phrase = dictCHLexiconPhrase,
+			dict_lexicon_config = dict_openie_config )
+		dict_openie_config['logger'].info( 'lexicon exported to ' + export_lexicon_file )
+
+	else :
+		if import_lexicon_file != '' :
+
+			# load previously prepared lexicon from disk
+			( dictCHLexiconURI, dictCHLexiconPhrase ) = lexicopy.lexicon_lib.import_lexicon( filename_lexicon = import_lexicon_file, dict_lexicon_config = dict_openie_config )
+			dict_openie_config['logger'].info( 'lexicon imported from ' + import_lexicon_file )
+		else :
+			dictCHLexiconURI = {}
+			dictCHLexiconPhrase = {}
+
+	dict_openie_config['logger'].info( 'LEXICON CH' )
+	dict_openie_config['logger'].info( 'num uri = ' + repr(len(dictCHLexiconURI)) )
+	dict_openie_config['logger'].info( 'num phrases = ' + repr(len(dictCHLexiconPhrase)) )
+
+	# min wordnet count is 0, so ANY mention in WordNet will be removed from the CH lexicon.
+	# this avoids 'lotus' for example, with cound 0, being treated as a material (as it is in CH lexicon).
+	# this means lexicon will ONLY contain the specialist domain vocab and no any common words.
+	lexicopy.lexicon_lib.filter_lexicon_wordnet(
+		dict_phrase = dictCHLexiconPhrase,
+		count_freq_min = 0,
+		dict_lexicon_config = dict_openie_config
+		)
+
+	dict_openie_config['logger'].info( 'LEXICON filtered using wordnet' )
+	dict_openie_config['logger'].info( 'num uri = ' + repr(len(dictCHLexiconURI)) )
+	dict_openie_config['logger'].info( 'num phrases = ' + repr(len(dictCHLexiconPhrase)) )
+
+	# merge it with CH lexicon
+	( dictMergedLexiconURI, dictMergedLexiconPhrase ) = lexicopy.lexicon_lib.merge_lexicon(
+		list_lexicon = [ ( dictNounTypeLexiconURI, dictNounTypeLexiconPhrase ), ( dictCHLexiconURI, dictCHLexiconPhrase ) ],
+		dict_lexicon_config = dict_openie_config
+		)
+
+	dict_openie_config['logger'].info( 'LEXICON merged' )
+	dict_openie_config['logger'].info( 'num uri = ' + repr(len(dictMergedLexiconURI)) )
+	dict_openie_config['logger'].info( 'num phrases = ' + repr(len(dictMergedLexiconPhrase)) )
+
+	return ( dictMergedLexiconURI, dictMergedLexiconPhrase )
+
+def load_ch_lexicon( noun_types_ranked = None, noun_types_lexicon = None, export_lexicon_file = '', import_lexicon_file = '', filename_lemma = None, filename_hypernym = None, filename_related = None, import_file_format = 'json', stemmer = None, snapshot_file = '', dict_openie_config = {} ) :
+	#
+	# Lexicon creation
+	#   manual noun list with domain specific noun type mappings (e.g. part, shape)
+	#   CH lexicon with nouns removed if they appear in WordNet (so we keep only the specialist vocabulary)
+	# if snapshot_file is not '' the merged lexicon is loaded from a memory mapped snapshot, which is (re)built if it is missing or any source file has changed
+	#
+
+	# load ranked noun type mappings (will be used as a filter for CH lexicon import and to disambiguate between multiple schema options)
+	listNounTypeRanked = read_noun_type_ranked_list(
+		filename = noun_types_ranked,
+		dict_openie_config = dict_openie_config
+		)
+
+	dict_openie_config['logger'].info( 'LEXICON schema list' )
+	dict_openie_config['logger'].info( 'num uri = ' + repr(len(listNounTypeRanked)) )
+
+	if snapshot_file == '' :
+		( dictMergedLexiconURI, dictMergedLexiconPhrase ) = build_ch_lexicon(
+			noun_types_lexicon = noun_types_lexicon,
+			export_lexicon_file = export_lexicon_file,
+			import_lexicon_file = import_lexicon_file,
+			filename_lemma = filename_lemma,
+			filename_hypernym = filename_hypernym,
+			filename_related = filename_related,
+			import_file_format = import_file_format,
+			allowed_schema_list = listNounTypeRanked,
+			stemmer = stemmer,
+			dict_openie_config = dict_openie_config )
+
+	else :
+		# snapshot checksum covers all files and settings the merged lexicon is built from (including the WordNet version, as the CH lexicon is WordNet filtered)
+		listSourceFiles = [ noun_types_ranked, noun_types_lexicon ]
+		if export_lexicon_file != '' :
+			listSourceFiles.extend( [ filename_lemma, filename_hypernym, filename_related ] )
+		elif import_lexicon_file != '' :
+			listSourceFiles.append( import_lexicon_file )
+
+		( dictMergedLexiconURI, dictMergedLexiconPhrase ) = lexicon_snapshot_lib.load_lexicon_snapshot(
+			filename = snapshot_file,
+			list_source_files = listSourceFiles,
+			list_settings = [ export_lexicon_file != '', import_lexicon_file != '', import_file_format, repr(stemmer), wordnet_closure_lib.get_wordnet_version() ],
+			build_function = lambda : build_ch_lexicon(
+				noun_types_lexicon = noun_types_lexicon,
+				export_lexicon_file = export_lexicon_file,
+				import_lexicon_file = import_lexicon_file,
+				filename_lemma = filename_lemma,
+				filename_hypernym = filename_hypernym,
+				filename_related = filename_related,
+				import_file_format = import_file_format,
+				allowed_schema_list = listNounTypeRanked,
+				stemmer = stemmer,
+				dict_openie_config = dict_openie_config ),
+			dict_openie_config = dict_openie_config )
+
+		dict_openie_config['logger'].info( 'LEXICON snapshot' )
+		dict_openie_config['logger'].info( 'num uri = ' + repr(len(dictMergedLexiconURI)) )
+		dict_openie_config['logger'].info( 'num phrases = ' + repr(len(dictMergedLexiconPhrase)) )
+
+	return ( listNounTypeRanked, dictMergedLexiconURI, dictMergedLexiconPhrase )
+
+def open_wordnet_cache( dict_config = None, dict_openie_config = {} ) :
+	#
+	# open the persistent WordNet expansion cache in the configured wordnet_cache_file
+	# return nlp_cache_lib.open_cache() handle, or None if wordnet_cache_file = ''
+	#
+
+	if dict_config['wordnet_cache_file'] == '' :
+		return None
+
+	return nlp_cache_lib.open_cache(
+		filename = dict_config['wordnet_cache_file'],
+		table = 'wordnet',
+		max_entries = int( dict_config['wordnet_cache_max_entries'] ),
+		dict_openie_config = dict_openie_config )
+
+def open_wordnet_closure( dict_config = None, dict_openie_config = {} ) :
+	#
+	# open the precomputed WordNet closure table in the configured wordnet_closure_file (built offline with wordnet_closure_lib.py)
+	# return wordnet_closure_lib.open_wordnet_closure() handle, or None if wordnet_closure_file = '' or the table is missing or out of date (NLTK WordNet is used instead)
+	#
+
+	if dict_config['wordnet_closure_file'] == '' :
+		return None
+
+	dictClosure = wordnet_closure_lib.open_wordnet_closure(
+		filename = dict_config['wordnet_closure_file'],
+		dict_lexicon_config = dict_openie_config )
+
+	if dictClosure == None :
+		dict_openie_config['logger'].info( 'wordnet closure missing or out of date (using NLTK WordNet, run wordnet_closure_lib.py to build it) : ' + dict_config['wordnet_closure_file'] )
+
+	return dictClosure
+
+def create_item_sets( list_document_proposition_sets = [], dict_sent_to_uri = {}, lex_phrase_index = {}, lex_uri_index = {}, schema_ranked_list = [], list_semantic_mapping = [], stemmer = None, schema_cache = None, wordnet_cache = None, dict_openie_config = {} ) :
+	#
+	# create semantically mapped item sets from attrib_ie propositions (tuples from read_proposition_file(), or an iterator such as iter_proposition_file() so the propositions are streamed)
+	# dict_sent_to_uri maps sent index to the artifact URI the sent came from
+	#
+
+	#
+	# (1) create compound itemset from extraction set
+	# compound items are tuples until step (3) expands them into single value item strings
+	#
+
+	# debug
+	'''
+	for entry in list_document_proposition_sets :
+		dict_openie_config['logger'].info( 'T0 = ' + repr(entry) )
+	'''
+
+	# group propositions by sent index in one pass, so each sent is joined to its propositions by a lookup (rather than a scan of all propositions per sent)
+	dictPropsBySent = group_propositions_by_sent(
+		list_document_proposition_sets = list_document_proposition_sets,
+		dict_openie_config = dict_openie_config )
+
+	listExtractionItemSets = []
+	for nSentIndex in dict_sent_to_uri :
+		strIndexSent = str(nSentIndex)
+		if not strIndexSent in dictPropsBySent :
+			continue
+		strURI = dict_sent_to_uri[ nSentIndex ]
+
+		for ( listPhraseText, nConf, listPropPattern, listHeadText ) in dictPropsBySent[strIndexSent] :
+
+			# note last index
+			nLastSet = len(listExtractionItemSets)
+
+			# create item sets for this proposition
+			add_item_sets_from_extraction(
+				list_item_sets = listExtractionItemSets,
+				list_extracted_prop = listPhraseText,
+				list_head_terms = listHeadText,
+				list_prop_pattern = listPropPattern,
+				dict_openie_config = dict_openie_config )
+
+			# add artifact URI to all new item sets (useful later when making RDF)
+			for nIndexSet in range( nLastSet, len(listExtractionItemSets) ) :
+				listExtractionItemSets[nIndexSet].append( ( 'artifact_uri', strURI, () ) )
+
+	# propositions are not needed for the later steps
+	dictPropsBySent = None
+
+	# debug
+	'''
+	for entry in listExtractionItemSets :
+		dict_openie_config['logger'].info( 'T1 = ' + repr( [ compound_item_to_string( compound_item = tupleItem ) for tupleItem in entry ] ) )
+	'''
+
+	#
+	# (2) aggregate patterns to extend compound itemset
+	#
+
+	aggregate_phrases_in_item_set( 
+		list_item_sets = listExtractionItemSets,
+		agg_patterns = [ ('attr',), ('attrbase','attrprep'), ('attrnoobjnosubj',) ],
+		agg_var_name = 'attribute',
+		dict_openie_config = dict_openie_config
+		)
+
+	# debug
+	'''
+	for entry in listExtractionItemSets :
+		dict_openie_config['logger'].info( 'T2 = ' + repr( [ compound_item_to_string( compound_item = tupleItem ) for tupleItem in entry ] ) )
+	'''
+
+	#
+	# (3) expand compound item sets into single value item sets, and do a lexicon lookup to add type classifications
+	#
+
+	expand_compound_items_and_apply_lexicon_schema_mappings(
+		list_item_sets = listExtractionItemSets,
+		lex_phrase_index = lex_phrase_index,
+		lex_uri_index = lex_uri_index,
+		schema_ranked_list = schema_ranked_list,
+		stemmer = stemmer,
+		schema_cache = schema_cache,
+		dict_openie_config = dict_openie_config
+		)
+
+	# debug
+	'''
+	for entry in listExtractionItemSets :
+		dict_openie_config['logger'].info( 'T3 = ' + repr(entry) )
+	'''
+
+	#
+	# (4) add WordNet troponyms (word with more generalized verb meaning)
+	#
+
+	apply_wordnet_mapping_to_item_sets(
+		list_item_sets = listExtractionItemSets,
+		allowed_types = set(['attribute_head', 'subj_head', 'obj_head']),
+		count_freq_threshold = 0.5,
+		top_n_lemma = 3,
+		wordnet_cache = wordnet_cache,
+		dict_openie_config = dict_openie_config
+		)
+
+	# debug
+	'''
+	for entry in listExtractionItemSets :
+		dict_openie_config['logger'].info( 'T4 = ' + repr(entry) )
+	'''
+
+	#
+	# (5) apply manual semantic mapping to generate relation schema types
+	#
+
+	apply_semantic_mapping_to_item_sets(
+		list_item_sets = listExtractionItemSets,
+		list_semantic_mapping = list_semantic_mapping,
+		dict_openie_config = dict_openie_config
+		)
+
+	# debug
+	'''
+	for entry in listExtractionItemSets :
+		dict_openie_config['logger'].info( 'T5 = ' + repr(entry) )
+	'''
+
+	return listExtractionItemSets
+
+def run_delta( dict_config = None, dataset_dir = None, delta_dir = None, attrib_ie_config_file = None, template_file = None, extract_file = None, item_set_file = None, am_item_set_file = None, am_script = None, am_rules_file = None, manifest_file = None, rules_policy = 'reuse', max_processes = 1, dict_openie_config = {} ) :
+	#
+	# incremental run for new and changed artifacts only, based on the artifact manifest written by the last run.
+	#   ingest the corpus and compare artifact text hashes to the manifest
+	#   sentence split and attrib_ie extract the changed artifacts only (in delta_dir), using the templates learnt by the last full run
+	#   create item sets for the changed artifacts, and merge them with the stored item sets of all other artifacts
+	#   association rules are reused (rules_policy = reuse) or re-mined from the merged item sets (rules_policy = remine)
+	#   apply rules to the changed artifacts and write productions for them only (<output_file_productions>.delta.trig)
+	# artifacts no longer in the corpus are removed from the item sets and listed in <output_file_productions>.removed.txt
+	# changed artifacts from the last run are listed in <output_file_productions>.replaced.txt. their old productions (the triples of their extraction event node) must be retracted before loading the delta productions
+	# note: extraction event nodes are named from the artifact URI (cultural_heritage_parse_lib.generate_extract_event_node_name()), so delta productions never reuse a node of another artifact
+	# note: with rules_policy = remine the rules are only re-applied to changed artifacts. run a full run to re-apply them to all artifacts.
+	#
+
+	logger = dict_openie_config['logger']
+
+	if not rules_policy in [ 'reuse', 'remine' ] :
+		raise Exception( 'invalid delta rules policy : ' + repr(rules_policy) )
+
+	strOutputFileItemSet = dict_config['output_file_item_set']
+	strOutputFileProductions = dict_config['output_file_productions']
+	strDeltaProductionsFile = strOutputFileProductions + '.delta.trig'
+	strRemovedURIFile = strOutputFileProductions + '.removed.txt'
+	strReplacedURIFile = strOutputFileProductions + '.replaced.txt'
+
+	# a delta run needs the outputs of a previous full run
+	if len( glob.glob( dataset_dir + os.sep + template_file + '_*.txt' ) ) == 0 :
+		raise Exception( 'delta run needs templates from a full run : ' + dataset_dir + os.sep + template_file + '_*.txt' )
+	for strFile in [ manifest_file, item_set_file, strOutputFileItemSet ] :
+		if os.path.isfile( strFile ) == False :
+			raise Exception( 'delta run needs output from a full run : ' + strFile )
+	if (rules_policy == 'reuse') and (os.path.isfile( am_rules_file ) == False) :
+		raise Exception( 'delta run with rules_policy = reuse needs association mining rules from a full run : ' + am_rules_file )
+
+	logger.info( '\n#\n# Gravitate - Delta Run\n#' )
+
+	#
+	# find new, changed and removed artifacts
+	#
+
+	dictText = read_corpus(
+		filename = dict_config['input_file'],
+		input_format = dict_config['input_format'],
+		max_doc = int( dict_config['max_doc_limit'] ),
+		allowed_uri = set( ast.literal_eval( dict_config['list_allowed_uri'] ) ),
+		sparql_endpoint = dict_config['sparql_endpoint'],
+		sparql_page_size = int( dict_config['sparql_page_size'] ),
+		sparql_max_retries = int( dict_config['sparql_max_retries'] ),
+		dict_openie_config = dict_openie_config )
+
+	dictHashes = calc_artifact_hashes( dict_text = dictText )
+	dictManifest = read_artifact_manifest( filename = manifest_file, dict_openie_config = dict_openie_config )
+
+	setChangedURI = set([])
+	for strURI in dictHashes :
+		if dictManifest.get( strURI ) != dictHashes[strURI] :
+			setChangedURI.add( strURI )
+	setRemovedURI = set( dictManifest.keys() ) - set( dictHashes.keys() )
+	setRetractURI = setChangedURI & set( dictManifest.keys() )
+
+	logger.info( 'delta : ' + str(len(dictHashes)) + ' artifacts, ' + str(len(setChangedURI)) + ' new or changed (' + str(len(setRetractURI)) + ' changed), ' + str(len(setRemovedURI)) + ' removed' )
+
+	#
+	# item sets for changed artifacts
+	#
+
+	listDeltaItemSets = []
+	if len(setChangedURI) > 0 :
+		if not os.path.isdir( delta_dir ) :
+			os.mkdir( delta_dir )
+
+		dictDeltaText = {}
+		for strURI in setChangedURI :
+			dictDeltaText[strURI] = dictText[strURI]
+		del dictText
+
+		strDeltaSentFile = delta_dir + os.sep + 'sentences.txt'
+		write_sentence_file( filename = strDeltaSentFile, dict_text = dictDeltaText, max_processes = max_processes, token_filename = delta_dir + os.sep + 'sentences.jsonl', dict_openie_config = dict_openie_config )
+
+		dictAttribIEDataset = attrib_ie.prepare_dataset( filename_config = attrib_ie_config_file, dataset_dir = delta_dir, logger = logger )
+		try :
+			attrib_ie.extract_dataset_propositions( dict_dataset = dictAttribIEDataset, template_file = template_file, extract_file = extract_file, template_dir = dataset_dir )
+		finally :
+			attrib_ie.close_dataset( dict_dataset = dictAttribIEDataset )
+		dictAttribIEDataset = None
+
+		listSemanticMappings = load_semantic_mapping(
+			filename_mapping = dict_config['semantic_mapping_ch'],
+			dict_openie_config = dict_openie_config )
+
+		( listNounTypeRanked, dictMergedLexiconURI, dictMergedLexiconPhrase ) = load_ch_lexicon(
+			noun_types_ranked = dict_config['noun_types_ranked'],
+			noun_types_lexicon = dict_config['noun_types_ch_lexicon'],
+			export_lexicon_file = dict_config['export_lexicon_file'],
+			import_lexicon_file = dict_config['import_lexicon_file'],
+			filename_lemma = dict_config['filename_lemma'],
+			filename_hypernym = dict_config['filename_hypernym'],
+			filename_related = dict_config['filename_related'],
+			import_file_format = dict_config['import_file_format'],
+			stemmer = None,
+			snapshot_file = dict_config['lexicon_snapshot_file'],
+			dict_openie_config = dict_openie_config )
+
+		dictWordNetCache = open_wordnet_cache( dict_config = dict_config, dict_openie_config = dict_openie_config )
+
+		listDeltaItemSets = create_item_sets(
+			list_document_proposition_sets = iter_proposition_file( filename = delta_dir + os.sep + 'annotated-' + extract_file, dict_openie_config = dict_openie_config ),
+			dict_sent_to_uri = read_sentence_uri_index( filename = strDeltaSentFile, dict_openie_config = dict_openie_config ),
+			lex_phrase_index = dictMergedLexiconPhrase,
+			lex_uri_index = dictMergedLexiconURI,
+			schema_ranked_list = listNounTypeRanked,
+			list_semantic_mapping = listSemanticMappings,
+			stemmer = None,
+			schema_cache = lexicon_matcher_lib.open_lookup_cache( max_entries = int( dict_config['lexicon_schema_cache_size'] ) ),
+			wordnet_cache = dictWordNetCache,
+			dict_openie_config = dict_openie_config )
+
+		if dictWordNetCache != None :
+			nlp_cache_lib.close_cache( dict_cache = dictWordNetCache, dict_openie_config = dict_openie_config )
+
+	logger.info( 'delta item sets = ' + str(len(listDeltaItemSets)) )
+
+	#
+	# merge with the stored item sets of unchanged artifacts
+	#
+
+	setReplacedURI = setChangedURI | setRemovedURI
+
+	listExtractionItemSets = merge_item_sets(
+		list_item_sets = read_item_set_file( filename = item_set_file, dict_openie_config = dict_openie_config ),
+		list_delta_item_sets = listDeltaItemSets,
+		replaced_uri = setReplacedURI )
+	write_item_set_file( filename = item_set_file, list_item_sets = listExtractionItemSets, dict_openie_config = dict_openie_config )
+
+	listAssociationMiningItemSets = filter_item_sets(
+		list_item_sets = listExtractionItemSets,
+		mandatory_items = set([]),
+		allowed_items = set(['semantic_type', 'attribute_head', 'subj_head', 'obj_head', 'attribute_wn', 'subj_wn', 'obj_wn']),
+		remove_duplicates = True,
+		dict_openie_config = dict_openie_config )
+	write_item_set_file( filename = am_item_set_file, list_item_sets = listAssociationMiningItemSets, dict_openie_config = dict_openie_config )
+	del listExtractionItemSets
+
+	#
+	# association rules
+	#
+
+	if rules_policy == 'remine' :
+		execute_association_mining_item_sets(
+			filename_item_sets = am_item_set_file,
+			filename_rules = am_rules_file,
+			path_rscript = '/Program Files/R/R-3.4.4/bin/Rscript.exe',
+			path_am_script = am_script,
+			working_dir = '.',
+			dict_openie_config = dict_openie_config )
+
+	listRules = import_association_mining_rules(
+		filename_rules = am_rules_file,
+		dict_openie_config = dict_openie_config )
+
+	apply_association_mining_rules(
+		list_item_sets = listDeltaItemSets,
+		list_rules = listRules,
+		max_inferences = 3,
+		dict_openie_config = dict_openie_config )
+
+	# final item sets (with inferences) for all artifacts
+	listOutputItemSets = merge_item_sets(
+		list_item_sets = read_item_set_file( filename = strOutputFileItemSet, dict_openie_config = dict_openie_config ),
+		list_delta_item_sets = listDeltaItemSets,
+		replaced_uri = setReplacedURI )
+	write_item_set_file( filename = strOutputFileItemSet, list_item_sets = listOutputItemSets, dict_openie_config = dict_openie_config )
+	del listOutputItemSets
+
+	#
+	# productions for changed artifacts only
+	#
+
+	logger.info( 'delta productions : ' + strDeltaProductionsFile )
+	writeHandle = codecs.open( strDeltaProductionsFile, 'w', 'utf-8', errors = 'replace' )
+	if len(listDeltaItemSets) > 0 :
+		strTurtle = cultural_heritage_parse_lib.item_set_to_CIDOC_CRM_RDF(
+			item_sets = listDeltaItemSets,
+			annotation_namespace = 'http://gravitate.org/id/',
+			graph_namespace = 'http://gravitate.org/id/NLP_algorithm/graph',
+			include_prefix = True,
+			entity_stemmer = nltk.stem.RegexpStemmer('s$', 4),
+			dict_ch_config = dict_openie_config )
+		if len(strTurtle) > 0 :
+			writeHandle.write( strTurtle + '\n' )
+	writeHandle.write( '\n' )
+	writeHandle.close()
+
+	logger.info( 'delta removed URIs : ' + strRemovedURIFile )
+	writeHandle = codecs.open( strRemovedURIFile, 'w', 'utf-8', errors = 'replace' )
+	for strURI in sorted( setRemovedURI ) :
+		writeHandle.write( strURI + '\n' )
+	writeHandle.close()
+
+	logger.info( 'delta replaced URIs : ' + strReplacedURIFile )
+	writeHandle = codecs.open( strReplacedURIFile, 'w', 'utf-8', errors = 'replace' )
+	for strURI in sorted( setRetractURI ) :
+		writeHandle.write( strURI + '\n' )
+	writeHandle.close()
+
+	# the manifest is only updated once everything else has been written, so a failed delta run can be re-run
+	write_artifact_manifest( filename = manifest_file, dict_manifest = dictHashes, dict_openie_config = dict_openie_config )
 
-		# debug
-		'''
-		for entry in listExtractionItemSets :
-			logger.info( 'T3 = ' + repr(entry) )
-		'''
+
+################################
+# main
+################################
+
+# only execute if this is the main file
+if __name__ == '__main__' :
+
+	#
+	# check args
+	#
+	if len(sys.argv) < 2 :
+		print 'Usage: ch_information_extraction_app.py <config file> [--resume] [--delta] [--templates | --shard=<k>/<N> | --merge=<N>]\n'
+		sys.stdout.flush()
+		sys.exit(1)
+	if not os.path.isfile(sys.argv[1]) :
+		print '<config file> ' + sys.argv[1] + ' does not exist\n'
+		sys.stdout.flush()
+		sys.exit(1)
+	for strArg in sys.argv[2:] :
+		if strArg.startswith( '--shard=' ) or strArg.startswith( '--merge=' ) :
+			if re.match( r'^(--shard=[0-9]+/[0-9]+|--merge=[0-9]+)$', strArg ) == None :
+				print 'invalid option ' + strArg + '\n'
+				sys.stdout.flush()
+				sys.exit(1)
+		elif not strArg in [ '--resume', '--delta', '--templates' ] :
+			print 'unknown option ' + strArg + '\n'
+			sys.stdout.flush()
+			sys.exit(1)
+
+	# make logger (global to STDOUT)
+	LOG_FORMAT = ('%(levelname) -s %(asctime)s %(message)s')
+	logger = logging.getLogger( __name__ )
+	logging.basicConfig( level=logging.INFO, format=LOG_FORMAT )
+	logger.info('logging started')
+
+	# initialize
+	readHandle = None
+	writeHandle = None
+
+	try :
+		# init
+		strConfigFile = sys.argv[1]
+		bResume = '--resume' in sys.argv[2:]
+		bDelta = '--delta' in sys.argv[2:]
+
+		# templates runs ingest, sentence split and attrib_ie generate on the whole corpus, then stops. shards all extract with these templates.
+		# shard k of N (k = 0 .. N-1) runs ingest, attrib_ie extract and item sets for its artifacts only, merge N combines the shards and runs association mining and RDF
+		bTemplates = '--templates' in sys.argv[2:]
+		bShard = False
+		nShardIndex = 0
+		nShardCount = 1
+		bMerge = False
+		nMergeCount = 0
+		for strArg in sys.argv[2:] :
+			if strArg.startswith( '--shard=' ) :
+				bShard = True
+				( nShardIndex, nShardCount ) = [ int( strValue ) for strValue in strArg[ len('--shard=') : ].split('/') ]
+				if (nShardCount < 1) or (nShardIndex >= nShardCount) :
+					raise Exception( 'invalid shard (expected k/N with k = 0 .. N-1) : ' + strArg )
+			elif strArg.startswith( '--merge=' ) :
+				bMerge = True
+				nMergeCount = int( strArg[ len('--merge=') : ] )
+				if nMergeCount < 1 :
+					raise Exception( 'invalid merge shard count : ' + strArg )
+		if (bShard == True) and (bMerge == True) :
+			raise Exception( '--shard and --merge cannot be used together' )
+		if (bTemplates == True) and ((bShard == True) or (bMerge == True)) :
+			raise Exception( '--templates cannot be used with --shard or --merge' )
+		if (bDelta == True) and ((bShard == True) or (bMerge == True) or (bTemplates == True)) :
+			raise Exception( '--delta cannot be used with --templates, --shard or --merge' )
+
+		# load config
+		dictConfig = soton_corenlppy.config_helper.read_config( strConfigFile )
+
+		strInputFile = dictConfig['input_file']
+		strInputFormat = dictConfig['input_format']
+		strOutputFileItemSet = dictConfig['output_file_item_set']
+		strOutputFileProductions = dictConfig['output_file_productions']
+		nDocMax = int( dictConfig['max_doc_limit'] )
+		setAllowedURI = set( ast.literal_eval( dictConfig['list_allowed_uri'] ) )
+		strSPARQLEndpoint = dictConfig['sparql_endpoint']
+		nSPARQLPageSize = int( dictConfig['sparql_page_size'] )
+		nSPARQLMaxRetries = int( dictConfig['sparql_max_retries'] )
+		nProcessMax = int( dictConfig['process_count'] )
+		strDeltaRulesPolicy = dictConfig['delta_rules_policy']
+
+		strLexiconFileExport = dictConfig['export_lexicon_file']
+		strLexiconFileImport = dictConfig['import_lexicon_file']
+		strSkosLemmaFile = dictConfig['filename_lemma']
+		strSkosHyperFile = dictConfig['filename_hypernym']
+		strSkosRelatedFile = dictConfig['filename_related']
+		strFileFormat = dictConfig['import_file_format']
+		strLexiconSnapshotFile = dictConfig['lexicon_snapshot_file']
+		nLexiconSchemaCacheSize = int( dictConfig['lexicon_schema_cache_size'] )
+
+		strNounTypeRankedFile = dictConfig['noun_types_ranked']
+		strNounTypeLexiconFile = dictConfig['noun_types_ch_lexicon']
+		strSemanticMappingCHFile = dictConfig['semantic_mapping_ch']
+
+		dictCHConfig = get_ch_config( dict_config = dictConfig, logger = logger )
+
+		# Disable stemming and rely on Wordnet morphy() instead as its more reliable
+		stemmer = None
 
 		#
-		# (4) add WordNet troponyms (word with more generalized verb meaning)
+		# pipeline stages
+		#   ingest > sentence split > attrib_ie generate > attrib_ie extract > item sets > association mining > RDF
+		# each stage writes its output files and a checkpoint with a fingerprint of its inputs (file content + settings + code).
+		# with --resume any stage whose inputs are unchanged since its last checkpoint is skipped, and later stages read its output files from disk.
+		# because each stage fingerprints the output files of the stage before it, a change anywhere re-runs everything downstream of it.
 		#
 
-		apply_wordnet_mapping_to_item_sets(
-			list_item_sets = listExtractionItemSets,
-			allowed_types = set(['attribute_head', 'subj_head', 'obj_head']),
-			count_freq_threshold = 0.5,
-			top_n_lemma = 3,
-			dict_openie_config = dictCHConfig
-			)
-
-		# debug
-		'''
-		for entry in listExtractionItemSets :
-			logger.info( 'T4 = ' + repr(entry) )
-		'''
+		strDatasetDir = 'CH_dataset'
+		# templates are learnt once in the (unsharded) dataset dir, and shards extract with them
+		strTemplateDir = strDatasetDir
+		if bShard == True :
+			strDatasetDir = get_shard_dataset_dir( dataset_dir = strDatasetDir, shard_index = nShardIndex, shard_count = nShardCount )
+		if not os.path.isdir( strDatasetDir ) :
+			os.mkdir( strDatasetDir )
+
+		strCheckpointFile = strDatasetDir + os.sep + 'checkpoints.json'
+		strCorpusFile = strDatasetDir + os.sep + 'corpus.jsonl'
+		strSentFile = strDatasetDir + os.sep + 'sentences.txt'
+		strSentTokenFile = strDatasetDir + os.sep + 'sentences.jsonl'
+		strAttribIEConfigFile = 'ch_attrib_ie.ini'
+		strTemplateFile = 'attribie-templates.txt'
+		strExtractFile = 'extractions-attribie.txt'
+		strPropFile = strDatasetDir + os.sep + 'annotated-extractions-attribie.txt'
+		strItemSetFile = strDatasetDir + os.sep + 'item-sets.txt'
+		strAMItemSetFile = strOutputFileItemSet + '.am.txt'
+		strAMScript = 'association_mining_ch.r'
+		strAMRulesFile = 'association_mining_rules.txt'
+		strSortedRulesFile = 'sorted_rules.txt'
+		strManifestFile = strDatasetDir + os.sep + 'artifact-manifest.json'
+		strDeltaDir = 'CH_delta'
+
+		# shards running on the same machine must not write to the same files
+		if bShard == True :
+			strAMItemSetFile = strDatasetDir + os.sep + os.path.basename( strAMItemSetFile )
+			if strLexiconFileExport != '' :
+				strLexiconFileExport = strDatasetDir + os.sep + os.path.basename( strLexiconFileExport )
 
 		#
-		# (5) apply manual semantic mapping to generate relation schema types
+		# delta run : only new and changed artifacts (needs the output of a previous full run)
 		#
 
-		apply_semantic_mapping_to_item_sets(
-			list_item_sets = listExtractionItemSets,
-			list_semantic_mapping = listSemanticMappings,
-			dict_openie_config = dictCHConfig
-			)
-
-		# debug
-		'''
-		for entry in listExtractionItemSets :
-			logger.info( 'T5 = ' + repr(entry) )
-		'''
-
-		# check we have items to process
-		if len(listExtractionItemSets) == 0 :
-			logger.info( 'Empty item set - cannot create RDF' )
+		if bDelta == True :
+			run_delta(
+				dict_config = dictConfig,
+				dataset_dir = strDatasetDir,
+				delta_dir = strDeltaDir,
+				attrib_ie_config_file = strAttribIEConfigFile,
+				template_file = strTemplateFile,
+				extract_file = strExtractFile,
+				item_set_file = strItemSetFile,
+				am_item_set_file = strAMItemSetFile,
+				am_script = strAMScript,
+				am_rules_file = strAMRulesFile,
+				manifest_file = strManifestFile,
+				rules_policy = strDeltaRulesPolicy,
+				max_processes = nProcessMax,
+				dict_openie_config = dictCHConfig )
+
 		else :
 
-			#
-			# (x) filter and write extraction item sets to disk ready for association mining
-			#
+			if bResume == True :
+				dictCheckpoints = checkpoint_lib.read_checkpoints( filename = strCheckpointFile )
+				logger.info( 'resuming from checkpoints : ' + repr( sorted( dictCheckpoints.keys() ) ) )
+			else :
+				dictCheckpoints = {}
 
-			listAssociationMiningItemSets = filter_item_sets(
-				list_item_sets = listExtractionItemSets,
-				mandatory_items = set([]),
-				allowed_items = set(['semantic_type', 'attribute_head', 'subj_head', 'obj_head', 'attribute_wn', 'subj_wn', 'obj_wn']),
-				remove_duplicates = True,
-				dict_openie_config = dictCHConfig
-				)
-
-			# debug
-			'''
-			for entry in listExtractionItemSets :
-				logger.info( 'T6 = ' + repr(entry) )
-			'''
+			if bMerge == False :
 
-			#
-			# (x) execute R script to perform association mining
-			#
+				#
+				# stage : ingest
+				#
 
-			strFile = strOutputFileItemSet + '.am.txt'
-			logger.info( 'item set for am : ' + strFile )
-			writeHandle = codecs.open( strFile, 'w', 'utf-8', errors = 'replace' )
-			for listItemSet in listAssociationMiningItemSets :
-				strLine = '\t'.join( list( listItemSet ) )
-				writeHandle.write( strLine + '\n' )
-			writeHandle.write( '\n' )
-			writeHandle.close()
+				logger.info( '\n#\n# Gravitate - Preparing CH Corpus\n#' )
+
+				strFingerprint = checkpoint_lib.calc_stage_fingerprint(
+					stage = 'ingest',
+					list_input_files = [ strInputFile ] + dictStageDependencies['ingest'],
+					list_settings = [ strInputFormat, nDocMax, sorted( setAllowedURI ), strSPARQLEndpoint, nSPARQLPageSize, nShardIndex, nShardCount ] )
+
+				if checkpoint_lib.is_stage_current( dict_checkpoints = dictCheckpoints, stage = 'ingest', fingerprint = strFingerprint, dict_openie_config = dictCHConfig ) == False :
+					checkpoint_lib.clear_stage( dict_checkpoints = dictCheckpoints, stage = 'ingest', filename = strCheckpointFile )
+
+					dictText = read_corpus(
+						filename = strInputFile,
+						input_format = strInputFormat,
+						max_doc = nDocMax,
+						allowed_uri = setAllowedURI,
+						sparql_endpoint = strSPARQLEndpoint,
+						sparql_page_size = nSPARQLPageSize,
+						sparql_max_retries = nSPARQLMaxRetries,
+						shard_index = nShardIndex,
+						shard_count = nShardCount,
+						dict_openie_config = dictCHConfig )
 
-			execute_association_mining_item_sets(
-				filename_item_sets = strFile,
-				filename_rules = 'association_mining_rules.txt',
-				path_rscript = '/Program Files/R/R-3.4.4/bin/Rscript.exe',
-				path_am_script = 'association_mining_ch.r',
-				working_dir = '.',
-				dict_openie_config = dictCHConfig
-				)
+					write_corpus_file( filename = strCorpusFile, dict_text = dictText, dict_openie_config = dictCHConfig )
 
-			#
-			# (x) read association mining rules and apply them to infer new relation schema mappings
-			#
+					checkpoint_lib.set_stage_complete( dict_checkpoints = dictCheckpoints, stage = 'ingest', fingerprint = strFingerprint, list_output_files = [ strCorpusFile ], filename = strCheckpointFile, dict_openie_config = dictCHConfig )
 
-			listRules = import_association_mining_rules(
-				filename_rules = 'association_mining_rules.txt',
-				dict_openie_config = dictCHConfig
-				)
-
-			strFile = 'sorted_rules.txt'
-			logger.info( 'sorted rules : ' + strFile )
-			writeHandle = codecs.open( strFile, 'w', 'utf-8', errors = 'replace' )
-			for entry in listRules :
-				writeHandle.write(
-					repr(entry[0][0]) + ' => ' + repr(entry[0][1])+ ' : ' + repr(entry[1:]) + '\n' )
-			writeHandle.write( '\n' )
-			writeHandle.close()
+				#
+				# stage : sentence split
+				#
 
-			apply_association_mining_rules(
-				list_item_sets = listExtractionItemSets,
-				list_rules = listRules,
-				max_inferences = 3,
-				dict_openie_config = dictCHConfig
-				)
-			#
-			# (x) write final item sets as output
-			#
+				strFingerprint = checkpoint_lib.calc_stage_fingerprint(
+					stage = 'sentence_split',
+					list_input_files = [ strCorpusFile ] + dictStageDependencies['sentence_split'],
+					list_settings = [ dictCHConfig['sent_token_seps'], dictCHConfig['whitespace'], dictCHConfig['punctuation'], strSentTokenFile ] )
 
-			strFile = strOutputFileItemSet
-			logger.info( 'item set : ' + strFile )
-			writeHandle = codecs.open( strFile, 'w', 'utf-8', errors = 'replace' )
+				if checkpoint_lib.is_stage_current( dict_checkpoints = dictCheckpoints, stage = 'sentence_split', fingerprint = strFingerprint, dict_openie_config = dictCHConfig ) == False :
+					checkpoint_lib.clear_stage( dict_checkpoints = dictCheckpoints, stage = 'sentence_split', filename = strCheckpointFile )
 
-			for listItemSet in listExtractionItemSets :
-				strLine = '\t'.join( list( listItemSet ) )
-				writeHandle.write( strLine + '\n' )
+					dictText = read_corpus_file( filename = strCorpusFile, dict_openie_config = dictCHConfig )
+					write_sentence_file( filename = strSentFile, dict_text = dictText, max_processes = nProcessMax, token_filename = strSentTokenFile, dict_openie_config = dictCHConfig )
+					del dictText
 
-			writeHandle.write( '\n' )
-			writeHandle.close()
+					checkpoint_lib.set_stage_complete( dict_checkpoints = dictCheckpoints, stage = 'sentence_split', fingerprint = strFingerprint, list_output_files = [ strSentFile, strSentTokenFile ], filename = strCheckpointFile, dict_openie_config = dictCHConfig )
 
-			#
-			# generate RDF for CH skos:Concept entries that can be read by ReseartchSpace
-			#
-			logger.info( 'Creating RDF productions for ResearchSpace' )
-
-			logger.info( 'productions: ' + strOutputFileProductions )
-			writeHandle = codecs.open( strOutputFileProductions, 'w', 'utf-8', errors = 'replace' )
-
-			strTurtle = cultural_heritage_parse_lib.item_set_to_CIDOC_CRM_RDF(
-				item_sets = listExtractionItemSets,
-				annotation_namespace = 'http://gravitate.org/id/',
-				graph_namespace = 'http://gravitate.org/id/NLP_algorithm/graph',
-				include_prefix = True,
-				# TODO capture s 's ies es NOT just a simple s at end
-				entity_stemmer = nltk.stem.RegexpStemmer('s$', 4),
-				dict_ch_config = dictCHConfig )
-			if len(strTurtle) > 0 :
-				writeHandle.write( strTurtle + '\n' )
-
-			writeHandle.write( '\n' )
-			writeHandle.close()
+				#
+				# stage : attrib ie generate
+				#
+
+				# note: generate and extract are run in-process and share the prepared dataset, so the corpus is only POS tagged and dependency parsed once
+				dictAttribIEDataset = None
+				# note: the attrib_ie config and the lexicon files it lists are inputs of both attrib_ie stages
+				listAttribIEInputs = [ strAttribIEConfigFile ] + attrib_ie.get_lexicon_source_files( list_lexicon_files = soton_corenlppy.config_helper.read_config( strAttribIEConfigFile )['list_lexicon_files'] )
+
+				if bShard == True :
+					# every shard extracts with the same templates, learnt on the whole corpus by a --templates run (copy its template files to each node)
+					if len( glob.glob( strTemplateDir + os.sep + strTemplateFile + '_*.txt' ) ) == 0 :
+						raise Exception( 'shards need the templates learnt by a --templates run : ' + strTemplateDir + os.sep + strTemplateFile + '_*.txt' )
+					logger.info( 'shard extracts with the templates in ' + strTemplateDir )
+
+				else :
+					strFingerprint = checkpoint_lib.calc_stage_fingerprint(
+						stage = 'attrib_ie_generate',
+						list_input_files = [ strSentFile, strSentTokenFile ] + listAttribIEInputs + dictStageDependencies['attrib_ie_generate'],
+						list_settings = [ strTemplateFile ] )
+
+					if checkpoint_lib.is_stage_current( dict_checkpoints = dictCheckpoints, stage = 'attrib_ie_generate', fingerprint = strFingerprint, dict_openie_config = dictCHConfig ) == False :
+						checkpoint_lib.clear_stage( dict_checkpoints = dictCheckpoints, stage = 'attrib_ie_generate', filename = strCheckpointFile )
+
+						dictAttribIEDataset = attrib_ie.prepare_dataset( filename_config = strAttribIEConfigFile, dataset_dir = strDatasetDir, logger = logger )
+						attrib_ie.generate_dataset_templates( dict_dataset = dictAttribIEDataset, template_file = strTemplateFile )
+
+						checkpoint_lib.set_stage_complete( dict_checkpoints = dictCheckpoints, stage = 'attrib_ie_generate', fingerprint = strFingerprint, list_output_files = sorted( glob.glob( strDatasetDir + os.sep + strTemplateFile + '_*.txt' ) ), filename = strCheckpointFile, dict_openie_config = dictCHConfig )
+
+				#
+				# stage : attrib ie extract
+				#
+
+				listTemplateFiles = sorted( glob.glob( strTemplateDir + os.sep + strTemplateFile + '_*.txt' ) )
+
+				strFingerprint = checkpoint_lib.calc_stage_fingerprint(
+					stage = 'attrib_ie_extract',
+					list_input_files = [ strSentFile, strSentTokenFile ] + listTemplateFiles + listAttribIEInputs + dictStageDependencies['attrib_ie_extract'],
+					list_settings = [ strTemplateFile, strExtractFile ] )
+
+				if (bTemplates == False) and (checkpoint_lib.is_stage_current( dict_checkpoints = dictCheckpoints, stage = 'attrib_ie_extract', fingerprint = strFingerprint, dict_openie_config = dictCHConfig ) == False) :
+					checkpoint_lib.clear_stage( dict_checkpoints = dictCheckpoints, stage = 'attrib_ie_extract', filename = strCheckpointFile )
+
+					if dictAttribIEDataset == None :
+						dictAttribIEDataset = attrib_ie.prepare_dataset( filename_config = strAttribIEConfigFile, dataset_dir = strDatasetDir, logger = logger )
+					attrib_ie.extract_dataset_propositions( dict_dataset = dictAttribIEDataset, template_file = strTemplateFile, extract_file = strExtractFile, template_dir = strTemplateDir )
+
+					checkpoint_lib.set_stage_complete( dict_checkpoints = dictCheckpoints, stage = 'attrib_ie_extract', fingerprint = strFingerprint, list_output_files = [ strPropFile ], filename = strCheckpointFile, dict_openie_config = dictCHConfig )
+
+				# stop the attrib ie worker pool and free the parsed corpus
+				if dictAttribIEDataset != None :
+					attrib_ie.close_dataset( dict_dataset = dictAttribIEDataset )
+				dictAttribIEDataset = None
+
+				#
+				# stage : item sets
+				#
+
+				listLexiconFiles = [ strNounTypeRankedFile, strNounTypeLexiconFile, strSemanticMappingCHFile ]
+				if strLexiconFileExport != '' :
+					listLexiconFiles.extend( [ strSkosLemmaFile, strSkosHyperFile, strSkosRelatedFile ] )
+				elif strLexiconFileImport != '' :
+					listLexiconFiles.append( strLexiconFileImport )
+
+				strFingerprint = checkpoint_lib.calc_stage_fingerprint(
+					stage = 'item_sets',
+					list_input_files = [ strPropFile, strSentFile, strCorpusFile ] + listLexiconFiles + dictStageDependencies['item_sets'],
+					list_settings = [ strLexiconFileExport, strLexiconFileImport, strFileFormat, strAMItemSetFile ] )
+
+				if (bTemplates == False) and (checkpoint_lib.is_stage_current( dict_checkpoints = dictCheckpoints, stage = 'item_sets', fingerprint = strFingerprint, dict_openie_config = dictCHConfig ) == False) :
+					checkpoint_lib.clear_stage( dict_checkpoints = dictCheckpoints, stage = 'item_sets', filename = strCheckpointFile )
+
+					logger.info( '\n#\n# Gravitate - Semantic Mapping\n#' )
+
+					#
+					# Semantic mapping patterns
+					#   manual domain-specific patterns
+					#
+					listSemanticMappings = load_semantic_mapping(
+						filename_mapping = strSemanticMappingCHFile,
+						dict_openie_config = dictCHConfig
+						)
+					logger.info( 'SEMANTIC MAPPING manual' )
+					logger.info( 'num patterns = ' + repr(len(listSemanticMappings)) )
+
+					( listNounTypeRanked, dictMergedLexiconURI, dictMergedLexiconPhrase ) = load_ch_lexicon(
+						noun_types_ranked = strNounTypeRankedFile,
+						noun_types_lexicon = strNounTypeLexiconFile,
+						export_lexicon_file = strLexiconFileExport,
+						import_lexicon_file = strLexiconFileImport,
+						filename_lemma = strSkosLemmaFile,
+						filename_hypernym = strSkosHyperFile,
+						filename_related = strSkosRelatedFile,
+						import_file_format = strFileFormat,
+						stemmer = stemmer,
+						snapshot_file = strLexiconSnapshotFile,
+						dict_openie_config = dictCHConfig )
+
+					#
+					# read in annotated propositions extracted from attribie (streamed, and grouped by sent in create_item_sets())
+					#
+
+					listDocumentPropositionSets = iter_proposition_file( filename = strPropFile, dict_openie_config = dictCHConfig )
+					dictSentToURIIndex = read_sentence_uri_index( filename = strSentFile, dict_openie_config = dictCHConfig )
+
+					#
+					# Semantic mapping to kwowledge base productions (KBP)
+					#   create item sets from {arg,rel}arg} variables
+					#   semantically map nouns (domain specific noun mapping file) -> subj_type, obj_type
+					#   add WordNet subj/obj/rel hypernymns as items -> rel_wn, subj_wn, obj_wn
+					#   semantically map rels (domain specific rel mapping file) -> rel_type
+					#   association mining (apriori) -> inferred_rel_type
+					#     learn rules to infer rel_type based on item sets (confidence 1.0 only)
+					#     apply rules to infer rel types
+					#   apply domain-specific heuristics to take known rel_type's and make CIDOC-CRM RDF productions
+					#
+
+					logger.info( 'SEMANTIC MAPPED EXTRACTIONS (using association mining)' )
+
+					dictWordNetCache = open_wordnet_cache( dict_config = dictConfig, dict_openie_config = dictCHConfig )
+
+					listExtractionItemSets = create_item_sets(
+						list_document_proposition_sets = listDocumentPropositionSets,
+						dict_sent_to_uri = dictSentToURIIndex,
+						lex_phrase_index = dictMergedLexiconPhrase,
+						lex_uri_index = dictMergedLexiconURI,
+						schema_ranked_list = listNounTypeRanked,
+						list_semantic_mapping = listSemanticMappings,
+						stemmer = stemmer,
+						schema_cache = lexicon_matcher_lib.open_lookup_cache( max_entries = nLexiconSchemaCacheSize ),
+						wordnet_cache = dictWordNetCache,
+						dict_openie_config = dictCHConfig )
+
+					if dictWordNetCache != None :
+						nlp_cache_lib.close_cache( dict_cache = dictWordNetCache, dict_openie_config = dictCHConfig )
+
+					#
+					# (x) filter and write extraction item sets to disk ready for association mining
+					#
+
+					listAssociationMiningItemSets = filter_item_sets(
+						list_item_sets = listExtractionItemSets,
+						mandatory_items = set([]),
+						allowed_items = set(['semantic_type', 'attribute_head', 'subj_head', 'obj_head', 'attribute_wn', 'subj_wn', 'obj_wn']),
+						remove_duplicates = True,
+						dict_openie_config = dictCHConfig
+						)
+
+					# debug
+					'''
+					for entry in listExtractionItemSets :
+						logger.info( 'T6 = ' + repr(entry) )
+					'''
+
+					# checkpoint the semantically mapped item sets, so association mining and RDF stages can be resumed without redoing lexicon work
+					logger.info( 'item set (semantic mapped) : ' + strItemSetFile )
+					write_item_set_file( filename = strItemSetFile, list_item_sets = listExtractionItemSets, dict_openie_config = dictCHConfig )
+
+					logger.info( 'item set for am : ' + strAMItemSetFile )
+					write_item_set_file( filename = strAMItemSetFile, list_item_sets = listAssociationMiningItemSets, dict_openie_config = dictCHConfig )
+
+					# manifest of artifact text hashes, so a later --delta run can find new and changed artifacts
+					write_artifact_manifest( filename = strManifestFile, dict_manifest = calc_artifact_hashes( dict_text = read_corpus_file( filename = strCorpusFile, dict_openie_config = dictCHConfig ) ), dict_openie_config = dictCHConfig )
+
+					checkpoint_lib.set_stage_complete( dict_checkpoints = dictCheckpoints, stage = 'item_sets', fingerprint = strFingerprint, list_output_files = [ strItemSetFile, strAMItemSetFile, strManifestFile ], filename = strCheckpointFile, dict_openie_config = dictCHConfig )
+
+			else :
+
+				#
+				# stage : merge
+				#
+
+				logger.info( '\n#\n# Gravitate - Merging Shards\n#' )
+
+				listShardFiles = []
+				for nShard in range( nMergeCount ) :
+					strShardDir = get_shard_dataset_dir( dataset_dir = strDatasetDir, shard_index = nShard, shard_count = nMergeCount )
+					listShardFiles.append( strShardDir + os.sep + os.path.basename( strItemSetFile ) )
+					listShardFiles.append( strShardDir + os.sep + os.path.basename( strManifestFile ) )
+
+				strFingerprint = checkpoint_lib.calc_stage_fingerprint(
+					stage = 'merge',
+					list_input_files = listShardFiles + dictStageDependencies['merge'],
+					list_settings = [ nMergeCount, strAMItemSetFile ] )
+
+				if checkpoint_lib.is_stage_current( dict_checkpoints = dictCheckpoints, stage = 'merge', fingerprint = strFingerprint, dict_openie_config = dictCHConfig ) == False :
+					checkpoint_lib.clear_stage( dict_checkpoints = dictCheckpoints, stage = 'merge', filename = strCheckpointFile )
+
+					merge_shards(
+						dataset_dir = strDatasetDir,
+						shard_count = nMergeCount,
+						item_set_file = strItemSetFile,
+						am_item_set_file = strAMItemSetFile,
+						manifest_file = strManifestFile,
+						dict_openie_config = dictCHConfig )
+
+					checkpoint_lib.set_stage_complete( dict_checkpoints = dictCheckpoints, stage = 'merge', fingerprint = strFingerprint, list_output_files = [ strItemSetFile, strAMItemSetFile, strManifestFile ], filename = strCheckpointFile, dict_openie_config = dictCHConfig )
+
+			listExtractionItemSets = []
+			if bTemplates == False :
+				listExtractionItemSets = read_item_set_file( filename = strItemSetFile, dict_openie_config = dictCHConfig )
+
+			# check we have items to process (a templates run stops once the templates are learnt, a shard stops here, association mining and RDF are run once on all shards by --merge)
+			if bTemplates == True :
+				logger.info( 'templates learnt in ' + strTemplateDir + '. run the shards with --shard=<k>/<N> (copy ' + strTemplateDir + os.sep + strTemplateFile + '_*.txt to each node)' )
+			elif bShard == True :
+				logger.info( 'shard ' + str(nShardIndex) + ' of ' + str(nShardCount) + ' complete (' + str(len(listExtractionItemSets)) + ' item sets). run --merge=' + str(nShardCount) + ' when all shards are complete' )
+			elif len(listExtractionItemSets) == 0 :
+				logger.info( 'Empty item set - cannot create RDF' )
+			else :
+
+				#
+				# stage : association mining
+				#
+
+				strFingerprint = checkpoint_lib.calc_stage_fingerprint(
+					stage = 'association_mining',
+					list_input_files = [ strAMItemSetFile, strAMScript ] + dictStageDependencies['association_mining'],
+					list_settings = [] )
+
+				if checkpoint_lib.is_stage_current( dict_checkpoints = dictCheckpoints, stage = 'association_mining', fingerprint = strFingerprint, dict_openie_config = dictCHConfig ) == False :
+					checkpoint_lib.clear_stage( dict_checkpoints = dictCheckpoints, stage = 'association_mining', filename = strCheckpointFile )
+
+					#
+					# (x) execute R script to perform association mining
+					#
+
+					execute_association_mining_item_sets(
+						filename_item_sets = strAMItemSetFile,
+						filename_rules = strAMRulesFile,
+						path_rscript = '/Program Files/R/R-3.4.4/bin/Rscript.exe',
+						path_am_script = strAMScript,
+						working_dir = '.',
+						dict_openie_config = dictCHConfig
+						)
+
+					checkpoint_lib.set_stage_complete( dict_checkpoints = dictCheckpoints, stage = 'association_mining', fingerprint = strFingerprint, list_output_files = [ strAMRulesFile ], filename = strCheckpointFile, dict_openie_config = dictCHConfig )
+
+				#
+				# stage : RDF
+				#
+
+				strFingerprint = checkpoint_lib.calc_stage_fingerprint(
+					stage = 'rdf',
+					list_input_files = [ strItemSetFile, strAMRulesFile ] + dictStageDependencies['rdf'],
+					list_settings = [ strOutputFileItemSet, strOutputFileProductions ] )
+
+				if checkpoint_lib.is_stage_current( dict_checkpoints = dictCheckpoints, stage = 'rdf', fingerprint = strFingerprint, dict_openie_config = dictCHConfig ) == False :
+					checkpoint_lib.clear_stage( dict_checkpoints = dictCheckpoints, stage = 'rdf', filename = strCheckpointFile )
+
+					#
+					# (x) read association mining rules and apply them to infer new relation schema mappings
+					#
+
+					listRules = import_association_mining_rules(
+						filename_rules = strAMRulesFile,
+						dict_openie_config = dictCHConfig
+						)
+
+					logger.info( 'sorted rules : ' + strSortedRulesFile )
+					writeHandle = codecs.open( strSortedRulesFile, 'w', 'utf-8', errors = 'replace' )
+					for entry in listRules :
+						writeHandle.write(
+							repr(entry[0][0]) + ' => ' + repr(entry[0][1])+ ' : ' + repr(entry[1:]) + '\n' )
+					writeHandle.write( '\n' )
+					writeHandle.close()
+
+					apply_association_mining_rules(
+						list_item_sets = listExtractionItemSets,
+						list_rules = listRules,
+						max_inferences = 3,
+						dict_openie_config = dictCHConfig
+						)
+					#
+					# (x) write final item sets as output
+					#
+
+					logger.info( 'item set : ' + strOutputFileItemSet )
+					write_item_set_file( filename = strOutputFileItemSet, list_item_sets = listExtractionItemSets, dict_openie_config = dictCHConfig )
+
+					#
+					# generate RDF for CH skos:Concept entries that can be read by ReseartchSpace
+					#
+					logger.info( 'Creating RDF productions for ResearchSpace' )
+
+					logger.info( 'productions: ' + strOutputFileProductions )
+					writeHandle = codecs.open( strOutputFileProductions, 'w', 'utf-8', errors = 'replace' )
+
+					strTurtle = cultural_heritage_parse_lib.item_set_to_CIDOC_CRM_RDF(
+						item_sets = listExtractionItemSets,
+						annotation_namespace = 'http://gravitate.org/id/',
+						graph_namespace = 'http://gravitate.org/id/NLP_algorithm/graph',
+						include_prefix = True,
+						# TODO capture s 's ies es NOT just a simple s at end
+						entity_stemmer = nltk.stem.RegexpStemmer('s$', 4),
+						dict_ch_config = dictCHConfig )
+					if len(strTurtle) > 0 :
+						writeHandle.write( strTurtle + '\n' )
+
+					writeHandle.write( '\n' )
+					writeHandle.close()
+
+					checkpoint_lib.set_stage_complete( dict_checkpoints = dictCheckpoints, stage = 'rdf', fingerprint = strFingerprint, list_output_files = [ strSortedRulesFile, strOutputFileItemSet, strOutputFileProductions ], filename = strCheckpointFile, dict_openie_config = dictCHConfig )
 
 	except :
 		logger.exception( 'ch_information_extraction_app main() exception' )
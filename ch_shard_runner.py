@@ -0,0 +1,142 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+/////////////////////////////////////////////////////////////////////////
+//
+// (c) Copyright University of Southampton IT Innovation, 2016
+//
+// Copyright in this software belongs to IT Innovation Centre of
+// Gamma House, Enterprise Road, Southampton SO16 7NS, UK.
+//
+// This software may not be used, sold, licensed, transferred, copied
+// or reproduced in whole or in part in any manner or form or in or
+// on any media by any person other than in accordance with the terms
+// of the Licence Agreement supplied with the software, or otherwise
+// without the prior written consent of the copyright owners.
+//
+// This software is distributed WITHOUT ANY WARRANTY, without even the
+// implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+// PURPOSE, except where stated in the Licence Agreement supplied with
+// the software.
+//
+//    Created By :    Stuart E. Middleton
+//    Created Date :    2018/11/28
+//    Created for Project:    GRAVITATE
+//
+/////////////////////////////////////////////////////////////////////////
+//
+// Dependencies: None
+//
+/////////////////////////////////////////////////////////////////////////
+"""
+
+import os, sys, logging, subprocess, time
+
+'''
+CH shard runner
+- learns the attrib_ie templates once on the whole corpus (--templates), then runs N shards of ch_information_extraction_app.py (--shard=k/N) as concurrent local processes that all extract with these templates, then --merge=N once they have all completed
+- each shard logs to its own file (e.g. CH_dataset_shard0of4.log) so the shard logs are not interleaved
+- shards share the nlp_cache_file and wordnet_cache_file SQLite databases. cache writes are short transactions and nlp_cache_lib waits up to nCacheLockTimeout seconds for a lock, so concurrent shards queue for the cache rather than failing
+- if any shard fails the merge is not run. fix the problem and re-run with --resume, so shards that completed are skipped by their checkpoints
+'''
+
+def run_shards( filename_config = None, shard_count = 1, resume = False, dataset_dir = 'CH_dataset', logger = None ) :
+	#
+	# start all shards, wait for them to finish and return a list of shard indexes that failed
+	#
+
+	listProcesses = []
+	for nShard in range( shard_count ) :
+		listCommand = [ sys.executable, 'ch_information_extraction_app.py', filename_config, '--shard=' + str(nShard) + '/' + str(shard_count) ]
+		if resume == True :
+			listCommand.append( '--resume' )
+
+		strLogFile = dataset_dir + '_shard' + str(nShard) + 'of' + str(shard_count) + '.log'
+		writeHandle = open( strLogFile, 'wb' )
+		logger.info( 'starting shard ' + str(nShard) + ' of ' + str(shard_count) + ' (log ' + strLogFile + ')' )
+		listProcesses.append( ( nShard, subprocess.Popen( listCommand, stdout = writeHandle, stderr = subprocess.STDOUT ), writeHandle ) )
+
+	listFailed = []
+	for ( nShard, processShard, writeHandle ) in listProcesses :
+		nReturnCode = processShard.wait()
+		writeHandle.close()
+		if nReturnCode != 0 :
+			logger.info( 'shard ' + str(nShard) + ' failed (exit code ' + str(nReturnCode) + ')' )
+			listFailed.append( nShard )
+		else :
+			logger.info( 'shard ' + str(nShard) + ' complete' )
+
+	return listFailed
+
+
+################################
+# main
+################################
+
+# only execute if this is the main file
+if __name__ == '__main__' :
+
+	#
+	# check args
+	#
+	if (len(sys.argv) < 3) or (not sys.argv[2].isdigit()) or (int( sys.argv[2] ) < 1) :
+		print 'Usage: ch_shard_runner.py <config file> <shard count> [--resume]\n'
+		sys.stdout.flush()
+		sys.exit(1)
+	if not os.path.isfile(sys.argv[1]) :
+		print '<config file> ' + sys.argv[1] + ' does not exist\n'
+		sys.stdout.flush()
+		sys.exit(1)
+	for strArg in sys.argv[3:] :
+		if not strArg in [ '--resume' ] :
+			print 'unknown option ' + strArg + '\n'
+			sys.stdout.flush()
+			sys.exit(1)
+
+	# make logger (global to STDOUT)
+	LOG_FORMAT = ('%(levelname) -s %(asctime)s %(message)s')
+	logger = logging.getLogger( __name__ )
+	logging.basicConfig( level=logging.INFO, format=LOG_FORMAT )
+	logger.info('logging started')
+
+	try :
+		# init
+		strConfigFile = sys.argv[1]
+		nShardCount = int( sys.argv[2] )
+		bResume = '--resume' in sys.argv[3:]
+
+		# templates are learnt once, so every shard extracts with the same templates
+		logger.info( '\n#\n# Gravitate - Learning CH templates\n#' )
+		listCommand = [ sys.executable, 'ch_information_extraction_app.py', strConfigFile, '--templates' ]
+		if bResume == True :
+			listCommand.append( '--resume' )
+		nReturnCode = subprocess.call( listCommand )
+		if nReturnCode != 0 :
+			raise Exception( 'templates run failed (exit code ' + str(nReturnCode) + '). shards not run' )
+
+		logger.info( '\n#\n# Gravitate - Running ' + str(nShardCount) + ' CH shards\n#' )
+
+		nTimeStart = time.time()
+		listFailed = run_shards( filename_config = strConfigFile, shard_count = nShardCount, resume = bResume, logger = logger )
+		logger.info( 'shards finished in ' + '%.1f' % ( time.time() - nTimeStart ) + ' seconds' )
+
+		if len(listFailed) > 0 :
+			raise Exception( 'shards ' + repr(listFailed) + ' failed, see their logs. merge not run' )
+
+		# association mining and RDF are run once over all shards
+		logger.info( '\n#\n# Gravitate - Merging ' + str(nShardCount) + ' CH shards\n#' )
+		nReturnCode = subprocess.call( [ sys.executable, 'ch_information_extraction_app.py', strConfigFile, '--merge=' + str(nShardCount) ] )
+		if nReturnCode != 0 :
+			raise Exception( 'merge failed (exit code ' + str(nReturnCode) + ')' )
+
+	except :
+		logger.exception( 'ch_shard_runner main() exception' )
+		sys.stderr.flush()
+		sys.stdout.flush()
+		sys.exit(1)
+
+	# all done
+	logger.info('finished')
+	sys.stdout.flush()
+	sys.exit(0);
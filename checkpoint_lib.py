@@ -0,0 +1,236 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+..
+	/////////////////////////////////////////////////////////////////////////
+	//
+	// (c) Copyright University of Southampton IT Innovation, 2018
+	//
+	// Copyright in this software belongs to IT Innovation Centre of
+	// Gamma House, Enterprise Road, Southampton SO16 7NS, UK.
+	//
+	// This software may not be used, sold, licensed, transferred, copied
+	// or reproduced in whole or in part in any manner or form or in or
+	// on any media by any person other than in accordance with the terms
+	// of the Licence Agreement supplied with the software, or otherwise
+	// without the prior written consent of the copyright owners.
+	//
+	// This software is distributed WITHOUT ANY WARRANTY, without even the
+	// implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+	// PURPOSE, except where stated in the Licence Agreement supplied with
+	// the software.
+	//
+	// Created By : Stuart E. Middleton
+	// Created Date : 2018/11/26
+	// Created for Project: GRAVITATE
+	//
+	/////////////////////////////////////////////////////////////////////////
+	//
+	// Dependancies: None
+	//
+	/////////////////////////////////////////////////////////////////////////
+	'''
+
+Stage checkpointing for multi-stage pipelines. each completed stage records a fingerprint of its inputs (file content hashes and settings) and hashes of its output files, so a resumed run can skip stages whose inputs are unchanged
+
+"""
+
+
+import os, sys, json, hashlib, codecs
+
+# read size when hashing files
+nHashBlockSize = 1048576
+
+def calc_file_hash( filename = None ) :
+	"""
+	calc a SHA1 hash of a file's content
+
+	:param str filename: file to hash
+
+	:return: SHA1 hex digest, or None if the file does not exist
+	:rtype: str
+	"""
+
+	if not isinstance( filename, (str,unicode) ) :
+		raise Exception( 'invalid filename' )
+
+	if not os.path.isfile( filename ) :
+		return None
+
+	hashObj = hashlib.sha1()
+	readHandle = open( filename, 'rb' )
+	try :
+		strBlock = readHandle.read( nHashBlockSize )
+		while len(strBlock) > 0 :
+			hashObj.update( strBlock )
+			strBlock = readHandle.read( nHashBlockSize )
+	finally :
+		readHandle.close()
+
+	return hashObj.hexdigest()
+
+def calc_stage_fingerprint( stage = None, list_input_files = [], list_settings = [] ) :
+	"""
+	calc a fingerprint for a stage from the content of its input files and the settings it runs with. a missing input file is fingerprinted as None.
+
+	:param str stage: stage name
+	:param list list_input_files: input filenames (including any code or config files the stage depends on)
+	:param list list_settings: JSON serializable settings the stage output depends on
+
+	:return: SHA1 hex digest
+	:rtype: str
+	"""
+
+	if not isinstance( stage, str ) :
+		raise Exception( 'invalid stage' )
+	if not isinstance( list_input_files, list ) :
+		raise Exception( 'invalid list_input_files' )
+	if not isinstance( list_settings, list ) :
+		raise Exception( 'invalid list_settings' )
+
+	listFileHashes = []
+	for strFile in list_input_files :
+		listFileHashes.append( [ strFile, calc_file_hash( filename = strFile ) ] )
+
+	strSerialized = json.dumps( [ stage, listFileHashes, list_settings ], ensure_ascii = True, separators = (',',':') )
+	return hashlib.sha1( strSerialized ).hexdigest()
+
+def read_checkpoints( filename = None ) :
+	"""
+	read a checkpoint file
+
+	:param str filename: checkpoint file (JSON)
+
+	:return: checkpoints = { stage : { 'fingerprint' : str, 'outputs' : { filename : SHA1 hex digest } } }. empty dict if the file does not exist.
+	:rtype: dict
+	"""
+
+	if not isinstance( filename, (str,unicode) ) :
+		raise Exception( 'invalid filename' )
+
+	if not os.path.isfile( filename ) :
+		return {}
+
+	readHandle = codecs.open( filename, 'r', 'utf-8', errors = 'replace' )
+	dictCheckpoints = json.loads( readHandle.read() )
+	readHandle.close()
+
+	if not isinstance( dictCheckpoints, dict ) :
+		raise Exception( 'checkpoint file not a JSON object : ' + filename )
+
+	return dictCheckpoints
+
+def write_checkpoints( filename = None, dict_checkpoints = None ) :
+	"""
+	write a checkpoint file. the file is written to a temp file and then moved, so an interrupted run never leaves a truncated checkpoint file.
+
+	:param str filename: checkpoint file (JSON)
+	:param dict dict_checkpoints: checkpoints from checkpoint_lib.read_checkpoints()
+	"""
+
+	if not isinstance( filename, (str,unicode) ) :
+		raise Exception( 'invalid filename' )
+	if not isinstance( dict_checkpoints, dict ) :
+		raise Exception( 'invalid dict_checkpoints' )
+
+	strTempFile = filename + '.tmp'
+	writeHandle = codecs.open( strTempFile, 'w', 'utf-8', errors = 'replace' )
+	writeHandle.write( json.dumps( dict_checkpoints, ensure_ascii = True, indent = 1, sort_keys = True ) + '\n' )
+	writeHandle.close()
+
+	# note: os.rename() will not overwrite an existing file on Windows
+	if os.path.isfile( filename ) :
+		os.remove( filename )
+	os.rename( strTempFile, filename )
+
+def is_stage_current( dict_checkpoints = None, stage = None, fingerprint = None, dict_openie_config = None ) :
+	"""
+	check if a stage can be skipped. a stage is current if it has a checkpoint with the same input fingerprint and all of its output files still exist with the content it wrote.
+
+	:param dict dict_checkpoints: checkpoints from checkpoint_lib.read_checkpoints()
+	:param str stage: stage name
+	:param str fingerprint: input fingerprint from checkpoint_lib.calc_stage_fingerprint()
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: True if stage is current and can be skipped
+	:rtype: bool
+	"""
+
+	if not isinstance( dict_checkpoints, dict ) :
+		raise Exception( 'invalid dict_checkpoints' )
+	if not isinstance( stage, str ) :
+		raise Exception( 'invalid stage' )
+	if not isinstance( fingerprint, str ) :
+		raise Exception( 'invalid fingerprint' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	if not stage in dict_checkpoints :
+		dict_openie_config['logger'].info( 'stage ' + stage + ' : no checkpoint' )
+		return False
+
+	if dict_checkpoints[stage]['fingerprint'] != fingerprint :
+		dict_openie_config['logger'].info( 'stage ' + stage + ' : inputs changed' )
+		return False
+
+	dictOutputs = dict_checkpoints[stage]['outputs']
+	for strFile in dictOutputs :
+		if calc_file_hash( filename = strFile ) != dictOutputs[strFile] :
+			dict_openie_config['logger'].info( 'stage ' + stage + ' : output missing or changed : ' + strFile )
+			return False
+
+	dict_openie_config['logger'].info( 'stage ' + stage + ' : inputs unchanged, skipping' )
+	return True
+
+def clear_stage( dict_checkpoints = None, stage = None, filename = None ) :
+	"""
+	remove a stage checkpoint before the stage is run, so a failed run is never mistaken for a completed one
+
+	:param dict dict_checkpoints: checkpoints from checkpoint_lib.read_checkpoints()
+	:param str stage: stage name
+	:param str filename: checkpoint file (JSON)
+	"""
+
+	if not isinstance( dict_checkpoints, dict ) :
+		raise Exception( 'invalid dict_checkpoints' )
+
+	if stage in dict_checkpoints :
+		del dict_checkpoints[stage]
+		write_checkpoints( filename = filename, dict_checkpoints = dict_checkpoints )
+
+def set_stage_complete( dict_checkpoints = None, stage = None, fingerprint = None, list_output_files = [], filename = None, dict_openie_config = None ) :
+	"""
+	record a completed stage checkpoint and write the checkpoint file
+
+	:param dict dict_checkpoints: checkpoints from checkpoint_lib.read_checkpoints()
+	:param str stage: stage name
+	:param str fingerprint: input fingerprint from checkpoint_lib.calc_stage_fingerprint()
+	:param list list_output_files: output filenames written by this stage
+	:param str filename: checkpoint file (JSON)
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+	"""
+
+	if not isinstance( dict_checkpoints, dict ) :
+		raise Exception( 'invalid dict_checkpoints' )
+	if not isinstance( stage, str ) :
+		raise Exception( 'invalid stage' )
+	if not isinstance( fingerprint, str ) :
+		raise Exception( 'invalid fingerprint' )
+	if not isinstance( list_output_files, list ) :
+		raise Exception( 'invalid list_output_files' )
+
+	dictOutputs = {}
+	for strFile in list_output_files :
+		strHash = calc_file_hash( filename = strFile )
+		if strHash == None :
+			raise Exception( 'stage ' + stage + ' output file missing : ' + strFile )
+		dictOutputs[strFile] = strHash
+
+	dict_checkpoints[stage] = {
+		'fingerprint' : fingerprint,
+		'outputs' : dictOutputs,
+		}
+	write_checkpoints( filename = filename, dict_checkpoints = dict_checkpoints )
+
+	dict_openie_config['logger'].info( 'stage ' + stage + ' : checkpoint written' )
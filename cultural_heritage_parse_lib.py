@@ -37,9 +37,9 @@ Cultural heritage parsing functions
 """
 
 
-import os, re, sys, copy, collections, codecs, string, ConfigParser, traceback, datetime, time, math, urllib
+import os, re, sys, copy, collections, codecs, string, ConfigParser, traceback, datetime, time, math, urllib, hashlib
 import nltk, nltk.stem.porter, nltk.corpus, numpy
-import openiepy, lexicopy, cultural_heritage_patterns_regex
+import openiepy, lexicopy, cultural_heritage_patterns_regex, wordnet_closure_lib, lexicon_matcher_lib
 
 def get_cultural_heritage_config( **kwargs ) :
 	"""
@@ -72,6 +72,9 @@ def get_cultural_heritage_config( **kwargs ) :
 	# setup common values
 	dict_cultural_heritage_config = openiepy.openie_lib.get_openie_config( **dictArgs )
 
+	# WordNet category index, so each lemma is classified once (see get_wordnet_category_mask())
+	dict_cultural_heritage_config['wordnet_category_cache'] = lexicon_matcher_lib.open_lookup_cache( max_entries = nWordNetCategoryCacheMax )
+
 	# all done
 	return dict_cultural_heritage_config
 
@@ -103,9 +106,195 @@ def generate_entity_node_name( namespace = None, entity_phrase = None, dict_ch_c
 		else :
 			return namespace + ':' + urllib.quote_plus( strEntityNode.encode('utf-8') )
 
+def generate_extract_event_node_name( artifact_uri = None, event_index = 1 ) :
+	"""
+	generate a node name for an extraction event based on the artifact URI (so the same artifact gets the same event node in every RDF file and service response)
+
+	:param unicode artifact_uri: URI of the artifact the extraction event is about
+	:param int event_index: index of the extraction event for this artifact (1 for the first)
+
+	:return node name extract_event_<sha1 of artifact URI>_<event index>
+	:rtype str
+	"""
+
+	if isinstance( artifact_uri, unicode ) :
+		artifact_uri = artifact_uri.encode('utf-8')
+	return 'extract_event_' + hashlib.sha1( artifact_uri ).hexdigest() + '_' + str(event_index)
+
+# CH entity categories assigned from WordNet noun hypernyms (bits of a category mask)
+nWordNetCategoryColour = 1
+nWordNetCategoryPart = 2
+nWordNetCategoryDecoration = 4
+nWordNetCategorySymbol = 8
+
+# mapping table of WordNet noun hypernyms for each category (hard coded for now)
+# listWordNetCategories = [ ( category bit, [ ( <syn-name>.<lemma-name>, max_depth ), ... ] ), ... ]
+# an entity is in a category if any of the hypernym lemma is inherited within max_depth (0 = direct hypernyms only)
+listWordNetCategories = [
+	( nWordNetCategoryColour, [ ( 'color.n.01.colour', 20 ) ] ),
+	( nWordNetCategoryPart, [ ( 'part.n.02.part', 20 ), ( 'part.n.03.part', 20 ) ] ),
+	( nWordNetCategoryDecoration, [ ( 'decoration.n.01.decoration', 20 ) ] ),
+	( nWordNetCategorySymbol, [ ( 'symbol.n.01.symbol', 0 ), ( 'letter.n.01.letter', 20 ), ( 'number.n.02.number', 20 ) ] ),
+	]
+
+# max number of lemma in the WordNet category index held on a CH config (LRU eviction, so a long running service does not grow without bound)
+nWordNetCategoryCacheMax = 100000
+
+# category masks of synsets in a WordNet closure table = { ( closure filename, synset_id ) : category mask }
+dictSynsetCategoryMask = {}
+
+def calc_wordnet_category_mask( dict_hypernyms = {} ) :
+	"""
+	calc a category mask from the inherited hypernym lemma of an entity
+
+	:param dict dict_hypernyms: hypernym lemma inherited for each max_depth in listWordNetCategories = { max_depth : set([ <syn-name>.<lemma-name>, ... ]) }
+
+	:return: category mask (OR of nWordNetCategory... bits)
+	:rtype: int
+	"""
+
+	nMask = 0
+	for ( nCategory, listHypernyms ) in listWordNetCategories :
+		for ( strLemma, nDepth ) in listHypernyms :
+			if strLemma in dict_hypernyms[nDepth] :
+				nMask = nMask | nCategory
+				break
+	return nMask
+
+def get_synset_category_mask( wordnet_closure = None, synset_id = None ) :
+	"""
+	return the category mask of a noun synset in a WordNet closure table (calculated once per synset)
+
+	:param dict wordnet_closure: closure table handle returned from wordnet_closure_lib.open_wordnet_closure()
+	:param int synset_id: synset ID
+
+	:return: category mask (OR of nWordNetCategory... bits)
+	:rtype: int
+	"""
+
+	tupleKey = ( wordnet_closure['filename'], synset_id )
+	if not tupleKey in dictSynsetCategoryMask :
+		dictHypernyms = {}
+		for ( nCategory, listHypernyms ) in listWordNetCategories :
+			for ( strLemma, nDepth ) in listHypernyms :
+				if not nDepth in dictHypernyms :
+					dictHypernyms[nDepth] = set([])
+					wordnet_closure_lib.inherited_hypernyms( set_lexicon = dictHypernyms[nDepth], wordnet_closure = wordnet_closure, synset_id = synset_id, pos='n', max_depth=nDepth )
+		dictSynsetCategoryMask[tupleKey] = calc_wordnet_category_mask( dict_hypernyms = dictHypernyms )
+
+	return dictSynsetCategoryMask[tupleKey]
+
+def get_wordnet_category_cache( dict_ch_config = None ) :
+	"""
+	return the WordNet category index held on a CH config (dict_ch_config['wordnet_category_cache'], made on first use), and the WordNet source its keys are made from
+
+	:param dict dict_ch_config: config object returned from cultural_heritage_parse_lib.get_cultural_heritage_config()
+
+	:return: ( cache handle returned from lexicon_matcher_lib.open_lookup_cache(), WordNet source = closure filename or nltk )
+	:rtype: tuple
+	"""
+
+	if not 'wordnet_category_cache' in dict_ch_config :
+		dict_ch_config['wordnet_category_cache'] = lexicon_matcher_lib.open_lookup_cache( max_entries = nWordNetCategoryCacheMax )
+
+	dictClosure = dict_ch_config.get( 'wordnet_closure' )
+	if dictClosure != None :
+		return ( dict_ch_config['wordnet_category_cache'], dictClosure['filename'] )
+	else :
+		return ( dict_ch_config['wordnet_category_cache'], 'nltk' )
+
+def calc_lemma_category_mask( lemma = None, dict_ch_config = None ) :
+	"""
+	classify a lemma from its noun hypernyms (no WordNet category index lookup).
+	the precomputed WordNet closure table in dict_ch_config['wordnet_closure'] is used if set (see wordnet_closure_lib), otherwise NLTK WordNet.
+
+	:param unicode lemma: lemma to classify, lowercase and stripped (e.g. sherd)
+	:param dict dict_ch_config: config object returned from cultural_heritage_parse_lib.get_cultural_heritage_config()
+
+	:return: category mask (OR of nWordNetCategory... bits, 0 if lemma is in no category or not in WordNet)
+	:rtype: int
+	"""
+
+	dictClosure = dict_ch_config.get( 'wordnet_closure' )
+	if dictClosure != None :
+		# a synset mask is a closure lookup, and the mask of a lemma is the OR of its synset masks
+		nMask = 0
+		for nSynsetID in wordnet_closure_lib.get_synset_ids( wordnet_closure = dictClosure, lemma = lemma, pos='n' ) :
+			nMask = nMask | get_synset_category_mask( wordnet_closure = dictClosure, synset_id = nSynsetID )
+		return nMask
+
+	# compile a list of noun hypernyms for each max_depth
+	# dictHypernyms = { max_depth : set([ <syn-name>.<lemma-name>, ... ]) }
+	listSynsets = lexicopy.wordnet_lib.get_synset_names( lemma, pos='n', dict_lexicon_config = dict_ch_config )
+	dictHypernyms = {}
+	for ( nCategory, listHypernyms ) in listWordNetCategories :
+		for ( strHyperLemma, nDepth ) in listHypernyms :
+			dictHypernyms[nDepth] = set([])
+
+	for syn in listSynsets :
+		for nDepth in dictHypernyms :
+			lexicopy.wordnet_lib.inherited_hypernyms( set_lexicon = dictHypernyms[nDepth], syn = syn, lang = 'eng', pos='n', max_depth=nDepth, depth=0, dict_lexicon_config = dict_ch_config )
+
+	return calc_wordnet_category_mask( dict_hypernyms = dictHypernyms )
+
+def get_wordnet_category_mask( lemma = None, dict_ch_config = None ) :
+	"""
+	return the category mask of a lemma from the WordNet category index, classifying it from its noun hypernyms if it has not been seen before.
+	the index is dict_ch_config['wordnet_category_cache'] (made by get_cultural_heritage_config(), or on first use), keyed on the WordNet source (closure filename or nltk) and lemma.
+
+	:param unicode lemma: lemma to classify (e.g. sherd)
+	:param dict dict_ch_config: config object returned from cultural_heritage_parse_lib.get_cultural_heritage_config()
+
+	:return: category mask (OR of nWordNetCategory... bits, 0 if lemma is in no category or not in WordNet)
+	:rtype: int
+	"""
+
+	if not isinstance( lemma, (str,unicode) ) :
+		raise Exception( 'invalid lemma' )
+	if not isinstance( dict_ch_config, dict ) :
+		raise Exception( 'invalid dict_ch_config' )
 
+	return classify_wordnet_categories( list_entities = [ ( lemma, None ) ], dict_ch_config = dict_ch_config )[0]
+
+def classify_wordnet_categories( list_entities = [], dict_ch_config = None ) :
+	"""
+	classify all the entities of a document in one call, using the WordNet category index. each unique lemma is looked up in the index once, and lemma not in the index are classified once and stored together.
+	the returned masks can be passed to annotation_entity_CIDOC_CRM_RELIC( wordnet_category_mask = ... ).
+
+	:param list list_entities: entities to classify = [ ( entity_phrase, entity_super_class ), ... ] where entity_super_class can be None. the super class (head) is used for lookup if there is one, as in annotation_entity_CIDOC_CRM_RELIC().
+	:param dict dict_ch_config: config object returned from cultural_heritage_parse_lib.get_cultural_heritage_config()
 
-def annotation_entity_CIDOC_CRM_RELIC( entity_phrase = None, entity_super_class = None, entity_lexicon_uri = None, entity_lexicon_schema = None, crm_thing_uri = None, extract_event_node = None, context_obj = None, check_wordnet = True, check_schema = True, entity_stemmer = None, dict_ch_config = None ) :
+	:return: category mask for each entity = [ mask, ... ]
+	:rtype: list
+	"""
+
+	if not isinstance( list_entities, list ) :
+		raise Exception( 'invalid list_entities' )
+	if not isinstance( dict_ch_config, dict ) :
+		raise Exception( 'invalid dict_ch_config' )
+
+	( dictCache, strSource ) = get_wordnet_category_cache( dict_ch_config = dict_ch_config )
+
+	listKeys = []
+	for ( strEntityPhrase, strEntitySuperClass ) in list_entities :
+		strPhraseToLookup = strEntityPhrase
+		if strEntitySuperClass != None :
+			strPhraseToLookup = strEntitySuperClass
+		listKeys.append( ( strSource, strPhraseToLookup.lower().strip() ) )
+
+	dictMasks = lexicon_matcher_lib.lookup_cache_get( dict_cache = dictCache, list_keys = list( set( listKeys ) ) )
+
+	dictNew = {}
+	for tupleKey in listKeys :
+		if (not tupleKey in dictMasks) and (not tupleKey in dictNew) :
+			dictNew[tupleKey] = calc_lemma_category_mask( lemma = tupleKey[1], dict_ch_config = dict_ch_config )
+	if len(dictNew) > 0 :
+		lexicon_matcher_lib.lookup_cache_store( dict_cache = dictCache, dict_entries = dictNew )
+		dictMasks.update( dictNew )
+
+	return [ dictMasks[tupleKey] for tupleKey in listKeys ]
+
+def annotation_entity_CIDOC_CRM_RELIC( entity_phrase = None, entity_super_class = None, entity_lexicon_uri = None, entity_lexicon_schema = None, crm_thing_uri = None, extract_event_node = None, context_obj = None, check_wordnet = True, check_schema = True, entity_stemmer = None, wordnet_category_mask = None, dict_ch_config = None ) :
 	"""
 	generate context based on an entity extraction lookup in some semantic mapping tables. context is used in annotation_object_CIDOC_CRM() to assert annotation about a thing.
 
@@ -123,7 +312,8 @@ def annotation_entity_CIDOC_CRM_RELIC( entity_phrase = None, entity_super_class
 	:param bool check_wordnet: if True check wordnet mapping table
 	:param bool check_schema: if True check wordnet mapping table
 	:param nltk.stem.api.StemmerI entity_stemmer: NLTK stemmer, default is None
-	:param dict dict_ch_config: config object returned from cultural_heritage_parse_lib.get_cultural_heritage_config()
+	:param int wordnet_category_mask: category mask for this entity from classify_wordnet_categories(), or None to look it up in the WordNet category index
+	:param dict dict_ch_config: config object returned from cultural_heritage_parse_lib.get_cultural_heritage_config(). if dict_ch_config['wordnet_closure'] is set to a wordnet_closure_lib.open_wordnet_closure() handle it is used for WordNet lookups.
 	"""
 
 	# check args without defaults
@@ -147,6 +337,8 @@ def annotation_entity_CIDOC_CRM_RELIC( entity_phrase = None, entity_super_class
 		raise Exception( 'invalid check_schema' )
 	if not isinstance( entity_stemmer, (nltk.stem.api.StemmerI,type(None)) ) :
 		raise Exception( 'invalid check_schema' )
+	if not isinstance( wordnet_category_mask, (int,type(None)) ) :
+		raise Exception( 'invalid wordnet_category_mask' )
 	if not isinstance( dict_ch_config, dict ) :
 		raise Exception( 'invalid dict_ch_config' )
 
@@ -216,23 +408,11 @@ def annotation_entity_CIDOC_CRM_RELIC( entity_phrase = None, entity_super_class
 		if entity_super_class != None :
 			strPhraseToLookup = entity_super_class
 
-		# compile a list of noun hypernyms
-		# setHyper = set([ <syn-name>.<lemma-name>, ... ])
-		listSynsets = lexicopy.wordnet_lib.get_synset_names( strPhraseToLookup.lower().strip(), pos='n', dict_lexicon_config = dict_ch_config )
-		setHyper = set([])
-		setHyperDirect = set([])
-
-		for syn in listSynsets :
-			# add lemma for this term
-			#lexicopy.wordnet_lib.get_lemma( set_lexicon = setHyper, syn = syn, lang = 'eng', dict_lexicon_config = dict_ch_config )
-
-			# add lemma for all hypernyms of this term
-			lexicopy.wordnet_lib.inherited_hypernyms( set_lexicon = setHyper, syn = syn, lang = 'eng', pos='n', max_depth=20, depth=0, dict_lexicon_config = dict_ch_config )
-
-			# add lemma for all hypernyms of this term (direct only)
-			lexicopy.wordnet_lib.inherited_hypernyms( set_lexicon = setHyperDirect, syn = syn, lang = 'eng', pos='n', max_depth=0, depth=0, dict_lexicon_config = dict_ch_config )
-
-		#dict_ch_config['logger'].info( repr(setHyper) )
+		# category mask from the noun hypernyms of this term (see listWordNetCategories)
+		# use the mask precomputed by classify_wordnet_categories() if there is one, otherwise the WordNet category index (a dict lookup for a lemma seen before)
+		nCategoryMask = wordnet_category_mask
+		if nCategoryMask == None :
+			nCategoryMask = get_wordnet_category_mask( lemma = strPhraseToLookup, dict_ch_config = dict_ch_config )
 
 		# colours
 		# <http://collection.britishmuseum.org/id/object/GAA42933> crm:P43_has_dimension grav:colour_red
@@ -242,7 +422,7 @@ def annotation_entity_CIDOC_CRM_RELIC( entity_phrase = None, entity_super_class
 		# grav:colour_type rdf:type crm:E55_Type
 		# grav:colour_type rdf:type skos:Concept
 		# grav:colour_type rdfs:label "colour"
-		if 'color.n.01.colour' in setHyper :
+		if nCategoryMask & nWordNetCategoryColour :
 			if not 'object_colour' in context_obj :
 				context_obj[ 'object_colour' ] = []
 			context_obj[ 'object_colour' ].append( ( strEntityPhraseSafe, context_obj['var_addr'], context_obj['sent_index'], strEntityNode, extract_event_node, strSuperEntityPhraseSafe, strSuperEntityNode ) )
@@ -252,7 +432,7 @@ def annotation_entity_CIDOC_CRM_RELIC( entity_phrase = None, entity_super_class
 		# grav:feature_hand rdf:type crm:E26_Physical_Feature
 		# grav:feature_hand rdfs:label "hand"
 		# TODO USE CHAP ONTOLOGY
-		if ('part.n.02.part' in setHyper) or ('part.n.03.part' in setHyper) :
+		if nCategoryMask & nWordNetCategoryPart :
 			if not 'object_part' in context_obj :
 				context_obj[ 'object_part' ] = []
 			context_obj[ 'object_part' ].append( ( strEntityPhraseSafe, context_obj['var_addr'], context_obj['sent_index'], strEntityNode, extract_event_node, strSuperEntityPhraseSafe, strSuperEntityNode ) )
@@ -262,13 +442,13 @@ def annotation_entity_CIDOC_CRM_RELIC( entity_phrase = None, entity_super_class
 		# grav:feature_spiral rdf:type crm:E36_Visual_Item
 		# grav:feature_spiral rdfs:label "spiral"
 		# TODO USE CHAP ONTOLOGY
-		if 'decoration.n.01.decoration' in setHyper :
+		if nCategoryMask & nWordNetCategoryDecoration :
 			if not 'object_decoration' in context_obj :
 				context_obj[ 'object_decoration' ] = []
 			context_obj[ 'object_decoration' ].append( ( strEntityPhraseSafe, context_obj['var_addr'], context_obj['sent_index'], strEntityNode, extract_event_node, strSuperEntityPhraseSafe, strSuperEntityNode ) )
 
 		# symbols such as numbers and letters (e.g. alpha) or other symbols (direct hypernym only)
-		if ('symbol.n.01.symbol' in setHyperDirect) or ('letter.n.01.letter' in setHyper) or ('number.n.02.number' in setHyper) :
+		if nCategoryMask & nWordNetCategorySymbol :
 			if not 'object_symbol' in context_obj :
 				context_obj[ 'object_symbol' ] = []
 			context_obj[ 'object_symbol' ].append( ( strEntityPhraseSafe, context_obj['var_addr'], context_obj['sent_index'], strEntityNode, extract_event_node, strSuperEntityPhraseSafe, strSuperEntityNode ) )
@@ -533,7 +713,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 		dictArtifact[strArtifactURI].append( [ listObj, listObjHead, listSemanticType, listSubj, listSubjHead ] )
 
 	# create a NLP extraction event for each artifact
-	nExtractionEventCount = 0
+	# note: event nodes are named from the artifact URI not a counter, so RDF from separate calls (delta runs, service requests) does not collide
 
 	listTurtle.append( 'ann:NLP_algorithm rdf:type crm:E39_Actor .' )
 
@@ -569,15 +749,15 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 
 
 	for strURI in dictArtifact :
-		nExtractionEventCount = nExtractionEventCount + 1
+		strExtractionEvent = 'ann:' + generate_extract_event_node_name( artifact_uri = strURI, event_index = 1 )
 
 		#
 		# <artifact> crm:P140i_was_attributed_by <extraction_event>
 		#
-		listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' rdf:type crm:E13_Attribute_Assignment .' )
-		listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P140_assigned_attribute_to <' + strURI + '> .' )
-		listTurtle.append( '<' + strURI + '> crm:P140i_was_attributed_by ann:extract_event' +  str(nExtractionEventCount) + ' .' )
-		listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P14_carried_out_by ann:NLP_algorithm .' )
+		listTurtle.append( strExtractionEvent + ' rdf:type crm:E13_Attribute_Assignment .' )
+		listTurtle.append( strExtractionEvent + ' crm:P140_assigned_attribute_to <' + strURI + '> .' )
+		listTurtle.append( '<' + strURI + '> crm:P140i_was_attributed_by ' + strExtractionEvent + ' .' )
+		listTurtle.append( strExtractionEvent + ' crm:P14_carried_out_by ann:NLP_algorithm .' )
 
 		# loop in each extraction
 		for ( listObj, listObjHead, listSemanticType, listSubj, listSubjHead ) in dictArtifact[strURI] :
@@ -628,7 +808,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 					listTurtle.append( 'ann:feature_' + strEntity + ' rdf:type skos:Concept .' )
 					listTurtle.append( 'ann:feature_' + strEntity + ' rdfs:label "' + strLabel + '" .' )
 					listTurtle.append( 'ann:feature_' + strEntity + ' skos:prefLabel "' + strLabel + '" .' )
-					listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:feature_' + strEntity + ' .' )
+					listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:feature_' + strEntity + ' .' )
 					listTurtle.append( '<' + strURI + '> crm:P56_bears_feature ann:feature_' + strEntity + ' .' )
 
 					if len(listObjHeadEntities) > 0 :
@@ -638,7 +818,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 							listTurtle.append( 'ann:feature_' + strEntityHead + ' rdfs:label "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:feature_' + strEntityHead + ' skos:prefLabel "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:feature_' +strEntity + ' skos:broader ann:feature_' + strEntityHead + ' .' )
-							listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:feature_' + strEntityHead + ' .' )
+							listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:feature_' + strEntityHead + ' .' )
 
 							listTurtle.append( 'ann:feature_' +strEntityHead + ' skos:broader ann:part_type .' )
 					else :
@@ -651,7 +831,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 					listTurtle.append( 'ann:feature_' + strEntity + ' rdf:type skos:Concept .' )
 					listTurtle.append( 'ann:feature_' + strEntity + ' rdfs:label "' + strLabel + '" .' )
 					listTurtle.append( 'ann:feature_' + strEntity + ' skos:prefLabel "' + strLabel + '" .' )
-					listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:feature_' + strEntity + ' .' )
+					listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:feature_' + strEntity + ' .' )
 					listTurtle.append( '<' + strURI + '> crm:P56_bears_feature ann:feature_' + strEntity + ' .' )
 
 					if len(listSubjHeadEntities) > 0 :
@@ -661,7 +841,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 							listTurtle.append( 'ann:feature_' + strEntityHead + ' rdfs:label "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:feature_' + strEntityHead + ' skos:prefLabel "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:feature_' +strEntity + ' skos:broader ann:feature_' + strEntityHead + ' .' )
-							listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:feature_' + strEntityHead + ' .' )
+							listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:feature_' + strEntityHead + ' .' )
 
 							listTurtle.append( 'ann:feature_' +strEntityHead + ' skos:broader ann:part_type .' )
 					else :
@@ -678,7 +858,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 					listTurtle.append( 'ann:decoration_' + strEntity + ' rdf:type skos:Concept .' )
 					listTurtle.append( 'ann:decoration_' + strEntity + ' rdfs:label "' + strLabel + '" .' )
 					listTurtle.append( 'ann:decoration_' + strEntity + ' skos:prefLabel "' + strLabel + '" .' )
-					listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:decoration_' + strEntity + ' .' )
+					listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:decoration_' + strEntity + ' .' )
 					listTurtle.append( '<' + strURI + '> crm:P65_shows_visual_item ann:decoration_' + strEntity + ' .' )
 
 					if len(listObjHeadEntities) > 0 :
@@ -688,7 +868,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 							listTurtle.append( 'ann:decoration_' + strEntityHead + ' rdfs:label "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:decoration_' + strEntityHead + ' skos:prefLabel "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:decoration_' +strEntity + ' skos:broader ann:decoration_' + strEntityHead + ' .' )
-							listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:decoration_' + strEntityHead + ' .' )
+							listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:decoration_' + strEntityHead + ' .' )
 
 							listTurtle.append( 'ann:decoration_' +strEntityHead + ' skos:broader ann:decoration_type .' )
 					else :
@@ -701,7 +881,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 					listTurtle.append( 'ann:decoration_' + strEntity + ' rdf:type skos:Concept .' )
 					listTurtle.append( 'ann:decoration_' + strEntity + ' rdfs:label "' + strLabel + '" .' )
 					listTurtle.append( 'ann:decoration_' + strEntity + ' skos:prefLabel "' + strLabel + '" .' )
-					listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:decoration_' + strEntity + ' .' )
+					listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:decoration_' + strEntity + ' .' )
 					listTurtle.append( '<' + strURI + '> crm:P65_shows_visual_item ann:decoration_' + strEntity + ' .' )
 
 					if len(listSubjHeadEntities) > 0 :
@@ -711,7 +891,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 							listTurtle.append( 'ann:decoration_' + strEntityHead + ' rdfs:label "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:decoration_' + strEntityHead + ' skos:prefLabel "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:decoration_' +strEntity + ' skos:broader ann:decoration_' + strEntityHead + ' .' )
-							listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:decoration_' + strEntityHead + ' .' )
+							listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:decoration_' + strEntityHead + ' .' )
 
 							listTurtle.append( 'ann:decoration_' +strEntityHead + ' skos:broader ann:decoration_type .' )
 					else :
@@ -728,7 +908,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 					listTurtle.append( 'ann:colour_' + strEntity + ' rdfs:label "' + strLabel + '" .' )
 					listTurtle.append( 'ann:colour_' + strEntity + ' skos:prefLabel "' + strLabel + '" .' )
 					listTurtle.append( 'ann:colour_' + strEntity + ' crm:P2_has_type ann:colour_type .' )
-					listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:colour_' + strEntity + ' .' )
+					listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:colour_' + strEntity + ' .' )
 					listTurtle.append( '<' + strURI + '> crm:P43_has_dimension ann:colour_' + strEntity + ' .' )
 
 					if len(listObjHeadEntities) > 0 :
@@ -739,7 +919,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 							listTurtle.append( 'ann:colour_' + strEntityHead + ' skos:prefLabel "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:colour_' + strEntityHead + ' crm:P2_has_type ann:colour_type .' )
 							listTurtle.append( 'ann:colour_' +strEntity + ' skos:broader ann:colour_' + strEntityHead + ' .' )
-							listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:colour_' + strEntityHead + ' .' )
+							listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:colour_' + strEntityHead + ' .' )
 
 							listTurtle.append( 'ann:colour_' +strEntityHead + ' skos:broader ann:colour_type .' )
 					else :
@@ -753,7 +933,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 					listTurtle.append( 'ann:colour_' + strEntity + ' rdfs:label "' + strLabel + '" .' )
 					listTurtle.append( 'ann:colour_' + strEntity + ' skos:prefLabel "' + strLabel + '" .' )
 					listTurtle.append( 'ann:colour_' + strEntity + ' crm:P2_has_type ann:colour_type .' )
-					listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:colour_' + strEntity + ' .' )
+					listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:colour_' + strEntity + ' .' )
 					listTurtle.append( '<' + strURI + '> crm:P43_has_dimension ann:colour_' + strEntity + ' .' )
 
 					if len(listSubjHeadEntities) > 0 :
@@ -764,7 +944,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 							listTurtle.append( 'ann:colour_' + strEntityHead + ' skos:prefLabel "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:colour_' + strEntityHead + ' crm:P2_has_type ann:colour_type .' )
 							listTurtle.append( 'ann:colour_' +strEntity + ' skos:broader ann:colour_' + strEntityHead + ' .' )
-							listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:colour_' + strEntityHead + ' .' )
+							listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:colour_' + strEntityHead + ' .' )
 
 							listTurtle.append( 'ann:colour_' +strEntityHead + ' skos:broader ann:colour_type .' )
 					else :
@@ -782,7 +962,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 					listTurtle.append( 'ann:symbol_' + strEntity + ' rdf:type skos:Concept .' )
 					listTurtle.append( 'ann:symbol_' + strEntity + ' rdfs:label "' + strLabel + '" .' )
 					listTurtle.append( 'ann:symbol_' + strEntity + ' skos:prefLabel "' + strLabel + '" .' )
-					listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:symbol_' + strEntity + ' .' )
+					listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:symbol_' + strEntity + ' .' )
 					listTurtle.append( '<' + strURI + '> crm:P128_carries ann:symbol_' + strEntity + ' .' )
 
 					if len(listObjHeadEntities) > 0 :
@@ -792,7 +972,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 							listTurtle.append( 'ann:symbol_' + strEntityHead + ' rdfs:label "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:symbol_' + strEntityHead + ' skos:prefLabel "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:symbol_' +strEntity + ' skos:broader ann:symbol_' + strEntityHead + ' .' )
-							listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:symbol_' + strEntityHead + ' .' )
+							listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:symbol_' + strEntityHead + ' .' )
 
 							listTurtle.append( 'ann:symbol_' +strEntityHead + ' skos:broader ann:symbol_type .' )
 					else :
@@ -805,7 +985,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 					listTurtle.append( 'ann:symbol_' + strEntity + ' rdf:type skos:Concept .' )
 					listTurtle.append( 'ann:symbol_' + strEntity + ' rdfs:label "' + strLabel + '" .' )
 					listTurtle.append( 'ann:symbol_' + strEntity + ' skos:prefLabel "' + strLabel + '" .' )
-					listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:symbol_' + strEntity + ' .' )
+					listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:symbol_' + strEntity + ' .' )
 					listTurtle.append( '<' + strURI + '> crm:P128_carries ann:symbol_' + strEntity + ' .' )
 
 					if len(listSubjHeadEntities) > 0 :
@@ -815,7 +995,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 							listTurtle.append( 'ann:symbol_' + strEntityHead + ' rdfs:label "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:symbol_' + strEntityHead + ' skos:prefLabel "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:symbol_' +strEntity + ' skos:broader ann:symbol_' + strEntityHead + ' .' )
-							listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:symbol_' + strEntityHead + ' .' )
+							listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:symbol_' + strEntityHead + ' .' )
 
 							listTurtle.append( 'ann:symbol_' +strEntityHead + ' skos:broader ann:symbol_type .' )
 					else :
@@ -831,7 +1011,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 					listTurtle.append( 'ann:shape_' + strEntity + ' rdf:type skos:Concept .' )
 					listTurtle.append( 'ann:shape_' + strEntity + ' rdfs:label "' + strLabel + '" .' )
 					listTurtle.append( 'ann:shape_' + strEntity + ' skos:prefLabel "' + strLabel + '" .' )
-					listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:shape_' + strEntity + ' .' )
+					listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:shape_' + strEntity + ' .' )
 
 					if len(listObjHeadEntities) > 0 :
 						for (strEntityHead, strLabelHead) in listObjHeadEntities :
@@ -840,7 +1020,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 							listTurtle.append( 'ann:shape_' + strEntityHead + ' rdfs:label "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:shape_' + strEntityHead + ' skos:prefLabel "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:shape_' +strEntity + ' skos:broader ann:shape_' + strEntityHead + ' .' )
-							listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:shape_' + strEntityHead + ' .' )
+							listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:shape_' + strEntityHead + ' .' )
 
 							listTurtle.append( 'ann:shape_' +strEntityHead + ' skos:broader ann:shape_type .' )
 					else :
@@ -853,7 +1033,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 					listTurtle.append( 'ann:shape_' + strEntity + ' rdf:type skos:Concept .' )
 					listTurtle.append( 'ann:shape_' + strEntity + ' rdfs:label "' + strLabel + '" .' )
 					listTurtle.append( 'ann:shape_' + strEntity + ' skos:prefLabel "' + strLabel + '" .' )
-					listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:shape_' + strEntity + ' .' )
+					listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:shape_' + strEntity + ' .' )
 
 					if len(listSubjHeadEntities) > 0 :
 						for (strEntityHead, strLabelHead) in listSubjHeadEntities :
@@ -862,7 +1042,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 							listTurtle.append( 'ann:shape_' + strEntityHead + ' rdfs:label "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:shape_' + strEntityHead + ' skos:prefLabel "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:shape_' +strEntity + ' skos:broader ann:shape_' + strEntityHead + ' .' )
-							listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:shape_' + strEntityHead + ' .' )
+							listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:shape_' + strEntityHead + ' .' )
 
 							listTurtle.append( 'ann:shape_' +strEntityHead + ' skos:broader ann:shape_type .' )
 					else :
@@ -878,7 +1058,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 					listTurtle.append( 'ann:material_' + strEntity + ' rdf:type skos:Concept .' )
 					listTurtle.append( 'ann:material_' + strEntity + ' rdfs:label "' + strLabel + '" .' )
 					listTurtle.append( 'ann:material_' + strEntity + ' skos:prefLabel "' + strLabel + '" .' )
-					listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:material_' + strEntity + ' .' )
+					listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:material_' + strEntity + ' .' )
 					listTurtle.append( '<' + strURI + '> crm:P45_consists_of ann:material_' + strEntity + ' .' )
 
 					if len(listObjHeadEntities) > 0 :
@@ -888,7 +1068,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 							listTurtle.append( 'ann:material_' + strEntityHead + ' rdfs:label "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:material_' + strEntityHead + ' skos:prefLabel "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:material_' +strEntity + ' skos:broader ann:material_' + strEntityHead + ' .' )
-							listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:material_' + strEntityHead + ' .' )
+							listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:material_' + strEntityHead + ' .' )
 
 							listTurtle.append( 'ann:material_' +strEntityHead + ' skos:broader ann:part_type .' )
 					else :
@@ -901,7 +1081,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 					listTurtle.append( 'ann:material_' + strEntity + ' rdf:type skos:Concept .' )
 					listTurtle.append( 'ann:material_' + strEntity + ' rdfs:label "' + strLabel + '" .' )
 					listTurtle.append( 'ann:material_' + strEntity + ' skos:prefLabel "' + strLabel + '" .' )
-					listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:material_' + strEntity + ' .' )
+					listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:material_' + strEntity + ' .' )
 					listTurtle.append( '<' + strURI + '> crm:P45_consists_of ann:material_' + strEntity + ' .' )
 
 					if len(listSubjHeadEntities) > 0 :
@@ -911,7 +1091,7 @@ def item_set_to_CIDOC_CRM_RDF( item_sets = [], annotation_namespace = 'http://ex
 							listTurtle.append( 'ann:material_' + strEntityHead + ' rdfs:label "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:material_' + strEntityHead + ' skos:prefLabel "' + strLabelHead + '" .' )
 							listTurtle.append( 'ann:material_' +strEntity + ' skos:broader ann:material_' + strEntityHead + ' .' )
-							listTurtle.append( 'ann:extract_event' + str(nExtractionEventCount) + ' crm:P141_assigned ann:material_' + strEntityHead + ' .' )
+							listTurtle.append( strExtractionEvent + ' crm:P141_assigned ann:material_' + strEntityHead + ' .' )
 
 							listTurtle.append( 'ann:material_' +strEntityHead + ' skos:broader ann:material_type .' )
 					else :
@@ -0,0 +1,452 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+..
+	/////////////////////////////////////////////////////////////////////////
+	//
+	// (c) Copyright University of Southampton IT Innovation, 2018
+	//
+	// Copyright in this software belongs to IT Innovation Centre of
+	// Gamma House, Enterprise Road, Southampton SO16 7NS, UK.
+	//
+	// This software may not be used, sold, licensed, transferred, copied
+	// or reproduced in whole or in part in any manner or form or in or
+	// on any media by any person other than in accordance with the terms
+	// of the Licence Agreement supplied with the software, or otherwise
+	// without the prior written consent of the copyright owners.
+	//
+	// This software is distributed WITHOUT ANY WARRANTY, without even the
+	// implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+	// PURPOSE, except where stated in the Licence Agreement supplied with
+	// the software.
+	//
+	// Created By : Stuart E. Middleton
+	// Created Date : 2018/11/22
+	// Created for Project: GRAVITATE
+	//
+	/////////////////////////////////////////////////////////////////////////
+	//
+	// Dependancies: None
+	//
+	/////////////////////////////////////////////////////////////////////////
+	'''
+
+Compiled phrase matcher for lexicon lookups, returning the same matches as lexicopy.lexicon_lib.phrase_lookup().
+phrase_lookup() builds every n-gram of a phrase (up to max_gram) and probes the lexicon phrase index with each one.
+This module compiles the lexicon phrase index into a word trie once, then each phrase variant is matched by walking the trie from each token, stopping as soon as no lexicon phrase can continue.
+
+Schema ranked lists (e.g. noun_type_CH_ranked_list.txt) are compiled into a SchemaRankIndex, so schema disambiguation and allowed schema filtering do not scan the ranked list.
+An in-memory LRU cache is also provided for memoizing lookup results (e.g. the schema chosen for a phrase and head) across a corpus.
+
+Trie layout:
+	node = { word : node, ..., None : True }, where the None key marks the end of a lexicon phrase
+	lexicon phrases are split into words on ' ' (the same separator phrase_lookup() uses to join n-gram tokens), so tokens containing spaces (e.g. hyphen variants) match exactly as they would when joined
+
+"""
+
+
+import collections
+import lexicopy
+import wordnet_closure_lib, lexicon_snapshot_lib
+
+class SchemaRankIndex( list ) :
+	"""
+	ranked list of schema URIs (most likely first) with a precomputed rank index = { schema_uri : rank }.
+	it is a list subclass so it can be passed to lexicopy importers as allowed_schema_list (which check isinstance( x, list )), and membership tests use the rank index rather than a scan.
+	the list should not be changed after it is created.
+	"""
+
+	def __init__( self, list_schema = [] ) :
+		list.__init__( self, list_schema )
+		self.rank_index = {}
+		for nRank in range(len(self)) :
+			if not self[nRank] in self.rank_index :
+				self.rank_index[ self[nRank] ] = nRank
+
+	def __contains__( self, schema ) :
+		return schema in self.rank_index
+
+	def get_rank( self, schema ) :
+		# rank of schema, or None if it is not in the ranked list
+		return self.rank_index.get( schema )
+
+# compiled matchers, keyed on id() of the lexicon indexes (the indexes are also held so the ids stay valid)
+dictCompiledMatchers = {}
+
+def compile_phrase_matcher( lex_phrase_index = None, lex_uri_index = None, dict_openie_config = None ) :
+	"""
+	compile a lexicon phrase index into a word trie for phrase_lookup()
+
+	:param dict lex_phrase_index: lexicon phrase index from lexicopy.lexicon_lib.import_lexicon()
+	:param dict lex_uri_index: lexicon uri index from lexicopy.lexicon_lib.import_lexicon()
+	:param dict dict_openie_config: config object returned from soton_corenlppy.common_parse_lib.get_common_config()
+
+	:return: matcher = { 'trie' : dict, 'phrase_index' : dict, 'uri_index' : dict, 'base_forms' : dict }
+	:rtype: dict
+	"""
+
+	if not isinstance( lex_phrase_index, (dict,lexicon_snapshot_lib.LexiconSnapshotIndex) ) :
+		raise Exception( 'invalid lex_phrase_index' )
+	if not isinstance( lex_uri_index, (dict,lexicon_snapshot_lib.LexiconSnapshotIndex) ) :
+		raise Exception( 'invalid lex_uri_index' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	dictTrie = {}
+	for strPhrase in lex_phrase_index :
+		if not isinstance( strPhrase, basestring ) :
+			continue
+
+		dictNode = dictTrie
+		for strWord in strPhrase.split(' ') :
+			if not strWord in dictNode :
+				dictNode[strWord] = {}
+			dictNode = dictNode[strWord]
+		dictNode[None] = True
+
+	return {
+		'trie' : dictTrie,
+		'phrase_index' : lex_phrase_index,
+		'uri_index' : lex_uri_index,
+		'base_forms' : {}
+		}
+
+def compile_schema_rank_index( schema_ranked_list = None ) :
+	"""
+	compile a ranked list of schema URIs into a SchemaRankIndex (returned as it is if it is already compiled)
+
+	:param list schema_ranked_list: list of schema URIs, most likely first
+
+	:return: ranked list with rank index
+	:rtype: lexicon_matcher_lib.SchemaRankIndex
+	"""
+
+	if isinstance( schema_ranked_list, SchemaRankIndex ) :
+		return schema_ranked_list
+	if not isinstance( schema_ranked_list, list ) :
+		raise Exception( 'invalid schema_ranked_list' )
+
+	return SchemaRankIndex( schema_ranked_list )
+
+def choose_ranked_schema( list_lexicon_match = [], schema_rank_index = None, allow_non_ranked_schema = False ) :
+	"""
+	choose the most likely schema for a phrase from its lexicon matches, in a single pass over the matches.
+	only matches with the top confidence score are considered, and of those the schema ranked highest is chosen.
+
+	:param list list_lexicon_match: lexicon matches from phrase_lookup() = [ ( lexicon_uri, schema_uri, matched_phrase, match_gram_size, confidence_score ) ]
+	:param lexicon_matcher_lib.SchemaRankIndex schema_rank_index: ranked list from compile_schema_rank_index()
+	:param bool allow_non_ranked_schema: if True and no top confidence match has a ranked schema, return the schema of the first top confidence match as a 'guess'
+
+	:return: schema URI or None
+	:rtype: unicode
+	"""
+
+	nBestScore = None
+	nBestRank = None
+	strSchemaChoice = None
+	strFirstSchema = None
+
+	for ( strURI, strSchemaURI, strPhrase, nGram, nConfidence ) in list_lexicon_match :
+		if (nBestScore == None) or (nConfidence > nBestScore) :
+			# new top confidence score, so forget any choice made on lower scoring matches
+			nBestScore = nConfidence
+			nBestRank = None
+			strSchemaChoice = None
+			strFirstSchema = strSchemaURI
+		elif nConfidence < nBestScore :
+			continue
+
+		nRank = schema_rank_index.get_rank( strSchemaURI )
+		if (nRank != None) and ((nBestRank == None) or (nRank < nBestRank)) :
+			nBestRank = nRank
+			strSchemaChoice = strSchemaURI
+
+	if (strSchemaChoice == None) and (allow_non_ranked_schema == True) :
+		strSchemaChoice = strFirstSchema
+
+	return strSchemaChoice
+
+def get_phrase_matcher( lex_phrase_index = None, lex_uri_index = None, dict_openie_config = None ) :
+	"""
+	return the compiled phrase matcher for a lexicon, compiling it on first use.
+	a lexicon is compiled once per process, so repeated calls (e.g. per request in the enrichment service) reuse it.
+
+	:param dict lex_phrase_index: lexicon phrase index from lexicopy.lexicon_lib.import_lexicon()
+	:param dict lex_uri_index: lexicon uri index from lexicopy.lexicon_lib.import_lexicon()
+	:param dict dict_openie_config: config object returned from soton_corenlppy.common_parse_lib.get_common_config()
+
+	:return: matcher from compile_phrase_matcher()
+	:rtype: dict
+	"""
+
+	tupleKey = ( id(lex_phrase_index), id(lex_uri_index) )
+	if tupleKey in dictCompiledMatchers :
+		dictMatcher = dictCompiledMatchers[tupleKey]
+		if (dictMatcher['phrase_index'] is lex_phrase_index) and (dictMatcher['uri_index'] is lex_uri_index) :
+			return dictMatcher
+
+	dictMatcher = compile_phrase_matcher(
+		lex_phrase_index = lex_phrase_index,
+		lex_uri_index = lex_uri_index,
+		dict_openie_config = dict_openie_config )
+
+	dictCompiledMatchers[tupleKey] = dictMatcher
+	return dictMatcher
+
+def find_base_word_form( matcher = None, lemma = None, dict_openie_config = None ) :
+	"""
+	memoized lexicopy.wordnet_lib.find_base_word_form() (no POS), as phrase_lookup() calls it for the last token and head of every phrase.
+	if dict_openie_config['wordnet_closure'] is set the precomputed WordNet closure table is used (see wordnet_closure_lib), so NLTK WordNet is not loaded.
+
+	:param dict matcher: matcher from compile_phrase_matcher()
+	:param unicode lemma: lemma to lookup
+	:param dict dict_openie_config: config object returned from soton_corenlppy.common_parse_lib.get_common_config()
+
+	:return: base phrase after WordNet lookup, or None if none found
+	:rtype: unicode
+	"""
+
+	dictBaseForms = matcher['base_forms']
+	if not lemma in dictBaseForms :
+		if dict_openie_config.get( 'wordnet_closure' ) != None :
+			dictBaseForms[lemma] = wordnet_closure_lib.find_base_word_form( wordnet_closure = dict_openie_config['wordnet_closure'], lemma = lemma )
+		else :
+			dictBaseForms[lemma] = lexicopy.wordnet_lib.find_base_word_form( lemma = lemma, morphy_pos_list = None, dict_lexicon_config = dict_openie_config )
+	return dictBaseForms[lemma]
+
+def match_phrases( matcher = None, phrase_tokens = [], head_token = None, max_gram = 5 ) :
+	"""
+	find all n-grams of phrase_tokens (up to max_gram tokens, and containing head_token if not None) that are lexicon phrases
+
+	:param dict matcher: matcher from compile_phrase_matcher()
+	:param list phrase_tokens: tokenized phrase
+	:param unicode head_token: head token which must be in any matched n-gram, or None to allow all n-grams
+	:param int max_gram: maximum n-gram size
+
+	:return: set of matched phrases (tokens joined with ' ')
+	:rtype: set
+	"""
+
+	nTokens = len(phrase_tokens)
+
+	# index of the next head token at or after each position, so a span [start,end] contains the head if listNextHead[start] <= end
+	listNextHead = [0] * nTokens
+	nNext = nTokens
+	for nIndex in range( nTokens - 1, -1, -1 ) :
+		if (head_token == None) or (phrase_tokens[nIndex] == head_token) :
+			nNext = nIndex
+		listNextHead[nIndex] = nNext
+
+	listTokenWords = []
+	for strToken in phrase_tokens :
+		listTokenWords.append( strToken.split(' ') )
+
+	dictTrie = matcher['trie']
+	setPhrases = set([])
+	for nStart in range( nTokens ) :
+		dictNode = dictTrie
+		for nEnd in range( nStart, min( nStart + max_gram, nTokens ) ) :
+			for strWord in listTokenWords[nEnd] :
+				dictNode = dictNode.get( strWord )
+				if dictNode == None :
+					break
+			if dictNode == None :
+				break
+
+			if (None in dictNode) and (listNextHead[nStart] <= nEnd) :
+				setPhrases.add( u' '.join( phrase_tokens[ nStart : nEnd + 1 ] ) )
+
+	return setPhrases
+
+def phrase_lookup( matcher = None, phrase_tokens = None, head_token = None, max_gram = 5, stemmer = None, apply_wordnet_morphy = False, hyphen_variant = False, dict_openie_config = None ) :
+	"""
+	perform an n-gram lookup of phrases using a compiled matcher, optionally based around a head token.
+	returns the same matches as lexicopy.lexicon_lib.phrase_lookup() (the order of matches within a phrase variant can differ, as phrase_lookup() iterates a set).
+
+	:param dict matcher: matcher from compile_phrase_matcher() or get_phrase_matcher()
+	:param list phrase_tokens: tokenized phrase to lookup in lexicon
+	:param unicode head_token: head token in phrase which must be in any ngram lookup. the default None allows all possible ngarms to be looked up.
+	:param int max_gram: maximum phrase gram size to check for matches in lexicon
+	:param nltk.stem.api.StemmerI stemmer: stemmer to use on last phrase token (default is None)
+	:param bool apply_wordnet_morphy: if True apply wordnet.morphy() to the last phrase token
+	:param bool hyphen_variant: if True lookup phrase as it is, and a version with hypens replaced by space characters.
+	:param dict dict_openie_config: config object returned from soton_corenlppy.common_parse_lib.get_common_config()
+
+	:return: lexicon matches to phrase = [ ( lexicon_uri, schema_uri, matched_phrase, match_gram_size, confidence_score ) ]
+	:rtype: list
+	"""
+
+	if not isinstance( matcher, dict ) :
+		raise Exception( 'invalid matcher' )
+	if not isinstance( phrase_tokens, list ) :
+		raise Exception( 'invalid phrase_tokens' )
+	if not isinstance( head_token, (str,unicode,type(None)) ) :
+		raise Exception( 'invalid head_token' )
+	if not isinstance( max_gram, int ) :
+		raise Exception( 'invalid max_gram' )
+	if not isinstance( apply_wordnet_morphy, bool ) :
+		raise Exception( 'invalid apply_wordnet_morphy' )
+	if not isinstance( hyphen_variant, bool ) :
+		raise Exception( 'invalid hyphen_variant' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	# size check
+	if len(phrase_tokens) == 0 :
+		return []
+
+	lex_phrase_index = matcher['phrase_index']
+	lex_uri_index = matcher['uri_index']
+
+	# phrase variants to lookup (with and without hyphens), built the same way as phrase_lookup()
+	listChecklist = [ [ list( phrase_tokens ), head_token ] ]
+
+	if hyphen_variant == True :
+		listPhraseTokens2 = []
+		for strToken in phrase_tokens :
+			listPhraseTokens2.append( strToken.replace('-',' ').replace('_',' ') )
+		strHead2 = head_token
+		if strHead2 != None :
+			strHead2 = strHead2.replace('-',' ').replace('_',' ')
+		if (head_token != strHead2) or (phrase_tokens != listPhraseTokens2) :
+			listChecklist.append( [ listPhraseTokens2, strHead2 ] )
+
+	listLexiconMatch = []
+	for (listPhraseTokens,strHead) in listChecklist :
+
+		# morphy
+		if apply_wordnet_morphy == True :
+			strBase = find_base_word_form( matcher = matcher, lemma = listPhraseTokens[-1], dict_openie_config = dict_openie_config )
+			if strBase != None :
+				listPhraseTokens[-1] = strBase
+
+			if strHead != None :
+				strBase = find_base_word_form( matcher = matcher, lemma = strHead, dict_openie_config = dict_openie_config )
+				if strBase != None :
+					strHead = strBase
+
+		# stemming
+		if stemmer != None :
+			listPhraseTokens[-1] = stemmer.stem( listPhraseTokens[-1] )
+			if strHead != None :
+				strHead = stemmer.stem( strHead )
+
+		setPhrases = match_phrases(
+			matcher = matcher,
+			phrase_tokens = listPhraseTokens,
+			head_token = strHead,
+			max_gram = max_gram )
+
+		for strPhrase in setPhrases :
+
+			# gram size of phrase (higher gram phrase matches are more likely to be correct)
+			nGram = 1 + strPhrase.count(' ')
+
+			# confidence = # tokens in extraction that appear in lexicon phrase
+			nConfidence = ( 1.0 * nGram ) / len(listPhraseTokens)
+
+			for strURI in lex_phrase_index[strPhrase] :
+				strSchemaURI = None
+				if strURI in lex_uri_index :
+					strSchemaURI = lex_uri_index[strURI][0]
+				listLexiconMatch.append( ( strURI, strSchemaURI, strPhrase, nGram, nConfidence ) )
+
+	# all done
+	return listLexiconMatch
+
+def open_lookup_cache( max_entries = -1 ) :
+	"""
+	open an in-memory LRU cache for memoizing lexicon lookup results.
+	when the cache grows beyond max_entries the least recently used entries are evicted.
+
+	:param int max_entries: max number of entries in cache before eviction starts (-1 for no limit)
+
+	:return: cache handle = { 'entries' : collections.OrderedDict, 'max_entries' : int, 'hits' : int, 'misses' : int, 'evictions' : int }
+	:rtype: dict
+	"""
+
+	if not isinstance( max_entries, int ) :
+		raise Exception( 'invalid max_entries' )
+
+	return {
+		'entries' : collections.OrderedDict(),
+		'max_entries' : max_entries,
+		'hits' : 0,
+		'misses' : 0,
+		'evictions' : 0
+		}
+
+def get_lookup_cache_stats( dict_cache = None ) :
+	"""
+	return a human readable summary of cache hit/miss/eviction counters
+
+	:param dict dict_cache: cache handle returned from lexicon_matcher_lib.open_lookup_cache()
+
+	:return: stats summary
+	:rtype: str
+	"""
+
+	nTotal = dict_cache['hits'] + dict_cache['misses']
+	if nTotal > 0 :
+		nHitRate = 100.0 * dict_cache['hits'] / nTotal
+	else :
+		nHitRate = 0.0
+
+	return 'hits = ' + str(dict_cache['hits']) + ', misses = ' + str(dict_cache['misses']) + ', hit rate = ' + '%.1f' % nHitRate + '%, evictions = ' + str(dict_cache['evictions'])
+
+def lookup_cache_get( dict_cache = None, list_keys = None ) :
+	"""
+	lookup a set of keys in the cache. hits are marked as most recently used and counted, misses are counted.
+
+	:param dict dict_cache: cache handle returned from lexicon_matcher_lib.open_lookup_cache()
+	:param list list_keys: list of hashable keys
+
+	:return: dict of values for keys found in cache = { key : value }
+	:rtype: dict
+	"""
+
+	if not isinstance( dict_cache, dict ) :
+		raise Exception( 'invalid dict_cache' )
+	if not isinstance( list_keys, list ) :
+		raise Exception( 'invalid list_keys' )
+
+	dictEntries = dict_cache['entries']
+	dictResult = {}
+	for key in list_keys :
+		if key in dictEntries :
+			# move to end of LRU order
+			value = dictEntries.pop( key )
+			dictEntries[key] = value
+			dictResult[key] = value
+			dict_cache['hits'] = dict_cache['hits'] + 1
+		else :
+			dict_cache['misses'] = dict_cache['misses'] + 1
+
+	return dictResult
+
+def lookup_cache_store( dict_cache = None, dict_entries = None ) :
+	"""
+	store a set of entries in the cache, then evict least recently used entries if the cache is larger than max_entries
+
+	:param dict dict_cache: cache handle returned from lexicon_matcher_lib.open_lookup_cache()
+	:param dict dict_entries: dict of values to store = { key : value }
+	"""
+
+	if not isinstance( dict_cache, dict ) :
+		raise Exception( 'invalid dict_cache' )
+	if not isinstance( dict_entries, dict ) :
+		raise Exception( 'invalid dict_entries' )
+
+	dictEntries = dict_cache['entries']
+	for key in dict_entries :
+		if key in dictEntries :
+			del dictEntries[key]
+		dictEntries[key] = dict_entries[key]
+
+	if dict_cache['max_entries'] == -1 :
+		return
+
+	while len(dictEntries) > dict_cache['max_entries'] :
+		dictEntries.popitem( last = False )
+		dict_cache['evictions'] = dict_cache['evictions'] + 1
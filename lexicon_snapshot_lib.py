@@ -0,0 +1,563 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+..
+	/////////////////////////////////////////////////////////////////////////
+	//
+	// (c) Copyright University of Southampton IT Innovation, 2018
+	//
+	// Copyright in this software belongs to IT Innovation Centre of
+	// Gamma House, Enterprise Road, Southampton SO16 7NS, UK.
+	//
+	// This software may not be used, sold, licensed, transferred, copied
+	// or reproduced in whole or in part in any manner or form or in or
+	// on any media by any person other than in accordance with the terms
+	// of the Licence Agreement supplied with the software, or otherwise
+	// without the prior written consent of the copyright owners.
+	//
+	// This software is distributed WITHOUT ANY WARRANTY, without even the
+	// implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+	// PURPOSE, except where stated in the Licence Agreement supplied with
+	// the software.
+	//
+	// Created By : Stuart E. Middleton
+	// Created Date : 2018/11/20
+	// Created for Project: GRAVITATE
+	//
+	/////////////////////////////////////////////////////////////////////////
+	//
+	// Dependancies: None
+	//
+	/////////////////////////////////////////////////////////////////////////
+	'''
+
+Binary snapshot of a built lexicon ( dict_uri, dict_phrase ) that is memory mapped when loaded, so load time is near zero and pages are shared between processes.
+A snapshot records a checksum of the source files and settings it was built from, and is rebuilt automatically when they change.
+The snapshot file format is generic (see write_snapshot()) and is also used for other read only tables that are built offline (e.g. wordnet_closure_lib).
+
+Snapshot file layout:
+	magic (8 bytes) | header length (uint32) | JSON header | table ...
+	header = { 'version' : int, 'marshal_version' : int, 'checksum' : str, 'tables' : { name : table header } }
+	hash table header = { 'offset' : int, 'buckets' : int, 'count' : int, 'entries_offset' : int, 'entries_end' : int }
+	hash table = bucket array (uint64 entry offset per bucket, 0 = empty, open addressing with linear probing) | entries
+	hash table entry = key length (uint32) | UTF-8 key | value length (uint32) | marshal serialized value
+	array table header = { 'type' : 'array', 'offset' : int, 'count' : int, 'entries_offset' : int, 'entries_end' : int }
+	array table = offset array (count + 1 uint64 entry offsets, so entry N is between offsets N and N+1) | marshal serialized values
+
+"""
+
+
+import os, sys, json, marshal, mmap, struct, zlib, collections
+import checkpoint_lib
+
+# snapshot format version (increment if the layout or the way lexicons are built changes, so old snapshots are rebuilt)
+nSnapshotVersion = 1
+strSnapshotMagic = 'LEXSNAP\x00'
+
+structUInt32 = struct.Struct( '<I' )
+structUInt64 = struct.Struct( '<Q' )
+structUInt64Pair = struct.Struct( '<QQ' )
+
+class LexiconSnapshotIndex( collections.Mapping ) :
+	"""
+	read only mapping view of a table in a memory mapped lexicon snapshot. lookups read the memory mapped table.
+	it is not a dict subclass, as dict(), dict.update() and json.dumps() read the underlying dict directly (which would be empty). dict( index ) makes a real dict copy of the table.
+	functions that take a lexicon index check isinstance( x, (dict,LexiconSnapshotIndex) ). lexicopy functions check isinstance( x, dict ), so only pass a snapshot to them after copying it with dict().
+	pickling reopens the snapshot file by name, so worker processes map the same file rather than receive a copy.
+	"""
+
+	def __init__( self, filename = None, map_snapshot = None, dict_table = None, table = None ) :
+		self.filename = filename
+		self.table = table
+		self.map_snapshot = map_snapshot
+		self.table_offset = dict_table['offset']
+		self.buckets = dict_table['buckets']
+		self.count = dict_table['count']
+		self.entries_offset = dict_table['entries_offset']
+		self.entries_end = dict_table['entries_end']
+
+	def find_entry( self, key ) :
+		# return offset of the value length field for key, or None if key is not in the table
+		if isinstance( key, unicode ) :
+			key = key.encode( 'utf-8' )
+		elif not isinstance( key, str ) :
+			return None
+
+		if self.buckets == 0 :
+			return None
+
+		nBucket = ( zlib.crc32( key ) & 0xffffffff ) % self.buckets
+		while True :
+			nEntry = structUInt64.unpack_from( self.map_snapshot, self.table_offset + 8 * nBucket )[0]
+			if nEntry == 0 :
+				return None
+			nKeyLen = structUInt32.unpack_from( self.map_snapshot, nEntry )[0]
+			if (nKeyLen == len(key)) and (self.map_snapshot[ nEntry + 4 : nEntry + 4 + nKeyLen ] == key) :
+				return nEntry + 4 + nKeyLen
+			nBucket = ( nBucket + 1 ) % self.buckets
+
+	def read_value( self, offset ) :
+		nValueLen = structUInt32.unpack_from( self.map_snapshot, offset )[0]
+		return marshal.loads( self.map_snapshot[ offset + 4 : offset + 4 + nValueLen ] )
+
+	def iter_entries( self ) :
+		# yield ( key, value offset ) for each entry in the order they were written
+		nOffset = self.entries_offset
+		while nOffset < self.entries_end :
+			nKeyLen = structUInt32.unpack_from( self.map_snapshot, nOffset )[0]
+			strKey = self.map_snapshot[ nOffset + 4 : nOffset + 4 + nKeyLen ].decode( 'utf-8' )
+			nValueOffset = nOffset + 4 + nKeyLen
+			nValueLen = structUInt32.unpack_from( self.map_snapshot, nValueOffset )[0]
+			yield ( strKey, nValueOffset )
+			nOffset = nValueOffset + 4 + nValueLen
+
+	def __contains__( self, key ) :
+		return self.find_entry( key ) != None
+
+	def has_key( self, key ) :
+		return self.find_entry( key ) != None
+
+	def __getitem__( self, key ) :
+		nOffset = self.find_entry( key )
+		if nOffset == None :
+			raise KeyError( key )
+		return self.read_value( nOffset )
+
+	def get( self, key, default = None ) :
+		nOffset = self.find_entry( key )
+		if nOffset == None :
+			return default
+		return self.read_value( nOffset )
+
+	def __len__( self ) :
+		return self.count
+
+	def __iter__( self ) :
+		for ( strKey, nOffset ) in self.iter_entries() :
+			yield strKey
+
+	def iterkeys( self ) :
+		return self.__iter__()
+
+	def keys( self ) :
+		return list( self.__iter__() )
+
+	def itervalues( self ) :
+		for ( strKey, nOffset ) in self.iter_entries() :
+			yield self.read_value( nOffset )
+
+	def values( self ) :
+		return list( self.itervalues() )
+
+	def iteritems( self ) :
+		for ( strKey, nOffset ) in self.iter_entries() :
+			yield ( strKey, self.read_value( nOffset ) )
+
+	def items( self ) :
+		return list( self.iteritems() )
+
+	def __eq__( self, other ) :
+		return self is other
+
+	def __ne__( self, other ) :
+		return not self is other
+
+	__hash__ = object.__hash__
+
+	def __repr__( self ) :
+		return '<LexiconSnapshotIndex ' + self.table + ' : ' + str(self.count) + ' entries from ' + self.filename + '>'
+
+	def __reduce__( self ) :
+		return ( open_lexicon_snapshot_index, ( self.filename, self.table ) )
+
+	def read_only( self, *args, **kwargs ) :
+		raise Exception( 'lexicon snapshot is read only' )
+
+	__setitem__ = read_only
+	__delitem__ = read_only
+	clear = read_only
+	pop = read_only
+	popitem = read_only
+	setdefault = read_only
+	update = read_only
+	copy = read_only
+
+class SnapshotArray( object ) :
+	"""
+	read only list view of an array table in a memory mapped snapshot, indexed by integer position.
+	pickling reopens the snapshot file by name, so worker processes map the same file rather than receive a copy.
+	"""
+
+	def __init__( self, filename = None, map_snapshot = None, dict_table = None, table = None ) :
+		self.filename = filename
+		self.table = table
+		self.map_snapshot = map_snapshot
+		self.table_offset = dict_table['offset']
+		self.count = dict_table['count']
+
+	def __getitem__( self, index ) :
+		if not isinstance( index, (int,long) ) :
+			raise TypeError( 'snapshot array index must be an int' )
+		if index < 0 :
+			index = index + self.count
+		if (index < 0) or (index >= self.count) :
+			raise IndexError( index )
+
+		( nStart, nEnd ) = structUInt64Pair.unpack_from( self.map_snapshot, self.table_offset + 8 * index )
+		return marshal.loads( self.map_snapshot[ nStart : nEnd ] )
+
+	def __len__( self ) :
+		return self.count
+
+	def __iter__( self ) :
+		for nIndex in xrange( self.count ) :
+			yield self[nIndex]
+
+	def __repr__( self ) :
+		return '<SnapshotArray ' + self.table + ' : ' + str(self.count) + ' entries from ' + self.filename + '>'
+
+	def __reduce__( self ) :
+		return ( open_snapshot_table, ( self.filename, self.table ) )
+
+# open snapshot maps, so each process maps a snapshot file once = { filename : ( mmap, header ) }
+dictOpenSnapshots = {}
+
+def calc_snapshot_checksum( list_source_files = [], list_settings = [] ) :
+	"""
+	calc a checksum of the source files and settings a lexicon is built from
+
+	:param list list_source_files: lexicon source files (e.g. gazetteer JSON files, plain lexicon CSV files)
+	:param list list_settings: JSON serializable settings the built lexicon depends on
+
+	:return: SHA1 hex digest
+	:rtype: str
+	"""
+
+	if not isinstance( list_source_files, list ) :
+		raise Exception( 'invalid list_source_files' )
+	if not isinstance( list_settings, list ) :
+		raise Exception( 'invalid list_settings' )
+
+	return checkpoint_lib.calc_stage_fingerprint(
+		stage = 'lexicon_snapshot_v' + str(nSnapshotVersion),
+		list_input_files = list_source_files,
+		list_settings = list_settings )
+
+def write_table( handle = None, dict_entries = {}, offset = 0 ) :
+	"""
+	write a hash table of entries to a snapshot file
+
+	:param file handle: file handle open for binary writing
+	:param dict dict_entries: entries to write
+	:param int offset: file offset the table starts at
+
+	:return: table header = { 'offset' : int, 'buckets' : int, 'count' : int, 'entries_offset' : int, 'entries_end' : int }
+	:rtype: dict
+	"""
+
+	# load factor <= 0.5 keeps linear probe chains short
+	nBuckets = 1
+	while nBuckets < 2 * len(dict_entries) :
+		nBuckets = nBuckets * 2
+
+	listBuckets = [0] * nBuckets
+	nEntriesOffset = offset + 8 * nBuckets
+	nEntry = nEntriesOffset
+
+	# entries are written first (so they are not all held in memory), then the bucket array is filled in
+	handle.seek( nEntriesOffset )
+	for key in sorted( dict_entries.keys() ) :
+		if isinstance( key, unicode ) :
+			strKey = key.encode( 'utf-8' )
+		else :
+			strKey = key
+		strValue = marshal.dumps( dict_entries[key] )
+
+		nBucket = ( zlib.crc32( strKey ) & 0xffffffff ) % nBuckets
+		while listBuckets[nBucket] != 0 :
+			nBucket = ( nBucket + 1 ) % nBuckets
+		listBuckets[nBucket] = nEntry
+
+		handle.write( structUInt32.pack( len(strKey) ) + strKey + structUInt32.pack( len(strValue) ) + strValue )
+		nEntry = nEntry + 8 + len(strKey) + len(strValue)
+
+	handle.seek( offset )
+	handle.write( ''.join( [ structUInt64.pack( nBucketEntry ) for nBucketEntry in listBuckets ] ) )
+	handle.seek( nEntry )
+
+	return { 'offset' : offset, 'buckets' : nBuckets, 'count' : len(dict_entries), 'entries_offset' : nEntriesOffset, 'entries_end' : nEntry }
+
+def write_array_table( handle = None, list_entries = [], offset = 0 ) :
+	"""
+	write an array table of entries to a snapshot file
+
+	:param file handle: file handle open for binary writing
+	:param list list_entries: entries to write (any iterable with a len(), so entries can be generated as they are written)
+	:param int offset: file offset the table starts at
+
+	:return: table header = { 'type' : 'array', 'offset' : int, 'count' : int, 'entries_offset' : int, 'entries_end' : int }
+	:rtype: dict
+	"""
+
+	nCount = len(list_entries)
+	listOffsets = []
+	nEntriesOffset = offset + 8 * ( nCount + 1 )
+	nEntry = nEntriesOffset
+
+	# entries are written first, then the offset array is filled in
+	handle.seek( nEntriesOffset )
+	for value in list_entries :
+		strValue = marshal.dumps( value )
+		listOffsets.append( nEntry )
+		handle.write( strValue )
+		nEntry = nEntry + len(strValue)
+	listOffsets.append( nEntry )
+
+	if len(listOffsets) != nCount + 1 :
+		raise Exception( 'array table entry count changed while writing' )
+
+	handle.seek( offset )
+	handle.write( ''.join( [ structUInt64.pack( nOffset ) for nOffset in listOffsets ] ) )
+	handle.seek( nEntry )
+
+	return { 'type' : 'array', 'offset' : offset, 'count' : nCount, 'entries_offset' : nEntriesOffset, 'entries_end' : nEntry }
+
+def write_snapshot( filename = None, list_tables = [], checksum = None, header_space = 1024 ) :
+	"""
+	write a snapshot file of named tables. the snapshot is written to a temp file and renamed, so processes building the same snapshot at the same time do not see a partial file.
+
+	:param str filename: snapshot filename
+	:param list list_tables: tables to write = [ ( table_name, dict or list ), ... ]. a dict is written as a hash table, a list as an array table.
+	:param str checksum: checksum of the sources the snapshot is built from (e.g. from calc_snapshot_checksum())
+	:param int header_space: space reserved for the JSON header (must be big enough for the header of all tables)
+	"""
+
+	if not isinstance( filename, (str,unicode) ) :
+		raise Exception( 'invalid filename' )
+	if not isinstance( list_tables, list ) :
+		raise Exception( 'invalid list_tables' )
+	if not isinstance( checksum, str ) :
+		raise Exception( 'invalid checksum' )
+	if not isinstance( header_space, int ) :
+		raise Exception( 'invalid header_space' )
+
+	strTempFile = filename + '.' + str(os.getpid()) + '.tmp'
+
+	# the header has fixed width offsets, so its length is known before the tables are written
+	dictHeader = {
+		'version' : nSnapshotVersion,
+		'marshal_version' : marshal.version,
+		'checksum' : checksum,
+		'tables' : {},
+		}
+
+	writeHandle = open( strTempFile, 'wb' )
+	try :
+		writeHandle.write( '\x00' * ( len(strSnapshotMagic) + 4 + header_space ) )
+		nOffset = len(strSnapshotMagic) + 4 + header_space
+
+		for ( strTable, entries ) in list_tables :
+			if isinstance( entries, dict ) :
+				dictHeader['tables'][strTable] = write_table( handle = writeHandle, dict_entries = entries, offset = nOffset )
+			else :
+				dictHeader['tables'][strTable] = write_array_table( handle = writeHandle, list_entries = entries, offset = nOffset )
+			nOffset = dictHeader['tables'][strTable]['entries_end']
+
+		strHeader = json.dumps( dictHeader, sort_keys = True )
+		if len(strHeader) > header_space :
+			raise Exception( 'snapshot header too large' )
+
+		writeHandle.seek( 0 )
+		writeHandle.write( strSnapshotMagic + structUInt32.pack( len(strHeader) ) + strHeader )
+		writeHandle.close()
+
+		# os.rename() will not replace an existing file on Windows
+		if os.path.exists( filename ) :
+			os.remove( filename )
+		os.rename( strTempFile, filename )
+
+	finally :
+		if writeHandle.closed == False :
+			writeHandle.close()
+		if os.path.exists( strTempFile ) :
+			os.remove( strTempFile )
+
+def write_lexicon_snapshot( filename = None, dict_uri = None, dict_phrase = None, checksum = None, dict_openie_config = None ) :
+	"""
+	write a lexicon snapshot file
+
+	:param str filename: snapshot filename
+	:param dict dict_uri: lexicon uri index = { uri : [ scheme_uri, hypernym_uri_list, related_uri_list ] }
+	:param dict dict_phrase: lexicon phrase index = { phrase : set_uri }
+	:param str checksum: checksum from calc_snapshot_checksum()
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+	"""
+
+	if not isinstance( filename, (str,unicode) ) :
+		raise Exception( 'invalid filename' )
+	if not isinstance( dict_uri, dict ) :
+		raise Exception( 'invalid dict_uri' )
+	if not isinstance( dict_phrase, dict ) :
+		raise Exception( 'invalid dict_phrase' )
+	if not isinstance( checksum, str ) :
+		raise Exception( 'invalid checksum' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	write_snapshot( filename = filename, list_tables = [ ( 'uri', dict_uri ), ( 'phrase', dict_phrase ) ], checksum = checksum )
+
+	dict_openie_config['logger'].info( 'lexicon snapshot written : ' + filename + ' (' + str(len(dict_uri)) + ' uri, ' + str(len(dict_phrase)) + ' phrases)' )
+
+def map_lexicon_snapshot( filename = None ) :
+	"""
+	memory map a lexicon snapshot file (once per process) and read its header
+
+	:param str filename: snapshot filename
+
+	:return: ( mmap, header ), or None if the file does not exist or is not a snapshot of the current version
+	:rtype: tuple
+	"""
+
+	if filename in dictOpenSnapshots :
+		return dictOpenSnapshots[filename]
+
+	if not os.path.isfile( filename ) :
+		return None
+	if os.path.getsize( filename ) < len(strSnapshotMagic) + 4 :
+		return None
+
+	readHandle = open( filename, 'rb' )
+	try :
+		mapSnapshot = mmap.mmap( readHandle.fileno(), 0, access = mmap.ACCESS_READ )
+	finally :
+		# the map stays valid after the file handle is closed
+		readHandle.close()
+
+	if mapSnapshot[ 0 : len(strSnapshotMagic) ] != strSnapshotMagic :
+		mapSnapshot.close()
+		return None
+
+	nHeaderLen = structUInt32.unpack_from( mapSnapshot, len(strSnapshotMagic) )[0]
+	nHeaderOffset = len(strSnapshotMagic) + 4
+	dictHeader = json.loads( mapSnapshot[ nHeaderOffset : nHeaderOffset + nHeaderLen ] )
+
+	if (dictHeader['version'] != nSnapshotVersion) or (dictHeader['marshal_version'] != marshal.version) :
+		mapSnapshot.close()
+		return None
+
+	dictOpenSnapshots[filename] = ( mapSnapshot, dictHeader )
+	return dictOpenSnapshots[filename]
+
+def open_lexicon_snapshot_index( filename = None, table = None ) :
+	"""
+	open a table of a lexicon snapshot (used when unpickling a LexiconSnapshotIndex)
+
+	:param str filename: snapshot filename
+	:param str table: table name (uri or phrase)
+
+	:return: read only dict view of the table
+	:rtype: LexiconSnapshotIndex
+	"""
+
+	tupleMap = map_lexicon_snapshot( filename = filename )
+	if tupleMap == None :
+		raise Exception( 'lexicon snapshot missing or invalid : ' + filename )
+	( mapSnapshot, dictHeader ) = tupleMap
+
+	return LexiconSnapshotIndex( filename = filename, map_snapshot = mapSnapshot, dict_table = dictHeader['tables'][table], table = table )
+
+def open_snapshot_table( filename = None, table = None ) :
+	"""
+	open a table of a snapshot as a read only view (also used when unpickling a SnapshotArray)
+
+	:param str filename: snapshot filename
+	:param str table: table name
+
+	:return: read only dict view of a hash table, or list view of an array table
+	:rtype: LexiconSnapshotIndex or SnapshotArray
+	"""
+
+	tupleMap = map_lexicon_snapshot( filename = filename )
+	if tupleMap == None :
+		raise Exception( 'snapshot missing or invalid : ' + filename )
+	( mapSnapshot, dictHeader ) = tupleMap
+
+	if not table in dictHeader['tables'] :
+		raise Exception( 'snapshot table missing : ' + filename + ' ' + table )
+	dictTable = dictHeader['tables'][table]
+
+	if dictTable.get( 'type' ) == 'array' :
+		return SnapshotArray( filename = filename, map_snapshot = mapSnapshot, dict_table = dictTable, table = table )
+	return LexiconSnapshotIndex( filename = filename, map_snapshot = mapSnapshot, dict_table = dictTable, table = table )
+
+def open_lexicon_snapshot( filename = None, checksum = None, dict_openie_config = None ) :
+	"""
+	open a lexicon snapshot if it exists and was built from sources with a matching checksum
+
+	:param str filename: snapshot filename
+	:param str checksum: checksum from calc_snapshot_checksum()
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: ( dict_uri, dict_phrase ) as read only memory mapped dict views, or None if there is no valid snapshot
+	:rtype: tuple
+	"""
+
+	if not isinstance( filename, (str,unicode) ) :
+		raise Exception( 'invalid filename' )
+	if not isinstance( checksum, str ) :
+		raise Exception( 'invalid checksum' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	tupleMap = map_lexicon_snapshot( filename = filename )
+	if tupleMap == None :
+		return None
+
+	( mapSnapshot, dictHeader ) = tupleMap
+	if dictHeader['checksum'] != checksum :
+		# sources have changed, so unmap the old snapshot (it will be replaced)
+		del dictOpenSnapshots[filename]
+		return None
+
+	return (
+		LexiconSnapshotIndex( filename = filename, map_snapshot = mapSnapshot, dict_table = dictHeader['tables']['uri'], table = 'uri' ),
+		LexiconSnapshotIndex( filename = filename, map_snapshot = mapSnapshot, dict_table = dictHeader['tables']['phrase'], table = 'phrase' ) )
+
+def load_lexicon_snapshot( filename = None, list_source_files = [], list_settings = [], build_function = None, dict_openie_config = None ) :
+	"""
+	load a lexicon from its snapshot, building (and writing) the snapshot first if it is missing or its source files or settings have changed
+
+	:param str filename: snapshot filename
+	:param list list_source_files: lexicon source files
+	:param list list_settings: JSON serializable settings the built lexicon depends on
+	:param function build_function: function with no args that builds the lexicon and returns ( dict_uri, dict_phrase )
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: ( dict_uri, dict_phrase ) as read only memory mapped dict views
+	:rtype: tuple
+	"""
+
+	if not isinstance( filename, (str,unicode) ) :
+		raise Exception( 'invalid filename' )
+	if not callable( build_function ) :
+		raise Exception( 'invalid build_function' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	strChecksum = calc_snapshot_checksum( list_source_files = list_source_files, list_settings = list_settings )
+
+	tupleLexicon = open_lexicon_snapshot( filename = filename, checksum = strChecksum, dict_openie_config = dict_openie_config )
+	if tupleLexicon != None :
+		dict_openie_config['logger'].info( 'lexicon snapshot loaded : ' + filename )
+		return tupleLexicon
+
+	dict_openie_config['logger'].info( 'lexicon snapshot missing or out of date (rebuilding) : ' + filename )
+	( dictURI, dictPhrase ) = build_function()
+
+	write_lexicon_snapshot( filename = filename, dict_uri = dictURI, dict_phrase = dictPhrase, checksum = strChecksum, dict_openie_config = dict_openie_config )
+
+	tupleLexicon = open_lexicon_snapshot( filename = filename, checksum = strChecksum, dict_openie_config = dict_openie_config )
+	if tupleLexicon == None :
+		raise Exception( 'lexicon snapshot could not be read back : ' + filename )
+	return tupleLexicon
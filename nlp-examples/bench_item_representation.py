@@ -0,0 +1,112 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+benchmark for create_item_sets() time and memory on the nlp-examples propositions, for comparing item representations (e.g. compound items as tuples vs re-parsed item strings)
+- the propositions in nlp-examples/annotated-extractions-attribie.txt are repeated <copies> times (default 20) with new sent indexes, 3 sents per artifact
+- lexicon schema and WordNet lookups are replaced by deterministic hash based stand-ins (the same in every version), so only the item handling is measured and no WordNet data is needed
+- each version runs in its own process and reports create_item_sets() time, the bytes held by the distinct item strings of the result and the max RSS of the process
+- --baseline <file> also runs another version of ch_information_extraction_app.py and checks the item set files written by both are byte identical, e.g. the version before compound items were kept as tuples
+	git show 90dcfac^:ch_information_extraction_app.py > /tmp/ch_app_baseline.py
+
+usage (from the repo root) : python nlp-examples/bench_item_representation.py [--baseline <file>] [<copies>]
+'''
+
+import os, sys, time, gc, imp, hashlib, codecs, logging, resource, tempfile, shutil, subprocess
+sys.path.insert( 0, os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ) )
+
+strRepoDir = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+
+def choose_lexicon_schema_stand_in( matcher = None, phrase_tokens = [], head_token = None, **kwargs ) :
+	strHash = hashlib.md5( ( u' '.join( phrase_tokens ) + u'|' + head_token ).encode( 'utf-8' ) ).hexdigest()
+	if strHash[0] in '01234567' :
+		return None
+	return u'http://example.org/schema/' + strHash[:2]
+
+def expand_wordnet_lemma_stand_in( lemma = None, pos = None, **kwargs ) :
+	strHash = hashlib.md5( ( lemma + pos ).encode( 'utf-8' ) ).hexdigest()
+	if strHash[0] in '0123' :
+		return []
+	return [ lemma[:3] + strChar for strChar in strHash[ : int( strHash[1], 16 ) % 6 ] ]
+
+def write_scaled_propositions( filename = None, copies = 20 ) :
+	# repeat the propositions with sent indexes offset for each copy, return the number of sents
+	listLines = codecs.open( os.path.join( strRepoDir, 'nlp-examples', 'annotated-extractions-attribie.txt' ), 'r', 'utf-8' ).read().splitlines()
+	nSents = max( [ int( strLine.split( '\t' )[0] ) for strLine in listLines if '\t' in strLine ] ) + 1
+	writeHandle = codecs.open( filename, 'w', 'utf-8' )
+	for nCopy in range( copies ) :
+		for strLine in listLines :
+			if '\t' in strLine :
+				listParts = strLine.split( '\t' )
+				listParts[0] = str( int( listParts[0] ) + nSents * nCopy )
+				strLine = '\t'.join( listParts )
+			writeHandle.write( strLine + '\n' )
+	writeHandle.close()
+	return nSents * copies
+
+def run_child( module_file = None, proposition_file = None, sent_count = 0, item_set_file = None ) :
+	logging.basicConfig( level=logging.WARNING )
+	dictConfig = { 'logger' : logging.getLogger( __name__ ) }
+
+	module = imp.load_source( 'ch_information_extraction_app_bench', module_file )
+	module.choose_lexicon_schema = choose_lexicon_schema_stand_in
+	module.expand_wordnet_lemma = expand_wordnet_lemma_stand_in
+
+	listProps = module.read_proposition_file( filename = proposition_file, dict_openie_config = dictConfig )
+	listMapping = module.load_semantic_mapping( filename_mapping = os.path.join( strRepoDir, 'semantic_mapping_CH.txt' ), dict_openie_config = dictConfig )
+	dictSentToURI = dict( [ ( nSent, 'http://example.org/artifact/%d' % ( nSent // 3 ) ) for nSent in range( sent_count ) ] )
+
+	gc.collect()
+	nTimeStart = time.time()
+	listItemSets = module.create_item_sets( list_document_proposition_sets = listProps, dict_sent_to_uri = dictSentToURI, list_semantic_mapping = listMapping, dict_openie_config = dictConfig )
+	nTime = time.time() - nTimeStart
+
+	# bytes held by item strings (each distinct string object counted once)
+	dictStrings = {}
+	nItems = 0
+	for listItemSet in listItemSets :
+		for strItem in listItemSet :
+			dictStrings[ id( strItem ) ] = sys.getsizeof( strItem )
+			nItems = nItems + 1
+	nMaxRSS = resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss
+
+	module.write_item_set_file( filename = item_set_file, list_item_sets = listItemSets, dict_openie_config = dictConfig )
+
+	print '%-8s : %d props, %d item sets, %d items, create_item_sets %.2f s, item strings %.1f MB, max RSS %d MB' % (
+		os.path.basename( item_set_file ).split( '.' )[0], len( listProps ), len( listItemSets ), nItems, nTime, sum( dictStrings.values() ) / 1048576.0, nMaxRSS / 1024 )
+	sys.stdout.flush()
+
+if __name__ == '__main__' :
+
+	if ( len( sys.argv ) > 1 ) and ( sys.argv[1] == '--child' ) :
+		run_child( module_file = sys.argv[2], proposition_file = sys.argv[3], sent_count = int( sys.argv[4] ), item_set_file = sys.argv[5] )
+		sys.exit( 0 )
+
+	listArgs = sys.argv[1:]
+	listVersions = [ ( 'current', os.path.join( strRepoDir, 'ch_information_extraction_app.py' ) ) ]
+	if '--baseline' in listArgs :
+		nIndex = listArgs.index( '--baseline' )
+		listVersions.insert( 0, ( 'baseline', os.path.abspath( listArgs[ nIndex + 1 ] ) ) )
+		del listArgs[ nIndex : nIndex + 2 ]
+	nCopies = 20
+	if len( listArgs ) > 0 :
+		nCopies = int( listArgs[0] )
+
+	# each version is a separate process so max RSS is measured for that version alone
+	strTempDir = tempfile.mkdtemp()
+	try :
+		strPropFile = os.path.join( strTempDir, 'propositions.txt' )
+		nSents = write_scaled_propositions( filename = strPropFile, copies = nCopies )
+
+		listItemSetFiles = []
+		for ( strVersion, strModuleFile ) in listVersions :
+			strItemSetFile = os.path.join( strTempDir, strVersion + '.item_sets.txt' )
+			subprocess.check_call( [ sys.executable, os.path.abspath( __file__ ), '--child', strModuleFile, strPropFile, str( nSents ), strItemSetFile ] )
+			listItemSetFiles.append( strItemSetFile )
+
+		if len( listItemSetFiles ) > 1 :
+			if open( listItemSetFiles[0], 'rb' ).read() != open( listItemSetFiles[1], 'rb' ).read() :
+				raise Exception( 'item set files differ' )
+			print 'item set files are byte identical'
+	finally :
+		shutil.rmtree( strTempDir )
@@ -0,0 +1,110 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+benchmark for the create_item_sets() stages and apply_association_mining_rules() on large item sets, for comparing how item set membership is checked (e.g. a hashed index vs a list scan)
+- synthetic propositions with 10, 50 and 200 vars each (200000 vars in total per run) are made into item sets, so item sets grow to hundreds or thousands of items after WordNet expansion
+- lexicon schema lookups return no schema and WordNet expansion returns 12 base names per head (deterministic stand-ins, the same in every version), so only the item set handling is measured and no WordNet data is needed
+- 2000 single item rules (each inferring 3 semantic types) are applied with max_inferences = 1000
+- --baseline <file> also times another version of ch_information_extraction_app.py and checks the item sets after each stage are identical, e.g. the version before membership was checked with a hashed index
+	git show fbb0e86^:ch_information_extraction_app.py > /tmp/ch_app_baseline.py
+
+usage (from the repo root) : python nlp-examples/bench_item_set_membership.py [--baseline <file>]
+'''
+
+import os, sys, time, imp, random, hashlib, logging
+sys.path.insert( 0, os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ) )
+
+import ch_information_extraction_app
+
+listVarTypes = [ 'subj', 'obj', 'attr', 'attrbase', 'attrprep', 'ctxt' ]
+listStages = [ 'extract', 'aggregate', 'expand', 'wordnet', 'rules' ]
+
+def expand_wordnet_lemma_stand_in( lemma = None, pos = None, **kwargs ) :
+	strHash = hashlib.md5( lemma + pos ).hexdigest()
+	return [ 'b%d_%s' % ( nIndex, strHash[:3] ) for nIndex in range( 12 ) ]
+
+def choose_lexicon_schema_stand_in( **kwargs ) :
+	return None
+
+def make_propositions( var_count = 10, total_vars = 200000 ) :
+	rnd = random.Random( 1 )
+	listProps = []
+	for nProp in range( total_vars // var_count ) :
+		listPattern = [ rnd.choice( listVarTypes ) for nVar in range( var_count ) ]
+		listPhrases = [ u'w%d w%d' % ( rnd.randint( 0, 500 ), rnd.randint( 0, 500 ) ) for nVar in range( var_count ) ]
+		listHeads = [ u'h%d' % rnd.randint( 0, 2000 ) for nVar in range( var_count ) ]
+		listProps.append( ( listPhrases, listPattern, listHeads ) )
+	return listProps
+
+def run_stages( module = None, list_props = None, dict_openie_config = None ) :
+	# run each stage in turn, return ( { stage : time }, [ item sets after each stage ] )
+	dictTimes = {}
+	listSnapshots = []
+	listItemSets = []
+
+	nTimeStart = time.time()
+	for ( listPhrases, listPattern, listHeads ) in list_props :
+		module.add_item_sets_from_extraction( list_item_sets = listItemSets, list_extracted_prop = listPhrases, list_prop_pattern = listPattern, list_head_terms = listHeads, dict_openie_config = dict_openie_config )
+	dictTimes['extract'] = time.time() - nTimeStart
+	listSnapshots.append( [ list( listItemSet ) for listItemSet in listItemSets ] )
+
+	nTimeStart = time.time()
+	module.aggregate_phrases_in_item_set( list_item_sets = listItemSets, dict_openie_config = dict_openie_config )
+	dictTimes['aggregate'] = time.time() - nTimeStart
+	listSnapshots.append( [ list( listItemSet ) for listItemSet in listItemSets ] )
+
+	nTimeStart = time.time()
+	module.expand_compound_items_and_apply_lexicon_schema_mappings( list_item_sets = listItemSets, dict_openie_config = dict_openie_config )
+	dictTimes['expand'] = time.time() - nTimeStart
+	listSnapshots.append( [ list( listItemSet ) for listItemSet in listItemSets ] )
+
+	nTimeStart = time.time()
+	module.apply_wordnet_mapping_to_item_sets( list_item_sets = listItemSets, dict_openie_config = dict_openie_config )
+	dictTimes['wordnet'] = time.time() - nTimeStart
+	listSnapshots.append( [ list( listItemSet ) for listItemSet in listItemSets ] )
+
+	# rules with a LHS of one item from the item sets (the same rules for every version)
+	listItems = sorted( set( [ strItem for listItemSet in listItemSets for strItem in listItemSet ] ) )
+	rnd = random.Random( 2 )
+	listRules = []
+	for nRule in range( 2000 ) :
+		listRules.append( ( ( ( rnd.choice( listItems ), ), tuple( [ 'semantic_type(%d)' % rnd.randint( 0, 50 ) for nType in range( 3 ) ] ) ), 1, 1, 1, 1 ) )
+
+	nTimeStart = time.time()
+	module.apply_association_mining_rules( list_item_sets = listItemSets, list_rules = listRules, max_inferences = 1000, dict_openie_config = dict_openie_config )
+	dictTimes['rules'] = time.time() - nTimeStart
+	listSnapshots.append( listItemSets )
+
+	return ( dictTimes, listSnapshots )
+
+if __name__ == '__main__' :
+
+	logging.basicConfig( level=logging.WARNING )
+	dictConfig = { 'logger' : logging.getLogger( __name__ ) }
+
+	listVersions = [ ( 'current', ch_information_extraction_app ) ]
+	if ( len( sys.argv ) > 2 ) and ( sys.argv[1] == '--baseline' ) :
+		listVersions.insert( 0, ( 'baseline', imp.load_source( 'ch_information_extraction_app_baseline', sys.argv[2] ) ) )
+
+	for ( strVersion, module ) in listVersions :
+		module.expand_wordnet_lemma = expand_wordnet_lemma_stand_in
+		module.choose_lexicon_schema = choose_lexicon_schema_stand_in
+
+	for nVarCount in [ 10, 50, 200 ] :
+		listProps = make_propositions( var_count = nVarCount )
+
+		listResults = []
+		for ( strVersion, module ) in listVersions :
+			listResults.append( ( strVersion, ) + run_stages( module = module, list_props = listProps, dict_openie_config = dictConfig ) )
+
+		for ( strVersion, dictTimes, listSnapshots ) in listResults[1:] :
+			for nStage in range( len( listStages ) ) :
+				if listSnapshots[nStage] != listResults[0][2][nStage] :
+					raise Exception( strVersion + ' item sets after ' + listStages[nStage] + ' differ from ' + listResults[0][0] )
+
+		listFinal = listResults[0][2][3]
+		print '%d vars per proposition : %d item sets, avg %.0f items per set after wordnet%s' % (
+			nVarCount, len( listFinal ), sum( [ len( listItemSet ) for listItemSet in listFinal ] ) / float( len( listFinal ) ), ' (identical item sets after every stage)' if len( listResults ) > 1 else '' )
+		for strStage in listStages :
+			print '  %-10s ' % strStage + ', '.join( [ '%s %.2f s' % ( strVersion, dictTimes[strStage] ) for ( strVersion, dictTimes, listSnapshots ) in listResults ] )
@@ -0,0 +1,117 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+benchmark for the compiled lexicon phrase matcher (lexicon_matcher_lib.phrase_lookup) vs lexicopy.lexicon_lib.phrase_lookup
+- the lookups are the subj and obj (phrase tokens, head) lookups create_item_sets() makes for nlp-examples/annotated-extractions-attribie.txt, each with its head and with no head
+- the lexicon is the noun type lexicon (noun_type_CH_lexicon_25Sept2018_MP.csv), imported as build_ch_lexicon() does, then again with <synthetic phrases> random phrases (default 80000) added
+- checks both return the same matches (as a multiset, since lexicopy returns matches within a variant in set order), then times each (20 passes over all lookups)
+- WordNet morphy is applied as create_item_sets() does. --no-morphy times the phrase matching alone (no WordNet data needed). --wordnet <dir> uses the WordNet database in <dir> instead of the NLTK wordnet corpus
+
+usage (from the repo root) : python nlp-examples/bench_phrase_matcher.py [--no-morphy] [--wordnet <dir>] [<synthetic phrases>]
+'''
+
+import os, sys, time, random, logging, collections
+sys.path.insert( 0, os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ) )
+
+import nltk.corpus.reader.wordnet
+import lexicopy
+import ch_information_extraction_app, lexicon_matcher_lib
+
+strRepoDir = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+
+def collect_lookups( dict_openie_config = None ) :
+	# (phrase tokens, head) for each subj and obj head, as expand_compound_items_and_apply_lexicon_schema_mappings() looks them up
+	listItemSets = []
+	for ( strSentIndex, listPhraseText, nConf, listPropPattern, listHeadText ) in ch_information_extraction_app.iter_proposition_file( filename = os.path.join( strRepoDir, 'nlp-examples', 'annotated-extractions-attribie.txt' ), dict_openie_config = dict_openie_config ) :
+		ch_information_extraction_app.add_item_sets_from_extraction( list_item_sets = listItemSets, list_extracted_prop = listPhraseText, list_head_terms = listHeadText, list_prop_pattern = listPropPattern, dict_openie_config = dict_openie_config )
+	ch_information_extraction_app.aggregate_phrases_in_item_set( list_item_sets = listItemSets, dict_openie_config = dict_openie_config )
+
+	listLookups = []
+	for listItemSet in listItemSets :
+		for tupleItem in listItemSet :
+			if tupleItem[0] in [ 'subj', 'obj' ] :
+				for strHead in ch_information_extraction_app.get_compound_item_heads( tupleItem ) :
+					listLookups.append( ( tupleItem[1].lower().split(' '), strHead ) )
+					listLookups.append( ( tupleItem[1].lower().split(' '), None ) )
+	return listLookups
+
+def add_synthetic_phrases( lex_phrase_index = None, lex_uri_index = None, list_lookups = None, count = 80000 ) :
+	# random 1 to 4 word phrases over the lookup vocabulary plus 5000 other words, so some synthetic phrases match
+	dictPhrase = dict( lex_phrase_index )
+	dictURI = dict( lex_uri_index )
+	rnd = random.Random( 1 )
+	setVocab = set([])
+	for ( listTokens, strHead ) in list_lookups :
+		setVocab.update( listTokens )
+	listVocab = sorted( setVocab ) + [ u'w%d' % nIndex for nIndex in range( 5000 ) ]
+	for nIndex in range( count ) :
+		strPhrase = u' '.join( [ rnd.choice( listVocab ) for nToken in range( rnd.randint( 1, 4 ) ) ] )
+		strURI = 'http://example.org/lexicon/synthetic%d' % nIndex
+		dictPhrase.setdefault( strPhrase, set([]) ).add( strURI )
+		dictURI[strURI] = [ 'http://example.org/schema/synthetic%d' % ( nIndex % 50 ), set([]), set([]) ]
+	return ( dictPhrase, dictURI )
+
+if __name__ == '__main__' :
+
+	logging.basicConfig( level=logging.WARNING )
+	dictConfig = { 'logger' : logging.getLogger( __name__ ) }
+
+	listArgs = sys.argv[1:]
+	bMorphy = True
+	if '--no-morphy' in listArgs :
+		bMorphy = False
+		listArgs.remove( '--no-morphy' )
+	if '--wordnet' in listArgs :
+		nIndex = listArgs.index( '--wordnet' )
+		lexicopy.wordnet_lib.wordnet = nltk.corpus.reader.wordnet.WordNetCorpusReader( listArgs[ nIndex + 1 ], None )
+		del listArgs[ nIndex : nIndex + 2 ]
+	nSynthetic = 80000
+	if len( listArgs ) > 0 :
+		nSynthetic = int( listArgs[0] )
+
+	( dictLexiconURI, dictLexiconPhrase ) = lexicopy.lexicon_lib.import_plain_lexicon(
+		filename_lemma = os.path.join( strRepoDir, 'noun_type_CH_lexicon_25Sept2018_MP.csv' ),
+		list_column_names = ['schema','phrase_list','hypernym'],
+		phrase_delimiter = '|',
+		lower_case = True,
+		stemmer = None,
+		apply_wordnet_morphy = bMorphy,
+		allowed_schema_list = None,
+		dict_lexicon_config = dictConfig )
+
+	listLookups = collect_lookups( dict_openie_config = dictConfig )
+	print 'lookups = ' + str( len( listLookups ) ) + ', WordNet morphy = ' + str( bMorphy )
+
+	nPasses = 20
+	for ( strName, ( dictPhrase, dictURI ) ) in [
+		( 'noun type lexicon', ( dictLexiconPhrase, dictLexiconURI ) ),
+		( 'noun type lexicon + %d synthetic phrases' % nSynthetic, add_synthetic_phrases( lex_phrase_index = dictLexiconPhrase, lex_uri_index = dictLexiconURI, list_lookups = listLookups, count = nSynthetic ) ) ] :
+
+		fnLexicopy = lambda listTokens, strHead : lexicopy.lexicon_lib.phrase_lookup( phrase_tokens = list( listTokens ), head_token = strHead, lex_phrase_index = dictPhrase, lex_uri_index = dictURI, max_gram = 5, stemmer = None, apply_wordnet_morphy = bMorphy, hyphen_variant = True, dict_lexicon_config = dictConfig )
+
+		nTimeStart = time.time()
+		dictMatcher = lexicon_matcher_lib.compile_phrase_matcher( lex_phrase_index = dictPhrase, lex_uri_index = dictURI, dict_openie_config = dictConfig )
+		nTimeCompile = time.time() - nTimeStart
+		fnMatcher = lambda listTokens, strHead : lexicon_matcher_lib.phrase_lookup( matcher = dictMatcher, phrase_tokens = list( listTokens ), head_token = strHead, max_gram = 5, stemmer = None, apply_wordnet_morphy = bMorphy, hyphen_variant = True, dict_openie_config = dictConfig )
+
+		# same matches
+		nMatches = 0
+		for ( listTokens, strHead ) in listLookups :
+			listExpected = fnLexicopy( listTokens, strHead )
+			if collections.Counter( fnMatcher( listTokens, strHead ) ) != collections.Counter( listExpected ) :
+				raise Exception( 'matches differ for ' + repr( ( listTokens, strHead ) ) )
+			nMatches = nMatches + len( listExpected )
+
+		# timing (a new matcher, so its WordNet base form memo starts empty)
+		dictMatcher = lexicon_matcher_lib.compile_phrase_matcher( lex_phrase_index = dictPhrase, lex_uri_index = dictURI, dict_openie_config = dictConfig )
+		listTimes = []
+		for fnLookup in [ fnLexicopy, fnMatcher ] :
+			nTimeStart = time.time()
+			for nPass in range( nPasses ) :
+				for ( listTokens, strHead ) in listLookups :
+					fnLookup( listTokens, strHead )
+			listTimes.append( 1000000.0 * ( time.time() - nTimeStart ) / nPasses / len( listLookups ) )
+
+		print '%s : %d phrases, %d matches (identical), compile %.2f s, lexicopy %.1f us/lookup, matcher %.1f us/lookup (%.1fx)' % (
+			strName, len( dictPhrase ), nMatches, nTimeCompile, listTimes[0], listTimes[1], listTimes[0] / listTimes[1] )
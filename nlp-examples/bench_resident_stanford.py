@@ -0,0 +1,138 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+benchmark for the resident Stanford tagger and parser (nlp_scheduler_lib resident = True)
+- checks the resident path returns the same POS tags and dependency graphs as the per-call path, then times one sentence of new text on each path
+- with no args a stand-in java (python script written to a temp dir and put first on the PATH) replays the MaxentTagger and LexicalizedParser stdin/stdout protocols, with a simulated JVM start of FAKE_JVM_START seconds (default 1.0). this measures the plumbing only, not Stanford itself
+- to measure the real tools run with <stanford_tagger_dir> <stanford_parser_dir> <model_jar> (java must be on the PATH)
+
+usage (from the repo root) : python nlp-examples/bench_resident_stanford.py [<stanford_tagger_dir> <stanford_parser_dir> <model_jar>]
+'''
+
+import os, sys, time, logging, re, tempfile, shutil, subprocess
+sys.path.insert( 0, os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ) )
+
+import soton_corenlppy, openiepy
+import nlp_scheduler_lib
+
+strFakeJava = '''#!%s
+import sys, time, os
+time.sleep( float( os.environ.get( 'FAKE_JVM_START', '1.0' ) ) )
+listArgs = sys.argv[1:]
+def tag( strToken ) :
+	if strToken.lower() in ( 'a', 'the' ) : return 'DT'
+	if strToken.lower() in ( 'with', 'of', 'on' ) : return 'IN'
+	if strToken.endswith( 'ed' ) : return 'VBN'
+	if strToken in ( '.', ',' ) : return strToken
+	return 'NN'
+if 'edu.stanford.nlp.tagger.maxent.MaxentTagger' in listArgs :
+	for strLine in iter( sys.stdin.readline, '' ) :
+		strToken = strLine.rstrip( '\\n' )
+		sys.stdout.write( strToken + '_' + tag( strToken ) + '\\n' )
+		sys.stdout.flush()
+	time.sleep( 0.5 )
+	sys.exit( 0 )
+if 'edu.stanford.nlp.parser.lexparser.LexicalizedParser' in listArgs :
+	readHandle = sys.stdin if listArgs[-1] == '-' else open( listArgs[-1] )
+	for strLine in iter( readHandle.readline, '' ) :
+		strLine = strLine.rstrip( '\\n' )
+		if strLine == '' : continue
+		sys.stderr.write( 'Parsing [sent. len. %%d]: %%s\\n' %% ( len( strLine.split() ), strLine ) )
+		listRows = []
+		for nIndex, strTagged in enumerate( strLine.split( ' ' ) ) :
+			( strWord, strTag ) = strTagged.rsplit( '/', 1 )
+			listRows.append( '\\t'.join( [ str( nIndex + 1 ), strWord, '_', strTag, strTag, '_', '0' if nIndex == 0 else '1', 'root' if nIndex == 0 else 'dep', '_', '_' ] ) )
+		sys.stdout.write( '\\n'.join( listRows ) + '\\n\\n' )
+		sys.stdout.flush()
+	time.sleep( 0.5 )
+	sys.exit( 0 )
+sys.exit( 'unknown class ' + repr( listArgs ) )
+''' % sys.executable
+
+def time_calls( fn, count ) :
+	nTimeStart = time.time()
+	for nCount in range( count ) :
+		fn()
+	return 1000.0 * ( time.time() - nTimeStart ) / count
+
+if __name__ == '__main__' :
+
+	logging.basicConfig( level=logging.WARNING )
+	logger = logging.getLogger( __name__ )
+
+	# soton_corenlppy pos_tag_tokenset() calls terminate() on a tagger process that has already exited, which raises OSError on linux (not windows)
+	fnTerminate = subprocess.Popen.terminate
+	def terminate_exited( self ) :
+		try :
+			fnTerminate( self )
+		except OSError :
+			pass
+	subprocess.Popen.terminate = terminate_exited
+
+	# nltk 3.4.5 java() uses subprocess.DEVNULL which is python 3 only
+	if not hasattr( subprocess, 'DEVNULL' ) :
+		subprocess.DEVNULL = open( os.devnull, 'w' )
+
+	strTempDir = None
+	if len( sys.argv ) == 4 :
+		( strTaggerDir, strParserDir, strModelJar ) = sys.argv[1:4]
+	else :
+		strTempDir = tempfile.mkdtemp()
+		os.mkdir( os.path.join( strTempDir, 'bin' ) )
+		strJava = os.path.join( strTempDir, 'bin', 'java' )
+		writeHandle = open( strJava, 'wb' )
+		writeHandle.write( strFakeJava )
+		writeHandle.close()
+		os.chmod( strJava, 0755 )
+		for strJar in [ 'stanford-parser.jar', 'stanford-parser-3.9.2-models.jar' ] :
+			open( os.path.join( strTempDir, strJar ), 'wb' ).close()
+		os.environ['PATH'] = os.path.join( strTempDir, 'bin' ) + os.pathsep + os.environ['PATH']
+		( strTaggerDir, strParserDir, strModelJar ) = ( strTempDir, strTempDir, os.path.join( strTempDir, 'stanford-parser-3.9.2-models.jar' ) )
+		print 'stand-in java, simulated JVM start ' + os.environ.get( 'FAKE_JVM_START', '1.0' ) + ' s'
+
+	dictConfig = {
+		'logger' : logger,
+		'lang_pos_mapping' : { 'en' : 'stanford' },
+		'sent_token_seps' : [ '\n', '\r' ],
+		'token_preservation_regex' : [ ( 'regex_url', 'URI' ) ],
+		'regex_url' : re.compile( r'http://\S+' ),
+		'stanford_tagger_dir' : strTaggerDir,
+		'stanford_parser_dir' : strParserDir,
+		'dep_model_path' : 'edu/stanford/nlp/models/lexparser/englishPCFG.ser.gz',
+		'dep_model_jar' : strModelJar,
+		'dep_options' : '',
+		'pos_sep' : ( '/', '|' ),
+	}
+
+	try :
+		listSents = [ u'A flint blade with a curved edge .'.split(), u'Fragment of the rim ( restored ) see http://x.org/1 .'.split() ]
+		depParser = openiepy.comp_sem_lib.get_dependency_parser( dict_openie_config = dictConfig )
+
+		# same output on both paths
+		listPOSRef = soton_corenlppy.common_parse_lib.pos_tag_tokenset( token_set = listSents, lang = 'en', dict_common_config = dictConfig, timeout = 300 )
+		for nCount in range( 3 ) :
+			if nlp_scheduler_lib.pos_tag_resident( token_set = listSents, lang = 'en', timeout = 300, dict_common_config = dictConfig ) != listPOSRef :
+				raise Exception( 'resident POS tags differ from per-call POS tags' )
+
+		listTrees = []
+		for listPOS in listPOSRef :
+			listTrees.extend( soton_corenlppy.common_parse_lib.create_sent_trees( list_pos = listPOS, dict_common_config = dictConfig ) )
+		fnSerialize = lambda listGraphs : [ openiepy.comp_sem_lib.serialize_dependency_graph( graph, dictConfig ) for graph in listGraphs ]
+		listGraphRef = fnSerialize( openiepy.comp_sem_lib.parse_sent_trees( list_sent_trees = listTrees, dep_parser = depParser, dict_openie_config = dictConfig ) )
+		for nCount in range( 3 ) :
+			if fnSerialize( nlp_scheduler_lib.parse_sent_trees_resident( list_sent_trees = listTrees, dep_parser = depParser, dict_openie_config = dictConfig ) ) != listGraphRef :
+				raise Exception( 'resident dependency graphs differ from per-call dependency graphs' )
+		print 'resident output matches per-call output (' + str( len( listGraphRef ) ) + ' dependency graphs)'
+
+		# latency for one sentence of new text
+		listNew = [ u'A bronze coin with a worn edge .'.split() ]
+		print 'per-call POS tag : %.1f ms' % time_calls( lambda : soton_corenlppy.common_parse_lib.pos_tag_tokenset( token_set = listNew, lang = 'en', dict_common_config = dictConfig, timeout = 300 ), 2 )
+		print 'resident POS tag : %.1f ms' % time_calls( lambda : nlp_scheduler_lib.pos_tag_resident( token_set = listNew, lang = 'en', timeout = 300, dict_common_config = dictConfig ), 20 )
+		print 'per-call dep parse : %.1f ms' % time_calls( lambda : openiepy.comp_sem_lib.parse_sent_trees( list_sent_trees = listTrees[:1], dep_parser = depParser, dict_openie_config = dictConfig ), 2 )
+		print 'resident dep parse : %.1f ms' % time_calls( lambda : nlp_scheduler_lib.parse_sent_trees_resident( list_sent_trees = listTrees[:1], dep_parser = depParser, dict_openie_config = dictConfig ), 20 )
+
+	finally :
+		nlp_scheduler_lib.stop_resident_processes()
+		if strTempDir != None :
+			shutil.rmtree( strTempDir )
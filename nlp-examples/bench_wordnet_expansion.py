@@ -0,0 +1,106 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+benchmark for the WordNet expansion stage (ch_information_extraction_app.apply_wordnet_mapping_to_item_sets)
+- the item sets are made from nlp-examples/annotated-extractions-attribie.txt by create_item_sets() steps (1) to (3), with the noun type lexicon
+- times the stage with no persistent cache (each unique lemma and POS expanded once), with a cold wordnet cache (new SQLite file) and with a warm cache (the same file reopened)
+- --baseline <file> also times apply_wordnet_mapping_to_item_sets() in another version of ch_information_extraction_app.py and checks every run gives the same item sets, e.g. the version before the expansion memo and cache
+	git show 0ad4126^:ch_information_extraction_app.py > /tmp/ch_app_baseline.py
+- WordNet is the NLTK wordnet corpus, or the WordNet database in <dir> with --wordnet <dir>
+
+usage (from the repo root) : python nlp-examples/bench_wordnet_expansion.py [--baseline <file>] [--wordnet <dir>]
+'''
+
+import os, sys, time, copy, imp, logging, tempfile, shutil
+sys.path.insert( 0, os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ) )
+
+import nltk.corpus.reader.wordnet
+import lexicopy
+import ch_information_extraction_app, nlp_cache_lib
+
+strRepoDir = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+
+def make_item_sets( dict_openie_config = None ) :
+	# create_item_sets() steps (1) to (3)
+	( dictLexiconURI, dictLexiconPhrase ) = lexicopy.lexicon_lib.import_plain_lexicon(
+		filename_lemma = os.path.join( strRepoDir, 'noun_type_CH_lexicon_25Sept2018_MP.csv' ),
+		list_column_names = ['schema','phrase_list','hypernym'],
+		phrase_delimiter = '|',
+		lower_case = True,
+		stemmer = None,
+		apply_wordnet_morphy = True,
+		allowed_schema_list = None,
+		dict_lexicon_config = dict_openie_config )
+	listRanked = ch_information_extraction_app.read_noun_type_ranked_list( filename = os.path.join( strRepoDir, 'noun_type_CH_ranked_list.txt' ), dict_openie_config = dict_openie_config )
+
+	listItemSets = []
+	for ( strSentIndex, listPhraseText, nConf, listPropPattern, listHeadText ) in ch_information_extraction_app.iter_proposition_file( filename = os.path.join( strRepoDir, 'nlp-examples', 'annotated-extractions-attribie.txt' ), dict_openie_config = dict_openie_config ) :
+		nLastSet = len( listItemSets )
+		ch_information_extraction_app.add_item_sets_from_extraction( list_item_sets = listItemSets, list_extracted_prop = listPhraseText, list_head_terms = listHeadText, list_prop_pattern = listPropPattern, dict_openie_config = dict_openie_config )
+		for nIndexSet in range( nLastSet, len( listItemSets ) ) :
+			listItemSets[nIndexSet].append( ( 'artifact_uri', 'http://example.org/artifact/' + strSentIndex, () ) )
+	ch_information_extraction_app.aggregate_phrases_in_item_set( list_item_sets = listItemSets, dict_openie_config = dict_openie_config )
+	ch_information_extraction_app.expand_compound_items_and_apply_lexicon_schema_mappings( list_item_sets = listItemSets, lex_phrase_index = dictLexiconPhrase, lex_uri_index = dictLexiconURI, schema_ranked_list = listRanked, dict_openie_config = dict_openie_config )
+	return listItemSets
+
+def time_stage( module = None, list_item_sets = None, wordnet_cache = None, dict_openie_config = None ) :
+	# run the stage on a copy of the item sets, as create_item_sets() calls it
+	listItemSets = copy.deepcopy( list_item_sets )
+	dictArgs = {}
+	if wordnet_cache != None :
+		dictArgs['wordnet_cache'] = wordnet_cache
+	nTimeStart = time.time()
+	module.apply_wordnet_mapping_to_item_sets( list_item_sets = listItemSets, allowed_types = set(['attribute_head', 'subj_head', 'obj_head']), count_freq_threshold = 0.5, top_n_lemma = 3, dict_openie_config = dict_openie_config, **dictArgs )
+	return ( time.time() - nTimeStart, listItemSets )
+
+if __name__ == '__main__' :
+
+	logging.basicConfig( level=logging.WARNING )
+	dictConfig = { 'logger' : logging.getLogger( __name__ ) }
+
+	listArgs = sys.argv[1:]
+	strBaseline = None
+	if '--baseline' in listArgs :
+		nIndex = listArgs.index( '--baseline' )
+		strBaseline = listArgs[ nIndex + 1 ]
+		del listArgs[ nIndex : nIndex + 2 ]
+	if '--wordnet' in listArgs :
+		nIndex = listArgs.index( '--wordnet' )
+		lexicopy.wordnet_lib.wordnet = nltk.corpus.reader.wordnet.WordNetCorpusReader( listArgs[ nIndex + 1 ], None )
+		del listArgs[ nIndex : nIndex + 2 ]
+
+	listItemSets = make_item_sets( dict_openie_config = dictConfig )
+	setHeads = set([])
+	nHeads = 0
+	for listItemSet in listItemSets :
+		for strItem in listItemSet :
+			if strItem.startswith( ( 'attribute_head(', 'subj_head(', 'obj_head(' ) ) :
+				nHeads = nHeads + 1
+				setHeads.add( strItem )
+	print 'item sets = ' + str( len( listItemSets ) ) + ', head items = ' + str( nHeads ) + ', unique = ' + str( len( setHeads ) )
+
+	listResults = []
+	if strBaseline != None :
+		moduleBaseline = imp.load_source( 'ch_information_extraction_app_baseline', strBaseline )
+		listResults.append( ( 'baseline', ) + time_stage( module = moduleBaseline, list_item_sets = listItemSets, dict_openie_config = dictConfig ) )
+
+	listResults.append( ( 'no cache', ) + time_stage( module = ch_information_extraction_app, list_item_sets = listItemSets, dict_openie_config = dictConfig ) )
+
+	strTempDir = tempfile.mkdtemp()
+	try :
+		strCacheFile = os.path.join( strTempDir, 'wordnet_cache.db' )
+		for strRun in [ 'cold cache', 'warm cache' ] :
+			dictCache = nlp_cache_lib.open_cache( filename = strCacheFile, table = 'wordnet', max_entries = -1, dict_openie_config = dictConfig )
+			listResults.append( ( strRun, ) + time_stage( module = ch_information_extraction_app, list_item_sets = listItemSets, wordnet_cache = dictCache, dict_openie_config = dictConfig ) )
+			nlp_cache_lib.close_cache( dict_cache = dictCache, dict_openie_config = dictConfig )
+	finally :
+		shutil.rmtree( strTempDir )
+
+	for ( strRun, nTime, listResultItemSets ) in listResults :
+		if listResultItemSets != listResults[0][2] :
+			raise Exception( strRun + ' item sets differ from ' + listResults[0][0] + ' item sets' )
+	print 'wn items = ' + str( sum( [ len( [ strItem for strItem in listItemSet if '_wn(' in strItem ] ) for listItemSet in listResults[0][2] ] ) ) + ' (identical in all runs)'
+
+	for ( strRun, nTime, listResultItemSets ) in listResults :
+		print '%-10s : %.3f s (%.1fx)' % ( strRun, nTime, listResults[0][1] / nTime )
@@ -0,0 +1,123 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+benchmark for worker pool memory vs process_count, for the order attrib_ie.prepare_dataset() loads the lexicon and starts the worker pool in
+- lexicon_first : lexicon dicts built in the parent, then the worker pool forked (workers inherit the dicts)
+- pool_first : worker pool forked, then lexicon dicts built in the parent (the order prepare_dataset() uses)
+- snapshot : lexicon memory mapped from a lexicon snapshot (lexicon_snapshot_lib), then the worker pool forked
+- each worker runs a batch stage that allocates (as the NLP stages do) so the garbage collector runs full collections, which write to the header of every tracked object in the worker heap, including inherited lexicon dicts
+- reports the proportional set size (Pss from /proc/<pid>/smaps_rollup, linux only) of the workers and the parent, so pages shared between them are counted once in the total
+- the lexicon is synthetic (uri -> [ phrase, ... ] and phrase -> [ uri, ... ] like attrib_ie.load_lexicon()), with <lexicon size> URIs (default 300000)
+
+usage (from the repo root) : python nlp-examples/bench_worker_pool_rss.py [<lexicon size>]
+'''
+
+import os, sys, gc, logging, tempfile, subprocess
+sys.path.insert( 0, os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ) )
+
+import nlp_scheduler_lib, lexicon_snapshot_lib
+
+def build_synthetic_lexicon( size = 300000 ) :
+	dictLexiconURI = {}
+	dictLexiconPhrase = {}
+	for nIndex in range( size ) :
+		strURI = u'http://example.org/lexicon/concept' + unicode( nIndex )
+		listPhrases = [ ( u'phrase%d' % nIndex, ), ( u'alt', u'phrase%d' % nIndex ) ]
+		dictLexiconURI[strURI] = listPhrases
+		for tuplePhrase in listPhrases :
+			strPhrase = u' '.join( tuplePhrase )
+			if not strPhrase in dictLexiconPhrase :
+				dictLexiconPhrase[strPhrase] = []
+			dictLexiconPhrase[strPhrase].append( strURI )
+	return ( dictLexiconURI, dictLexiconPhrase )
+
+def allocate_batch_function( list_payloads = None, dict_batch_args = None, dict_openie_config = None ) :
+	# allocate like an NLP stage (lots of small containers) so full collections run in the worker
+	listResults = []
+	for nPayload in list_payloads :
+		listGarbage = [ { 'token' : [ nIndex ] } for nIndex in range( 200000 ) ]
+		gc.collect()
+		listResults.append( len( listGarbage ) )
+	return listResults
+
+def read_pss_kb( pid = None ) :
+	for strLine in open( '/proc/' + str(pid) + '/smaps_rollup' ) :
+		if strLine.startswith( 'Pss:' ) :
+			return int( strLine.split()[1] )
+	raise Exception( 'no Pss for pid ' + str(pid) )
+
+def open_synthetic_snapshot( filename = None, size = 300000, dict_openie_config = None ) :
+	return lexicon_snapshot_lib.load_lexicon_snapshot(
+		filename = filename,
+		list_source_files = [],
+		list_settings = [ size ],
+		build_function = lambda : build_synthetic_lexicon( size = size ),
+		dict_openie_config = dict_openie_config )
+
+def run_child( order = None, process_count = 1, size = 300000, snapshot_file = None ) :
+	logger = logging.getLogger( __name__ )
+	dictConfig = { 'logger' : logger }
+
+	if order == 'lexicon_first' :
+		( dictLexiconURI, dictLexiconPhrase ) = build_synthetic_lexicon( size = size )
+		dictWorkerPool = nlp_scheduler_lib.start_worker_pool( max_processes = process_count, dict_openie_config = dictConfig )
+	elif order == 'pool_first' :
+		dictWorkerPool = nlp_scheduler_lib.start_worker_pool( max_processes = process_count, dict_openie_config = dictConfig )
+		( dictLexiconURI, dictLexiconPhrase ) = build_synthetic_lexicon( size = size )
+	elif order == 'snapshot' :
+		( dictLexiconURI, dictLexiconPhrase ) = open_synthetic_snapshot( filename = snapshot_file, size = size, dict_openie_config = dictConfig )
+		dictWorkerPool = nlp_scheduler_lib.start_worker_pool( max_processes = process_count, dict_openie_config = dictConfig )
+	else :
+		raise Exception( 'invalid order' )
+
+	dictTasks = {}
+	for nTask in range( process_count * 4 ) :
+		dictTasks[ str(nTask) ] = nTask
+	nlp_scheduler_lib.execute_batch_queue(
+		dict_tasks = dictTasks,
+		dict_costs = dict( [ ( strTask, 1 ) for strTask in dictTasks ] ),
+		batch_function = allocate_batch_function,
+		dict_batch_args = {},
+		stage = 'allocate',
+		worker_pool = dictWorkerPool,
+		dict_openie_config = dictConfig )
+
+	nWorkerKB = 0
+	for processWorker in dictWorkerPool['processes'] :
+		nWorkerKB = nWorkerKB + read_pss_kb( pid = processWorker.pid )
+	nParentKB = read_pss_kb( pid = os.getpid() )
+	nlp_scheduler_lib.stop_worker_pool( worker_pool = dictWorkerPool )
+
+	print '%-14s process_count %d : workers Pss %7.1f MB (%6.1f MB per worker), parent Pss %7.1f MB, total %7.1f MB' % (
+		order, process_count, nWorkerKB / 1024.0, nWorkerKB / 1024.0 / process_count, nParentKB / 1024.0, ( nWorkerKB + nParentKB ) / 1024.0 )
+	sys.stdout.flush()
+
+if __name__ == '__main__' :
+
+	logging.basicConfig( level=logging.WARNING )
+
+	if ( len( sys.argv ) > 1 ) and ( sys.argv[1] == '--child' ) :
+		run_child( order = sys.argv[2], process_count = int( sys.argv[3] ), size = int( sys.argv[4] ), snapshot_file = sys.argv[5] )
+		sys.exit( 0 )
+
+	nSize = 300000
+	if len( sys.argv ) > 1 :
+		nSize = int( sys.argv[1] )
+
+	# each run is a separate process so memory from one run does not affect the next
+	strTempDir = tempfile.mkdtemp()
+	strSnapshotFile = os.path.join( strTempDir, 'lexicon.snapshot' )
+	try :
+		print 'synthetic lexicon of ' + str(nSize) + ' URIs'
+
+		# build the snapshot once here, so the snapshot runs only map it
+		subprocess.check_call( [ sys.executable, '-c', 'import sys; sys.path[0:0] = ' + repr( [ os.path.dirname( os.path.abspath( __file__ ) ), os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ) ] ) + '; import logging, bench_worker_pool_rss; bench_worker_pool_rss.open_synthetic_snapshot( filename = ' + repr( strSnapshotFile ) + ', size = ' + str(nSize) + ', dict_openie_config = { \'logger\' : logging.getLogger() } )' ] )
+
+		for strOrder in [ 'lexicon_first', 'pool_first', 'snapshot' ] :
+			for nProcessCount in [ 1, 2, 4 ] :
+				subprocess.check_call( [ sys.executable, os.path.abspath( __file__ ), '--child', strOrder, str(nProcessCount), str(nSize), strSnapshotFile ] )
+	finally :
+		if os.path.exists( strSnapshotFile ) :
+			os.remove( strSnapshotFile )
+		os.rmdir( strTempDir )
@@ -0,0 +1,98 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+stand-in SPARQL endpoint for testing input_format=sparql_endpoint (ch_information_extraction_app.iter_sparql_endpoint_bindings)
+- serves <row count> synthetic ( artifact, text ) bindings (default 25) over HTTP POST query=..., paged using the LIMIT and OFFSET the app appends to the query
+- the 2nd request returns HTTP 503, so the retry with backoff is exercised
+- checks all bindings are read in order with page size 10, then stops the consumer after the first binding with page size 2 and checks the prefetch thread exits (it must not block on the full page queue)
+- with --serve <port> it only runs the endpoint (until ctrl-c), so ch_information_extraction_app.ini sparql_endpoint can be pointed at http://localhost:<port>/sparql
+
+usage (from the repo root) : python nlp-examples/sparql_endpoint_stand_in.py [<row count>] [--serve <port>]
+'''
+
+import os, sys, time, json, logging, threading, BaseHTTPServer, urlparse
+sys.path.insert( 0, os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ) )
+
+import ch_information_extraction_app
+
+listRows = []
+listRequestCount = [ 0 ]
+
+class StandInSPARQLHandler( BaseHTTPServer.BaseHTTPRequestHandler ) :
+	protocol_version = 'HTTP/1.1'
+
+	def do_POST( self ) :
+		nLength = int( self.headers.getheader( 'content-length' ) )
+		strQuery = urlparse.parse_qs( self.rfile.read( nLength ) )['query'][0]
+		listRequestCount[0] = listRequestCount[0] + 1
+
+		# fail one request so the client has to retry
+		if listRequestCount[0] == 2 :
+			self.send_response( 503 )
+			self.send_header( 'Content-Length', '0' )
+			self.end_headers()
+			return
+
+		nLimit = int( strQuery.split( 'LIMIT ' )[1].split()[0] )
+		nOffset = int( strQuery.split( 'OFFSET ' )[1].split()[0] )
+		strBody = json.dumps( { 'head' : { 'vars' : [ 'artifact', 'text' ] }, 'results' : { 'bindings' : listRows[ nOffset : nOffset + nLimit ] } } )
+		self.send_response( 200 )
+		self.send_header( 'Content-Type', 'application/sparql-results+json' )
+		self.send_header( 'Content-Length', str( len( strBody ) ) )
+		self.end_headers()
+		self.wfile.write( strBody )
+
+	def log_message( self, *args ) :
+		pass
+
+if __name__ == '__main__' :
+
+	logging.basicConfig( level=logging.WARNING )
+	dictConfig = { 'logger' : logging.getLogger( __name__ ) }
+
+	listArgs = sys.argv[1:]
+	nPort = 0
+	if '--serve' in listArgs :
+		nPort = int( listArgs[ listArgs.index( '--serve' ) + 1 ] )
+		del listArgs[ listArgs.index( '--serve' ) : listArgs.index( '--serve' ) + 2 ]
+
+	nRows = 25
+	if len( listArgs ) > 0 :
+		nRows = int( listArgs[0] )
+	for nIndex in range( nRows ) :
+		listRows.append( { 'artifact' : { 'type' : 'uri', 'value' : 'http://example.org/artifact/%06d' % nIndex }, 'text' : { 'type' : 'literal', 'value' : u'A bronze coin with a worn edge (%d).' % nIndex } } )
+
+	server = BaseHTTPServer.HTTPServer( ( '127.0.0.1', nPort ), StandInSPARQLHandler )
+	strEndpoint = 'http://127.0.0.1:%d/sparql' % server.server_port
+
+	if nPort != 0 :
+		print 'stand-in SPARQL endpoint ' + strEndpoint + ' (' + str( nRows ) + ' bindings)'
+		server.serve_forever()
+		sys.exit( 0 )
+
+	threadServer = threading.Thread( target = server.serve_forever )
+	threadServer.daemon = True
+	threadServer.start()
+
+	strQuery = 'SELECT ?artifact ?text WHERE { ?artifact <http://example.org/text> ?text } ORDER BY ?artifact'
+
+	# all bindings, in order, despite the failed request
+	listResult = list( ch_information_extraction_app.iter_sparql_endpoint_bindings( endpoint = strEndpoint, query = strQuery, page_size = 10, max_retries = 3, dict_openie_config = dictConfig ) )
+	if listResult != [ ( dictRow['artifact']['value'], dictRow['text']['value'] ) for dictRow in listRows ] :
+		raise Exception( 'bindings read from endpoint differ from bindings served' )
+	print 'paging : ' + str( len( listResult ) ) + ' bindings read in order, ' + str( listRequestCount[0] ) + ' requests (1 failed and retried)'
+
+	# consumer stops after the first binding, once the prefetch thread has filled the page queue and is waiting to put the next page
+	nThreadsBefore = threading.active_count()
+	for tupleBinding in ch_information_extraction_app.iter_sparql_endpoint_bindings( endpoint = strEndpoint, query = strQuery, page_size = 2, max_retries = 3, dict_openie_config = dictConfig ) :
+		time.sleep( 1 )
+		break
+	nTimeStart = time.time()
+	while ( threading.active_count() > nThreadsBefore ) and ( time.time() - nTimeStart < 10 ) :
+		time.sleep( 0.1 )
+	if threading.active_count() > nThreadsBefore :
+		raise Exception( 'prefetch thread still running 10s after early stop' )
+	print 'early stop : prefetch thread exited after %.1f s' % ( time.time() - nTimeStart )
+
+	server.shutdown()
@@ -0,0 +1,462 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+..
+	/////////////////////////////////////////////////////////////////////////
+	//
+	// (c) Copyright University of Southampton IT Innovation, 2018
+	//
+	// Copyright in this software belongs to IT Innovation Centre of
+	// Gamma House, Enterprise Road, Southampton SO16 7NS, UK.
+	//
+	// This software may not be used, sold, licensed, transferred, copied
+	// or reproduced in whole or in part in any manner or form or in or
+	// on any media by any person other than in accordance with the terms
+	// of the Licence Agreement supplied with the software, or otherwise
+	// without the prior written consent of the copyright owners.
+	//
+	// This software is distributed WITHOUT ANY WARRANTY, without even the
+	// implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+	// PURPOSE, except where stated in the Licence Agreement supplied with
+	// the software.
+	//
+	// Created By : Stuart E. Middleton
+	// Created Date : 2018/11/20
+	// Created for Project: GRAVITATE
+	//
+	/////////////////////////////////////////////////////////////////////////
+	//
+	// Dependancies: None
+	//
+	/////////////////////////////////////////////////////////////////////////
+	'''
+
+Persistent content-addressed cache for NLP results (e.g. POS tagged sents, dependency graphs) stored in a SQLite database
+
+"""
+
+
+import os, sys, json, hashlib, sqlite3, time
+import nltk, soton_corenlppy, openiepy
+import nlp_scheduler_lib
+
+# max number of SQL parameters per query (SQLite default limit is 999)
+nMaxSQLParams = 500
+
+# seconds to wait for a lock on a cache database shared by several processes (e.g. shards run on one machine) before failing (SQLite default is 5)
+nCacheLockTimeout = 600.0
+
+def open_cache( filename = None, table = None, max_entries = -1, dict_openie_config = None ) :
+	"""
+	open (or create) a persistent cache table in a SQLite database file.
+	each cache entry is a (key, value, last_access) row. keys are hashes of the content being cached, values are JSON serialized results.
+	when the cache grows beyond max_entries the least recently accessed entries are evicted.
+	several processes can share a cache file, each waits up to nCacheLockTimeout seconds for the database lock.
+
+	:param str filename: SQLite database filename
+	:param str table: name of the cache table (e.g. pos)
+	:param int max_entries: max number of entries in cache table before eviction starts (-1 for no limit)
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: cache handle = { 'connection' : sqlite3.Connection, 'table' : str, 'max_entries' : int, 'hits' : int, 'misses' : int, 'evictions' : int }
+	:rtype: dict
+	"""
+
+	if not isinstance( filename, (str,unicode) ) :
+		raise Exception( 'invalid filename' )
+	if not isinstance( table, str ) :
+		raise Exception( 'invalid table' )
+	if not table.isalnum() :
+		raise Exception( 'invalid table name (alpha numeric only) : ' + repr(table) )
+	if not isinstance( max_entries, int ) :
+		raise Exception( 'invalid max_entries' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	dbConnection = sqlite3.connect( filename, timeout = nCacheLockTimeout )
+	dbConnection.execute( 'CREATE TABLE IF NOT EXISTS ' + table + ' ( key TEXT PRIMARY KEY, value TEXT NOT NULL, last_access REAL NOT NULL )' )
+	dbConnection.execute( 'CREATE INDEX IF NOT EXISTS ' + table + '_last_access ON ' + table + ' ( last_access )' )
+	dbConnection.commit()
+
+	dict_cache = {
+		'connection' : dbConnection,
+		'table' : table,
+		'max_entries' : max_entries,
+		'hits' : 0,
+		'misses' : 0,
+		'evictions' : 0,
+		}
+
+	nSize = dbConnection.execute( 'SELECT COUNT(*) FROM ' + table ).fetchone()[0]
+	dict_openie_config['logger'].info( 'opened cache ' + filename + ' [' + table + '] entries = ' + str(nSize) )
+
+	return dict_cache
+
+def close_cache( dict_cache = None, dict_openie_config = None ) :
+	"""
+	log cache stats and close the cache database connection
+
+	:param dict dict_cache: cache handle returned from nlp_cache_lib.open_cache()
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+	"""
+
+	if not isinstance( dict_cache, dict ) :
+		raise Exception( 'invalid dict_cache' )
+
+	dict_openie_config['logger'].info( 'cache [' + dict_cache['table'] + '] ' + get_cache_stats( dict_cache = dict_cache ) )
+
+	dict_cache['connection'].commit()
+	dict_cache['connection'].close()
+	dict_cache['connection'] = None
+
+def get_cache_stats( dict_cache = None ) :
+	"""
+	return a human readable summary of cache hit/miss/eviction counters
+
+	:param dict dict_cache: cache handle returned from nlp_cache_lib.open_cache()
+
+	:return: stats summary
+	:rtype: str
+	"""
+
+	nTotal = dict_cache['hits'] + dict_cache['misses']
+	if nTotal > 0 :
+		nHitRate = 100.0 * dict_cache['hits'] / nTotal
+	else :
+		nHitRate = 0.0
+
+	return 'hits = ' + str(dict_cache['hits']) + ', misses = ' + str(dict_cache['misses']) + ', hit rate = ' + '%.1f' % nHitRate + '%, evictions = ' + str(dict_cache['evictions'])
+
+def calc_cache_key( list_components = None ) :
+	"""
+	calc a content-addressed cache key from a list of JSON serializable components (e.g. [ model_key, tokens ])
+
+	:param list list_components: components to hash
+
+	:return: SHA1 hex digest
+	:rtype: str
+	"""
+
+	if not isinstance( list_components, list ) :
+		raise Exception( 'invalid list_components' )
+
+	strSerialized = json.dumps( list_components, ensure_ascii = True, separators = (',',':') )
+	return hashlib.sha1( strSerialized ).hexdigest()
+
+def cache_lookup( dict_cache = None, list_keys = None ) :
+	"""
+	lookup a set of keys in the cache. hits are marked as accessed (so they are not evicted) and counted, misses are counted.
+
+	:param dict dict_cache: cache handle returned from nlp_cache_lib.open_cache()
+	:param list list_keys: list of keys from nlp_cache_lib.calc_cache_key()
+
+	:return: dict of JSON deserialized values for keys found in cache = { key : value }
+	:rtype: dict
+	"""
+
+	if not isinstance( dict_cache, dict ) :
+		raise Exception( 'invalid dict_cache' )
+	if not isinstance( list_keys, list ) :
+		raise Exception( 'invalid list_keys' )
+
+	dbConnection = dict_cache['connection']
+	strTable = dict_cache['table']
+
+	dictResult = {}
+	listUniqueKeys = list( set( list_keys ) )
+	for nIndex in range( 0, len(listUniqueKeys), nMaxSQLParams ) :
+		listChunk = listUniqueKeys[ nIndex : nIndex + nMaxSQLParams ]
+		strSQL = 'SELECT key, value FROM ' + strTable + ' WHERE key IN (' + ','.join( ['?'] * len(listChunk) ) + ')'
+		for ( strKey, strValue ) in dbConnection.execute( strSQL, listChunk ) :
+			dictResult[ str(strKey) ] = json.loads( strValue )
+
+	# mark hits as accessed
+	nTime = time.time()
+	dbConnection.executemany( 'UPDATE ' + strTable + ' SET last_access = ? WHERE key = ?', [ ( nTime, strKey ) for strKey in dictResult ] )
+	dbConnection.commit()
+
+	for strKey in list_keys :
+		if strKey in dictResult :
+			dict_cache['hits'] = dict_cache['hits'] + 1
+		else :
+			dict_cache['misses'] = dict_cache['misses'] + 1
+
+	return dictResult
+
+def cache_store( dict_cache = None, dict_entries = None ) :
+	"""
+	store a set of entries in the cache, then evict least recently accessed entries if the cache is larger than max_entries
+
+	:param dict dict_cache: cache handle returned from nlp_cache_lib.open_cache()
+	:param dict dict_entries: dict of JSON serializable values to store = { key : value }
+	"""
+
+	if not isinstance( dict_cache, dict ) :
+		raise Exception( 'invalid dict_cache' )
+	if not isinstance( dict_entries, dict ) :
+		raise Exception( 'invalid dict_entries' )
+
+	dbConnection = dict_cache['connection']
+	strTable = dict_cache['table']
+
+	nTime = time.time()
+	listRows = []
+	for strKey in dict_entries :
+		listRows.append( ( strKey, json.dumps( dict_entries[strKey], ensure_ascii = True, separators = (',',':') ), nTime ) )
+	dbConnection.executemany( 'INSERT OR REPLACE INTO ' + strTable + ' ( key, value, last_access ) VALUES ( ?, ?, ? )', listRows )
+	dbConnection.commit()
+
+	evict_cache( dict_cache = dict_cache )
+
+def evict_cache( dict_cache = None ) :
+	"""
+	evict the least recently accessed entries so the cache size is at most max_entries
+
+	:param dict dict_cache: cache handle returned from nlp_cache_lib.open_cache()
+	"""
+
+	if dict_cache['max_entries'] == -1 :
+		return
+
+	dbConnection = dict_cache['connection']
+	strTable = dict_cache['table']
+
+	nSize = dbConnection.execute( 'SELECT COUNT(*) FROM ' + strTable ).fetchone()[0]
+	nExcess = nSize - dict_cache['max_entries']
+	if nExcess <= 0 :
+		return
+
+	dbConnection.execute( 'DELETE FROM ' + strTable + ' WHERE key IN ( SELECT key FROM ' + strTable + ' ORDER BY last_access ASC LIMIT ? )', ( nExcess, ) )
+	dbConnection.commit()
+
+	dict_cache['evictions'] = dict_cache['evictions'] + nExcess
+
+def calc_pos_model_key( lang = 'en', dict_common_config = None ) :
+	"""
+	calc a key for the POS tagger model and settings used by common_parse_lib.pos_tag_tokenset(). if any of these change a cached POS tag is invalid.
+	key includes the tagger type and dir for this lang, the sent_token_seps and the token_preservation_regex (names, POS labels and regex patterns).
+
+	:param str lang: ISO 639-1 2 character language code (e.g. en)
+	:param dict dict_common_config: config object returned from common_parse_lib.get_common_config()
+
+	:return: list of JSON serializable model components
+	:rtype: list
+	"""
+
+	strLangBase = lang[:2]
+	if strLangBase in dict_common_config['lang_pos_mapping'] :
+		strType = dict_common_config['lang_pos_mapping'][strLangBase]
+	else :
+		strType = 'treebank'
+
+	if strType == 'stanford' :
+		strTaggerDir = dict_common_config['stanford_tagger_dir']
+	elif strType == 'treetagger' :
+		strTaggerDir = dict_common_config['treetagger_tagger_dir']
+	else :
+		strTaggerDir = None
+
+	listPreservationRegex = []
+	for ( strRegexName, strPOS ) in dict_common_config['token_preservation_regex'] :
+		rePattern = dict_common_config[strRegexName]
+		listPreservationRegex.append( [ strRegexName, strPOS, rePattern.pattern, rePattern.flags ] )
+
+	return [ 'pos', lang, strType, strTaggerDir, list( dict_common_config['sent_token_seps'] ), listPreservationRegex ]
+
+def pos_tag_tokenset_batch_cached( document_token_set = None, lang = 'en', dict_cache = None, max_processes = 4, timeout = 300, worker_pool = None, resident = False, dict_common_config = None ) :
+	"""
+	POS tag a batch of tokenized documents using nlp_scheduler_lib.pos_tag_tokenset_batch(), with a persistent cache so only documents not seen before (cache misses) are sent to the POS tagger.
+	documents are cached by a hash of their tokens and the POS tagger model key from nlp_cache_lib.calc_pos_model_key().
+
+	:param dict document_token_set: { docID : [ [token,token,...], ... ], ... } see common_parse_lib.pos_tag_tokenset_batch()
+	:param str lang: ISO 639-1 2 character language code (e.g. en)
+	:param dict dict_cache: cache handle returned from nlp_cache_lib.open_cache(). None will disable caching.
+	:param int max_processes: number of worker processes to spawn using multiprocessing.Process
+	:param int timeout: timeout in seconds for POS tagger process in the unlikely event the POS tagger hangs
+	:param dict worker_pool: worker pool handle returned from nlp_scheduler_lib.start_worker_pool(). None will start worker processes for this call only.
+	:param bool resident: if True the worker pool keeps resident Stanford POS taggers (see nlp_scheduler_lib.pos_tag_resident())
+	:param dict dict_common_config: config object returned from common_parse_lib.get_common_config()
+
+	:return: dict of POS tagged documents { docID : [ [ (token,pos),(token,pos),... ], ... ], ... }
+	:rtype: dict
+	"""
+
+	if not isinstance( document_token_set, dict ) :
+		raise Exception( 'invalid document_token_set' )
+	if not isinstance( dict_cache, (dict,type(None)) ) :
+		raise Exception( 'invalid dict_cache' )
+	if not isinstance( dict_common_config, dict ) :
+		raise Exception( 'invalid dict_common_config' )
+
+	if dict_cache == None :
+		return nlp_scheduler_lib.pos_tag_tokenset_batch(
+			document_token_set = document_token_set,
+			lang = lang,
+			dict_common_config = dict_common_config,
+			max_processes = max_processes,
+			timeout = timeout,
+			worker_pool = worker_pool,
+			resident = resident )
+
+	listModelKey = calc_pos_model_key( lang = lang, dict_common_config = dict_common_config )
+
+	# calc cache key for each document
+	dictDocKey = {}
+	for strDocumentID in document_token_set :
+		dictDocKey[strDocumentID] = calc_cache_key( [ listModelKey, document_token_set[strDocumentID] ] )
+
+	dictCached = cache_lookup( dict_cache = dict_cache, list_keys = dictDocKey.values() )
+
+	# use cached results for hits, and POS tag misses
+	dictOutputResults = {}
+	dictMisses = {}
+	for strDocumentID in document_token_set :
+		strKey = dictDocKey[strDocumentID]
+		if strKey in dictCached :
+			listPOSSet = []
+			for listSent in dictCached[strKey] :
+				listPOSSet.append( [ tuple( listEntry ) for listEntry in listSent ] )
+			dictOutputResults[strDocumentID] = listPOSSet
+		else :
+			dictMisses[strDocumentID] = document_token_set[strDocumentID]
+
+	dict_common_config['logger'].info( 'POS cache : ' + str(len(dictOutputResults)) + ' docs cached, ' + str(len(dictMisses)) + ' docs to POS tag' )
+
+	if len(dictMisses) > 0 :
+		dictTagged = nlp_scheduler_lib.pos_tag_tokenset_batch(
+			document_token_set = dictMisses,
+			lang = lang,
+			dict_common_config = dict_common_config,
+			max_processes = max_processes,
+			timeout = timeout,
+			worker_pool = worker_pool,
+			resident = resident )
+
+		dictNewEntries = {}
+		for strDocumentID in dictTagged :
+			dictOutputResults[strDocumentID] = dictTagged[strDocumentID]
+			dictNewEntries[ dictDocKey[strDocumentID] ] = dictTagged[strDocumentID]
+
+		cache_store( dict_cache = dict_cache, dict_entries = dictNewEntries )
+
+	return dictOutputResults
+
+def calc_dep_model_key( dict_custom_pos_mappings = {}, space_replacement_char = '_', dict_openie_config = None ) :
+	"""
+	calc a key for the dependency parser model and settings used by comp_sem_lib.parse_sent_trees(). if any of these change a cached dependency graph is invalid.
+	key includes the parser dir, model path, model jar, parser options, custom POS mappings and space replacement char.
+
+	:param dict dict_custom_pos_mappings: dict of custom POS mappings e.g. { 'FIGURE' : 'CD', 'TABLE' : 'CD', ... }
+	:param str space_replacement_char: replacement char for all token spaces
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: list of JSON serializable model components
+	:rtype: list
+	"""
+
+	if 'dep_options' in dict_openie_config :
+		strDepOptions = dict_openie_config['dep_options']
+	else :
+		strDepOptions = ''
+
+	return [ 'dep', dict_openie_config['stanford_parser_dir'], dict_openie_config['dep_model_path'], dict_openie_config['dep_model_jar'], strDepOptions, sorted( dict_custom_pos_mappings.items() ), space_replacement_char ]
+
+def parse_sent_trees_batch_cached( dict_doc_sent_trees = None, dep_parser = None, dict_custom_pos_mappings = {}, space_replacement_char = '_', dict_cache = None, max_processes = 4, worker_pool = None, resident = False, dict_openie_config = None ) :
+	"""
+	dependency parse a batch of documents using nlp_scheduler_lib.parse_sent_trees_batch(), with a persistent cache so only documents not seen before (cache misses) are sent to the dependency parser.
+	documents are cached by a hash of the tagged tokens the parser will see (i.e. flattened sent trees after prepare_tags_for_dependency_parse()) and the parser model key from nlp_cache_lib.calc_dep_model_key().
+	dependency graphs are cached in CoNLL format using comp_sem_lib.serialize_dependency_graph() and rehydrated on a cache hit.
+
+	:param dict dict_doc_sent_trees: dict of documents { docID : list of sent trees }
+	:param nltk.parse.stanford.StanfordDependencyParser dep_parser: dependency parser from comp_sem_lib.get_dependency_parser()
+	:param dict dict_custom_pos_mappings: dict of custom POS mappings e.g. { 'FIGURE' : 'CD', 'TABLE' : 'CD', ... }
+	:param str space_replacement_char: replacement char for all token spaces
+	:param dict dict_cache: cache handle returned from nlp_cache_lib.open_cache(). None will disable caching.
+	:param int max_processes: number of worker processes to spawn using multiprocessing.Process
+	:param dict worker_pool: worker pool handle returned from nlp_scheduler_lib.start_worker_pool(). None will start worker processes for this call only.
+	:param bool resident: if True the worker pool keeps resident Stanford parsers (see nlp_scheduler_lib.parse_sent_trees_resident())
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: dict of documents { docID : list of nltk.parse.DependencyGraph }
+	:rtype: dict
+	"""
+
+	if not isinstance( dict_doc_sent_trees, dict ) :
+		raise Exception( 'invalid dict_doc_sent_trees' )
+	if not isinstance( dict_cache, (dict,type(None)) ) :
+		raise Exception( 'invalid dict_cache' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	if dict_cache == None :
+		return nlp_scheduler_lib.parse_sent_trees_batch(
+			dict_doc_sent_trees = dict_doc_sent_trees,
+			dep_parser = dep_parser,
+			dict_custom_pos_mappings = dict_custom_pos_mappings,
+			space_replacement_char = space_replacement_char,
+			max_processes = max_processes,
+			worker_pool = worker_pool,
+			resident = resident,
+			dict_openie_config = dict_openie_config )
+
+	listModelKey = calc_dep_model_key( dict_custom_pos_mappings = dict_custom_pos_mappings, space_replacement_char = space_replacement_char, dict_openie_config = dict_openie_config )
+
+	# calc cache key for each document using the same tagged tokens that comp_sem_lib.parse_sent_trees() will send to the parser
+	dictDocKey = {}
+	for strDocumentID in dict_doc_sent_trees :
+		listTaggedSents = []
+		for treeSent in dict_doc_sent_trees[strDocumentID] :
+			treeFlat = soton_corenlppy.common_parse_lib.flattern_sent(
+				tree_sent = treeSent,
+				dict_common_config = dict_openie_config )
+			listTaggedSents.append( treeFlat.pos() )
+
+		openiepy.comp_sem_lib.prepare_tags_for_dependency_parse(
+			list_tagged_sents = listTaggedSents,
+			dict_custom_pos_mappings = dict_custom_pos_mappings,
+			space_replacement_char = space_replacement_char,
+			dict_openie_config = dict_openie_config )
+
+		dictDocKey[strDocumentID] = calc_cache_key( [ listModelKey, listTaggedSents ] )
+
+	dictCached = cache_lookup( dict_cache = dict_cache, list_keys = dictDocKey.values() )
+
+	# rehydrate cached graphs for hits, and dependency parse misses
+	dictOutputResults = {}
+	dictMisses = {}
+	for strDocumentID in dict_doc_sent_trees :
+		strKey = dictDocKey[strDocumentID]
+		if strKey in dictCached :
+			listSentGraphs = []
+			for strSerializedGraph in dictCached[strKey] :
+				listSentGraphs.append( nltk.parse.DependencyGraph( tree_str = strSerializedGraph, top_relation_label = 'root' ) )
+			dictOutputResults[strDocumentID] = listSentGraphs
+		else :
+			dictMisses[strDocumentID] = dict_doc_sent_trees[strDocumentID]
+
+	dict_openie_config['logger'].info( 'dep cache : ' + str(len(dictOutputResults)) + ' docs cached, ' + str(len(dictMisses)) + ' docs to dependency parse' )
+
+	if len(dictMisses) > 0 :
+		dictParsed = nlp_scheduler_lib.parse_sent_trees_batch(
+			dict_doc_sent_trees = dictMisses,
+			dep_parser = dep_parser,
+			dict_custom_pos_mappings = dict_custom_pos_mappings,
+			space_replacement_char = space_replacement_char,
+			max_processes = max_processes,
+			worker_pool = worker_pool,
+			resident = resident,
+			dict_openie_config = dict_openie_config )
+
+		dictNewEntries = {}
+		for strDocumentID in dictParsed :
+			dictOutputResults[strDocumentID] = dictParsed[strDocumentID]
+
+			listSerializedGraphs = []
+			for depObj in dictParsed[strDocumentID] :
+				listSerializedGraphs.append( openiepy.comp_sem_lib.serialize_dependency_graph( depObj, dict_openie_config ) )
+			dictNewEntries[ dictDocKey[strDocumentID] ] = listSerializedGraphs
+
+		cache_store( dict_cache = dict_cache, dict_entries = dictNewEntries )
+
+	return dictOutputResults
@@ -0,0 +1,1110 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+..
+	/////////////////////////////////////////////////////////////////////////
+	//
+	// (c) Copyright University of Southampton IT Innovation, 2018
+	//
+	// Copyright in this software belongs to IT Innovation Centre of
+	// Gamma House, Enterprise Road, Southampton SO16 7NS, UK.
+	//
+	// This software may not be used, sold, licensed, transferred, copied
+	// or reproduced in whole or in part in any manner or form or in or
+	// on any media by any person other than in accordance with the terms
+	// of the Licence Agreement supplied with the software, or otherwise
+	// without the prior written consent of the copyright owners.
+	//
+	// This software is distributed WITHOUT ANY WARRANTY, without even the
+	// implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+	// PURPOSE, except where stated in the Licence Agreement supplied with
+	// the software.
+	//
+	// Created By : Stuart E. Middleton
+	// Created Date : 2018/11/29
+	// Created for Project: GRAVITATE
+	//
+	/////////////////////////////////////////////////////////////////////////
+	//
+	// Dependancies: None
+	//
+	/////////////////////////////////////////////////////////////////////////
+	'''
+
+Dynamic work queue scheduler for NLP batch jobs (POS tagging, dependency parsing, template generation and matching). documents are ordered longest-first by estimated cost and grouped into small batches on a shared queue, so worker processes pull work as they finish and the tail of a run is balanced across workers. a pool of worker processes can be started once and reused by every batch job
+
+"""
+
+
+import os, sys, copy, time, logging, traceback, multiprocessing, Queue, cPickle, subprocess, threading, collections
+import nltk, soton_corenlppy, openiepy
+
+def schedule_batches( dict_costs = None, max_processes = 4, batches_per_process = 8 ) :
+	"""
+	order tasks longest-first by cost and group them into batches. the target cost of each batch is total cost / ( max_processes * batches_per_process ), so tasks more costly than the target get a batch of their own and appear first, and cheap tasks are grouped together to amortize per-batch overhead (e.g. JVM startup).
+
+	:param dict dict_costs: { task_id : cost }
+	:param int max_processes: number of worker processes
+	:param int batches_per_process: average number of batches per worker process
+
+	:return: list of batches, each a list of task_id's, in execution order
+	:rtype: list
+	"""
+
+	if not isinstance( dict_costs, dict ) :
+		raise Exception( 'invalid dict_costs' )
+	if not isinstance( max_processes, int ) :
+		raise Exception( 'invalid max_processes' )
+	if not isinstance( batches_per_process, int ) :
+		raise Exception( 'invalid batches_per_process' )
+
+	nCostTotal = sum( dict_costs.values() )
+	nCostTarget = max( 1, nCostTotal / max( 1, max_processes * batches_per_process ) )
+
+	listBatches = []
+	listBatch = []
+	nCostBatch = 0
+	for strTaskID in sorted( dict_costs.keys(), key=lambda entry: dict_costs[entry], reverse=True ) :
+		listBatch.append( strTaskID )
+		nCostBatch = nCostBatch + dict_costs[strTaskID]
+		if nCostBatch >= nCostTarget :
+			listBatches.append( listBatch )
+			listBatch = []
+			nCostBatch = 0
+
+	if len(listBatch) > 0 :
+		listBatches.append( listBatch )
+
+	return listBatches
+
+def start_worker_pool( max_processes = 4, dict_openie_config = None ) :
+	"""
+	start a pool of long-lived worker processes that can be reused by execute_batch_queue() for every NLP stage (POS tagging, dependency parsing, template generation, template matching).
+	workers are forked once with a copy of the config (including its compiled regex), so it is not pickled again for each stage.
+	the args of each execute_batch_queue() call are broadcast once per worker on a control queue, rather than sent with every batch.
+	worker processes are daemons, so they are terminated if the parent process exits without calling stop_worker_pool().
+
+	:param int max_processes: number of worker processes
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: worker pool handle
+	:rtype: dict
+	"""
+
+	if not isinstance( max_processes, int ) :
+		raise Exception( 'invalid max_processes' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	nProcessMax = max( 1, max_processes )
+
+	# multiprocess cannot pickle logger objects so run without logger
+	# each worker process will make a logger within its own process
+	dictConfigCopy = copy.copy( dict_openie_config )
+	dictConfigCopy['logger'] = None
+
+	queueTasks = multiprocessing.Queue()
+	queueResults = multiprocessing.Queue()
+
+	listControlQueues = []
+	listProcesses = []
+	for nProcess in range(nProcessMax) :
+		queueControl = multiprocessing.Queue()
+		processWorker = multiprocessing.Process(
+			target = batch_queue_worker,
+			args = (
+				queueTasks,
+				queueResults,
+				queueControl,
+				nProcess,
+				dictConfigCopy )
+			)
+		processWorker.daemon = True
+		listControlQueues.append( queueControl )
+		listProcesses.append( processWorker )
+
+	for processWorker in listProcesses :
+		processWorker.start()
+
+	dict_openie_config['logger'].info( 'worker pool started : ' + str(nProcessMax) + ' processes' )
+
+	return {
+		'processes' : listProcesses,
+		'queue_tasks' : queueTasks,
+		'queue_results' : queueResults,
+		'control_queues' : listControlQueues,
+		'context_version' : 0,
+		'running' : True,
+		}
+
+def stop_worker_pool( worker_pool = None, terminate = False ) :
+	"""
+	stop a worker pool started by start_worker_pool(). calling this on a pool that is already stopped does nothing.
+
+	:param dict worker_pool: worker pool handle returned from start_worker_pool()
+	:param bool terminate: if True terminate workers immediately, otherwise signal them to exit once they have finished their current batch
+	"""
+
+	if not isinstance( worker_pool, dict ) :
+		raise Exception( 'invalid worker_pool' )
+
+	if worker_pool['running'] == False :
+		return
+	worker_pool['running'] = False
+
+	if terminate == False :
+		for processWorker in worker_pool['processes'] :
+			worker_pool['queue_tasks'].put( None )
+		for processWorker in worker_pool['processes'] :
+			processWorker.join( 60 )
+
+	for processWorker in worker_pool['processes'] :
+		if processWorker.is_alive() :
+			processWorker.terminate()
+			processWorker.join()
+
+def execute_batch_queue( dict_tasks = None, dict_costs = None, batch_function = None, dict_batch_args = {}, max_processes = 4, batches_per_process = 8, stage = 'batch', worker_pool = None, dict_openie_config = None ) :
+	"""
+	execute tasks using a pool of worker processes pulling batches from a shared queue (see schedule_batches()).
+	the number of batches in the input queue is limited to 2 per worker, and topped up as results come back, to avoid multiprocess Queue overload.
+	per worker busy and idle time is logged at the end.
+
+	:param dict dict_tasks: { task_id : task payload }. payloads must be picklable.
+	:param dict dict_costs: { task_id : cost estimate (e.g. token count) }
+	:param func batch_function: module level function( list_task_payloads, dict_batch_args, dict_openie_config ) returning a list of results (one per payload)
+	:param dict dict_batch_args: args passed to batch_function (must be picklable)
+	:param int max_processes: number of worker processes (ignored if a worker_pool is provided)
+	:param int batches_per_process: average number of batches per worker process
+	:param str stage: stage name for logging (e.g. POS tagger)
+	:param dict worker_pool: worker pool handle returned from start_worker_pool(). None will start a worker pool for this call only.
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: { task_id : result }
+	:rtype: dict
+	"""
+
+	if not isinstance( dict_tasks, dict ) :
+		raise Exception( 'invalid dict_tasks' )
+	if not isinstance( dict_costs, dict ) :
+		raise Exception( 'invalid dict_costs' )
+	if not callable( batch_function ) :
+		raise Exception( 'invalid batch_function' )
+	if not isinstance( max_processes, int ) :
+		raise Exception( 'invalid max_processes' )
+	if not isinstance( worker_pool, (dict,type(None)) ) :
+		raise Exception( 'invalid worker_pool' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	logger = dict_openie_config['logger']
+
+	if len(dict_tasks) == 0 :
+		return {}
+
+	if worker_pool == None :
+		nProcessMax = max( 1, max_processes )
+	else :
+		if worker_pool['running'] == False :
+			raise Exception( stage + ' : worker pool is not running' )
+		nProcessMax = len( worker_pool['processes'] )
+
+	listBatches = schedule_batches( dict_costs = dict_costs, max_processes = nProcessMax, batches_per_process = batches_per_process )
+
+	# tag the batch function and its args with a new context version. the context is pickled once here (not by each Queue feeder thread, which would silently drop errors) so unpicklable args raise an error before any work is queued.
+	if worker_pool == None :
+		nContextVersion = 1
+	else :
+		nContextVersion = worker_pool['context_version'] + 1
+	strContext = cPickle.dumps( ( nContextVersion, batch_function, dict_batch_args ), cPickle.HIGHEST_PROTOCOL )
+
+	nTimeStart = time.time()
+
+	# no point starting more workers than there are batches
+	dictPool = worker_pool
+	if worker_pool == None :
+		nProcessMax = min( nProcessMax, len(listBatches) )
+		dictPool = start_worker_pool( max_processes = nProcessMax, dict_openie_config = dict_openie_config )
+
+	logger.info( stage + ' : ' + str(len(dict_tasks)) + ' tasks in ' + str(len(listBatches)) + ' batches for ' + str(nProcessMax) + ' processes' )
+
+	queueTasks = dictPool['queue_tasks']
+	queueResults = dictPool['queue_results']
+	listProcesses = dictPool['processes']
+
+	dictResults = {}
+	dictWorkerStats = {}
+	try :
+		# broadcast the batch function and its args to every worker once.
+		# batches carry the context version they need so workers pick up the new context before processing them.
+		dictPool['context_version'] = nContextVersion
+		for queueControl in dictPool['control_queues'] :
+			queueControl.put( strContext )
+
+		# feed batches 2 per worker, and top up the queue each time a batch result is returned
+		nBatchNext = 0
+		while (nBatchNext < len(listBatches)) and (nBatchNext < 2 * nProcessMax) :
+			queueTasks.put( ( nContextVersion, [ ( strTaskID, dict_tasks[strTaskID] ) for strTaskID in listBatches[nBatchNext] ] ) )
+			nBatchNext = nBatchNext + 1
+
+		nBatchesPending = len(listBatches)
+		while nBatchesPending > 0 :
+			try :
+				tupleResult = queueResults.get( True, 1 )
+			except Queue.Empty :
+				# check for workers that have died without reporting an error (e.g. killed by OS)
+				for nProcess in range(len(listProcesses)) :
+					if listProcesses[nProcess].is_alive() == False :
+						raise Exception( stage + ' : worker process ' + str(nProcess) + ' exited unexpectedly (code ' + repr(listProcesses[nProcess].exitcode) + ')' )
+				continue
+
+			if tupleResult[0] == 'error' :
+				raise Exception( stage + ' : worker process ' + str(tupleResult[1]) + ' failure > ' + tupleResult[2] )
+
+			( strType, nProcess, listTaskIDs, listTaskResults, nTimeBusy ) = tupleResult
+			for nIndex in range(len(listTaskIDs)) :
+				dictResults[ listTaskIDs[nIndex] ] = listTaskResults[nIndex]
+			nBatchesPending = nBatchesPending - 1
+
+			if not nProcess in dictWorkerStats :
+				dictWorkerStats[nProcess] = [ 0.0, 0 ]
+			dictWorkerStats[nProcess][0] = dictWorkerStats[nProcess][0] + nTimeBusy
+			dictWorkerStats[nProcess][1] = dictWorkerStats[nProcess][1] + 1
+
+			if nBatchNext < len(listBatches) :
+				queueTasks.put( ( nContextVersion, [ ( strTaskID, dict_tasks[strTaskID] ) for strTaskID in listBatches[nBatchNext] ] ) )
+				nBatchNext = nBatchNext + 1
+
+	except :
+		# queues are left in an unknown state so the pool cannot be reused
+		stop_worker_pool( worker_pool = dictPool, terminate = True )
+		raise
+
+	if worker_pool == None :
+		stop_worker_pool( worker_pool = dictPool )
+
+	# report per worker busy and idle time (idle = waiting for work, process startup and queue IO)
+	nTimeTotal = time.time() - nTimeStart
+	for nProcess in range(nProcessMax) :
+		( nTimeBusy, nBatchCount ) = dictWorkerStats.get( nProcess, [ 0.0, 0 ] )
+		logger.info( stage + ' : worker ' + str(nProcess) + ' batches = ' + str(nBatchCount) + ', busy = ' + '%.1f' % nTimeBusy + 's, idle = ' + '%.1f' % max( 0.0, nTimeTotal - nTimeBusy ) + 's' )
+	logger.info( stage + ' : elapsed = ' + '%.1f' % nTimeTotal + 's' )
+
+	return dictResults
+
+def batch_queue_worker( queue_tasks = None, queue_results = None, queue_control = None, process_id = 0, dict_openie_config = None ) :
+	"""
+	worker process for start_worker_pool(). pulls batches until a None batch is read.
+	before processing a batch the worker reads its control queue until it has the context (batch function and args) the batch was scheduled with.
+
+	:param multiprocessing.Queue queue_tasks: input queue of ( context_version, [ ( task_id, payload ), ... ] ) or None to stop
+	:param multiprocessing.Queue queue_results: output queue of ( 'result', process_id, [ task_id, ... ], [ result, ... ], busy_seconds ) or ( 'error', process_id, error_msg )
+	:param multiprocessing.Queue queue_control: input queue of pickled ( context_version, batch_function, dict_batch_args ) for this worker. see execute_batch_queue()
+	:param int process_id: ID of process for logging purposes
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+	"""
+
+	try :
+		# make a config with a valid logger (created within this process)
+		dictConfigCopy = copy.copy( dict_openie_config )
+
+		logger = logging.getLogger( __name__ )
+		if len(logger.handlers) == 0 :
+			hdlr = logging.StreamHandler( stream = sys.stdout )
+			LOG_FORMAT = ('%(levelname) -s %(asctime)s %(message)s')
+			fmt = logging.Formatter( fmt = LOG_FORMAT )
+			hdlr.setFormatter( fmt )
+			logger.addHandler( hdlr )
+		logger.setLevel( logging.INFO )
+
+		dictConfigCopy['logger'] = logger
+
+		nContextVersion = 0
+		batchFunction = None
+		dictBatchArgs = None
+
+		while True :
+			tupleTask = queue_tasks.get()
+			if tupleTask == None :
+				break
+
+			( nTaskContextVersion, listBatch ) = tupleTask
+			while nContextVersion < nTaskContextVersion :
+				( nContextVersion, batchFunction, dictBatchArgs ) = cPickle.loads( queue_control.get() )
+
+			nTimeBatch = time.time()
+
+			listTaskIDs = []
+			listPayloads = []
+			for ( strTaskID, objPayload ) in listBatch :
+				listTaskIDs.append( strTaskID )
+				listPayloads.append( objPayload )
+
+			listTaskResults = batchFunction( listPayloads, dictBatchArgs, dictConfigCopy )
+			if len(listTaskResults) != len(listPayloads) :
+				raise Exception( 'batch function returned ' + str(len(listTaskResults)) + ' results for ' + str(len(listPayloads)) + ' tasks' )
+
+			queue_results.put( ( 'result', process_id, listTaskIDs, listTaskResults, time.time() - nTimeBatch ) )
+
+		stop_resident_processes()
+
+	except :
+		# error result with a stack trace
+		listTrace = []
+		if sys.exc_info()[2] != None :
+			for tupleStack in traceback.extract_tb( sys.exc_info()[2] ) :
+				if tupleStack != None :
+					listTrace.append( repr(tupleStack[0]) + '\t' + repr(tupleStack[1]) + '\t' + repr(tupleStack[2]) + '\t' + repr(tupleStack[3]) )
+		strTrace = '\n'.join( listTrace )
+		queue_results.put( ( 'error', process_id, repr( sys.exc_info()[0] ) + '\n' + repr( sys.exc_info()[1] ) + '\n' + strTrace ) )
+
+#
+# resident Stanford processes
+# the Stanford POS tagger and dependency parser are Java programs, and starting a JVM and loading a model takes several seconds. a batch run amortizes this over a large batch,
+# but a service enriching a single artifact would pay it on every request. resident processes are started once in each worker process (on first use) and then driven over stdin/stdout,
+# using the same command line and text protocol as the per-call processes so the output is the same.
+#
+
+# resident processes of this worker process = { name : { 'cmd' : list, 'process' : subprocess.Popen, 'queue_out' : Queue.Queue, 'errors' : collections.deque } }
+dictResidentProcesses = {}
+
+# Stanford POS tagger model for each supported lang (same as common_parse_lib.pos_tag_tokenset())
+dictStanfordTaggerModels = {
+	'zh' : 'models' + os.sep + 'chinese-distsim.tagger',
+	'ar' : 'models' + os.sep + 'arabic.tagger',
+	'en' : 'models' + os.sep + 'english-caseless-left3words-distsim.tagger',
+	'fr' : 'models' + os.sep + 'french.tagger',
+	'de' : 'models' + os.sep + 'german-dewac.tagger',
+	'es' : 'models' + os.sep + 'spanish-distsim.tagger',
+	}
+
+def read_resident_stdout( pipe_handle = None, queue_buffer = None ) :
+	"""
+	thread function reading the stdout of a resident process line by line onto a queue. None is queued when stdout is closed (i.e. the process has exited).
+
+	:param file pipe_handle: stdout pipe of resident process
+	:param Queue.Queue queue_buffer: queue for lines read (UTF-8 str)
+	"""
+
+	try :
+		for strLine in iter( pipe_handle.readline, '' ) :
+			queue_buffer.put( strLine )
+	finally :
+		queue_buffer.put( None )
+
+def read_resident_stderr( pipe_handle = None, deque_errors = None ) :
+	"""
+	thread function draining the stderr of a resident process, so a chatty process (e.g. Stanford parser progress messages) never blocks on a full pipe. the last few lines are kept for error reports.
+
+	:param file pipe_handle: stderr pipe of resident process
+	:param collections.deque deque_errors: bounded deque for the last lines read
+	"""
+
+	for strLine in iter( pipe_handle.readline, '' ) :
+		deque_errors.append( strLine.rstrip() )
+
+def get_resident_process( name = None, list_cmd = None, working_dir = None, dict_openie_config = None ) :
+	"""
+	return a resident process for this worker process, starting it if it is not already running (or was started with a different command line)
+
+	:param str name: name of resident process (e.g. pos_tagger)
+	:param list list_cmd: command line
+	:param str working_dir: working dir for process (None for current dir)
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: resident process handle = { 'cmd' : list, 'process' : subprocess.Popen, 'queue_out' : Queue.Queue, 'errors' : collections.deque }
+	:rtype: dict
+	"""
+
+	if name in dictResidentProcesses :
+		dictResident = dictResidentProcesses[name]
+		if (dictResident['cmd'] == list_cmd) and (dictResident['process'].poll() == None) :
+			return dictResident
+		stop_resident_process( name = name )
+
+	processResident = subprocess.Popen( list_cmd, cwd = working_dir, shell = False, stdin = subprocess.PIPE, stdout = subprocess.PIPE, stderr = subprocess.PIPE )
+
+	dictResident = {
+		'cmd' : list_cmd,
+		'process' : processResident,
+		'queue_out' : Queue.Queue(),
+		'errors' : collections.deque( maxlen = 20 ),
+		}
+
+	threadOut = threading.Thread( target = read_resident_stdout, args = ( processResident.stdout, dictResident['queue_out'] ) )
+	threadOut.setDaemon( True )
+	threadOut.start()
+
+	threadErr = threading.Thread( target = read_resident_stderr, args = ( processResident.stderr, dictResident['errors'] ) )
+	threadErr.setDaemon( True )
+	threadErr.start()
+
+	dictResidentProcesses[name] = dictResident
+	dict_openie_config['logger'].info( 'resident process started : ' + name )
+
+	return dictResident
+
+def stop_resident_process( name = None ) :
+	"""
+	stop a resident process of this worker process (if running). stdin is closed so the process exits when it has finished its current input, and it is terminated if it does not.
+
+	:param str name: name of resident process
+	"""
+
+	if not name in dictResidentProcesses :
+		return
+
+	processResident = dictResidentProcesses[name]['process']
+	del dictResidentProcesses[name]
+
+	try :
+		processResident.stdin.close()
+	except IOError :
+		pass
+
+	for nWait in range(50) :
+		if processResident.poll() != None :
+			return
+		time.sleep( 0.1 )
+	processResident.terminate()
+
+def stop_resident_processes() :
+	"""
+	stop all resident processes of this worker process
+	"""
+
+	for strName in dictResidentProcesses.keys() :
+		stop_resident_process( name = strName )
+
+def write_resident_stdin( pipe_handle = None, list_lines = [] ) :
+	"""
+	thread function writing lines to the stdin of a resident process. stdin is flushed but left open for the next call.
+
+	:param file pipe_handle: stdin pipe of resident process
+	:param list list_lines: lines to write (unicode, without newlines)
+	"""
+
+	try :
+		for strLine in list_lines :
+			pipe_handle.write( strLine.encode( 'utf8' ) + '\n' )
+		pipe_handle.flush()
+	except IOError :
+		# process has exited. this is reported by the reader of its response
+		pass
+
+def exchange_resident_lines( name = None, dict_resident = None, list_lines = [], count_blocks = 0, blank_line_blocks = False, timeout = 300 ) :
+	"""
+	write lines to a resident process and read its response.
+	the response is either count_blocks lines (blank_line_blocks = False) or count_blocks blocks of lines each terminated by a blank line (blank_line_blocks = True).
+	on a timeout or process failure the resident process is stopped (so it is restarted by the next call) and an exception is raised.
+
+	:param str name: name of resident process
+	:param dict dict_resident: resident process handle returned from get_resident_process()
+	:param list list_lines: lines to write (unicode, without newlines)
+	:param int count_blocks: number of lines or blocks expected
+	:param bool blank_line_blocks: if True read blocks terminated by blank lines, otherwise read single lines
+	:param int timeout: timeout in seconds for the whole response
+
+	:return: list of response lines (blank_line_blocks = False) or list of blocks, each a list of lines (blank_line_blocks = True). lines are unicode without newlines.
+	:rtype: list
+	"""
+
+	processResident = dict_resident['process']
+	queueOut = dict_resident['queue_out']
+
+	try :
+		# write input in a thread, so a large input cannot deadlock against a process blocked writing its output
+		threadIn = threading.Thread( target = write_resident_stdin, args = ( processResident.stdin, list_lines ) )
+		threadIn.setDaemon( True )
+		threadIn.start()
+
+		listResult = []
+		listBlock = []
+		nTimeExpire = time.time() + timeout
+		while len(listResult) < count_blocks :
+			try :
+				strLine = queueOut.get( True, max( 0.01, nTimeExpire - time.time() ) )
+			except Queue.Empty :
+				raise Exception( name + ' : timeout waiting for resident process response (' + str(len(listResult)) + ' of ' + str(count_blocks) + ' read)' )
+			if strLine == None :
+				raise Exception( name + ' : resident process exited (code ' + repr( processResident.poll() ) + ') : ' + '\n'.join( dict_resident['errors'] ) )
+
+			strLine = strLine.decode( 'utf8' ).rstrip( u'\r\n' )
+
+			if blank_line_blocks == False :
+				listResult.append( strLine )
+			elif strLine == u'' :
+				listResult.append( listBlock )
+				listBlock = []
+			else :
+				listBlock.append( strLine )
+
+		threadIn.join( max( 0.01, nTimeExpire - time.time() ) )
+
+	except :
+		stop_resident_process( name = name )
+		raise
+
+	return listResult
+
+def get_stanford_tagger_command( lang = 'en', dict_common_config = None ) :
+	"""
+	return the Stanford POS tagger command line used by common_parse_lib.pos_tag_tokenset() for a lang, or None if the lang is not tagged with the Stanford POS tagger (e.g. treebank or treetagger)
+
+	:param str lang: ISO 639-1 2 character language code (e.g. 'en')
+	:param dict dict_common_config: config object returned from common_parse_lib.get_common_config()
+
+	:return: ( list_cmd, working_dir ) or None
+	:rtype: tuple
+	"""
+
+	strLangBase = lang.lower()
+	if strLangBase == 'uk' :
+		strLangBase = 'ru'
+
+	if dict_common_config['lang_pos_mapping'].get( strLangBase ) != 'stanford' :
+		return None
+	if not strLangBase in dictStanfordTaggerModels :
+		raise Exception( 'unsupported language for stanford POS : ' + repr(strLangBase) )
+
+	listCMD = [
+		'java',
+		'-mx300m',
+		'-classpath',
+		'stanford-postagger.jar',
+		'edu.stanford.nlp.tagger.maxent.MaxentTagger',
+		'-model',
+		dictStanfordTaggerModels[strLangBase],
+		'-sentenceDelimiter',
+		'null',
+		'-tokenize',
+		'false',
+		'-outputFormat',
+		'slashTags'
+		]
+
+	return ( listCMD, dict_common_config['stanford_tagger_dir'] )
+
+def get_stanford_parser_command( dep_parser = None ) :
+	"""
+	return the command line nltk.parse.stanford.StanfordDependencyParser.tagged_parse_sents() runs, with the input read from stdin ('-') rather than a temp file
+
+	:param nltk.parse.stanford.StanfordDependencyParser dep_parser: dependency parser from comp_sem_lib.get_dependency_parser()
+
+	:return: command line
+	:rtype: list
+	"""
+
+	listCMD = [ 'java' ]
+	listCMD.extend( dep_parser.java_options.split() )
+	listCMD.extend( [
+		'-cp',
+		os.pathsep.join( dep_parser._classpath ),
+		dep_parser._MAIN_CLASS,
+		'-model',
+		dep_parser.model_path,
+		'-sentences',
+		'newline',
+		'-outputFormat',
+		dep_parser._OUTPUT_FORMAT,
+		'-tokenized',
+		'-tagSeparator',
+		'/',
+		'-tokenizerFactory',
+		'edu.stanford.nlp.process.WhitespaceTokenizer',
+		'-tokenizerMethod',
+		'newCoreLabelTokenizerFactory',
+		'-encoding',
+		dep_parser._encoding,
+		] )
+	if dep_parser.corenlp_options :
+		listCMD.append( dep_parser.corenlp_options )
+	listCMD.append( '-' )
+
+	return listCMD
+
+def pos_tag_resident( token_set = None, lang = 'en', timeout = 300, dict_common_config = None ) :
+	"""
+	POS tag a list of tokenized sents using a resident Stanford POS tagger. same result as common_parse_lib.pos_tag_tokenset(), which is used for langs not tagged by Stanford.
+	tokens are written one per line and the tagger returns one tagged token per line, as for common_parse_lib.pos_tag_tokenset(), but stdin is left open so the tagger is reused by the next call.
+
+	:param list token_set: list of token sets (one per sent), each a list of token strings
+	:param str lang: ISO 639-1 2 character language code (e.g. 'en')
+	:param int timeout: timeout in seconds for POS tagger response
+	:param dict dict_common_config: config object returned from common_parse_lib.get_common_config()
+
+	:return: list of POS tagged sents e.g. [ [ ('And', 'CC'), ('now', 'RB'), ... ], ... ]
+	:rtype: list
+	"""
+
+	tupleCMD = get_stanford_tagger_command( lang = lang, dict_common_config = dict_common_config )
+	if tupleCMD == None :
+		return soton_corenlppy.common_parse_lib.pos_tag_tokenset( token_set = token_set, lang = lang, dict_common_config = dict_common_config, timeout = timeout )
+
+	listNewlineChars = dict_common_config['sent_token_seps']
+
+	# newline tokens are not sent to the tagger (they are labelled NEWLINE)
+	listLines = []
+	for listSentTokens in token_set :
+		for token in listSentTokens :
+			if not token in listNewlineChars :
+				# Stanford style escape brackets so they get POS tagged correctly
+				listLines.append( soton_corenlppy.common_parse_lib.escape_token( token ) )
+
+	listOutputPOS = []
+	if len(listLines) > 0 :
+		dictResident = get_resident_process( name = 'pos_tagger', list_cmd = tupleCMD[0], working_dir = tupleCMD[1], dict_openie_config = dict_common_config )
+		listOutputPOS = exchange_resident_lines( name = 'pos_tagger', dict_resident = dictResident, list_lines = listLines, count_blocks = len(listLines), timeout = timeout )
+
+	# reconstruct the token sets (see common_parse_lib.pos_tag_tokenset())
+	listResult = []
+	nIndexPos = 0
+	for listSentTokens in token_set :
+		listTaggedSent = []
+		for token in listSentTokens :
+			if token in listNewlineChars :
+				listTaggedSent.append( ( token, 'NEWLINE' ) )
+				continue
+
+			listPOS = listOutputPOS[nIndexPos].strip().rsplit( '_', 1 )
+			nIndexPos = nIndexPos + 1
+			if len(listPOS) != 2 :
+				raise Exception( 'POS failed : ' + repr(listOutputPOS[nIndexPos - 1]) )
+
+			# the original token is used (not the returned token), and tokens matching a URL or namespace regex get a fixed POS tag
+			strPOS = listPOS[1]
+			for ( strRegexName, strPOSTokenName ) in dict_common_config['token_preservation_regex'] :
+				if dict_common_config[ strRegexName ].match( token ) != None :
+					strPOS = strPOSTokenName
+					break
+
+			listTaggedSent.append( ( token, strPOS ) )
+
+		listResult.append( listTaggedSent )
+
+	return listResult
+
+def parse_sent_trees_resident( list_sent_trees = None, dep_parser = None, dict_custom_pos_mappings = {}, space_replacement_char = '_', timeout = 300, dict_openie_config = None ) :
+	"""
+	dependency parse a list of sent trees using a resident Stanford parser. same result as comp_sem_lib.parse_sent_trees().
+	the parser reads one tagged sent per line from stdin and writes a CoNLL block (terminated by a blank line) for each sent.
+
+	:param list list_sent_trees: list of stanford POS tagged sent trees
+	:param nltk.parse.stanford.StanfordDependencyParser dep_parser: dependency parser from comp_sem_lib.get_dependency_parser()
+	:param dict dict_custom_pos_mappings: dict of custom POS mappings e.g. { 'FIGURE' : 'CD', 'TABLE' : 'CD', ... }
+	:param str space_replacement_char: replacement char for all token spaces
+	:param int timeout: timeout in seconds for parser response
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: list of nltk.parse.DependencyGraph
+	:rtype: list
+	"""
+
+	# flatten sents and prepare tags exactly as comp_sem_lib.parse_sent_trees() does
+	listTaggedSents = []
+	for treeSent in list_sent_trees :
+		treeFlat = soton_corenlppy.common_parse_lib.flattern_sent( tree_sent = treeSent, dict_common_config = dict_openie_config )
+		listTaggedSents.append( treeFlat.pos() )
+
+	openiepy.comp_sem_lib.prepare_tags_for_dependency_parse(
+		list_tagged_sents = listTaggedSents,
+		dict_custom_pos_mappings = dict_custom_pos_mappings,
+		dict_openie_config = dict_openie_config )
+
+	if len(listTaggedSents) == 0 :
+		return []
+
+	listLines = []
+	for listTagged in listTaggedSents :
+		listLines.append( u' '.join( u'/'.join( tupleTagged ) for tupleTagged in listTagged ) )
+
+	dictResident = get_resident_process( name = 'dep_parser', list_cmd = get_stanford_parser_command( dep_parser = dep_parser ), dict_openie_config = dict_openie_config )
+	listBlocks = exchange_resident_lines( name = 'dep_parser', dict_resident = dictResident, list_lines = listLines, count_blocks = len(listLines), blank_line_blocks = True, timeout = timeout )
+
+	listSentGraphs = []
+	for listBlock in listBlocks :
+		# Stanford parser can output non-breaking spaces, which nltk replaces (see nltk.parse.stanford.GenericStanfordParser._execute())
+		listSentGraphs.append( dep_parser._make_tree( u'\n'.join( listBlock ).replace( u'\xa0', u' ' ) ) )
+
+	return listSentGraphs
+
+def pos_tag_batch_function( list_doc_token_sets = None, dict_batch_args = None, dict_openie_config = None ) :
+	"""
+	batch function for pos_tag_tokenset_batch(). all sents in the batch are POS tagged in a single call to the POS tagger.
+
+	:param list list_doc_token_sets: list of documents, each a list of token sets (one per sent)
+	:param dict dict_batch_args: { 'lang' : str, 'timeout' : int, 'resident' : bool }
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: list of documents, each a list of POS tagged token sets
+	:rtype: list
+	"""
+
+	listCorpusTokenSet = []
+	for listDocTokenSet in list_doc_token_sets :
+		listCorpusTokenSet.extend( listDocTokenSet )
+
+	listTaggedCorpusTokenSet = []
+	if (len(listCorpusTokenSet) > 0) and (dict_batch_args['resident'] == True) :
+		listTaggedCorpusTokenSet = pos_tag_resident(
+			token_set = listCorpusTokenSet,
+			lang = dict_batch_args['lang'],
+			timeout = dict_batch_args['timeout'],
+			dict_common_config = dict_openie_config )
+	elif len(listCorpusTokenSet) > 0 :
+		listTaggedCorpusTokenSet = soton_corenlppy.common_parse_lib.pos_tag_tokenset(
+			token_set = listCorpusTokenSet,
+			lang = dict_batch_args['lang'],
+			dict_common_config = dict_openie_config,
+			timeout = dict_batch_args['timeout'] )
+
+	listResult = []
+	nIndex = 0
+	for listDocTokenSet in list_doc_token_sets :
+		listResult.append( listTaggedCorpusTokenSet[ nIndex : nIndex + len(listDocTokenSet) ] )
+		nIndex = nIndex + len(listDocTokenSet)
+
+	return listResult
+
+def pos_tag_tokenset_batch( document_token_set = None, lang = 'en', dict_common_config = None, max_processes = 4, timeout = 300, worker_pool = None, resident = False ) :
+	"""
+	POS tag a batch of tokenized documents. same interface as common_parse_lib.pos_tag_tokenset_batch() but documents are scheduled longest-first (cost = token count) on a shared work queue, so no worker is left with a long tail of documents while others are idle.
+
+	:param dict document_token_set: { docID : [ token_set for each document sent ] }
+	:param str lang: ISO 639-1 2 character language code (e.g. 'en')
+	:param dict dict_common_config: config object returned from common_parse_lib.get_common_config()
+	:param int max_processes: number of worker processes
+	:param int timeout: timeout in seconds for POS tagger process in the unlikely event the POS tagger hangs
+	:param dict worker_pool: worker pool handle returned from nlp_scheduler_lib.start_worker_pool(). None will start worker processes for this call only.
+	:param bool resident: if True each worker keeps a resident Stanford POS tagger for reuse by later calls (see pos_tag_resident()). use with a worker_pool, otherwise the tagger exits with the workers at the end of this call.
+
+	:return: dict of POS tagged documents { docID : [ tagged_token_set for each document sent ] }
+	:rtype: dict
+	"""
+
+	if not isinstance( document_token_set, dict ) :
+		raise Exception( 'invalid document_token_set' )
+	if not isinstance( lang, (str,unicode) ) :
+		raise Exception( 'invalid lang' )
+	if not isinstance( dict_common_config, dict ) :
+		raise Exception( 'invalid dict_common_config' )
+
+	dictCosts = {}
+	for strDocumentID in document_token_set :
+		nTokens = 0
+		for listTokens in document_token_set[strDocumentID] :
+			nTokens = nTokens + len(listTokens)
+		dictCosts[strDocumentID] = nTokens
+
+	return execute_batch_queue(
+		dict_tasks = document_token_set,
+		dict_costs = dictCosts,
+		batch_function = pos_tag_batch_function,
+		dict_batch_args = { 'lang' : lang, 'timeout' : timeout, 'resident' : resident },
+		max_processes = max_processes,
+		stage = 'POS tagger',
+		worker_pool = worker_pool,
+		dict_openie_config = dict_common_config )
+
+def dep_parse_batch_function( list_doc_sent_trees = None, dict_batch_args = None, dict_openie_config = None ) :
+	"""
+	batch function for parse_sent_trees_batch(). all sents in the batch are dependency parsed in a single call to the dependency parser.
+
+	:param list list_doc_sent_trees: list of documents, each a list of sent trees
+	:param dict dict_batch_args: { 'dep_parser' : nltk.parse.stanford.StanfordDependencyParser, 'dict_custom_pos_mappings' : dict, 'space_replacement_char' : str, 'resident' : bool }
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: list of documents, each a list of serialized dependency graphs (see comp_sem_lib.serialize_dependency_graph())
+	:rtype: list
+	"""
+
+	listCorpusSentTrees = []
+	for listSentTrees in list_doc_sent_trees :
+		listCorpusSentTrees.extend( listSentTrees )
+
+	listCorpusDepGraphs = []
+	if (len(listCorpusSentTrees) > 0) and (dict_batch_args['resident'] == True) :
+		listCorpusDepGraphs = parse_sent_trees_resident(
+			list_sent_trees = listCorpusSentTrees,
+			dep_parser = dict_batch_args['dep_parser'],
+			dict_custom_pos_mappings = dict_batch_args['dict_custom_pos_mappings'],
+			space_replacement_char = dict_batch_args['space_replacement_char'],
+			dict_openie_config = dict_openie_config )
+	elif len(listCorpusSentTrees) > 0 :
+		listCorpusDepGraphs = openiepy.comp_sem_lib.parse_sent_trees(
+			list_sent_trees = listCorpusSentTrees,
+			dep_parser = dict_batch_args['dep_parser'],
+			dict_custom_pos_mappings = dict_batch_args['dict_custom_pos_mappings'],
+			space_replacement_char = dict_batch_args['space_replacement_char'],
+			dict_openie_config = dict_openie_config )
+
+	if len(listCorpusDepGraphs) != len(listCorpusSentTrees) :
+		raise Exception( 'dependency parser returned ' + str(len(listCorpusDepGraphs)) + ' graphs for ' + str(len(listCorpusSentTrees)) + ' sents' )
+
+	# serialize graphs as dep graph contains function pointers which cannot be pickled on a Queue
+	listResult = []
+	nIndex = 0
+	for listSentTrees in list_doc_sent_trees :
+		listSerialized = []
+		for depGraph in listCorpusDepGraphs[ nIndex : nIndex + len(listSentTrees) ] :
+			listSerialized.append( openiepy.comp_sem_lib.serialize_dependency_graph( dep_graph = depGraph, dict_openie_config = dict_openie_config ) )
+		listResult.append( listSerialized )
+		nIndex = nIndex + len(listSentTrees)
+
+	return listResult
+
+def parse_sent_trees_batch( dict_doc_sent_trees = None, dep_parser = None, dict_custom_pos_mappings = {}, space_replacement_char = '_', max_processes = 4, worker_pool = None, resident = False, dict_openie_config = None ) :
+	"""
+	dependency parse a batch of documents. same interface as comp_sem_lib.parse_sent_trees_batch() but documents are scheduled longest-first (cost = token count) on a shared work queue, and each batch of documents is parsed with a single call to the dependency parser.
+
+	:param dict dict_doc_sent_trees: dict of documents { docID : list of sent trees }
+	:param nltk.parse.stanford.StanfordDependencyParser dep_parser: dependency parser from comp_sem_lib.get_dependency_parser()
+	:param dict dict_custom_pos_mappings: dict of custom POS mappings e.g. { 'FIGURE' : 'CD', 'TABLE' : 'CD', ... }
+	:param str space_replacement_char: replacement char for all token spaces
+	:param int max_processes: number of worker processes
+	:param dict worker_pool: worker pool handle returned from nlp_scheduler_lib.start_worker_pool(). None will start worker processes for this call only.
+	:param bool resident: if True each worker keeps a resident Stanford parser for reuse by later calls (see parse_sent_trees_resident()). use with a worker_pool, otherwise the parser exits with the workers at the end of this call.
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: dict of documents { docID : list of nltk.parse.DependencyGraph }
+	:rtype: dict
+	"""
+
+	if not isinstance( dict_doc_sent_trees, dict ) :
+		raise Exception( 'invalid dict_doc_sent_trees' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	dictCosts = {}
+	for strDocumentID in dict_doc_sent_trees :
+		nTokens = 0
+		for treeSent in dict_doc_sent_trees[strDocumentID] :
+			nTokens = nTokens + len( treeSent.leaves() )
+		dictCosts[strDocumentID] = nTokens
+
+	dictSerialized = execute_batch_queue(
+		dict_tasks = dict_doc_sent_trees,
+		dict_costs = dictCosts,
+		batch_function = dep_parse_batch_function,
+		dict_batch_args = { 'dep_parser' : dep_parser, 'dict_custom_pos_mappings' : dict_custom_pos_mappings, 'space_replacement_char' : space_replacement_char, 'resident' : resident },
+		max_processes = max_processes,
+		stage = 'dep parse',
+		worker_pool = worker_pool,
+		dict_openie_config = dict_openie_config )
+
+	# make NLTK dep graph objects from the serialized form
+	dictDepGraphs = {}
+	for strDocumentID in dictSerialized :
+		dictDepGraphs[strDocumentID] = []
+		for strSerializedGraph in dictSerialized[strDocumentID] :
+			dictDepGraphs[strDocumentID].append( nltk.parse.DependencyGraph( tree_str = strSerializedGraph, top_relation_label = 'root' ) )
+
+	return dictDepGraphs
+
+def serialize_document_graphs( dict_document_sent_graphs = None, dict_openie_config = None ) :
+	"""
+	serialize the dependency graphs of a set of documents so they can be sent to worker processes (dep graphs contain function pointers which cannot be pickled on a Queue).
+	the cost of each document is the number of graph nodes.
+
+	:param dict dict_document_sent_graphs: dict of documents { docID : list of nltk.parse.DependencyGraph }
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: ( { docID : list of serialized graphs }, { docID : cost } )
+	:rtype: tuple
+	"""
+
+	dictSerialized = {}
+	dictCosts = {}
+	for strDocumentID in dict_document_sent_graphs :
+		listSerialized = []
+		nNodes = 0
+		for depGraph in dict_document_sent_graphs[strDocumentID] :
+			listSerialized.append( openiepy.comp_sem_lib.serialize_dependency_graph( dep_graph = depGraph, dict_openie_config = dict_openie_config ) )
+			nNodes = nNodes + len( depGraph.nodes )
+		dictSerialized[strDocumentID] = listSerialized
+		dictCosts[strDocumentID] = nNodes
+
+	return ( dictSerialized, dictCosts )
+
+def generate_templates_batch_function( list_doc_graphs = None, dict_batch_args = None, dict_openie_config = None ) :
+	"""
+	batch function for generate_open_extraction_templates_batch(). templates are generated one sent graph at a time (as comp_sem_lib.generate_open_extraction_templates_worker() does).
+
+	:param list list_doc_graphs: list of documents, each a list of serialized dependency graphs
+	:param dict dict_batch_args: args for comp_sem_lib.generate_open_extraction_templates() { 'seed_tuples' : ..., 'var_candidates' : ..., 'dict_seed_to_template_mappings' : ..., 'dict_context_dep_types' : ..., 'longest_dep_path' : ..., 'longest_inter_target_walk' : ..., 'max_seed_variants' : ..., 'allow_seed_subsumption' : ..., 'avoid_dep_set' : ... }
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: list of documents, each a list of open extraction templates
+	:rtype: list
+	"""
+
+	listResult = []
+	for listSerializedGraphs in list_doc_graphs :
+		listPatternsDoc = []
+		for strSerializedGraph in listSerializedGraphs :
+			depObj = nltk.parse.DependencyGraph( tree_str = strSerializedGraph, top_relation_label = 'root' )
+
+			listPatterns = openiepy.comp_sem_lib.generate_open_extraction_templates(
+				seed_tuples = dict_batch_args['seed_tuples'],
+				var_candidates = dict_batch_args['var_candidates'],
+				corpus_sent_graphs = [ depObj ],
+				dict_seed_to_template_mappings = dict_batch_args['dict_seed_to_template_mappings'],
+				dict_context_dep_types = dict_batch_args['dict_context_dep_types'],
+				longest_dep_path = dict_batch_args['longest_dep_path'],
+				longest_inter_target_walk = dict_batch_args['longest_inter_target_walk'],
+				max_seed_variants = dict_batch_args['max_seed_variants'],
+				allow_seed_subsumption = dict_batch_args['allow_seed_subsumption'],
+				avoid_dep_set = dict_batch_args['avoid_dep_set'],
+				dict_openie_config = dict_openie_config )
+			listPatternsDoc.extend( listPatterns )
+
+		listResult.append( listPatternsDoc )
+
+	return listResult
+
+def generate_open_extraction_templates_batch( seed_tuples = None, var_candidates = None, dict_document_sent_graphs = {}, dict_seed_to_template_mappings = {}, dict_context_dep_types = [], max_processes = 4, longest_dep_path = 32, longest_inter_target_walk = 2, max_seed_variants = 128, allow_seed_subsumption = True, avoid_dep_set = set([]), worker_pool = None, dict_openie_config = None ) :
+	"""
+	generate open extraction templates for a batch of documents. same interface as comp_sem_lib.generate_open_extraction_templates_batch() but documents are scheduled longest-first (cost = graph nodes) on a shared work queue, and a worker_pool can be reused across calls.
+	documents that share the same list of graphs (e.g. duplicate sents, see attrib_ie.parse_corpus()) are generated once and their templates repeated for each of them, so template frequencies are the same as if each was generated separately.
+
+	:param list seed_tuples: list (or set) of seed_tuples from comp_sem_lib.generate_seed_tuples()
+	:param dict var_candidates: dict of seed tuple variable types, each containing a list of phrases that are var candidates, from comp_sem_lib.generate_seed_tuples()
+	:param dict dict_document_sent_graphs: dict of documents { docID : list of nltk.parse.DependencyGraph }
+	:param list dict_seed_to_template_mappings: dict of mappings from seed_tuple type names (e.g. 'ARGUMENT') to open extraction template types (e.g. 'arg')
+	:param dict dict_context_dep_types: dict of contextual dependency types that are to be added if not already on graph path (e.g. neg)
+	:param int max_processes: number of worker processes
+	:param int longest_dep_path: longest graph path allowed for walks
+	:param int longest_inter_target_walk: longest inter-target variable walk distance allowed
+	:param int max_seed_variants: max number of seed variants possible for an individual sent graph
+	:param bool allow_seed_subsumption: if True removes any seed token which is subsumed by other seed token
+	:param set avoid_dep_set: set of dep types to avoid walking
+	:param dict worker_pool: worker pool handle returned from nlp_scheduler_lib.start_worker_pool(). None will start worker processes for this call only.
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: list of open extraction templates
+	:rtype: list
+	"""
+
+	if not isinstance( dict_document_sent_graphs, dict ) :
+		raise Exception( 'invalid dict_document_sent_graphs' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	# documents sharing a graph list with an earlier document = { docID : docID of earlier document }
+	dictUniqueGraphs = {}
+	dictSharedGraphs = {}
+	dictFirstDocument = {}
+	for strDocumentID in sorted( dict_document_sent_graphs.keys() ) :
+		listGraphs = dict_document_sent_graphs[strDocumentID]
+		if id(listGraphs) in dictFirstDocument :
+			dictSharedGraphs[strDocumentID] = dictFirstDocument[ id(listGraphs) ]
+		else :
+			dictFirstDocument[ id(listGraphs) ] = strDocumentID
+			dictUniqueGraphs[strDocumentID] = listGraphs
+
+	( dictSerialized, dictCosts ) = serialize_document_graphs( dict_document_sent_graphs = dictUniqueGraphs, dict_openie_config = dict_openie_config )
+
+	dictBatchArgs = {
+		'seed_tuples' : seed_tuples,
+		'var_candidates' : var_candidates,
+		'dict_seed_to_template_mappings' : dict_seed_to_template_mappings,
+		'dict_context_dep_types' : dict_context_dep_types,
+		'longest_dep_path' : longest_dep_path,
+		'longest_inter_target_walk' : longest_inter_target_walk,
+		'max_seed_variants' : max_seed_variants,
+		'allow_seed_subsumption' : allow_seed_subsumption,
+		'avoid_dep_set' : avoid_dep_set,
+		}
+
+	dictPatterns = execute_batch_queue(
+		dict_tasks = dictSerialized,
+		dict_costs = dictCosts,
+		batch_function = generate_templates_batch_function,
+		dict_batch_args = dictBatchArgs,
+		max_processes = max_processes,
+		stage = 'generate templates',
+		worker_pool = worker_pool,
+		dict_openie_config = dict_openie_config )
+
+	listPatternsTotal = []
+	for strDocumentID in sorted( dict_document_sent_graphs.keys() ) :
+		if strDocumentID in dictSharedGraphs :
+			listPatternsTotal.extend( dictPatterns[ dictSharedGraphs[strDocumentID] ] )
+		else :
+			listPatternsTotal.extend( dictPatterns[strDocumentID] )
+
+	return listPatternsTotal
+
+def match_patterns_batch_function( list_doc_graphs = None, dict_batch_args = None, dict_openie_config = None ) :
+	"""
+	batch function for match_extraction_patterns_batch()
+
+	:param list list_doc_graphs: list of documents, each a list of serialized dependency graphs
+	:param dict dict_batch_args: args for comp_sem_lib.match_extraction_patterns() { 'list_extraction_patterns' : ..., 'dict_collapse_dep_types' : ..., 'dict_assert_true' : ..., 'dict_assert_false' : ... }
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: list of documents, each a list of extractions for each sent
+	:rtype: list
+	"""
+
+	listResult = []
+	for listSerializedGraphs in list_doc_graphs :
+		listExtractionsDoc = []
+		for strSerializedGraph in listSerializedGraphs :
+			depObj = nltk.parse.DependencyGraph( tree_str = strSerializedGraph, top_relation_label = 'root' )
+
+			listMatches = openiepy.comp_sem_lib.match_extraction_patterns(
+				dep_graph = depObj,
+				list_extraction_patterns = dict_batch_args['list_extraction_patterns'],
+				dict_collapse_dep_types = dict_batch_args['dict_collapse_dep_types'],
+				dict_assert_true = dict_batch_args['dict_assert_true'],
+				dict_assert_false = dict_batch_args['dict_assert_false'],
+				dict_openie_config = dict_openie_config )
+			listExtractionsDoc.append( listMatches )
+
+		listResult.append( listExtractionsDoc )
+
+	return listResult
+
+def match_extraction_patterns_batch( dict_document_sent_graphs = {}, list_extraction_patterns = [], dict_collapse_dep_types = {}, dict_assert_true = openiepy.comp_sem_lib.dict_assertion_true, dict_assert_false = openiepy.comp_sem_lib.dict_assertion_false, max_processes = 4, worker_pool = None, dict_openie_config = None ) :
+	"""
+	match extraction patterns to a batch of documents. same interface as comp_sem_lib.match_extraction_patterns_batch() but documents are scheduled longest-first (cost = graph nodes) on a shared work queue, and a worker_pool can be reused across calls.
+
+	:param dict dict_document_sent_graphs: dict of documents { docID : list of nltk.parse.DependencyGraph }
+	:param list list_extraction_patterns: list of parsed extraction patterns from comp_sem_lib.parse_extraction_pattern()
+	:param dict dict_collapse_dep_types: mapping of dep types to collapse
+	:param dict dict_assert_true: assertion checks for true
+	:param dict dict_assert_false: assertion checks for false
+	:param int max_processes: number of worker processes
+	:param dict worker_pool: worker pool handle returned from nlp_scheduler_lib.start_worker_pool(). None will start worker processes for this call only.
+	:param dict dict_openie_config: config object returned from openie_lib.get_openie_config()
+
+	:return: dict of documents { docID : [ list of extractions for each sent ] }
+	:rtype: dict
+	"""
+
+	if not isinstance( dict_document_sent_graphs, dict ) :
+		raise Exception( 'invalid dict_document_sent_graphs' )
+	if not isinstance( list_extraction_patterns, list ) :
+		raise Exception( 'invalid list_extraction_patterns' )
+	if not isinstance( dict_openie_config, dict ) :
+		raise Exception( 'invalid dict_openie_config' )
+
+	( dictSerialized, dictCosts ) = serialize_document_graphs( dict_document_sent_graphs = dict_document_sent_graphs, dict_openie_config = dict_openie_config )
+
+	dictBatchArgs = {
+		'list_extraction_patterns' : list_extraction_patterns,
+		'dict_collapse_dep_types' : dict_collapse_dep_types,
+		'dict_assert_true' : dict_assert_true,
+		'dict_assert_false' : dict_assert_false,
+		}
+
+	return execute_batch_queue(
+		dict_tasks = dictSerialized,
+		dict_costs = dictCosts,
+		batch_function = match_patterns_batch_function,
+		dict_batch_args = dictBatchArgs,
+		max_processes = max_processes,
+		stage = 'match templates',
+		worker_pool = worker_pool,
+		dict_openie_config = dict_openie_config )
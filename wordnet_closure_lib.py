@@ -0,0 +1,540 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+..
+	/////////////////////////////////////////////////////////////////////////
+	//
+	// (c) Copyright University of Southampton IT Innovation, 2018
+	//
+	// Copyright in this software belongs to IT Innovation Centre of
+	// Gamma House, Enterprise Road, Southampton SO16 7NS, UK.
+	//
+	// This software may not be used, sold, licensed, transferred, copied
+	// or reproduced in whole or in part in any manner or form or in or
+	// on any media by any person other than in accordance with the terms
+	// of the Licence Agreement supplied with the software, or otherwise
+	// without the prior written consent of the copyright owners.
+	//
+	// This software is distributed WITHOUT ANY WARRANTY, without even the
+	// implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+	// PURPOSE, except where stated in the Licence Agreement supplied with
+	// the software.
+	//
+	// Created By : Stuart E. Middleton
+	// Created Date : 2018/11/26
+	// Created for Project: GRAVITATE
+	//
+	/////////////////////////////////////////////////////////////////////////
+	//
+	// Dependancies: None
+	//
+	/////////////////////////////////////////////////////////////////////////
+	'''
+
+Precomputed WordNet table for nouns and verbs, built offline from the NLTK WordNet corpus and memory mapped when loaded (using the lexicon_snapshot_lib file format).
+Every noun and verb synset has an integer ID. For each synset the table holds its lemma names, lemma names with frequency counts, verb groups and the transitive hypernym closure (each ancestor with its shortest distance), so hypernym queries are array lookups rather than a recursive walk of NLTK synsets.
+The lemma index, exception lists and morphological substitutions (for all POS) are also in the table, so lemma lookup and morphy do not need the NLTK WordNet corpus reader to be loaded at all.
+
+Functions mirror those in lexicopy.wordnet_lib, but take a synset ID instead of a nltk.corpus.reader.wordnet.Synset, and give the same results:
+	get_synset_ids() == lexicopy.wordnet_lib.get_synset_names()
+	get_lemma() == lexicopy.wordnet_lib.get_lemma()
+	get_lemma_with_freq() == lexicopy.wordnet_lib.get_lemma_with_freq()
+	inherited_hypernyms() == lexicopy.wordnet_lib.inherited_hypernyms()
+	verb_groups() == lexicopy.wordnet_lib.verb_groups()
+	find_base_word_form() == lexicopy.wordnet_lib.find_base_word_form()
+
+Build the table with: python wordnet_closure_lib.py <closure file>
+The table must be rebuilt if WordNet or NLTK is upgraded. The WordNet and NLTK versions used to build the table are recorded in it, and open_wordnet_closure() will not open a table built with a different version of either.
+The build reads NLTK WordNet corpus reader internals (_lemma_pos_offset_map, _exception_map and _data_file(), also used by get_wordnet_version()), which are not part of the NLTK API and may change between NLTK versions. It has been tested with NLTK 3.4.5 and WordNet 3.0.
+
+"""
+
+import os, sys, logging
+import nltk
+import lexicopy
+import lexicon_snapshot_lib
+
+# closure table format version (increment if the table layout or the way it is built changes, so old tables are rejected)
+nClosureVersion = 1
+
+# POS with synsets in the closure table
+strClosurePOS = 'nv'
+
+# POS with a lemma index for morphy (in the order NLTK WordNet morphy checks them)
+strMorphyPOS = 'nvar'
+
+# tables in a closure file = [ table name, ... ]
+# arrays are indexed by synset ID, index_<pos> and exception_<pos> are keyed on word form
+listClosureTables = [
+	'info',
+	'synset_id',
+	'synset_name',
+	'synset_pos',
+	'lemma',
+	'lemma_freq',
+	'hypernym_closure',
+	'verb_group',
+	'index_n',
+	'index_v',
+	'index_a',
+	'index_r',
+	'exception_n',
+	'exception_v',
+	'exception_a',
+	'exception_r',
+	]
+
+# open closure tables, so each process opens a closure file once = { filename : wordnet_closure }
+dictOpenClosures = {}
+
+def get_wordnet_version() :
+	"""
+	return the version of the NLTK WordNet corpus used by lexicopy (e.g. 3.0)
+
+	:return: WordNet version
+	:rtype: str
+	"""
+
+	wordnet = lexicopy.wordnet_lib.wordnet
+
+	# note: NLTK get_version() reads from the current position of the adjective data file handle (which synset lookups move), so rewind it first
+	wordnet._data_file( 'a' ).seek( 0 )
+	return wordnet.get_version()
+
+def calc_closure_checksum() :
+	"""
+	calc the checksum recorded in a closure table file
+
+	:return: checksum
+	:rtype: str
+	"""
+
+	return lexicon_snapshot_lib.calc_snapshot_checksum( list_source_files = [], list_settings = [ 'wordnet_closure', nClosureVersion ] )
+
+def calc_hypernym_closure( synset_id = None, list_hypernyms = [], dict_closure = {} ) :
+	"""
+	calc the transitive hypernym closure of a synset (memoized in dict_closure, so each synset is calculated once)
+
+	:param int synset_id: synset ID
+	:param list list_hypernyms: direct hypernym synset IDs for each synset ID = [ [ synset_id, ... ], ... ]
+	:param dict dict_closure: closure of synsets calculated so far = { synset_id : { ancestor_synset_id : distance } }
+
+	:return: ancestors with their shortest distance = { ancestor_synset_id : distance }, where distance 1 = direct hypernym
+	:rtype: dict
+	"""
+
+	if synset_id in dict_closure :
+		return dict_closure[synset_id]
+
+	dictAncestors = {}
+	for nHyper in list_hypernyms[synset_id] :
+		if (not nHyper in dictAncestors) or (dictAncestors[nHyper] > 1) :
+			dictAncestors[nHyper] = 1
+		dictHyperClosure = calc_hypernym_closure( synset_id = nHyper, list_hypernyms = list_hypernyms, dict_closure = dict_closure )
+		for nAncestor in dictHyperClosure :
+			nDist = dictHyperClosure[nAncestor] + 1
+			if (not nAncestor in dictAncestors) or (dictAncestors[nAncestor] > nDist) :
+				dictAncestors[nAncestor] = nDist
+
+	dict_closure[synset_id] = dictAncestors
+	return dictAncestors
+
+def build_wordnet_closure( filename = None, dict_lexicon_config = None ) :
+	"""
+	build a closure table file from the NLTK WordNet corpus (offline build step, it takes a few minutes for WordNet 3.0)
+
+	:param str filename: closure table filename
+	:param dict dict_lexicon_config: config object returned from lexicon_lib.get_lexicon_config()
+	"""
+
+	if not isinstance( filename, (str,unicode) ) :
+		raise Exception( 'invalid filename' )
+	if not isinstance( dict_lexicon_config, dict ) :
+		raise Exception( 'invalid dict_lexicon_config' )
+
+	wordnet = lexicopy.wordnet_lib.wordnet
+	strVersion = get_wordnet_version()
+
+	# synset IDs (nouns then verbs)
+	listSynsets = []
+	for strPOS in strClosurePOS :
+		listSynsets.extend( list( wordnet.all_synsets( strPOS ) ) )
+
+	dictSynsetID = {}
+	dictOffsetID = {}
+	for nID in range(len(listSynsets)) :
+		dictSynsetID[ listSynsets[nID].name() ] = nID
+		dictOffsetID[ ( listSynsets[nID].pos(), listSynsets[nID].offset() ) ] = nID
+
+	dict_lexicon_config['logger'].info( 'wordnet closure synsets = ' + str(len(listSynsets)) )
+
+	listNames = []
+	listPOS = []
+	listLemma = []
+	listLemmaFreq = []
+	listHypernyms = []
+	listVerbGroups = []
+
+	for syn in listSynsets :
+		strPOS = syn.pos()
+		listNames.append( syn.name() )
+		listPOS.append( strPOS )
+
+		# lemma as added by lexicopy.wordnet_lib.get_lemma( pos = syn.pos() ) in the order they are added
+		listLemmaNames = []
+		for lemma in syn.lemmas( lang = 'eng' ) :
+			listLemmaNames.append( syn.name() + '.' + lemma.name() )
+			for lemmaDerived in lemma.derivationally_related_forms() :
+				synDerived = lemmaDerived.synset()
+				if synDerived.pos() in strPOS :
+					listLemmaNames.append( synDerived.name() + '.' + lemmaDerived.name() )
+		listLemma.append( listLemmaNames )
+
+		# lemma as added by lexicopy.wordnet_lib.get_lemma_with_freq( pos = syn.pos() ) in the order they are added
+		# note: get_lemma_with_freq() stops at the first derived lemma with a different POS, so this does too
+		listLemmaNames = []
+		bStop = False
+		for lemma in syn.lemmas( lang = 'eng' ) :
+			listLemmaNames.append( ( syn.name() + '.' + lemma.name(), lemma.count() ) )
+			for lemmaDerived in lemma.derivationally_related_forms() :
+				synDerived = lemmaDerived.synset()
+				if not synDerived.pos() in strPOS :
+					bStop = True
+					break
+				listLemmaNames.append( ( synDerived.name() + '.' + lemmaDerived.name(), lemmaDerived.count() ) )
+			if bStop == True :
+				break
+		listLemmaFreq.append( listLemmaNames )
+
+		# hypernyms (nouns and verbs only have noun and verb hypernyms)
+		listHypernyms.append( [ dictSynsetID[ synHyper.name() ] for synHyper in syn.hypernyms() if synHyper.name() in dictSynsetID ] )
+		listVerbGroups.append( [ dictSynsetID[ synVerb.name() ] for synVerb in syn.verb_groups() if synVerb.name() in dictSynsetID ] )
+
+	# transitive hypernym closure, sorted by distance so queries with a max depth can stop early
+	# listClosure = [ ( ( ancestor_synset_id, distance ), ... ), ... ]
+	dictClosure = {}
+	listClosure = []
+	for nID in range(len(listSynsets)) :
+		dictAncestors = calc_hypernym_closure( synset_id = nID, list_hypernyms = listHypernyms, dict_closure = dictClosure )
+		listClosure.append( tuple( sorted( dictAncestors.items(), key = lambda entry: ( entry[1], entry[0] ) ) ) )
+	dictClosure = None
+
+	# lemma index, exception lists and morphological substitutions (NLTK reader internals, which morphy() uses to find lemma)
+	# note: adjective and adverb synsets are not in the closure table, so their index is only used by morphy() and has no synset IDs
+	dictIndex = {}
+	dictExceptions = {}
+	dictInfo = {
+		'wordnet_version' : strVersion,
+		'nltk_version' : nltk.__version__,
+		}
+	for strPOS in strMorphyPOS :
+		dictIndex[strPOS] = {}
+		for strForm in wordnet._lemma_pos_offset_map :
+			if strPOS in wordnet._lemma_pos_offset_map[strForm] :
+				if strPOS in strClosurePOS :
+					dictIndex[strPOS][strForm] = [ dictOffsetID[ ( strPOS, nOffset ) ] for nOffset in wordnet._lemma_pos_offset_map[strForm][strPOS] ]
+				else :
+					dictIndex[strPOS][strForm] = []
+		dictExceptions[strPOS] = dict( wordnet._exception_map[strPOS] )
+		dictInfo['substitutions_' + strPOS] = [ list( tupleSub ) for tupleSub in wordnet.MORPHOLOGICAL_SUBSTITUTIONS[strPOS] ]
+
+	lexicon_snapshot_lib.write_snapshot(
+		filename = filename,
+		list_tables = [
+			( 'info', dictInfo ),
+			( 'synset_id', dictSynsetID ),
+			( 'synset_name', listNames ),
+			( 'synset_pos', listPOS ),
+			( 'lemma', listLemma ),
+			( 'lemma_freq', listLemmaFreq ),
+			( 'hypernym_closure', listClosure ),
+			( 'verb_group', listVerbGroups ),
+			( 'index_n', dictIndex['n'] ),
+			( 'index_v', dictIndex['v'] ),
+			( 'index_a', dictIndex['a'] ),
+			( 'index_r', dictIndex['r'] ),
+			( 'exception_n', dictExceptions['n'] ),
+			( 'exception_v', dictExceptions['v'] ),
+			( 'exception_a', dictExceptions['a'] ),
+			( 'exception_r', dictExceptions['r'] ),
+			],
+		checksum = calc_closure_checksum(),
+		header_space = 4096 )
+
+	dict_lexicon_config['logger'].info( 'wordnet closure written : ' + filename + ' (WordNet ' + dictInfo['wordnet_version'] + ', ' + str(len(listSynsets)) + ' synsets)' )
+
+def open_wordnet_closure( filename = None, check_wordnet_version = True, dict_lexicon_config = None ) :
+	"""
+	open a closure table file (memory mapped, so pages are shared between processes)
+
+	:param str filename: closure table filename
+	:param bool check_wordnet_version: if True check the table was built from the same WordNet version as the NLTK WordNet corpus (this loads the NLTK WordNet corpus reader). the NLTK version is always checked.
+	:param dict dict_lexicon_config: config object returned from lexicon_lib.get_lexicon_config()
+
+	:return: closure table handle = { 'filename' : str, 'wordnet_version' : str, 'substitutions' : { pos : [ ( old, new ), ... ] }, table_name : read only table view, ... }, or None if the file does not exist, is not a closure table of the current version or was built with a different NLTK or WordNet version
+	:rtype: dict
+	"""
+
+	if not isinstance( filename, (str,unicode) ) :
+		raise Exception( 'invalid filename' )
+	if not isinstance( check_wordnet_version, bool ) :
+		raise Exception( 'invalid check_wordnet_version' )
+	if not isinstance( dict_lexicon_config, dict ) :
+		raise Exception( 'invalid dict_lexicon_config' )
+
+	if filename in dictOpenClosures :
+		return dictOpenClosures[filename]
+
+	tupleMap = lexicon_snapshot_lib.map_lexicon_snapshot( filename = filename )
+	if tupleMap == None :
+		return None
+	( mapSnapshot, dictHeader ) = tupleMap
+	if dictHeader['checksum'] != calc_closure_checksum() :
+		return None
+
+	dictClosure = {
+		'filename' : filename,
+		}
+	for strTable in listClosureTables :
+		dictClosure[strTable] = lexicon_snapshot_lib.open_snapshot_table( filename = filename, table = strTable )
+
+	# the table is built from NLTK WordNet reader internals, so a table built with another NLTK or WordNet version may not give the same results
+	dictInfo = dictClosure['info']
+	if dictInfo['nltk_version'] != nltk.__version__ :
+		dict_lexicon_config['logger'].warning( 'wordnet closure built with NLTK ' + dictInfo['nltk_version'] + ' but NLTK ' + nltk.__version__ + ' is installed, rebuild it : ' + filename )
+		return None
+	if (check_wordnet_version == True) and (dictInfo['wordnet_version'] != get_wordnet_version()) :
+		dict_lexicon_config['logger'].warning( 'wordnet closure built from WordNet ' + dictInfo['wordnet_version'] + ' but NLTK WordNet is ' + get_wordnet_version() + ', rebuild it : ' + filename )
+		return None
+
+	dictClosure['wordnet_version'] = dictInfo['wordnet_version']
+	dictClosure['substitutions'] = {}
+	for strPOS in strMorphyPOS :
+		dictClosure['substitutions'][strPOS] = [ tuple( listSub ) for listSub in dictInfo['substitutions_' + strPOS] ]
+
+	dict_lexicon_config['logger'].info( 'wordnet closure loaded : ' + filename + ' (WordNet ' + dictClosure['wordnet_version'] + ', ' + str(len(dictClosure['synset_name'])) + ' synsets)' )
+
+	dictOpenClosures[filename] = dictClosure
+	return dictClosure
+
+def morphy( wordnet_closure = None, form = None, pos = None ) :
+	"""
+	find the base forms of a word form in the closure table lemma index (same as the NLTK WordNet reader _morphy() with check_exceptions = True)
+
+	:param dict wordnet_closure: closure table handle returned from open_wordnet_closure()
+	:param unicode form: lowercase word form
+	:param str pos: WordNet POS (n, v, a or r)
+
+	:return: base forms in the lemma index (empty if none found)
+	:rtype: list
+	"""
+
+	dictIndex = wordnet_closure['index_' + pos]
+	listSubstitutions = wordnet_closure['substitutions'][pos]
+
+	def apply_rules( list_forms ) :
+		return [ strForm[ : -len(strOld) ] + strNew for strForm in list_forms for ( strOld, strNew ) in listSubstitutions if strForm.endswith( strOld ) ]
+
+	def filter_forms( list_forms ) :
+		listResult = []
+		for strForm in list_forms :
+			if (strForm in dictIndex) and (not strForm in listResult) :
+				listResult.append( strForm )
+		return listResult
+
+	# check the exception lists
+	listExceptions = wordnet_closure['exception_' + pos].get( form )
+	if listExceptions != None :
+		return filter_forms( [ form ] + listExceptions )
+
+	# apply rules once and return all that are in the index (and check the original too)
+	listForms = apply_rules( [ form ] )
+	listResult = filter_forms( [ form ] + listForms )
+	if len(listResult) > 0 :
+		return listResult
+
+	# keep applying rules until there is a match
+	while len(listForms) > 0 :
+		listForms = apply_rules( listForms )
+		listResult = filter_forms( listForms )
+		if len(listResult) > 0 :
+			return listResult
+
+	return []
+
+def find_base_word_form( wordnet_closure = None, lemma = None ) :
+	"""
+	find the base form of a word, trying each POS in turn (same as lexicopy.wordnet_lib.find_base_word_form() with no POS)
+
+	:param dict wordnet_closure: closure table handle returned from open_wordnet_closure()
+	:param unicode lemma: lemma to lookup
+
+	:return: base phrase after WordNet lookup, or None if none found
+	:rtype: unicode
+	"""
+
+	if not isinstance( wordnet_closure, dict ) :
+		raise Exception( 'invalid wordnet_closure' )
+	if not isinstance( lemma, (str,unicode) ) :
+		raise Exception( 'invalid lemma' )
+
+	for strPOS in strMorphyPOS :
+		listForms = morphy( wordnet_closure = wordnet_closure, form = lemma, pos = strPOS )
+		if len(listForms) > 0 :
+			return listForms[0]
+	return None
+
+def get_synset_ids( wordnet_closure = None, lemma = None, pos = 'nv' ) :
+	"""
+	lookup lemma and return all possible synset IDs (same synsets and order as lexicopy.wordnet_lib.get_synset_names())
+
+	:param dict wordnet_closure: closure table handle returned from open_wordnet_closure()
+	:param unicode lemma: lemma to lookup
+	:param str pos: WordNet POS filter (n and/or v)
+
+	:return: list of synset ID (empty if none found)
+	:rtype: list
+	"""
+
+	if not isinstance( wordnet_closure, dict ) :
+		raise Exception( 'invalid wordnet_closure' )
+	if not isinstance( lemma, (str,unicode) ) :
+		raise Exception( 'invalid lemma' )
+	if not isinstance( pos, (str,unicode) ) :
+		raise Exception( 'invalid pos' )
+
+	strLemma = lemma.lower()
+
+	listIDs = []
+	for strPOS in pos :
+		if not strPOS in strClosurePOS :
+			raise Exception( 'wordnet closure has no POS ' + strPOS )
+		dictIndex = wordnet_closure['index_' + strPOS]
+		for strForm in morphy( wordnet_closure = wordnet_closure, form = strLemma, pos = strPOS ) :
+			listIDs.extend( dictIndex[strForm] )
+
+	return listIDs
+
+def get_synset_id( wordnet_closure = None, synset_name = None ) :
+	"""
+	lookup a synset ID from its name
+
+	:param dict wordnet_closure: closure table handle returned from open_wordnet_closure()
+	:param str synset_name: valid wordnet synset name such as dog.n.01
+
+	:return: synset ID
+	:rtype: int
+	"""
+
+	if not isinstance( wordnet_closure, dict ) :
+		raise Exception( 'invalid wordnet_closure' )
+	if not isinstance( synset_name, (str,unicode) ) :
+		raise Exception( 'invalid synset_name' )
+
+	nID = wordnet_closure['synset_id'].get( synset_name )
+	if nID == None :
+		raise Exception( 'synset not in wordnet closure : ' + synset_name )
+	return nID
+
+def get_lemma( set_lexicon, wordnet_closure = None, synset_id = None, pos = 'nv' ) :
+	"""
+	get all lemma (direct and derived) for a synset and add them to set_lexicon
+
+	:param set set_lexicon: set of WordNet lexicon synsets and lemma names
+	:param dict wordnet_closure: closure table handle returned from open_wordnet_closure()
+	:param int synset_id: synset ID
+	:param str pos: WordNet POS filter
+	"""
+
+	if wordnet_closure['synset_pos'][synset_id] in pos :
+		set_lexicon.update( wordnet_closure['lemma'][synset_id] )
+
+def get_lemma_with_freq( set_lexicon, wordnet_closure = None, synset_id = None, pos = 'nv' ) :
+	"""
+	get all lemma with a freq count
+
+	:param set set_lexicon: set of tuples = ( lemma name, count )
+	:param dict wordnet_closure: closure table handle returned from open_wordnet_closure()
+	:param int synset_id: synset ID
+	:param str pos: WordNet POS filter
+	"""
+
+	if wordnet_closure['synset_pos'][synset_id] in pos :
+		set_lexicon.update( wordnet_closure['lemma_freq'][synset_id] )
+
+def inherited_hypernyms( set_lexicon, wordnet_closure = None, synset_id = None, pos = 'nv', max_depth = 3 ) :
+	"""
+	get lemma of all inherited hypernym synsets and add them to set_lexicon
+
+	:param set set_lexicon: set of WordNet lexicon synsets and lemma names
+	:param dict wordnet_closure: closure table handle returned from open_wordnet_closure()
+	:param int synset_id: synset ID
+	:param str pos: WordNet POS filter
+	:param int max_depth: maximum depth for inherited search (0 = direct hypernyms only)
+	"""
+
+	if not isinstance( set_lexicon, set ) :
+		raise Exception( 'invalid set_lexicon' )
+	if not isinstance( wordnet_closure, dict ) :
+		raise Exception( 'invalid wordnet_closure' )
+	if not isinstance( synset_id, int ) :
+		raise Exception( 'invalid synset_id' )
+	if not isinstance( max_depth, int ) :
+		raise Exception( 'invalid max_depth' )
+
+	# lexicopy.wordnet_lib.inherited_hypernyms() adds hypernyms up to max_depth + 1 links away
+	for ( nAncestor, nDist ) in wordnet_closure['hypernym_closure'][synset_id] :
+		if nDist > max_depth + 1 :
+			break
+		get_lemma( set_lexicon, wordnet_closure = wordnet_closure, synset_id = nAncestor, pos = pos )
+
+def verb_groups( set_lexicon, wordnet_closure = None, synset_id = None, pos = 'v' ) :
+	"""
+	get lemma of the verb group for a synset and add them to set_lexicon
+
+	:param set set_lexicon: set of WordNet lexicon synsets and lemma names
+	:param dict wordnet_closure: closure table handle returned from open_wordnet_closure()
+	:param int synset_id: synset ID
+	:param str pos: WordNet POS filter
+	"""
+
+	if not isinstance( set_lexicon, set ) :
+		raise Exception( 'invalid set_lexicon' )
+	if not isinstance( wordnet_closure, dict ) :
+		raise Exception( 'invalid wordnet_closure' )
+	if not isinstance( synset_id, int ) :
+		raise Exception( 'invalid synset_id' )
+
+	for nVerb in wordnet_closure['verb_group'][synset_id] :
+		get_lemma( set_lexicon, wordnet_closure = wordnet_closure, synset_id = nVerb, pos = pos )
+
+if __name__ == '__main__' :
+
+	#
+	# check args
+	#
+	if len(sys.argv) < 2 :
+		print 'Usage: wordnet_closure_lib.py <closure file>\n'
+		sys.stdout.flush()
+		sys.exit(1)
+
+	# make logger (global to STDOUT)
+	LOG_FORMAT = ('%(levelname) -s %(asctime)s %(message)s')
+	logger = logging.getLogger( __name__ )
+	logging.basicConfig( level=logging.INFO, format=LOG_FORMAT )
+	logger.info('logging started')
+
+	try :
+		build_wordnet_closure( filename = sys.argv[1], dict_lexicon_config = { 'logger' : logger } )
+
+	except :
+		logger.exception( 'wordnet_closure_lib main() exception' )
+		sys.stderr.flush()
+		sys.stdout.flush()
+		sys.exit(1)
+
+	# all done
+	logger.info('finished')
+	sys.stdout.flush()
+	sys.exit(0);